@@ -1,7 +1,7 @@
 # Home.py (vorher main.py)
 import streamlit as st
-from app.chroma_client import get_chroma_vectorstore
-from langchain_ollama import OllamaEmbeddings
+from app.chroma_client import check_connectivity, get_chroma_vectorstore, create_embedding_model
+from app.collection_inventory import get_inventory
 from app.config import Config
 
 st.set_page_config(
@@ -23,39 +23,62 @@ Dieser Chatbot hilft dir, Informationen aus hochgeladenen Dokumenten zu finden.
 ### 📊 Aktueller Status:
 """)
 
-# Zeige Statistiken
-try:
-    @st.cache_resource
-    def get_vectorstore():
-        embedding_model = OllamaEmbeddings(
-            base_url=Config.OLLAMA_BASE_URL,
-            model=Config.OLLAMA_EMBEDDING_MODEL
-        )
-        return get_chroma_vectorstore(embedding_model)
-    
-    vectorstore = get_vectorstore()
-    doc_count = vectorstore._collection.count()
-    
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.metric("📄 Dokumente", doc_count)
-    
-    with col2:
-        st.metric("🗄️ ChromaDB", "✅ Verbunden")
-    
-    with col3:
-        st.metric("🤖 Ollama", "✅ Bereit")
-    
-    if doc_count == 0:
-        st.info("👉 Noch keine Dokumente vorhanden. Lade welche auf der **Dokumente**-Seite hoch!")
+# Zeige Statistiken (schneller Heartbeat statt Client-Import beim Seitenstart)
+@st.cache_data(ttl=30, show_spinner=False)
+def get_status():
+    return check_connectivity()
+
+@st.cache_resource
+def get_vectorstore():
+    embedding_model = create_embedding_model()
+    return get_chroma_vectorstore(embedding_model)
+
+status = get_status()
+chroma_ok = status["chroma"]["ok"]
+ollama_ok = status["ollama"]["ok"]
+
+col1, col2, col3 = st.columns(3)
+
+with col2:
+    if chroma_ok:
+        st.metric("🗄️ ChromaDB", "✅ Verbunden", f"{status['chroma']['latency_ms']:.0f} ms", delta_color="off")
+    else:
+        st.metric("🗄️ ChromaDB", "❌ Nicht erreichbar")
+
+with col3:
+    if ollama_ok:
+        st.metric("🤖 Ollama", "✅ Bereit", f"{status['ollama']['latency_ms']:.0f} ms", delta_color="off")
     else:
-        st.success(f"✅ {doc_count} Dokumente bereit für Abfragen!")
+        st.metric("🤖 Ollama", "❌ Nicht erreichbar")
 
-except Exception as e:
-    st.error(f"❌ Verbindungsfehler: {e}")
+if chroma_ok:
+    try:
+        # Anzahl aus dem Inventar, ChromaDB-Client nur falls noch keins existiert
+        inventory = get_inventory(Config.CHROMA_COLLECTION_NAME)
+        if inventory.is_built():
+            doc_count = inventory.totals()["chunks"]
+        else:
+            doc_count = get_vectorstore()._collection.count()
+        
+        with col1:
+            st.metric("📄 Dokumente", doc_count)
+        
+        if doc_count == 0:
+            st.info("👉 Noch keine Dokumente vorhanden. Lade welche auf der **Dokumente**-Seite hoch!")
+        else:
+            st.success(f"✅ {doc_count} Dokumente bereit für Abfragen!")
+    
+    except Exception as e:
+        st.error(f"❌ Verbindungsfehler: {e}")
+else:
+    with col1:
+        st.metric("📄 Dokumente", "–")
+    st.error(f"❌ Verbindungsfehler: {status['chroma'].get('error')}")
     st.info("Stelle sicher, dass ChromaDB läuft: `docker-compose up -d`")
 
+if not ollama_ok:
+    st.warning(f"⚠️ Ollama nicht erreichbar ({Config.OLLAMA_BASE_URL}): {status['ollama'].get('error')}")
+
 st.divider()
 
 st.markdown("""
@@ -65,6 +88,6 @@ st.markdown("""
 - **Collection**: {collection}
 """.format(
     model=Config.OLLAMA_EMBEDDING_MODEL,
-    server=Config.OLLAMA_BASE_URL,
+    server=", ".join(e["url"] for e in status["ollama"].get("endpoints", [])) or Config.OLLAMA_BASE_URL,
     collection=Config.CHROMA_COLLECTION_NAME
 ))
\ No newline at end of file
@@ -0,0 +1,265 @@
+# app/api_server.py
+"""
+Headless HTTP-Service vor der RAG Pipeline (ohne Streamlit).
+
+Endpunkte:
+    GET  /health                        Lebenszeichen
+    GET  /collections/<name>/stats      Anzahl Chunks einer Collection
+    GET  /metrics                       Zähler und Stufen-Histogramme (Prometheus-Textformat)
+    POST /query                         {"question", "collection", "k"} → Antwort + Quellen
+    POST /query/stream                  wie /query, aber als Server-Sent Events
+                                        (Events 'sources', 'queue', 'token', 'metrics', 'done', ...)
+
+Pipelines, Vectorstores und das Embedding-Modell werden prozessweit
+wiederverwendet, so dass parallele Requests sich Verbindungen, Scheduler und
+Query-Batching teilen.
+
+Start (aus src/):
+    python -m app.api_server --port 8080
+"""
+import argparse
+import json
+import logging
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+from .chroma_client import get_chroma_vectorstore, create_embedding_model
+from .config import Config
+from .metrics import get_metrics
+from .rag_pipeline import RAGPipeline
+
+logger = logging.getLogger(__name__)
+
+# Obergrenze für den Request-Body (eine Frage plus Parameter)
+MAX_BODY_BYTES = 64 * 1024
+
+
+class BodyTooLarge(ValueError):
+    """Request-Body größer als MAX_BODY_BYTES"""
+
+
+class PipelineRegistry:
+    """Hält pro Collection eine RAG Pipeline (einmal erstellt, dann wiederverwendet)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._embedding_model = None
+        self._vectorstores: Dict[str, object] = {}
+        self._pipelines: Dict[str, RAGPipeline] = {}
+
+    @property
+    def collections(self):
+        return [Config.DOCUMENTS_COLLECTION, Config.METADATA_COLLECTION]
+
+    def get_vectorstore(self, collection_name: str):
+        with self._lock:
+            if self._embedding_model is None:
+                self._embedding_model = create_embedding_model()
+            if collection_name not in self._vectorstores:
+                self._vectorstores[collection_name] = get_chroma_vectorstore(
+                    self._embedding_model, collection_name=collection_name
+                )
+            return self._vectorstores[collection_name]
+
+    def get_pipeline(self, collection_name: str) -> RAGPipeline:
+        vectorstore = self.get_vectorstore(collection_name)
+        with self._lock:
+            if collection_name not in self._pipelines:
+                self._pipelines[collection_name] = RAGPipeline(
+                    vectorstore, collection_name=collection_name
+                )
+            return self._pipelines[collection_name]
+
+
+class RAGRequestHandler(BaseHTTPRequestHandler):
+    """HTTP-Handler für Query-, Streaming- und Stats-Endpunkte"""
+
+    server_version = "SADPAC-RAG/1.0"
+    protocol_version = "HTTP/1.1"
+    registry: PipelineRegistry = None
+
+    # ---- Routing ----
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0].rstrip("/")
+        parts = path.strip("/").split("/")
+
+        if path == "/health":
+            self._send_json({"status": "ok"})
+        elif path == "/metrics":
+            self._send_text(get_metrics().render_prometheus(), "text/plain; version=0.0.4; charset=utf-8")
+        elif len(parts) == 3 and parts[0] == "collections" and parts[2] == "stats":
+            self._handle_stats(parts[1])
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unbekannter Pfad: {path}")
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0].rstrip("/")
+
+        if path not in ("/query", "/query/stream"):
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unbekannter Pfad: {path}")
+            return
+
+        try:
+            params = self._read_query_params()
+        except BodyTooLarge as e:
+            # Body bleibt ungelesen: Verbindung nach der Antwort schließen
+            self.close_connection = True
+            self._send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, str(e))
+            return
+        except ValueError as e:
+            self._send_error(HTTPStatus.BAD_REQUEST, str(e))
+            return
+
+        if path == "/query":
+            self._handle_query(**params)
+        else:
+            self._handle_query_stream(**params)
+
+    # ---- Handler ----
+
+    def _handle_stats(self, collection_name: str):
+        if collection_name not in self.registry.collections:
+            self._send_error(HTTPStatus.NOT_FOUND, f"Unbekannte Collection: {collection_name}")
+            return
+        try:
+            vectorstore = self.registry.get_vectorstore(collection_name)
+            self._send_json({
+                "collection": collection_name,
+                "count": vectorstore._collection.count(),
+            })
+        except Exception as e:
+            logger.error(f"❌ Stats-Fehler: {e}", exc_info=True)
+            self._send_error(HTTPStatus.BAD_GATEWAY, str(e))
+
+    def _handle_query(self, question: str, collection: str, k: int):
+        try:
+            result = self.registry.get_pipeline(collection).query(question, k=k)
+        except Exception as e:
+            self._send_error(HTTPStatus.BAD_GATEWAY, str(e))
+            return
+        self._send_json({
+            "answer": result["answer"],
+            "sources": result["sources"],
+            "metrics": result["metrics"],
+        })
+
+    def _handle_query_stream(self, question: str, collection: str, k: int):
+        try:
+            rag = self.registry.get_pipeline(collection)
+        except Exception as e:
+            self._send_error(HTTPStatus.BAD_GATEWAY, str(e))
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.send_header("X-Accel-Buffering", "no")
+        self.end_headers()
+        self.close_connection = True
+
+        cancel_event = threading.Event()
+        stream = rag.query_stream(question, k=k, cancel_event=cancel_event)
+        try:
+            for event in stream:
+                payload = json.dumps(event, ensure_ascii=False, default=str)
+                self.wfile.write(f"event: {event['type']}\ndata: {payload}\n\n".encode("utf-8"))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            # Client hat die Verbindung geschlossen - Generierung abbrechen
+            logger.info("🔌 Client getrennt, breche Generierung ab")
+        finally:
+            cancel_event.set()
+            stream.close()
+
+    # ---- Helfer ----
+
+    def _read_query_params(self) -> dict:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            raise ValueError("Ungültiger Content-Length-Header")
+        if length < 0:
+            raise ValueError("Ungültiger Content-Length-Header")
+        if length > MAX_BODY_BYTES:
+            raise BodyTooLarge(f"Body zu groß ({length} Bytes, erlaubt: {MAX_BODY_BYTES})")
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Ungültiges JSON: {e}")
+        if not isinstance(body, dict):
+            raise ValueError("Body muss ein JSON-Objekt sein")
+
+        question = body.get("question") or ""
+        if not isinstance(question, str):
+            raise ValueError("'question' muss ein String sein")
+        question = question.strip()
+        if not question:
+            raise ValueError("'question' fehlt")
+
+        collection = body.get("collection") or Config.CHROMA_COLLECTION_NAME
+        if collection not in self.registry.collections:
+            raise ValueError(f"Unbekannte Collection: {collection}")
+
+        try:
+            k = int(body.get("k", 3))
+        except (TypeError, ValueError):
+            raise ValueError("'k' muss eine Zahl sein")
+        if not 1 <= k <= 50:
+            raise ValueError("'k' muss zwischen 1 und 50 liegen")
+
+        return {"question": question, "collection": collection, "k": k}
+
+    def _send_json(self, data: dict, status: HTTPStatus = HTTPStatus.OK):
+        body = json.dumps(data, ensure_ascii=False, default=str)
+        self._send_text(body, "application/json; charset=utf-8", status)
+
+    def _send_text(self, text: str, content_type: str, status: HTTPStatus = HTTPStatus.OK):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: HTTPStatus, message: str):
+        self._send_json({"error": message}, status=status)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def create_server(host: str, port: int, registry: PipelineRegistry = None) -> ThreadingHTTPServer:
+    """Erstellt den HTTP-Server (ein Thread pro Verbindung)"""
+    handler = type("Handler", (RAGRequestHandler,), {"registry": registry or PipelineRegistry()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP Query-Service für die RAG Pipeline")
+    parser.add_argument("--host", default=Config.API_HOST, help=f"Bind-Adresse (default: {Config.API_HOST})")
+    parser.add_argument("--port", type=int, default=Config.API_PORT, help=f"Port (default: {Config.API_PORT})")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    server = create_server(args.host, args.port)
+    logger.info(f"🚀 RAG API läuft auf http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("🛑 Beende RAG API")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+# app/batch_qa.py
+"""
+Batch-Beantwortung vieler Fragen (Evaluation, FAQ-Vorgenerierung).
+
+Fragen kommen als JSONL, Antworten gehen als JSONL raus (eine Zeile pro
+Frage, sofort geschrieben). Ablauf:
+
+    - Query-Embeddings werden fensterweise in einem Call berechnet
+      (embed_query_batch, sonst embed_documents) und an RAGPipeline.query
+      übergeben.
+    - Retrieval und Generierung laufen in einem Thread-Pool mit begrenzt
+      vielen Fragen gleichzeitig; die Ollama-Slots des Schedulers bleiben
+      die eigentliche Grenze für den Chat.
+    - Die Ausgabedatei ist zugleich der Checkpoint: beim erneuten Start
+      werden bereits beantwortete IDs übersprungen, fehlgeschlagene Fragen
+      erneut versucht.
+"""
+import json
+import logging
+import os
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def read_questions(path: Path) -> Iterator[dict]:
+    """
+    Liest Fragen aus JSONL ({"question": ..., optional "id", "k", weitere Felder})
+
+    Ohne "id" wird die Zeilennummer verwendet, damit Checkpoints stabil bleiben.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"⚠️  Zeile {line_no} übersprungen (kein JSON): {e}")
+                continue
+            if not item.get("question"):
+                logger.warning(f"⚠️  Zeile {line_no} übersprungen (keine 'question')")
+                continue
+            item["id"] = str(item.get("id", line_no))
+            yield item
+
+
+def load_checkpoint(path: Path) -> Set[str]:
+    """
+    Liest die bisherige Ausgabe und gibt die erfolgreich beantworteten IDs zurück
+
+    Die Datei wird dabei bereinigt: Zeilen mit Fehler und eine beim Abbruch
+    halb geschriebene letzte Zeile fliegen raus (die Fragen laufen erneut).
+    """
+    path = Path(path)
+    if not path.exists():
+        return set()
+
+    done, kept, dropped = set(), [], 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                dropped += 1
+                continue
+            if record.get("error") or "id" not in record:
+                dropped += 1
+                continue
+            done.add(record["id"])
+            kept.append(line if line.endswith("\n") else line + "\n")
+
+    if dropped:
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(kept)
+        os.replace(tmp, path)
+        logger.info(f"🧹 {dropped} fehlerhafte/unvollständige Einträge entfernt")
+    return done
+
+
+def embed_questions(embeddings, questions: List[str]) -> List[List[float]]:
+    """Ein Embedding-Call für mehrere Fragen (wie BatchingEmbeddings)"""
+    embed_batch = getattr(embeddings, "embed_query_batch", embeddings.embed_documents)
+    return embed_batch(questions)
+
+
+class BatchQARunner:
+    """
+    Beantwortet Fragen aus einem Iterable mit begrenzter Parallelität
+
+    Args:
+        rag: RAGPipeline
+        output_path: Ausgabe-JSONL (zugleich Checkpoint)
+        workers: Gleichzeitig bearbeitete Fragen
+        embed_batch_size: Fragen pro Embedding-Call
+        k: Anzahl Quellen (pro Frage über "k" überschreibbar)
+        on_result: Optional, Callback(record) nach jeder Frage
+    """
+
+    def __init__(
+        self,
+        rag,
+        output_path: Path,
+        workers: int = 4,
+        embed_batch_size: int = 32,
+        k: int = 3,
+        on_result: Optional[Callable[[dict], None]] = None,
+    ):
+        self.rag = rag
+        self.output_path = Path(output_path)
+        self.workers = max(1, workers)
+        self.embed_batch_size = max(1, embed_batch_size)
+        self.k = k
+        self.on_result = on_result
+        self.stats = {"answered": 0, "failed": 0, "skipped": 0, "embedding_batches": 0}
+
+    def _embed_window(self, items: List[dict]) -> Tuple[List[Optional[List[float]]], Optional[dict]]:
+        """
+        Embeddings für ein Fenster; bei Fehlern rechnet query() sie selbst
+
+        Returns:
+            (Vektoren, {'batch_size', 'seconds' (Anteil pro Frage)} oder None)
+        """
+        embeddings = getattr(self.rag.vectorstore, "embeddings", None)
+        if embeddings is None:
+            return [None] * len(items), None
+
+        start = time.perf_counter()
+        try:
+            vectors = embed_questions(embeddings, [item["question"] for item in items])
+        except Exception as e:
+            logger.warning(f"⚠️  Batch-Embedding fehlgeschlagen, einzeln weiter: {e}")
+            return [None] * len(items), None
+        seconds = time.perf_counter() - start
+
+        self.stats["embedding_batches"] += 1
+        return vectors, {"batch_size": len(items), "seconds": seconds / len(items)}
+
+    def _answer(self, item: dict, query_vector: Optional[List[float]], embedding: Optional[dict]) -> dict:
+        record = dict(item)
+        start = time.perf_counter()
+        try:
+            result = self.rag.query(item["question"], k=int(item.get("k", self.k)), query_vector=query_vector)
+        except Exception as e:
+            record["error"] = str(e)
+        else:
+            record["answer"] = result["answer"]
+            record["sources"] = [
+                {"metadata": source["metadata"], "score": source["score"]} for source in result["sources"]
+            ]
+            record["scores"] = [source["score"] for source in result["sources"]]
+            record["metrics"] = result["metrics"]
+        if embedding:
+            record["embedding_batch_size"] = embedding["batch_size"]
+            record["embedding_batch_seconds"] = embedding["seconds"]
+        record["elapsed_seconds"] = time.perf_counter() - start
+        return record
+
+    def _write(self, out, record: dict) -> None:
+        """Schreibt ein Ergebnis sofort (nur im Haupt-Thread aufgerufen)"""
+        out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        out.flush()
+        if record.get("error"):
+            self.stats["failed"] += 1
+            logger.warning(f"⚠️  Frage {record['id']} fehlgeschlagen: {record['error']}")
+        else:
+            self.stats["answered"] += 1
+        if self.on_result:
+            self.on_result(record)
+
+    def run(self, questions: Iterable[dict]) -> dict:
+        """
+        Arbeitet alle (noch offenen) Fragen ab
+
+        Returns:
+            Statistik (answered, failed, skipped, embedding_batches, seconds)
+        """
+        done = load_checkpoint(self.output_path)
+        if done:
+            logger.info(f"↩️  Checkpoint: {len(done)} Fragen bereits beantwortet")
+
+        def pending_questions():
+            for item in questions:
+                if item["id"] in done:
+                    self.stats["skipped"] += 1
+                    continue
+                yield item
+
+        started = time.perf_counter()
+        iterator = pending_questions()
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.output_path, "a", encoding="utf-8") as out, \
+                ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch-qa") as executor:
+            in_flight = set()
+
+            def collect(return_when):
+                finished, still_running = wait(in_flight, return_when=return_when)
+                for future in finished:
+                    self._write(out, future.result())
+                return still_running
+
+            while True:
+                window = list(islice(iterator, self.embed_batch_size))
+                if not window:
+                    break
+                # Nächstes Fenster einbetten, während die Worker noch generieren
+                vectors, embedding = self._embed_window(window)
+                for item, vector in zip(window, vectors):
+                    # Begrenzt: höchstens 'workers' Fragen in Arbeit
+                    while len(in_flight) >= self.workers:
+                        in_flight = collect(FIRST_COMPLETED)
+                    in_flight.add(executor.submit(self._answer, item, vector, embedding))
+            if in_flight:
+                collect(ALL_COMPLETED)
+
+        self.stats["seconds"] = time.perf_counter() - started
+        return dict(self.stats)
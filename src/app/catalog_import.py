@@ -0,0 +1,489 @@
+# app/catalog_import.py
+"""
+Strukturierter Import von Katalog-Exporten (JSONL, CSV/TSV, MARC) in
+metadata-collection.
+
+Statt Katalogdaten als Fließtext durch Loader und Splitter zu schicken,
+wird jeder Datensatz zu genau einem Dokument: der Embedding-Text entsteht
+aus einer Feld-Vorlage (Config.CATALOG_TEXT_TEMPLATE), alle Felder bleiben
+als Metadaten erhalten. Die IDs sind deterministisch, ein erneuter Import
+überschreibt also bestehende Einträge statt sie zu verdoppeln; unveränderte
+Datensätze werden gar nicht erst neu eingebettet.
+
+Die Leser arbeiten streamend, zusammen mit store_chunk_stream liegen nie
+mehr als group_size Datensätze gleichzeitig im Speicher.
+"""
+import csv
+import hashlib
+import json
+import logging
+import re
+import sys
+import uuid
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from .catalog_index import FIELD_LABELS
+from .config import Config
+from .ingestion import store_chunk_stream
+
+logger = logging.getLogger(__name__)
+
+# Namensraum für deterministische Datensatz-IDs
+CATALOG_NAMESPACE = uuid.UUID("6b1f5c3e-2d4a-5e8f-9a0b-c1d2e3f4a5b6")
+
+FORMATS = {
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".csv": "csv",
+    ".tsv": "csv",
+    ".mrc": "marc",
+    ".marc": "marc",
+    ".mrk": "mrk",
+    ".xml": "marcxml",
+}
+
+# MARC 21: (Tag, Unterfelder, Feldname); mehrfach belegte Felder werden Listen
+MARC_FIELDS: List[Tuple[str, str, str]] = [
+    ("001", "", "control_number"),
+    ("020", "a", "isbn"),
+    ("022", "a", "issn"),
+    ("041", "a", "language"),
+    ("082", "a", "classification"),
+    ("084", "a", "classification"),
+    ("100", "a", "author"),
+    ("110", "a", "author"),
+    ("245", "ab", "title"),
+    ("245", "c", "responsibility"),
+    ("250", "a", "edition"),
+    ("260", "a", "place"),
+    ("260", "b", "publisher"),
+    ("260", "c", "year"),
+    ("264", "a", "place"),
+    ("264", "b", "publisher"),
+    ("264", "c", "year"),
+    ("300", "a", "extent"),
+    ("490", "a", "series"),
+    ("520", "a", "summary"),
+    ("650", "a", "subjects"),
+    ("689", "a", "subjects"),  # RSWK-Schlagwortketten (DNB)
+    ("700", "a", "contributors"),
+]
+
+# Vom Importer gesetzte Metadaten; gleichnamige Katalogfelder bekommen das Präfix "record_"
+RESERVED_KEYS = ("filename", "source", "record_id", "source_format")
+
+_PLACEHOLDER = re.compile(r"\{([^{}]+)\}")
+# ISBD-Satzzeichen am Feldende ("Titel :", "Verlag,", "2001.")
+_ISBD_TRAILING = re.compile(r"[\s/:;,=.]+$")
+
+MarcField = Tuple[str, str, List[Tuple[str, str]]]
+
+
+def detect_format(path: Path) -> Optional[str]:
+    return FORMATS.get(Path(path).suffix.lower())
+
+
+# ---------------------------------------------------------------------------
+# Leser
+# ---------------------------------------------------------------------------
+
+def read_jsonl(path: Path) -> Iterator[dict]:
+    """Ein JSON-Objekt pro Zeile; ungültige Zeilen werden übersprungen"""
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                logger.warning(f"⚠️  {path.name}:{line_no}: kein gültiges JSON ({e})")
+                continue
+            if not isinstance(record, dict):
+                logger.warning(f"⚠️  {path.name}:{line_no}: kein JSON-Objekt")
+                continue
+            yield record
+
+
+def read_csv(path: Path, delimiter: Optional[str] = None) -> Iterator[dict]:
+    """CSV/TSV mit Kopfzeile; Trennzeichen wird erkannt, wenn nicht angegeben"""
+    # Lange Felder (Abstracts) überschreiten sonst das Default-Limit von 128 KB
+    csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if delimiter is None:
+            if path.suffix.lower() == ".tsv":
+                delimiter = "\t"
+            else:
+                sample = f.read(64 * 1024)
+                f.seek(0)
+                try:
+                    delimiter = csv.Sniffer().sniff(sample, delimiters=",;\t|").delimiter
+                except csv.Error:
+                    delimiter = ","
+        for row in csv.DictReader(f, delimiter=delimiter):
+            # Überzählige Spalten landen unter dem Schlüssel None
+            yield {k: v for k, v in row.items() if k is not None}
+
+
+def read_marc(path: Path) -> Iterator[List[MarcField]]:
+    """Binäres MARC (ISO 2709), Datensatz für Datensatz"""
+    with open(path, "rb") as f:
+        while True:
+            head = f.read(5)
+            if not head.strip():
+                return
+            try:
+                length = int(head)
+            except ValueError:
+                logger.warning(f"⚠️  {path.name}: ungültige Datensatzlänge {head!r}, Import abgebrochen")
+                return
+            raw = head + f.read(length - 5)
+            try:
+                yield _parse_iso2709(raw)
+            except (ValueError, IndexError) as e:
+                logger.warning(f"⚠️  {path.name}: fehlerhafter MARC-Datensatz übersprungen ({e})")
+
+
+def _parse_iso2709(raw: bytes) -> List[MarcField]:
+    leader = raw[:24].decode("ascii", errors="replace")
+    # Leader/09 = "a": Unicode, sonst MARC-8 (hier näherungsweise Latin-1)
+    encoding = "utf-8" if leader[9] == "a" else "latin-1"
+    base = int(leader[12:17])
+    directory = raw[24:base - 1]
+
+    fields: List[MarcField] = [("LDR", "", [("", leader)])]
+    for pos in range(0, len(directory) - 11, 12):
+        entry = directory[pos:pos + 12].decode("ascii")
+        tag, length, start = entry[:3], int(entry[3:7]), int(entry[7:12])
+        data = raw[base + start:base + start + length].rstrip(b"\x1e\x1d")
+        text = data.decode(encoding, errors="replace")
+        if tag < "010":
+            fields.append((tag, "", [("", text)]))
+        else:
+            parts = text.split("\x1f")
+            fields.append((tag, parts[0], [(p[:1], p[1:]) for p in parts[1:] if p]))
+    return fields
+
+
+def read_mrk(path: Path) -> Iterator[List[MarcField]]:
+    """MARC im Textformat (MarcEdit .mrk: "=245  10$aTitel :$bUntertitel")"""
+    fields: List[MarcField] = []
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            if not line.strip():
+                if fields:
+                    yield fields
+                    fields = []
+                continue
+            if not line.startswith("=") or len(line) < 6:
+                continue
+            tag, rest = line[1:4], line[6:]
+            if tag == "LDR" or tag < "010":
+                fields.append((tag, "", [("", rest.replace("{dollar}", "$"))]))
+            else:
+                parts = rest[2:].split("$")
+                fields.append((tag, rest[:2], [
+                    (p[:1], p[1:].replace("{dollar}", "$")) for p in parts[1:] if p
+                ]))
+    if fields:
+        yield fields
+
+
+def read_marcxml(path: Path) -> Iterator[List[MarcField]]:
+    """MARCXML, per iterparse gestreamt (bearbeitete Datensätze werden freigegeben)"""
+    root = None
+    for event, elem in ET.iterparse(str(path), events=("start", "end")):
+        if root is None:
+            root = elem
+        if event != "end" or _local(elem.tag) != "record":
+            continue
+        fields: List[MarcField] = []
+        for child in elem:
+            name = _local(child.tag)
+            if name == "leader":
+                fields.append(("LDR", "", [("", child.text or "")]))
+            elif name == "controlfield":
+                fields.append((child.get("tag", ""), "", [("", child.text or "")]))
+            elif name == "datafield":
+                indicators = (child.get("ind1") or " ") + (child.get("ind2") or " ")
+                fields.append((child.get("tag", ""), indicators, [
+                    (sub.get("code", ""), sub.text or "") for sub in child if _local(sub.tag) == "subfield"
+                ]))
+        root.clear()
+        yield fields
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def marc_to_record(fields: List[MarcField]) -> dict:
+    """
+    Bildet MARC-Felder auf sprechende Feldnamen ab (MARC_FIELDS); alle
+    übrigen Felder bleiben als marc_<tag> erhalten
+    """
+    mapping: Dict[str, List[Tuple[str, str]]] = {}
+    for tag, codes, name in MARC_FIELDS:
+        mapping.setdefault(tag, []).append((codes, name))
+
+    record: Dict[str, list] = {}
+    for tag, _indicators, subfields in fields:
+        if tag == "LDR":
+            continue
+        targets = mapping.get(tag)
+        if targets is None:
+            value = " ".join(v.strip() for _, v in subfields if v.strip())
+            if value:
+                record.setdefault(f"marc_{tag}", []).append(value)
+            continue
+        for codes, name in targets:
+            values = [v.strip() for code, v in subfields if (not codes or code in codes) and v.strip()]
+            value = _ISBD_TRAILING.sub("", " ".join(values))
+            if value:
+                record.setdefault(name, []).append(value)
+
+    if "year" in record:
+        years = [m.group(0) for m in (re.search(r"\d{4}", y) for y in record["year"]) if m]
+        record["year"] = years[:1] or record["year"][:1]
+    return {k: v[0] if len(v) == 1 else v for k, v in record.items()}
+
+
+def iter_records(path: Path, fmt: Optional[str] = None) -> Iterator[dict]:
+    """Datensätze einer Exportdatei als Dicts (Format nach Dateiendung, wenn nicht angegeben)"""
+    path = Path(path)
+    fmt = fmt or detect_format(path)
+    if fmt == "jsonl":
+        yield from read_jsonl(path)
+    elif fmt == "csv":
+        yield from read_csv(path)
+    elif fmt in ("marc", "mrk", "marcxml"):
+        reader = {"marc": read_marc, "mrk": read_mrk, "marcxml": read_marcxml}[fmt]
+        for fields in reader(path):
+            yield marc_to_record(fields)
+    else:
+        raise ValueError(f"Unbekanntes Katalogformat für {path.name}: {fmt or path.suffix}")
+
+
+# ---------------------------------------------------------------------------
+# Datensatz → Dokument
+# ---------------------------------------------------------------------------
+
+def flatten_value(value):
+    """Metadaten-Wert für ChromaDB (nur str/int/float/bool; None = weglassen)"""
+    if value is None:
+        return None
+    if isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False, sort_keys=True) if value else None
+    if isinstance(value, (list, tuple)):
+        items = [flatten_value(v) for v in value]
+        items = [str(v) for v in items if v not in (None, "")]
+        return "; ".join(items) or None
+    text = str(value).strip()
+    return text or None
+
+
+def flatten_record(record: dict) -> dict:
+    """
+    Flache Metadaten aus einem Datensatz; fehlende Standardfelder
+    (title/author/year/isbn) werden aus bekannten Aliasen ergänzt
+    """
+    flat = {}
+    for key, value in record.items():
+        key = str(key).strip()
+        value = flatten_value(value)
+        if key and value is not None:
+            flat[key] = value
+
+    lowered = {k.lower(): k for k in flat}
+    for field, labels in FIELD_LABELS.items():
+        if field in flat:
+            continue
+        for label in labels:
+            if label in lowered:
+                flat[field] = flat[lowered[label]]
+                break
+    return flat
+
+
+def _lookup(fields: dict, lowered: dict, name: str):
+    name = name.strip()
+    if name in fields:
+        return fields[name]
+    key = lowered.get(name.lower())
+    return fields[key] if key is not None else None
+
+
+def render_text(fields: dict, template: str) -> str:
+    """
+    Embedding-Text aus der Vorlage; Zeilen, deren Platzhalter alle leer sind,
+    entfallen. Ohne Treffer werden alle Felder als "Feld: Wert" ausgegeben.
+    """
+    lowered = {k.lower(): k for k in fields}
+    lines = []
+    for line in template.splitlines():
+        names = _PLACEHOLDER.findall(line)
+        values = {name: _lookup(fields, lowered, name) for name in names}
+        if names and all(v in (None, "") for v in values.values()):
+            continue
+        lines.append(_PLACEHOLDER.sub(lambda m: str(values.get(m.group(1)) or ""), line).rstrip())
+    text = "\n".join(line for line in lines if line.strip())
+    if text.strip():
+        return text
+    return "\n".join(f"{key}: {value}" for key, value in fields.items())
+
+
+def record_id(fields: dict, id_fields: Iterable[str]) -> str:
+    """
+    Deterministische ID: aus dem ersten vorhandenen ID-Feld, sonst aus dem
+    Inhalt des Datensatzes
+    """
+    lowered = {k.lower(): k for k in fields}
+    for name in id_fields:
+        value = _lookup(fields, lowered, name)
+        if value not in (None, ""):
+            return str(uuid.uuid5(CATALOG_NAMESPACE, f"id:{value}"))
+    digest = hashlib.sha1(
+        json.dumps(fields, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    return str(uuid.uuid5(CATALOG_NAMESPACE, f"content:{digest}"))
+
+
+def record_to_document(
+    record: dict, source: Path, fmt: str, template: str, id_fields: Iterable[str]
+) -> Document:
+    return _fields_to_document(flatten_record(record), source, fmt, template, id_fields)
+
+
+def _fields_to_document(
+    fields: dict, source: Path, fmt: str, template: str, id_fields: Iterable[str]
+) -> Document:
+    doc_id = record_id(fields, id_fields)
+    text = render_text(fields, template)
+
+    metadata = {}
+    for key, value in fields.items():
+        metadata[f"record_{key}" if key in RESERVED_KEYS else key] = value
+    metadata.update({
+        "filename": source.name,
+        "source": str(source),
+        "record_id": doc_id,
+        "source_format": fmt,
+    })
+    return Document(id=doc_id, page_content=text, metadata=metadata)
+
+
+def iter_catalog_documents(
+    path: Path,
+    fmt: Optional[str] = None,
+    template: Optional[str] = None,
+    id_fields: Optional[Iterable[str]] = None,
+    stats: Optional[dict] = None,
+) -> Iterator[Document]:
+    """Ein Dokument pro Datensatz; leere Datensätze zählen als 'invalid'"""
+    path = Path(path)
+    fmt = fmt or detect_format(path)
+    template = template if template is not None else Config.CATALOG_TEXT_TEMPLATE
+    id_fields = list(id_fields or Config.CATALOG_ID_FIELDS)
+    stats = stats if stats is not None else {}
+    stats.setdefault("records", 0)
+    stats.setdefault("invalid", 0)
+
+    for record in iter_records(path, fmt):
+        stats["records"] += 1
+        fields = flatten_record(record)
+        if not fields:
+            stats["invalid"] += 1
+            continue
+        yield _fields_to_document(fields, path, fmt, template, id_fields)
+
+
+# ---------------------------------------------------------------------------
+# Import
+# ---------------------------------------------------------------------------
+
+def _make_group_filter(vectorstore, skip_unchanged: bool, stats: dict) -> Callable[[List[Document]], List[Document]]:
+    """
+    Vorbereitung pro Gruppe: doppelte IDs zusammenfassen (letzter gewinnt)
+    und optional unveränderte Datensätze aussortieren
+
+    Dubletten über Gruppengrenzen hinweg werden nacheinander geschrieben
+    (der spätere gewinnt); eine ID-Menge über die ganze Datei würde bei
+    Millionen Datensätzen den Speicher sprengen.
+    """
+    def prepare(group: List[Document]) -> List[Document]:
+        unique = {doc.id: doc for doc in group}
+        stats["duplicates"] += len(group) - len(unique)
+        if not skip_unchanged:
+            return list(unique.values())
+
+        existing = vectorstore._collection.get(ids=list(unique), include=["documents", "metadatas"])
+        stored = {
+            doc_id: (text, metadata)
+            for doc_id, text, metadata in zip(existing["ids"], existing["documents"], existing["metadatas"])
+        }
+        changed = []
+        for doc_id, doc in unique.items():
+            if stored.get(doc_id) == (doc.page_content, doc.metadata):
+                stats["unchanged"] += 1
+            else:
+                changed.append(doc)
+        return changed
+
+    return prepare
+
+
+def import_catalog_file(
+    vectorstore,
+    path: Path,
+    fmt: Optional[str] = None,
+    template: Optional[str] = None,
+    id_fields: Optional[Iterable[str]] = None,
+    batch_size: int = 64,
+    group_size: int = 1000,
+    skip_unchanged: bool = True,
+    catalog_index=None,
+    inventory=None,
+    summary_index=None,
+    on_batch: Optional[Callable[[int, int], None]] = None,
+) -> dict:
+    """
+    Importiert eine Katalogdatei gruppenweise in den Vectorstore
+
+    Args:
+        path: Exportdatei (.jsonl/.ndjson, .csv/.tsv, .mrc/.marc, .mrk, .xml)
+        fmt: Format erzwingen (sonst nach Dateiendung)
+        template: Vorlage für den Embedding-Text (default: Config.CATALOG_TEXT_TEMPLATE)
+        id_fields: Felder für die Datensatz-ID (default: Config.CATALOG_ID_FIELDS)
+        batch_size: Datensätze pro Embedding-/Upsert-Batch
+        group_size: Datensätze gleichzeitig im Speicher
+        skip_unchanged: Vorhandene, identische Datensätze nicht neu einbetten
+
+    Returns:
+        Statistik wie store_chunk_stream, plus 'records', 'invalid',
+        'duplicates', 'unchanged' und 'stored'
+    """
+    path = Path(path)
+    counts = {"records": 0, "invalid": 0, "duplicates": 0, "unchanged": 0}
+    documents = iter_catalog_documents(path, fmt, template, id_fields, stats=counts)
+
+    stats = store_chunk_stream(
+        vectorstore,
+        documents,
+        group_size=group_size,
+        on_batch=on_batch,
+        prepare_group=_make_group_filter(vectorstore, skip_unchanged, counts),
+        batch_size=batch_size,
+        catalog_index=catalog_index,
+        inventory=inventory,
+        summary_index=summary_index,
+    )
+    stats.update(counts)
+    stats["stored"] = stats["chunks"]
+    return stats
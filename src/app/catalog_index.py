@@ -0,0 +1,379 @@
+# app/catalog_index.py
+"""
+Strukturierter Feld-Index für Katalog-Einträge (Titel, Autor, Jahr, ISBN).
+
+Wird beim Import von metadata-collection befüllt und liegt als SQLite-Datei
+neben den Daten. Fragen wie "Habt ihr <Titel> von <Autor>?" können damit
+per Exakt-, Präfix- oder Fuzzy-Suche beantwortet werden, ganz ohne
+Embedding-Round-Trip zu Ollama.
+"""
+import json
+import logging
+import re
+import sqlite3
+import threading
+import unicodedata
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("title", "author", "year", "isbn")
+
+# Feld-Bezeichner in Metadaten bzw. "Label: Wert"-Zeilen im Text
+FIELD_LABELS: Dict[str, tuple] = {
+    "title": ("title", "titel", "haupttitel", "sachtitel"),
+    "author": ("author", "autor", "autorin", "verfasser", "verfasserin", "creator"),
+    "year": ("year", "jahr", "erscheinungsjahr", "date", "datum"),
+    "isbn": ("isbn", "isbn13", "isbn10"),
+}
+
+_LABEL_LINE = re.compile(r"^\s*([A-Za-zÄÖÜäöüß0-9 ]{2,30}?)\s*[:=]\s*(.+?)\s*$")
+_ISBN = re.compile(r"\b(?:97[89][\s-]?)?(?:\d[\s-]?){9}[\dXx]\b")
+_YEAR = re.compile(r"\b(1[5-9]\d{2}|20\d{2})\b")
+
+# Erkennung von Katalog-Anfragen
+_QUERY_ISBN = re.compile(r"\bISBN[\s:]*([\dXx][\dXx\s-]{8,16}[\dXx])", re.IGNORECASE)
+_QUERY_LABELED = re.compile(
+    r"\b(titel|title|autor|author|verfasser|jahr|year)\s*[:=]\s*(\"[^\"]+\"|[^,;]+)",
+    re.IGNORECASE,
+)
+_QUERY_LOOKUP = re.compile(
+    r"^\s*(?:habt ihr|haben sie|hast du|gibt es|gibt's|führt ihr|do you have|is there|have you got)"
+    r"\s+(?:(?:das|die|den|ein|eine|einen|the|a|an)\s+)?(?:buch\s+|book\s+)?"
+    r"(?P<title>.+?)"
+    r"(?:\s+(?:von|by)\s+(?P<author>.+?))?"
+    r"(?:\s+(?:aus dem jahr|from|\()\s*(?P<year>\d{4})\)?)?"
+    r"(?:\s+(?:im katalog|in the catalog(?:ue)?|da|vorrätig))?\s*\??\s*$",
+    re.IGNORECASE,
+)
+
+
+def normalize(text: str) -> str:
+    """Kleinschreibung, ohne Akzente/Satzzeichen, einfache Leerzeichen"""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return " ".join(text.split())
+
+
+def normalize_title(text: str) -> str:
+    """Wie normalize(), zusätzlich ohne führenden Artikel ("Der Zauberberg" → "zauberberg")"""
+    return re.sub(r"^(der|die|das|ein|eine|the|a|an)\s+", "", normalize(text))
+
+
+def normalize_isbn(text: str) -> str:
+    return re.sub(r"[^0-9X]", "", (text or "").upper())
+
+
+def trigrams(text: str) -> set:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def extract_catalog_fields(text: str, metadata: Optional[dict] = None) -> Dict[str, str]:
+    """
+    Liest Titel, Autor, Jahr und ISBN aus Metadaten oder "Label: Wert"-Zeilen
+
+    Metadaten haben Vorrang; fehlende Felder werden im Text gesucht.
+    """
+    fields: Dict[str, str] = {}
+    metadata = metadata or {}
+
+    lowered = {str(k).lower(): v for k, v in metadata.items()}
+    for field, labels in FIELD_LABELS.items():
+        for label in labels:
+            value = lowered.get(label)
+            if value not in (None, ""):
+                fields[field] = str(value).strip()
+                break
+
+    for line in (text or "").splitlines():
+        match = _LABEL_LINE.match(line)
+        if not match:
+            continue
+        label = match.group(1).strip().lower()
+        for field, labels in FIELD_LABELS.items():
+            if field not in fields and label in labels:
+                fields[field] = match.group(2).strip()
+
+    if "isbn" not in fields:
+        match = _ISBN.search(text or "")
+        if match:
+            fields["isbn"] = match.group(0)
+    if "isbn" in fields:
+        fields["isbn"] = normalize_isbn(fields["isbn"])
+    if "year" in fields:
+        match = _YEAR.search(fields["year"])
+        if match:
+            fields["year"] = match.group(1)
+        else:
+            del fields["year"]
+
+    return {k: v for k, v in fields.items() if v}
+
+
+def parse_fielded_query(question: str) -> Optional[Dict[str, str]]:
+    """
+    Erkennt Katalog-Nachschlagefragen und extrahiert die Suchfelder
+
+    Returns:
+        dict mit 'title'/'author'/'year'/'isbn' oder None bei freien Fragen
+    """
+    question = (question or "").strip()
+    if not question:
+        return None
+
+    isbn = _QUERY_ISBN.search(question)
+    if isbn:
+        return {"isbn": normalize_isbn(isbn.group(1))}
+
+    labeled = _QUERY_LABELED.findall(question)
+    if labeled:
+        fields = {}
+        for label, value in labeled:
+            label = label.lower()
+            field = next(f for f, labels in FIELD_LABELS.items() if label in labels)
+            fields[field] = value.strip().strip('"').strip()
+        return fields
+
+    match = _QUERY_LOOKUP.match(question)
+    if match:
+        fields = {
+            key: value.strip().strip('"„“').strip()
+            for key, value in match.groupdict().items()
+            if value
+        }
+        # Nur kurze, konkrete Titel - "gibt es Bücher über ..." ist eine Themenfrage
+        if "title" in fields and (
+            len(fields["title"].split()) > 12
+            or re.match(r"^(bücher|buecher|books|literatur|etwas|something|was|titel)\b", fields["title"], re.I)
+        ):
+            return None
+        return fields or None
+
+    return None
+
+
+class CatalogIndex:
+    """SQLite-Index über Katalog-Felder einer Collection"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS records (
+                    id TEXT PRIMARY KEY,
+                    title TEXT, author TEXT, year TEXT, isbn TEXT,
+                    title_norm TEXT, author_norm TEXT,
+                    content TEXT, metadata TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_title ON records(title_norm);
+                CREATE INDEX IF NOT EXISTS idx_author ON records(author_norm);
+                CREATE INDEX IF NOT EXISTS idx_isbn ON records(isbn);
+                CREATE INDEX IF NOT EXISTS idx_year ON records(year);
+                CREATE TABLE IF NOT EXISTS title_trigrams (
+                    trigram TEXT NOT NULL,
+                    id TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_trigram ON title_trigrams(trigram);
+            """)
+
+    # ---- Aufbau ----
+
+    def add_documents(self, documents: Iterable[Document], ids: Iterable[str]) -> int:
+        """Indiziert Chunks bzw. Katalog-Einträge mit ihren Vectorstore-IDs"""
+        rows = []
+        grams = []
+        for doc, doc_id in zip(documents, ids):
+            fields = extract_catalog_fields(doc.page_content, doc.metadata)
+            if not ({"title", "isbn"} & fields.keys()):
+                continue
+            title_norm = normalize_title(fields.get("title", ""))
+            rows.append((
+                doc_id,
+                fields.get("title"), fields.get("author"), fields.get("year"), fields.get("isbn"),
+                title_norm, normalize(fields.get("author", "")),
+                doc.page_content, json.dumps(doc.metadata, ensure_ascii=False, default=str),
+            ))
+            grams.extend((g, doc_id) for g in trigrams(title_norm))
+
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM title_trigrams WHERE id = ?", [(r[0],) for r in rows]
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.executemany("INSERT INTO title_trigrams VALUES (?, ?)", grams)
+        return len(rows)
+
+    def delete(self, ids: Iterable[str]) -> None:
+        ids = [(i,) for i in ids]
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM records WHERE id = ?", ids)
+            self._conn.executemany("DELETE FROM title_trigrams WHERE id = ?", ids)
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM records")
+            self._conn.execute("DELETE FROM title_trigrams")
+
+    def rebuild(self, collection, page_size: int = 1000) -> int:
+        """Baut den Index seitenweise aus Texten und Metadaten einer Collection neu auf"""
+        self.clear()
+        offset = total = 0
+        while True:
+            page = collection.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+            if not page["ids"]:
+                break
+            docs = [
+                Document(page_content=text or "", metadata=metadata or {})
+                for text, metadata in zip(page["documents"], page["metadatas"])
+            ]
+            total += self.add_documents(docs, page["ids"])
+            offset += len(page["ids"])
+        logger.info(f"📚 Katalog-Index neu aufgebaut: {total} Einträge ({self.path.name})")
+        return total
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    # ---- Suche ----
+
+    def lookup(self, fields: Dict[str, str], limit: int = 5, fuzzy_threshold: float = 0.75) -> List[dict]:
+        """
+        Sucht Einträge: ISBN exakt, Titel/Autor exakt, dann per Präfix, dann fuzzy
+
+        Returns:
+            Liste von dicts mit 'id', Feldern, 'content', 'metadata', 'match', 'score'
+            (score: 0 = exakt, größer = unschärfer)
+        """
+        if fields.get("isbn"):
+            rows = self._query("isbn = ?", [normalize_isbn(fields["isbn"])], limit)
+            return [self._hit(r, "isbn", 0.0) for r in rows]
+
+        title = normalize_title(fields.get("title", ""))
+        author = normalize(fields.get("author", ""))
+        year = fields.get("year")
+        if not title and not author:
+            return []
+
+        def conditions(prefix: bool):
+            clauses, params = [], []
+            if title:
+                if prefix:
+                    # Bereichsabfrage statt LIKE, damit der Index genutzt wird
+                    clauses.append("title_norm >= ? AND title_norm < ?")
+                    params.extend([title, title + "\uffff"])
+                else:
+                    clauses.append("title_norm = ?")
+                    params.append(title)
+            if author:
+                # Voller Name oder nur Nachname ("Mann" trifft "thomas mann", "mann thomas")
+                clauses.append("(author_norm = ? OR author_norm LIKE ?)")
+                params.extend([author, f"%{author.split()[-1]}%"])
+            if year:
+                clauses.append("year = ?")
+                params.append(year)
+            return " AND ".join(clauses), params
+
+        for prefix, match in ((False, "exact"), (True, "prefix")):
+            where, params = conditions(prefix)
+            rows = self._query(where, params, limit)
+            if rows:
+                return [self._hit(r, match, 0.0 if match == "exact" else 0.1) for r in rows]
+
+        if not title:
+            return []
+        return self._fuzzy(title, author, year, limit, fuzzy_threshold)
+
+    def _fuzzy(self, title: str, author: str, year: Optional[str], limit: int, threshold: float) -> List[dict]:
+        """Trigramm-Kandidaten, bewertet mit SequenceMatcher"""
+        grams = list(trigrams(title))
+        placeholders = ",".join("?" * len(grams))
+        with self._lock:
+            candidate_ids = [
+                row[0] for row in self._conn.execute(
+                    f"SELECT id FROM title_trigrams WHERE trigram IN ({placeholders}) "
+                    f"GROUP BY id HAVING COUNT(*) >= ? ORDER BY COUNT(*) DESC LIMIT 200",
+                    grams + [max(1, len(grams) // 3)],
+                )
+            ]
+        if not candidate_ids:
+            return []
+
+        rows = self._query(
+            f"id IN ({','.join('?' * len(candidate_ids))})", candidate_ids, len(candidate_ids)
+        )
+        scored = []
+        for row in rows:
+            ratio = SequenceMatcher(None, title, row["title_norm"] or "").ratio()
+            if author:
+                ratio = 0.7 * ratio + 0.3 * SequenceMatcher(None, author, row["author_norm"] or "").ratio()
+            if year and row["year"] != year:
+                ratio -= 0.1
+            if ratio >= threshold:
+                scored.append((ratio, row))
+        scored.sort(key=lambda x: -x[0])
+        return [self._hit(row, "fuzzy", round(1 - ratio, 3)) for ratio, row in scored[:limit]]
+
+    def _query(self, where: str, params: list, limit: int) -> List[sqlite3.Row]:
+        with self._lock:
+            self._conn.row_factory = sqlite3.Row
+            try:
+                return self._conn.execute(
+                    f"SELECT * FROM records WHERE {where} LIMIT ?", list(params) + [limit]
+                ).fetchall()
+            finally:
+                self._conn.row_factory = None
+
+    @staticmethod
+    def _hit(row: sqlite3.Row, match: str, score: float) -> dict:
+        return {
+            "id": row["id"],
+            "title": row["title"],
+            "author": row["author"],
+            "year": row["year"],
+            "isbn": row["isbn"],
+            "content": row["content"],
+            "metadata": json.loads(row["metadata"] or "{}"),
+            "match": match,
+            "score": score,
+        }
+
+
+_indexes: Dict[str, CatalogIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_catalog_index(collection_name: str) -> CatalogIndex:
+    """
+    Gibt den (gecachten) Katalog-Index einer Collection zurück
+
+    Jede physische Version hat eine eigene Datei; logische Namen werden auf
+    die aktive Version aufgelöst (siehe collection_aliases).
+    """
+    from .collection_aliases import resolve_collection
+    from .config import Config
+
+    physical_name = resolve_collection(collection_name)
+    with _indexes_lock:
+        if physical_name not in _indexes:
+            path = Path(Config.CATALOG_INDEX_DIR) / f"{physical_name}.catalog.sqlite3"
+            _indexes[physical_name] = CatalogIndex(path)
+        return _indexes[physical_name]
@@ -0,0 +1,103 @@
+# app/chat_memory.py
+"""
+Begrenzter Gesprächsverlauf für Multi-Turn-Chats.
+
+Die letzten Nachrichten werden wörtlich übernommen, solange sie in das
+Token-Budget passen. Alles davor wird inkrementell in eine laufende
+Zusammenfassung gefaltet: pro Turn werden nur die Nachrichten
+zusammengefasst, die gerade aus dem Fenster gefallen sind. Dadurch bleibt
+die Prompt-Größe konstant, egal wie lang das Gespräch wird.
+"""
+import logging
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Grobe Schätzung: ~4 Zeichen pro Token (reicht für Budget-Entscheidungen)
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Schätzt die Token-Anzahl eines Textes"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def format_messages(messages: List[dict]) -> str:
+    """Formatiert Nachrichten als 'Nutzer:/Assistent:'-Transkript"""
+    lines = []
+    for message in messages:
+        role = "Nutzer" if message["role"] == "user" else "Assistent"
+        lines.append(f"{role}: {message['content']}")
+    return "\n".join(lines)
+
+
+class ChatMemory:
+    """Zustand der laufenden Zusammenfassung für ein Gespräch"""
+
+    def __init__(self, token_budget: int = None, summary_max_tokens: int = None):
+        from .config import Config
+
+        self.token_budget = token_budget or Config.CHAT_HISTORY_TOKEN_BUDGET
+        self.summary_max_tokens = summary_max_tokens or Config.CHAT_SUMMARY_MAX_TOKENS
+
+        self.summary = ""
+        self.summarized_upto = 0
+
+    def reset(self) -> None:
+        self.summary = ""
+        self.summarized_upto = 0
+
+    def window_start(self, messages: List[dict]) -> int:
+        """Index der ältesten Nachricht, die noch wörtlich ins Budget passt"""
+        used = 0
+        start = len(messages)
+        for i in range(len(messages) - 1, -1, -1):
+            cost = estimate_tokens(messages[i]["content"])
+            if used + cost > self.token_budget and start < len(messages):
+                break
+            used += cost
+            start = i
+        return max(start, self.summarized_upto)
+
+    def update(
+        self,
+        messages: List[dict],
+        summarize: Callable[[str, List[dict]], str]
+    ) -> Tuple[str, List[dict]]:
+        """
+        Aktualisiert die Zusammenfassung und liefert den Prompt-Verlauf
+
+        Args:
+            messages: Bisheriger Verlauf (ohne aktuelle Frage), nur angehängt
+            summarize: Funktion (bisherige Zusammenfassung, neue Nachrichten)
+                → neue Zusammenfassung
+
+        Returns:
+            (Zusammenfassung, wörtlich übernommene letzte Nachrichten)
+        """
+        messages = [m for m in messages if m.get("content")]
+
+        # Verlauf wurde geleert → neu beginnen
+        if len(messages) < self.summarized_upto:
+            self.reset()
+
+        start = self.window_start(messages)
+        dropped = messages[self.summarized_upto:start]
+        if dropped:
+            logger.info(f"📝 Fasse {len(dropped)} ältere Nachrichten zusammen")
+            self.summary = summarize(self.summary, dropped)
+            self.summarized_upto = start
+
+        recent = [dict(m) for m in messages[start:]]
+        if recent:
+            # Eine einzelne übergroße Nachricht wird gekürzt
+            max_chars = self.token_budget * CHARS_PER_TOKEN
+            if len(recent) == 1 and len(recent[0]["content"]) > max_chars:
+                recent[0]["content"] = recent[0]["content"][-max_chars:]
+        return self.summary, recent
+
+    def truncate_summary(self, summary: Optional[str]) -> str:
+        """Begrenzt die Zusammenfassung hart auf ihr Token-Budget"""
+        summary = (summary or "").strip()
+        max_chars = self.summary_max_tokens * CHARS_PER_TOKEN
+        return summary[:max_chars]
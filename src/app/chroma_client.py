@@ -1,58 +1,227 @@
 # src/app/chroma_client.py
+# chromadb, langchain_chroma und langchain_ollama kosten zusammen mehrere
+# Sekunden Importzeit und werden deshalb erst beim ersten Aufruf importiert.
+import json
 import logging
+import time
+from typing import TYPE_CHECKING
+from urllib.error import URLError
 from urllib.parse import urlparse
-import chromadb
-from langchain_chroma import Chroma
-from langchain_ollama import OllamaEmbeddings
+from urllib.request import urlopen
 from .config import Config
+from .embedding_batcher import BatchingEmbeddings
+from .ollama_scheduler import ScheduledEmbeddings
+
+if TYPE_CHECKING:
+    from langchain_chroma import Chroma
 
 logger = logging.getLogger(__name__)
 
+# Heartbeat-Endpunkte für den schnellen Verbindungstest (ohne Client-Import)
+CHROMA_HEARTBEAT_PATHS = ("/api/v2/heartbeat", "/api/v1/heartbeat")
+OLLAMA_VERSION_PATH = "/api/version"
+
+
+def _probe(url: str, timeout: float) -> dict:
+    """GET auf url, liefert ok, Latenz und ggf. JSON-Antwort oder Fehler"""
+    start = time.perf_counter()
+    try:
+        with urlopen(url, timeout=timeout) as response:
+            body = response.read()
+        result = {"ok": True, "latency_ms": (time.perf_counter() - start) * 1000}
+        try:
+            result["response"] = json.loads(body) if body else None
+        except ValueError:
+            pass
+        return result
+    except (URLError, OSError, ValueError) as e:
+        return {
+            "ok": False,
+            "latency_ms": (time.perf_counter() - start) * 1000,
+            "error": str(getattr(e, "reason", e)),
+        }
+
+
+def _probe_chroma(url: str, timeout: float) -> dict:
+    for path in CHROMA_HEARTBEAT_PATHS:
+        result = _probe(url.rstrip("/") + path, timeout)
+        if result["ok"]:
+            break
+    return result
+
+
+def check_connectivity(timeout: float = None) -> dict:
+    """
+    Prüft ChromaDB und Ollama per HTTP-Heartbeat, ohne chromadb oder
+    langchain_ollama zu importieren (für Startseite und Health-Checks)
+
+    Returns:
+        {"chroma": {...}, "ollama": {...}} mit "ok", "latency_ms" und ggf. "error"
+    """
+    timeout = timeout or Config.STARTUP_CHECK_TIMEOUT
+    shards = [_probe_chroma(url, timeout) for url in Config.CHROMA_SHARD_URLS]
+    if shards:
+        # Sharding: ok nur, wenn alle Shards antworten
+        chroma = {
+            "ok": all(shard["ok"] for shard in shards),
+            "latency_ms": max(shard["latency_ms"] for shard in shards),
+            "shards": shards,
+        }
+        failed = [url for url, shard in zip(Config.CHROMA_SHARD_URLS, shards) if not shard["ok"]]
+        if failed:
+            chroma["error"] = f"Shards nicht erreichbar: {', '.join(failed)}"
+    else:
+        chroma = _probe_chroma(Config.CHROMA_HTTP_URL, timeout)
+
+    from .ollama_pool import ROLES, endpoints_from_config, pool_enabled
+    
+    if pool_enabled():
+        # Pool: ok, wenn jede Rolle mindestens einen erreichbaren Server hat
+        endpoints = []
+        for endpoint in endpoints_from_config():
+            result = _probe(endpoint.url + OLLAMA_VERSION_PATH, timeout)
+            endpoints.append({"url": endpoint.url, "roles": sorted(endpoint.roles), **result})
+        reachable = [e for e in endpoints if e["ok"]]
+        missing = [role for role in ROLES if not any(role in e["roles"] for e in reachable)]
+        ollama = {
+            "ok": not missing,
+            "latency_ms": min((e["latency_ms"] for e in reachable), default=0.0),
+            "endpoints": endpoints,
+        }
+        failed = [e["url"] for e in endpoints if not e["ok"]]
+        if failed:
+            ollama["error"] = f"Ollama-Server nicht erreichbar: {', '.join(failed)}"
+    else:
+        ollama = _probe(Config.OLLAMA_BASE_URL.rstrip("/") + OLLAMA_VERSION_PATH, timeout)
+    return {"chroma": chroma, "ollama": ollama}
+
+
+def create_embedding_model(batch_queries: bool = True, model: str = None):
+    """
+    Erstellt das Ollama Embedding-Modell (alle Aufrufe laufen über den Scheduler)
+
+    Args:
+        batch_queries: Parallele Query-Embeddings zu einem Call bündeln
+        model: Embedding-Modell (default: Config.OLLAMA_EMBEDDING_MODEL)
+    """
+    from .ollama_pool import PooledEmbeddings, get_ollama_pool, pool_enabled
+    
+    model = model or Config.OLLAMA_EMBEDDING_MODEL
+    if pool_enabled():
+        # Mehrere Server: pro Batch der schnellste erreichbare (mit Failover)
+        embeddings = PooledEmbeddings(get_ollama_pool(), model)
+    else:
+        from langchain_ollama import OllamaEmbeddings
+        embeddings = OllamaEmbeddings(base_url=Config.OLLAMA_BASE_URL, model=model)
+    
+    embedding_model = ScheduledEmbeddings(embeddings)
+    if batch_queries:
+        embedding_model = BatchingEmbeddings(
+            embedding_model,
+            window_ms=Config.EMBEDDING_BATCH_WINDOW_MS,
+            max_batch_size=Config.EMBEDDING_BATCH_MAX_SIZE,
+        )
+    return embedding_model
+
+def _create_http_client(url: str):
+    """chromadb.HttpClient für eine Server-URL (Tenant/Database aus Config)"""
+    import chromadb
+    
+    u = urlparse(url)
+    ssl = (u.scheme == "https")
+    port = u.port or (443 if ssl else 80)
+    
+    return chromadb.HttpClient(
+        host=u.hostname,
+        port=port,
+        ssl=ssl,
+        tenant=getattr(Config, "CHROMA_TENANT", "default_tenant"),
+        database=getattr(Config, "CHROMA_DATABASE", "default_database"),
+    )
+
+def _connect(embedding_model, collection_name: str):
+    """Vectorstore für eine physische Collection (ein Server oder Shards)"""
+    from langchain_chroma import Chroma
+    
+    if Config.CHROMA_SHARD_URLS:
+        from .sharded_store import ShardedVectorStore
+        
+        # Alle Shards müssen erreichbar sein: die Zuordnung ID -> Shard
+        # hängt von der Anzahl ab
+        shards = [
+            Chroma(
+                collection_name=collection_name,
+                embedding_function=embedding_model,
+                client=_create_http_client(url),
+            )
+            for url in Config.CHROMA_SHARD_URLS
+        ]
+        logger.info(
+            "✅ ChromaDB verbunden - Collection: %s (%d Shards)", collection_name, len(shards)
+        )
+        return ShardedVectorStore(
+            shards,
+            collection_name=collection_name,
+            shard_names=Config.CHROMA_SHARD_URLS,
+            timeout=Config.CHROMA_SHARD_TIMEOUT,
+            retry_after=Config.CHROMA_SHARD_RETRY_SECONDS,
+        )
+    
+    vectorstore = Chroma(
+        collection_name=collection_name,
+        embedding_function=embedding_model,
+        client=_create_http_client(Config.CHROMA_HTTP_URL),
+    )
+    
+    logger.info("✅ ChromaDB verbunden - Collection: %s", collection_name)
+    return vectorstore
+
 def get_chroma_vectorstore(
     embedding_model=None, 
-    collection_name: str = None
-) -> Chroma:
+    collection_name: str = None,
+    resolve_alias: bool = True
+) -> "Chroma":
     """
     Verbindet sich mit ChromaDB und nutzt Ollama Embeddings von TH Wildau
     
+    Ist Config.CHROMA_SHARD_URLS gesetzt, wird die Collection über alle
+    dort genannten Server verteilt (ShardedVectorStore).
+    
     Args:
         embedding_model: Embedding-Modell (optional)
         collection_name: Name der Collection (optional)
+        resolve_alias: collection_name als logischen Namen behandeln und
+            immer die aktive Version aus dem Alias-Register nutzen
+            (AliasedVectorStore). False = genau diese physische Collection.
     """
     try:
         # Falls kein Embedding-Model übergeben, nutze Ollama
         if embedding_model is None:
-            embedding_model = OllamaEmbeddings(
-                base_url=Config.OLLAMA_BASE_URL,
-                model=Config.OLLAMA_EMBEDDING_MODEL
-                # ENTFERNT: request_timeout=120.0
-            )
+            embedding_model = create_embedding_model()
         
         # Collection-Name bestimmen
         if collection_name is None:
             collection_name = Config.CHROMA_COLLECTION_NAME
         
-        u = urlparse(Config.CHROMA_HTTP_URL)
-        ssl = (u.scheme == "https")
-        port = u.port or (443 if ssl else 80)
+        if not resolve_alias:
+            return _connect(embedding_model, collection_name)
         
-        client = chromadb.HttpClient(
-            host=u.hostname,
-            port=port,
-            ssl=ssl,
-            tenant=getattr(Config, "CHROMA_TENANT", "default_tenant"),
-            database=getattr(Config, "CHROMA_DATABASE", "default_database"),
-        )
+        from .collection_aliases import AliasedVectorStore, get_alias_registry
         
-        vectorstore = Chroma(
-            collection_name=collection_name,
-            embedding_function=embedding_model,
-            client=client,
-        )
+        registry = get_alias_registry()
+        
+        def factory(physical_name: str):
+            # Versionen mit anderem Embedding-Modell brauchen passende Query-Embeddings
+            model = registry.version_info(physical_name).get("embedding_model")
+            if model and model != Config.OLLAMA_EMBEDDING_MODEL:
+                return _connect(create_embedding_model(model=model), physical_name)
+            return _connect(embedding_model, physical_name)
         
-        logger.info("✅ ChromaDB verbunden - Collection: %s", collection_name)
+        vectorstore = AliasedVectorStore(collection_name, factory=factory, registry=registry)
+        # Aktive Version sofort verbinden, damit Fehler hier auftreten
+        vectorstore.vectorstore
         return vectorstore
         
     except Exception as e:
         logger.error("❌ Fehler beim Verbinden: %s", e)
-        raise
\ No newline at end of file
+        raise
@@ -0,0 +1,228 @@
+# app/collection_aliases.py
+"""
+Logische Collection-Namen (Aliase) und ihre physischen Versionen.
+
+Die App spricht immer den logischen Namen an (z.B. "documents-collection").
+Das Alias-Register (JSON-Datei in Config.COLLECTION_ALIAS_FILE) legt fest,
+welche physische Collection dahinter aktiv ist, z.B.
+"documents-collection__v2". Ein Wechsel schreibt die Datei atomar
+(os.replace); Leser sehen also entweder die alte oder die neue Version,
+nie einen Zwischenstand. Die vorherige Version bleibt für ein Rollback
+erhalten.
+
+Ohne Eintrag im Register ist der physische Name gleich dem logischen.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: nur prozessinterne Sperre
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+VERSION_SEPARATOR = "__v"
+
+
+def version_name(collection_name: str, version: int) -> str:
+    return f"{collection_name}{VERSION_SEPARATOR}{version}"
+
+
+class AliasRegistry:
+    """Alias-Register als JSON-Datei, von allen Prozessen gemeinsam genutzt"""
+
+    def __init__(self, path: Path, refresh_seconds: float = 1.0):
+        self.path = Path(path)
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._data: Dict[str, dict] = {}
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+
+    # ---- Lesen ----
+
+    def _load(self, force: bool = False) -> Dict[str, dict]:
+        """Liest die Datei neu, wenn sie sich geändert hat (höchstens alle refresh_seconds)"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.refresh_seconds:
+            return self._data
+        self._checked_at = now
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._data, self._mtime = {}, None
+            return self._data
+        if force or mtime != self._mtime:
+            try:
+                self._data = json.loads(self.path.read_text(encoding="utf-8"))
+                self._mtime = mtime
+            except (OSError, ValueError) as e:
+                # Alte Sicht behalten, statt auf halb geschriebene Daten zu wechseln
+                logger.warning(f"⚠️  Alias-Register nicht lesbar: {e}")
+        return self._data
+
+    def resolve(self, collection_name: str) -> str:
+        """Physischer Name der aktiven Version"""
+        with self._lock:
+            entry = self._load().get(collection_name)
+        return entry["active"] if entry and entry.get("active") else collection_name
+
+    def get(self, collection_name: str) -> dict:
+        with self._lock:
+            return dict(self._load(force=True).get(collection_name) or {})
+
+    def all(self) -> Dict[str, dict]:
+        with self._lock:
+            return {name: dict(entry) for name, entry in self._load(force=True).items()}
+
+    def version_info(self, physical_name: str) -> dict:
+        """Einstellungen, mit denen eine physische Version gebaut wurde"""
+        with self._lock:
+            data = self._load()
+        for entry in data.values():
+            info = entry.get("versions", {}).get(physical_name)
+            if info:
+                return dict(info)
+        return {}
+
+    def next_version(self, collection_name: str) -> int:
+        """Nächste freie Versionsnummer für eine Shadow-Collection"""
+        entry = self.get(collection_name)
+        return int(entry.get("latest_version", 0)) + 1
+
+    # ---- Schreiben ----
+
+    @contextmanager
+    def _file_lock(self):
+        """Sperre über Prozess- und Container-Grenzen (flock auf <register>.lock)"""
+        if fcntl is None:
+            yield
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_name(self.path.name + ".lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _update(self, collection_name: str, change: Callable[[dict], None]) -> dict:
+        # Read-modify-write unter Datei-Sperre: CLI, App und API schreiben dieselbe Datei
+        with self._lock, self._file_lock():
+            data = dict(self._load(force=True))
+            entry = dict(data.get(collection_name) or {"active": collection_name, "history": []})
+            change(entry)
+            data[collection_name] = entry
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=str(self.path.parent), prefix=".aliases-", suffix=".json")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp, self.path)
+            self._data = data
+            self._mtime = self.path.stat().st_mtime_ns
+            self._checked_at = time.monotonic()
+            return dict(entry)
+
+    def set_build(self, collection_name: str, build: Optional[dict]) -> dict:
+        """Hinterlegt den Stand eines laufenden Neuaufbaus (oder entfernt ihn)"""
+        def change(entry):
+            if build is None:
+                entry.pop("build", None)
+            else:
+                entry["build"] = build
+                version = build.get("version")
+                if version:
+                    entry["latest_version"] = max(int(entry.get("latest_version", 0)), version)
+        return self._update(collection_name, change)
+
+    def add_version(self, collection_name: str, physical_name: str, info: dict) -> dict:
+        """Registriert eine fertig gebaute Version (Embedding-Modell, Chunking, Anzahl)"""
+        def change(entry):
+            entry.setdefault("versions", {})[physical_name] = info
+        return self._update(collection_name, change)
+
+    def switch(self, collection_name: str, physical_name: str) -> dict:
+        """Schaltet alle Leser atomar auf physical_name um"""
+        def change(entry):
+            if entry.get("active") == physical_name:
+                return
+            entry["previous"] = entry.get("active", collection_name)
+            entry["active"] = physical_name
+            entry.setdefault("history", []).append({
+                "at": datetime.now().isoformat(timespec="seconds"),
+                "from": entry["previous"],
+                "to": physical_name,
+            })
+        entry = self._update(collection_name, change)
+        logger.info(f"🔀 {collection_name} → {entry['active']} (vorher: {entry.get('previous')})")
+        return entry
+
+    def rollback(self, collection_name: str) -> dict:
+        """Schaltet auf die vorherige Version zurück"""
+        previous = self.get(collection_name).get("previous")
+        if not previous:
+            raise ValueError(f"Keine vorherige Version für {collection_name}")
+        return self.switch(collection_name, previous)
+
+
+_registry: Optional[AliasRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_alias_registry() -> AliasRegistry:
+    """Gibt das prozessweite Alias-Register zurück"""
+    from .config import Config
+
+    global _registry
+    with _registry_lock:
+        if _registry is None or _registry.path != Path(Config.COLLECTION_ALIAS_FILE):
+            _registry = AliasRegistry(Config.COLLECTION_ALIAS_FILE)
+        return _registry
+
+
+def resolve_collection(collection_name: str) -> str:
+    """Physischer Name der aktiven Version einer logischen Collection"""
+    return get_alias_registry().resolve(collection_name)
+
+
+class AliasedVectorStore:
+    """
+    Vectorstore unter einem logischen Namen. Vor jedem Zugriff wird das
+    Alias-Register geprüft; nach einem Wechsel gehen alle weiteren Aufrufe an
+    die neue Version (auch bei lange gecachten Objekten in Streamlit/API).
+    Alle Attribute werden an den Vectorstore der aktiven Version gereicht.
+    """
+
+    def __init__(self, collection_name: str, factory: Callable[[str], object], registry: AliasRegistry):
+        self.collection_name = collection_name
+        self._factory = factory
+        self._registry = registry
+        self._stores: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def physical_name(self) -> str:
+        return self._registry.resolve(self.collection_name)
+
+    @property
+    def vectorstore(self):
+        name = self.physical_name
+        store = self._stores.get(name)
+        if store is None:
+            with self._lock:
+                store = self._stores.get(name)
+                if store is None:
+                    store = self._stores[name] = self._factory(name)
+        return store
+
+    def __getattr__(self, name):
+        return getattr(self.vectorstore, name)
@@ -0,0 +1,244 @@
+# app/collection_inventory.py
+"""
+Inventar einer Collection: welche Dateien mit wie vielen Chunks, welcher
+Textgröße und wann importiert. Liegt als SQLite-Datei neben den Daten und
+wird beim Import und beim Löschen inkrementell gepflegt, damit die
+Übersicht ohne Scan über alle Chunks in ChromaDB auskommt.
+
+Für bestehende Collections ohne Inventar baut rebuild() es einmalig aus den
+ChromaDB-Metadaten auf (seitenweise).
+"""
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+# SQLite erlaubt nur begrenzt viele Parameter pro Statement
+_ID_CHUNK = 500
+
+SORT_COLUMNS = {
+    "filename": "filename COLLATE NOCASE ASC",
+    "chunks": "chunks DESC",
+    "chars": "chars DESC",
+    "last_ingested_at": "last_ingested_at DESC",
+}
+
+
+def _filename_of(metadata: dict) -> str:
+    filename = metadata.get("filename")
+    if not filename and metadata.get("source"):
+        filename = Path(str(metadata["source"])).name
+    return filename or "Unbekannt"
+
+
+class CollectionInventory:
+    """SQLite-Inventar (Dateien und Chunk-IDs) einer Collection"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS chunks (
+                    id TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    chars INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_chunks_filename ON chunks(filename);
+                CREATE TABLE IF NOT EXISTS files (
+                    filename TEXT PRIMARY KEY,
+                    file_type TEXT,
+                    chunks INTEGER NOT NULL,
+                    chars INTEGER NOT NULL,
+                    first_ingested_at TEXT,
+                    last_ingested_at TEXT
+                );
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            """)
+
+    # ---- Pflege ----
+
+    def add_documents(self, documents: Iterable[Document], ids: Iterable[str]) -> int:
+        """Trägt gespeicherte Chunks mit ihren Vectorstore-IDs ein"""
+        now = datetime.now().isoformat(timespec="seconds")
+        rows = []
+        per_file: Dict[str, list] = {}
+        for doc, doc_id in zip(documents, ids):
+            filename = _filename_of(doc.metadata)
+            chars = len(doc.page_content)
+            rows.append((doc_id, filename, chars))
+            stats = per_file.setdefault(filename, [0, 0])
+            stats[0] += 1
+            stats[1] += chars
+
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            # Upserts bestehender IDs nicht doppelt zählen
+            self._remove_ids([r[0] for r in rows])
+            self._conn.executemany("INSERT INTO chunks VALUES (?, ?, ?)", rows)
+            self._conn.executemany(
+                """
+                INSERT INTO files VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(filename) DO UPDATE SET
+                    chunks = chunks + excluded.chunks,
+                    chars = chars + excluded.chars,
+                    last_ingested_at = excluded.last_ingested_at
+                """,
+                [
+                    (filename, Path(filename).suffix.lower(), n, chars, now, now)
+                    for filename, (n, chars) in per_file.items()
+                ],
+            )
+        return len(rows)
+
+    def _remove_ids(self, ids: List[str]) -> None:
+        """Entfernt Chunks und korrigiert die Datei-Zähler (Lock muss gehalten werden)"""
+        for i in range(0, len(ids), _ID_CHUNK):
+            part = ids[i:i + _ID_CHUNK]
+            placeholders = ",".join("?" * len(part))
+            removed = self._conn.execute(
+                f"SELECT filename, COUNT(*), SUM(chars) FROM chunks WHERE id IN ({placeholders}) GROUP BY filename",
+                part,
+            ).fetchall()
+            if not removed:
+                continue
+            self._conn.execute(f"DELETE FROM chunks WHERE id IN ({placeholders})", part)
+            self._conn.executemany(
+                "UPDATE files SET chunks = chunks - ?, chars = chars - ? WHERE filename = ?",
+                [(n, chars, filename) for filename, n, chars in removed],
+            )
+        self._conn.execute("DELETE FROM files WHERE chunks <= 0")
+
+    def delete(self, ids: Iterable[str]) -> None:
+        with self._lock, self._conn:
+            self._remove_ids(list(ids))
+
+    def file_ids(self, filename: str) -> List[str]:
+        """Chunk-IDs einer Datei (z.B. zum Löschen in ChromaDB)"""
+        with self._lock:
+            rows = self._conn.execute("SELECT id FROM chunks WHERE filename = ?", (filename,)).fetchall()
+        return [row[0] for row in rows]
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM chunks")
+            self._conn.execute("DELETE FROM files")
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('built', '1')")
+
+    def rebuild(self, collection, page_size: int = 1000) -> int:
+        """
+        Baut das Inventar seitenweise aus den ChromaDB-Metadaten neu auf
+
+        Die Markierung 'built' wird erst am Ende gesetzt: ein abgebrochener
+        Neuaufbau gilt beim nächsten ensure_built() als nicht aufgebaut.
+        """
+        self.clear()
+        self.mark_stale()
+        offset = total = 0
+        while True:
+            page = collection.get(include=["metadatas", "documents"], limit=page_size, offset=offset)
+            if not page["ids"]:
+                break
+            docs = [
+                Document(page_content=text or "", metadata=metadata or {})
+                for text, metadata in zip(page["documents"], page["metadatas"])
+            ]
+            total += self.add_documents(docs, page["ids"])
+            offset += len(page["ids"])
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('built', '1')")
+        logger.info(f"📇 Inventar neu aufgebaut: {total} Chunks ({self.path.name})")
+        return total
+
+    def is_built(self) -> bool:
+        """True, sobald das Inventar einmal aufgebaut (oder geleert) wurde"""
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM meta WHERE key = 'built'").fetchone() is not None
+
+    def mark_stale(self) -> None:
+        """Inventar gilt als nicht aufgebaut; ensure_built() baut es beim nächsten Zugriff neu auf"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM meta WHERE key = 'built'")
+
+    def ensure_built(self, collection) -> None:
+        """Baut das Inventar beim ersten Zugriff aus der Collection auf"""
+        if not self.is_built():
+            self.rebuild(collection)
+
+    # ---- Abfragen ----
+
+    def totals(self) -> dict:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(chunks), 0), COALESCE(SUM(chars), 0) FROM files"
+            ).fetchone()
+        return {"files": row[0], "chunks": row[1], "chars": row[2]}
+
+    def count_files(self, search: Optional[str] = None) -> int:
+        where, params = self._search_clause(search)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM files {where}", params).fetchone()[0]
+
+    def list_files(
+        self,
+        search: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = 50,
+        order_by: str = "filename",
+    ) -> List[dict]:
+        """Eine Seite der Dateiliste, optional gefiltert nach Teil-Dateinamen"""
+        where, params = self._search_clause(search)
+        order = SORT_COLUMNS.get(order_by, SORT_COLUMNS["filename"])
+        sql = f"SELECT * FROM files {where} ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params = params + [limit, offset]
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    @staticmethod
+    def _search_clause(search: Optional[str]) -> tuple:
+        if not search:
+            return "", []
+        escaped = search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return "WHERE filename LIKE ? ESCAPE '\\'", [f"%{escaped}%"]
+
+
+_inventories: Dict[str, CollectionInventory] = {}
+_inventories_lock = threading.Lock()
+
+
+def get_inventory(collection_name: str) -> CollectionInventory:
+    """
+    Gibt das (gecachte) Inventar einer Collection zurück
+
+    Jede physische Version hat eine eigene Datei; logische Namen werden auf
+    die aktive Version aufgelöst (siehe collection_aliases).
+    """
+    from .collection_aliases import resolve_collection
+    from .config import Config
+
+    physical_name = resolve_collection(collection_name)
+    with _inventories_lock:
+        if physical_name not in _inventories:
+            path = Path(Config.INVENTORY_DIR) / f"{physical_name}.inventory.sqlite3"
+            _inventories[physical_name] = CollectionInventory(path)
+        return _inventories[physical_name]
@@ -15,6 +15,20 @@ class Config:
     OLLAMA_MODEL: str = os.getenv("OLLAMA_MODEL", "llama3.2")
     OLLAMA_EMBEDDING_MODEL: str = os.getenv("OLLAMA_EMBEDDING_MODEL", "granite-embedding:278m")
     OLLAMA_KEEP_ALIVE: str = os.getenv("OLLAMA_KEEP_ALIVE", "5m")
+
+    # Query-Embedding Micro-Batching
+    EMBEDDING_BATCH_WINDOW_MS: float = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5"))
+    EMBEDDING_BATCH_MAX_SIZE: int = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32"))
+
+    # Ollama Scheduler (Concurrency-Limits pro Request-Klasse und pro Server im Pool)
+    OLLAMA_MAX_CONCURRENCY: int = int(os.getenv("OLLAMA_MAX_CONCURRENCY", "4"))
+    OLLAMA_CHAT_CONCURRENCY: int = int(os.getenv("OLLAMA_CHAT_CONCURRENCY", "2"))
+    OLLAMA_QUERY_EMBEDDING_CONCURRENCY: int = int(os.getenv("OLLAMA_QUERY_EMBEDDING_CONCURRENCY", "2"))
+    OLLAMA_BULK_EMBEDDING_CONCURRENCY: int = int(os.getenv("OLLAMA_BULK_EMBEDDING_CONCURRENCY", "1"))
+    SCHEDULER_QUEUE_POLL_SECONDS: float = float(os.getenv("SCHEDULER_QUEUE_POLL_SECONDS", "0.5"))
+
+    # Geschätzte Antwortlänge (Tokens), solange keine vollständige Generierung gemessen wurde
+    CANCEL_EXPECTED_ANSWER_TOKENS: int = int(os.getenv("CANCEL_EXPECTED_ANSWER_TOKENS", "300"))
     
     # Embedding Model
     EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "oliverguhr/revosax-granite-embedding-278m-multilingual")
@@ -27,15 +41,126 @@ class Config:
     CHUNK_SIZE: int = int(os.getenv("CHUNK_SIZE", "1000"))
     CHUNK_OVERLAP: int = int(os.getenv("CHUNK_OVERLAP", "200"))
 
+    # Multi-Turn Chat (Token-Budget für den Verlauf)
+    CHAT_HISTORY_TOKEN_BUDGET: int = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "1000"))
+    CHAT_SUMMARY_MAX_TOKENS: int = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "250"))
+    CHAT_CONDENSE_QUESTION: bool = os.getenv("CHAT_CONDENSE_QUESTION", "true").lower() == "true"
+
+    # HTTP Query-Service
+    API_HOST: str = os.getenv("API_HOST", "0.0.0.0")
+    API_PORT: int = int(os.getenv("API_PORT", "8080"))
+
     # Data Directories
     BASE_DATA_DIR: Path = Path(__file__).parent.parent.parent / "data"
     DOCUMENTS_DIR: Path = BASE_DATA_DIR / "documents"
     METADATA_DIR: Path = BASE_DATA_DIR / "metadata"
 
+    # Quantisierter First-Pass-Index (z.B. "metadata-collection"; leer = aus)
+    QUANTIZED_INDEX_COLLECTIONS: list = [
+        c.strip() for c in os.getenv("QUANTIZED_INDEX_COLLECTIONS", "").split(",") if c.strip()
+    ]
+    QUANTIZED_INDEX_MODE: str = os.getenv("QUANTIZED_INDEX_MODE", "int8")
+    QUANTIZED_INDEX_DIR: Path = Path(os.getenv("QUANTIZED_INDEX_DIR", str(BASE_DATA_DIR / "index")))
+    QUANTIZED_RESCORE_FACTOR: int = int(os.getenv("QUANTIZED_RESCORE_FACTOR", "10"))
+
         # Collection Names
     DOCUMENTS_COLLECTION: str = os.getenv("DOCUMENTS_COLLECTION", "documents-collection")
     METADATA_COLLECTION: str = os.getenv("METADATA_COLLECTION", "metadata-collection")
     
     # Default Collection (für Abwärtskompatibilität)
     CHROMA_COLLECTION_NAME: str = os.getenv("CHROMA_COLLECTION_NAME", DOCUMENTS_COLLECTION)
-    DATA_DIR: Path = DOCUMENTS_DIR  # Default für load_documents.py
\ No newline at end of file
+    DATA_DIR: Path = DOCUMENTS_DIR  # Default für load_documents.py
+
+    # Katalog-Feldindex (Titel/Autor/Jahr/ISBN) für exakte Nachschlage-Fragen
+    CATALOG_INDEX_COLLECTIONS: list = [
+        c.strip() for c in os.getenv("CATALOG_INDEX_COLLECTIONS", METADATA_COLLECTION).split(",") if c.strip()
+    ]
+    CATALOG_INDEX_DIR: Path = Path(os.getenv("CATALOG_INDEX_DIR", str(BASE_DATA_DIR / "index")))
+    # "context": Treffer als Kontext ans LLM, "answer": direkt ohne LLM antworten
+    CATALOG_LOOKUP_MODE: str = os.getenv("CATALOG_LOOKUP_MODE", "context")
+
+    # Import-Berichte (JSON pro Lauf, angezeigt auf der Dokumente-Seite)
+    INGESTION_REPORT_DIR: Path = Path(os.getenv("INGESTION_REPORT_DIR", str(BASE_DATA_DIR / "reports")))
+
+    # Inventar pro Collection (Dateien, Chunks, Größen) für die Übersicht
+    INVENTORY_DIR: Path = Path(os.getenv("INVENTORY_DIR", str(BASE_DATA_DIR / "index")))
+
+    # Chat-Seite: Token-Rendering höchstens alle N ms, Verlauf seitenweise
+    CHAT_RENDER_INTERVAL_MS: int = int(os.getenv("CHAT_RENDER_INTERVAL_MS", "50"))
+    CHAT_HISTORY_PAGE_SIZE: int = int(os.getenv("CHAT_HISTORY_PAGE_SIZE", "20"))
+
+    # Timeout (Sekunden) für den Heartbeat-Check beim Seitenstart
+    STARTUP_CHECK_TIMEOUT: float = float(os.getenv("STARTUP_CHECK_TIMEOUT", "2"))
+
+    # Sharding: Collection über mehrere ChromaDB-Server verteilen
+    # (kommagetrennte URLs, leer = ein Server unter CHROMA_HTTP_URL)
+    CHROMA_SHARD_URLS: list = [
+        u.strip() for u in os.getenv("CHROMA_SHARD_URLS", "").split(",") if u.strip()
+    ]
+    # Timeout pro Shard-Abfrage und Pause, bevor ein gestörter Shard erneut gefragt wird
+    CHROMA_SHARD_TIMEOUT: float = float(os.getenv("CHROMA_SHARD_TIMEOUT", "10"))
+    CHROMA_SHARD_RETRY_SECONDS: float = float(os.getenv("CHROMA_SHARD_RETRY_SECONDS", "30"))
+
+    # Alias-Register: logischer Collection-Name -> aktive physische Version
+    COLLECTION_ALIAS_FILE: Path = Path(os.getenv("COLLECTION_ALIAS_FILE", str(BASE_DATA_DIR / "index" / "aliases.json")))
+    # Neuaufbau im Hintergrund: Pause zwischen Batches (Sekunden), damit Chat nicht verhungert
+    REEMBED_BATCH_PAUSE: float = float(os.getenv("REEMBED_BATCH_PAUSE", "0.5"))
+
+    # Dokument-Index (Zentroid pro Datei) beim Import pflegen
+    SUMMARY_INDEX_COLLECTIONS: list = [
+        c.strip() for c in os.getenv("SUMMARY_INDEX_COLLECTIONS", DOCUMENTS_COLLECTION).split(",") if c.strip()
+    ]
+    # Zweistufiges Retrieval: erst Top-Dokumente, dann Chunks nur in diesen
+    TWO_STAGE_COLLECTIONS: list = [
+        c.strip() for c in os.getenv("TWO_STAGE_COLLECTIONS", "").split(",") if c.strip()
+    ]
+    TWO_STAGE_TOP_DOCUMENTS: int = int(os.getenv("TWO_STAGE_TOP_DOCUMENTS", "5"))
+
+    # Große TXT-Dateien per mmap streamen statt komplett zu laden (ab dieser Größe in Bytes)
+    STREAMING_TXT_MIN_BYTES: int = int(os.getenv("STREAMING_TXT_MIN_BYTES", str(20 * 1024 * 1024)))
+    # Encoding für TXT-Dateien, die kein gültiges UTF-8 sind
+    TXT_FALLBACK_ENCODING: str = os.getenv("TXT_FALLBACK_ENCODING", "cp1252")
+
+    # Ollama-Pool: Server pro Rolle (kommagetrennt, leer = OLLAMA_BASE_URL)
+    OLLAMA_CHAT_URLS: list = [
+        u.strip() for u in os.getenv("OLLAMA_CHAT_URLS", "").split(",") if u.strip()
+    ]
+    OLLAMA_EMBEDDING_URLS: list = [
+        u.strip() for u in os.getenv("OLLAMA_EMBEDDING_URLS", "").split(",") if u.strip()
+    ]
+    # Circuit Breaker: Fehler in Folge bis zur Sperre, Dauer der Sperre (Sekunden)
+    OLLAMA_CIRCUIT_FAILURES: int = int(os.getenv("OLLAMA_CIRCUIT_FAILURES", "3"))
+    OLLAMA_CIRCUIT_OPEN_SECONDS: float = float(os.getenv("OLLAMA_CIRCUIT_OPEN_SECONDS", "30"))
+    # Health-Check aller Pool-Server (Sekunden, 0 = aus)
+    OLLAMA_HEALTH_INTERVAL: float = float(os.getenv("OLLAMA_HEALTH_INTERVAL", "15"))
+
+    # Small-to-Big: kleine Child-Chunks einbetten, größere Parent-Fenster lokal speichern
+    PARENT_CHILD_COLLECTIONS: list = [
+        c.strip() for c in os.getenv("PARENT_CHILD_COLLECTIONS", "").split(",") if c.strip()
+    ]
+    PARENT_CHUNK_SIZE: int = int(os.getenv("PARENT_CHUNK_SIZE", "2000"))
+    PARENT_CHUNK_OVERLAP: int = int(os.getenv("PARENT_CHUNK_OVERLAP", "200"))
+    CHILD_CHUNK_SIZE: int = int(os.getenv("CHILD_CHUNK_SIZE", "400"))
+    CHILD_CHUNK_OVERLAP: int = int(os.getenv("CHILD_CHUNK_OVERLAP", "50"))
+    # Children pro gewünschtem Parent in der Vektorsuche (Puffer für Duplikate)
+    SMALL_TO_BIG_CHILD_FACTOR: int = int(os.getenv("SMALL_TO_BIG_CHILD_FACTOR", "3"))
+    PARENT_STORE_DIR: Path = Path(os.getenv("PARENT_STORE_DIR", str(BASE_DATA_DIR / "index")))
+
+    # Zusätzliche Token-Grenze pro Chunk (0 = nur CHUNK_SIZE in Zeichen)
+    CHUNK_MAX_TOKENS: int = int(os.getenv("CHUNK_MAX_TOKENS", "0"))
+
+    # Katalog-Import (JSONL/CSV/MARC): Vorlage für den Embedding-Text ("\\n" = Zeilenumbruch)
+    CATALOG_TEXT_TEMPLATE: str = os.getenv(
+        "CATALOG_TEXT_TEMPLATE",
+        "Titel: {title}\\nAutor: {author}\\nJahr: {year}\\nVerlag: {publisher}\\n"
+        "ISBN: {isbn}\\nSchlagwörter: {subjects}\\nZusammenfassung: {summary}",
+    ).replace("\\n", "\n")
+    # Felder für deterministische Datensatz-IDs (erstes vorhandenes gewinnt)
+    CATALOG_ID_FIELDS: list = [
+        f.strip() for f in os.getenv("CATALOG_ID_FIELDS", "id,record_id,control_number,isbn").split(",") if f.strip()
+    ]
+
+    # Prozessübergreifende Ollama-Slots (flock-Dateien; leer = nur prozessintern)
+    OLLAMA_SLOT_DIR: str = os.getenv("OLLAMA_SLOT_DIR", str(BASE_DATA_DIR / "index" / "ollama-slots"))
+    # Höchstens so lange wartet ein Bulk-Batch auf Chat-Pausen anderer Prozesse (Sekunden)
+    OLLAMA_BULK_MAX_YIELD_SECONDS: float = float(os.getenv("OLLAMA_BULK_MAX_YIELD_SECONDS", "30"))
@@ -1,55 +1,145 @@
 # app/document_processor.py
 import logging
+import time
 from pathlib import Path
-from typing import List, Optional
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional
 from langchain_core.documents import Document
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import (
-    PyPDFLoader,
-    TextLoader,
-    UnstructuredWordDocumentLoader,
-)
 
 logger = logging.getLogger(__name__)
 
+# Separator-Hierarchie: Absatz, Zeile, Wort, Zeichen
+SEPARATORS = ["\n\n", "\n", " ", ""]
+
 
 class DocumentProcessor:
     """Verarbeitet Dokumente und bereitet sie für ChromaDB vor"""
     
-    def __init__(self, chunk_size: int = None, chunk_overlap: int = None):
+    def __init__(
+        self,
+        chunk_size: int = None,
+        chunk_overlap: int = None,
+        child_chunk_size: int = None,
+        child_chunk_overlap: int = None
+    ):
+        """
+        Args:
+            chunk_size, chunk_overlap: Chunk-Größe (bei Small-to-Big: Parent-Fenster)
+            child_chunk_size, child_chunk_overlap: Optional, Größe der
+                eingebetteten Child-Chunks für Small-to-Big (split_children)
+        """
         # Importiere Config hier um Circular Import zu vermeiden
         from .config import Config
+        from .fast_splitter import FastTextSplitter
         
         # Nutze Config-Werte als Default
         chunk_size = chunk_size or Config.CHUNK_SIZE
         chunk_overlap = chunk_overlap or Config.CHUNK_OVERLAP
         
-        self.text_splitter = RecursiveCharacterTextSplitter(
+        # Gleiche Chunks wie RecursiveCharacterTextSplitter, aber auf Offsets
+        self.max_tokens = Config.CHUNK_MAX_TOKENS or None
+        self.text_splitter = FastTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
-            length_function=len,
-            separators=["\n\n", "\n", " ", ""]
+            separators=SEPARATORS,
+            max_tokens=self.max_tokens
         )
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.streaming_min_bytes = Config.STREAMING_TXT_MIN_BYTES
+        self.fallback_encoding = Config.TXT_FALLBACK_ENCODING
+        
+        self.child_splitter = None
+        if child_chunk_size:
+            self.child_splitter = FastTextSplitter(
+                chunk_size=child_chunk_size,
+                chunk_overlap=child_chunk_overlap or 0,
+                separators=SEPARATORS,
+                max_tokens=self.max_tokens
+            )
     
-    def load_document(self, file_path: Path) -> List[Document]:
-        """Lädt ein Dokument basierend auf der Dateiendung"""
+    @classmethod
+    def for_collection(cls, collection_name: str, chunk_size: int = None, chunk_overlap: int = None) -> "DocumentProcessor":
+        """Processor mit den Chunk-Einstellungen einer Collection (Small-to-Big oder normal)"""
+        from .config import Config
+        
+        if collection_name in Config.PARENT_CHILD_COLLECTIONS:
+            return cls(
+                chunk_size=chunk_size or Config.PARENT_CHUNK_SIZE,
+                chunk_overlap=chunk_overlap or Config.PARENT_CHUNK_OVERLAP,
+                child_chunk_size=Config.CHILD_CHUNK_SIZE,
+                child_chunk_overlap=Config.CHILD_CHUNK_OVERLAP,
+            )
+        return cls(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    
+    @property
+    def small_to_big(self) -> bool:
+        return self.child_splitter is not None
+    
+    def split_children(self, parents: List[Document]) -> List[Document]:
+        """
+        Teilt Parent-Chunks in kleine Child-Chunks zum Einbetten. Parents
+        bekommen eine 'parent_id', Children erben die Metadaten ihres Parents
+        plus 'child_id' (Position im Parent).
+        """
+        from .parent_store import parent_id
+        
+        children = []
+        for parent in parents:
+            pid = parent_id(
+                parent.metadata.get("source") or parent.metadata.get("filename", ""),
+                parent.page_content,
+                parent.metadata.get("chunk_id", 0),
+                self.chunk_size,
+                self.chunk_overlap,
+            )
+            parent.metadata["parent_id"] = pid
+            for i, text in enumerate(self.child_splitter.split_text(parent.page_content)):
+                metadata = dict(parent.metadata)
+                metadata.update(child_id=i, chunk_size=len(text))
+                children.append(Document(page_content=text, metadata=metadata))
+        return children
+    
+    def iter_children(self, parents: Iterable[Document], parent_store, group_size: int = 100) -> Iterator[Document]:
+        """
+        Speichert Parents gruppenweise im Parent-Speicher und liefert ihre
+        Children (funktioniert auch mit gestreamten Chunks)
+        """
+        iterator = iter(parents)
+        while True:
+            group = list(islice(iterator, group_size))
+            if not group:
+                return
+            children = self.split_children(group)
+            parent_store.add_documents(group)
+            yield from children
+    
+    def _load(self, file_path: Path) -> List[Document]:
+        """Lädt ein Dokument basierend auf der Dateiendung (wirft bei Fehlern)"""
         suffix = file_path.suffix.lower()
         
+        # Loader einzeln importieren: PDF/unstructured nur, wenn gebraucht
+        if suffix == ".pdf":
+            from langchain_community.document_loaders import PyPDFLoader
+            loader = PyPDFLoader(str(file_path))
+        elif suffix == ".txt":
+            from langchain_community.document_loaders import TextLoader
+            loader = TextLoader(str(file_path))
+        elif suffix in [".doc", ".docx"]:
+            from langchain_community.document_loaders import UnstructuredWordDocumentLoader
+            loader = UnstructuredWordDocumentLoader(str(file_path))
+        else:
+            logger.warning(f"Unsupported file type: {suffix}")
+            return []
+        
+        documents = loader.load()
+        logger.info(f"✅ Geladen: {file_path.name} ({len(documents)} Seiten)")
+        return documents
+    
+    def load_document(self, file_path: Path) -> List[Document]:
+        """Lädt ein Dokument basierend auf der Dateiendung"""
         try:
-            if suffix == ".pdf":
-                loader = PyPDFLoader(str(file_path))
-            elif suffix == ".txt":
-                loader = TextLoader(str(file_path))
-            elif suffix in [".doc", ".docx"]:
-                loader = UnstructuredWordDocumentLoader(str(file_path))
-            else:
-                logger.warning(f"Unsupported file type: {suffix}")
-                return []
-            
-            documents = loader.load()
-            logger.info(f"✅ Geladen: {file_path.name} ({len(documents)} Seiten)")
-            return documents
-            
+            return self._load(file_path)
         except Exception as e:
             logger.error(f"❌ Fehler beim Laden von {file_path.name}: {e}")
             return []
@@ -66,13 +156,33 @@ class DocumentProcessor:
         logger.info(f"📄 {len(documents)} Dokumente → {len(chunks)} Chunks")
         return chunks
     
-    def load_and_process_file(self, file_path: Path) -> List[Document]:
-        """Lädt und verarbeitet eine einzelne Datei"""
-        documents = self.load_document(file_path)
+    def load_and_process_file(self, file_path: Path, timings: Optional[dict] = None) -> List[Document]:
+        """
+        Lädt und verarbeitet eine einzelne Datei
+        
+        Args:
+            file_path: Pfad zur Datei
+            timings: Optional, wird mit 'pages', 'load_seconds', 'split_seconds'
+                und bei Ladefehlern mit 'error' befüllt
+        """
+        timings = {} if timings is None else timings
+        
+        start = time.perf_counter()
+        try:
+            documents = self._load(file_path)
+        except Exception as e:
+            logger.error(f"❌ Fehler beim Laden von {file_path.name}: {e}")
+            timings["error"] = str(e)
+            documents = []
+        timings["load_seconds"] = time.perf_counter() - start
+        timings["pages"] = len(documents)
+        
         if not documents:
             return []
         
+        start = time.perf_counter()
         chunks = self.process_documents(documents)
+        timings["split_seconds"] = time.perf_counter() - start
         
         # Füge Dateinamen zu Metadaten hinzu
         for chunk in chunks:
@@ -81,12 +191,69 @@ class DocumentProcessor:
         
         return chunks
     
+    def is_large_text(self, file_path: Path) -> bool:
+        """TXT-Datei, die gestreamt statt komplett geladen werden sollte"""
+        return file_path.suffix.lower() == ".txt" and file_path.stat().st_size >= self.streaming_min_bytes
+    
+    def iter_text_chunks(self, file_path: Path, timings: Optional[dict] = None) -> Iterator[Document]:
+        """
+        Liefert die Chunks einer (großen) TXT-Datei nacheinander, ohne die
+        Datei komplett zu laden - gleiche Chunks und Metadaten wie
+        load_and_process_file
+        
+        Args:
+            timings: Optional, wird am Ende mit 'pages', 'chunks',
+                'split_seconds' (bzw. 'error') befüllt
+        """
+        from .streaming_splitter import StreamingTextSplitter
+        
+        timings = {} if timings is None else timings
+        splitter = StreamingTextSplitter(
+            self.chunk_size,
+            self.chunk_overlap,
+            separators=SEPARATORS,
+            fallback_encoding=self.fallback_encoding,
+            max_tokens=self.max_tokens,
+        )
+        timings.update(pages=1, chunks=0, load_seconds=0.0, split_seconds=0.0)
+        logger.info(f"🌊 Streame {file_path.name} ({file_path.stat().st_size / 1024 / 1024:.1f} MB)")
+        
+        start = time.perf_counter()
+        try:
+            for i, text in enumerate(splitter.iter_chunks(file_path)):
+                chunk = Document(page_content=text, metadata={
+                    "source": str(file_path),
+                    "chunk_id": i,
+                    "chunk_size": len(text),
+                    "filename": file_path.name,
+                })
+                timings["chunks"] = i + 1
+                timings["split_seconds"] += time.perf_counter() - start
+                yield chunk
+                start = time.perf_counter()
+        except Exception as e:
+            logger.error(f"❌ Fehler beim Streamen von {file_path.name}: {e}")
+            timings["error"] = str(e)
+            return
+        timings["split_seconds"] += time.perf_counter() - start
+        logger.info(f"📄 {file_path.name} → {timings['chunks']} Chunks (gestreamt)")
+    
     def load_and_process_folder(
         self, 
         folder_path: Path, 
-        file_types: Optional[List[str]] = None
+        file_types: Optional[List[str]] = None,
+        on_file: Optional[Callable[[Path, List[Document], dict], None]] = None,
+        on_large_text: Optional[Callable[[Path], None]] = None
     ) -> List[Document]:
-        """Lädt und verarbeitet alle Dateien in einem Ordner"""
+        """
+        Lädt und verarbeitet alle Dateien in einem Ordner
+        
+        Args:
+            on_file: Callback(file_path, chunks, timings) nach jeder Datei
+            on_large_text: Callback(file_path) für große TXT-Dateien; diese
+                werden dann nicht geladen, sondern vom Aufrufer gestreamt
+                (iter_text_chunks)
+        """
         if file_types is None:
             file_types = [".pdf", ".txt", ".doc", ".docx"]
         
@@ -97,7 +264,13 @@ class DocumentProcessor:
             logger.info(f"🔍 Gefunden: {len(files)} {file_type}-Dateien")
             
             for file_path in files:
-                chunks = self.load_and_process_file(file_path)
+                if on_large_text is not None and self.is_large_text(file_path):
+                    on_large_text(file_path)
+                    continue
+                timings = {}
+                chunks = self.load_and_process_file(file_path, timings)
+                if on_file is not None:
+                    on_file(file_path, chunks, timings)
                 all_chunks.extend(chunks)
         
         logger.info(f"✅ Gesamt: {len(all_chunks)} Chunks aus {folder_path}")
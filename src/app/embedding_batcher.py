@@ -0,0 +1,134 @@
+# app/embedding_batcher.py
+"""
+Micro-Batching für Query-Embeddings: Gleichzeitig eintreffende Anfragen
+werden zu einem einzigen Embedding-Call an Ollama zusammengefasst.
+"""
+import logging
+import threading
+import time
+from typing import List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingQuery:
+    """Eine wartende Query mit Ergebnis-Slot"""
+
+    __slots__ = ("text", "event", "done", "vector", "error")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.event = threading.Event()
+        self.done = False
+        self.vector: Optional[List[float]] = None
+        self.error: Optional[BaseException] = None
+
+
+class BatchingEmbeddings(Embeddings):
+    """
+    Wrapper um ein Embedding-Modell, der parallele `embed_query`-Aufrufe bündelt.
+
+    Der erste Aufrufer wird zum "Leader" und schickt alle bis dahin
+    eingetroffenen Queries in einem `embed_documents`-Call ab. Queries, die
+    währenddessen ankommen, landen im nächsten Batch, den der älteste
+    Wartende als neuer Leader abschickt. Nur wenn weitere
+    Aufrufer gleichzeitig aktiv sind, wartet der Leader bis zu `window_ms`
+    auf Nachzügler - ein einzelner Nutzer hat also keine Zusatz-Latenz.
+
+    `embed_documents` (Ingestion) wird unverändert durchgereicht. Bietet das
+    darunterliegende Modell `embed_query_batch` an (z.B. ScheduledEmbeddings),
+    werden gebündelte Queries darüber gesendet.
+    """
+
+    def __init__(self, embeddings: Embeddings, window_ms: float = 5.0, max_batch_size: int = 32):
+        self.embeddings = embeddings
+        self.window_ms = window_ms
+        self.max_batch_size = max(1, max_batch_size)
+
+        self._lock = threading.Lock()
+        self._queue: List[_PendingQuery] = []
+        self._leader_active = False
+        self._active_callers = 0
+
+        # Statistiken
+        self.batches_sent = 0
+        self.queries_embedded = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        pending = _PendingQuery(text)
+
+        with self._lock:
+            self._queue.append(pending)
+            self._active_callers += 1
+            is_leader = not self._leader_active
+            if is_leader:
+                self._leader_active = True
+
+        try:
+            while True:
+                if is_leader:
+                    self._lead_batch()
+                pending.event.wait()
+                if pending.done:
+                    break
+                # Zum Leader für den nächsten Batch befördert
+                pending.event.clear()
+                is_leader = True
+        finally:
+            with self._lock:
+                self._active_callers -= 1
+
+        if pending.error is not None:
+            raise pending.error
+        return pending.vector
+
+    def _lead_batch(self) -> None:
+        """Schickt einen Batch ab und übergibt danach die Leader-Rolle"""
+        with self._lock:
+            concurrent = self._active_callers > 1
+
+        # Nur unter Last kurz auf weitere Queries warten
+        if concurrent and self.window_ms > 0:
+            time.sleep(self.window_ms / 1000)
+
+        with self._lock:
+            batch = self._queue[:self.max_batch_size]
+            del self._queue[:self.max_batch_size]
+
+        self._embed_batch(batch)
+
+        with self._lock:
+            if self._queue:
+                # Ältester Wartender übernimmt (seine Query steht vorne in der Queue)
+                self._queue[0].event.set()
+            else:
+                self._leader_active = False
+
+    def _embed_batch(self, batch: List[_PendingQuery]) -> None:
+        """Sendet einen Batch und verteilt die Vektoren an die Aufrufer"""
+        try:
+            embed_batch = getattr(self.embeddings, "embed_query_batch", self.embeddings.embed_documents)
+            vectors = embed_batch([p.text for p in batch])
+            if len(vectors) != len(batch):
+                raise RuntimeError(
+                    f"Embedding-Server lieferte {len(vectors)} Vektoren für {len(batch)} Queries"
+                )
+            for p, vector in zip(batch, vectors):
+                p.vector = vector
+        except Exception as e:
+            logger.error(f"❌ Batch-Embedding fehlgeschlagen ({len(batch)} Queries): {e}")
+            for p in batch:
+                p.error = e
+        finally:
+            self.batches_sent += 1
+            self.queries_embedded += len(batch)
+            if len(batch) > 1:
+                logger.debug(f"📦 {len(batch)} Queries in einem Embedding-Call gebündelt")
+            for p in batch:
+                p.done = True
+                p.event.set()
@@ -0,0 +1,316 @@
+# app/fast_splitter.py
+"""
+Schneller rekursiver Text-Splitter auf Offsets.
+
+RecursiveCharacterTextSplitter kopiert den Text auf jeder Ebene: re.split
+erzeugt Teilstrings, Separatoren werden wieder angehängt, beim Mergen wird
+die Liste der aktuellen Abschnitte bei jedem Entfernen neu angelegt und am
+Ende per join zusammengesetzt. Hier sind Abschnitte nur (start, end)-Paare
+in den Originaltext:
+
+    - Separatoren werden mit re.search/finditer(text, start, end) direkt im
+      Originaltext gesucht.
+    - Aufeinanderfolgende Abschnitte sind lückenlos, ein Chunk ist also
+      text[start:end] - ein einziger Slice pro Chunk, Strip über Offsets.
+    - Reicht kein Separator mehr (Zeichen-Ebene), werden die Fenster direkt
+      berechnet statt Zeichen für Zeichen gemergt.
+
+Separator-Hierarchie, chunk_size/chunk_overlap (Zeichen), keep_separator
+("start") und Strip entsprechen RecursiveCharacterTextSplitter mit
+length_function=len; die Chunks sind identisch.
+
+Optional begrenzt max_tokens die Chunks zusätzlich nach Tokens
+(token_counter, default: estimate_tokens). Ein Abschnitt gilt dann nur als
+klein genug, wenn er beide Grenzen einhält, und beim Mergen wird ein Chunk
+abgeschlossen, sobald eine der beiden Grenzen überschritten würde. Die
+Token-Zahl eines Chunks wird als Summe seiner Abschnitte gezählt (für
+subadditive Zähler wie estimate_tokens also nie unterschätzt).
+"""
+import re
+from bisect import bisect_left, bisect_right
+from collections import deque
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+DEFAULT_SEPARATORS = ["\n\n", "\n", " ", ""]
+
+
+class _SpanMerger:
+    """Fasst lückenlose Abschnitte (start, end, tokens) zu Chunk-Spans zusammen"""
+
+    __slots__ = ("chunk_size", "chunk_overlap", "max_tokens", "current", "total", "tokens")
+
+    def __init__(self, chunk_size: int, chunk_overlap: int, max_tokens: Optional[int]):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.max_tokens = max_tokens
+        self.current = deque()
+        self.total = 0
+        self.tokens = 0
+
+    def _too_big(self, length: int, tokens: int) -> bool:
+        if self.total + length > self.chunk_size:
+            return True
+        return self.max_tokens is not None and self.tokens + tokens > self.max_tokens
+
+    def add(self, start: int, end: int, tokens: int, out: list) -> None:
+        length = end - start
+        if self.current and self._too_big(length, tokens):
+            out.append((self.current[0][0], self.current[-1][1]))
+            # Vorne entfernen, bis nur noch die Überlappung übrig ist und der Abschnitt passt
+            while self.total > self.chunk_overlap or (self.total > 0 and self._too_big(length, tokens)):
+                first_start, first_end, first_tokens = self.current.popleft()
+                self.total -= first_end - first_start
+                self.tokens -= first_tokens
+        self.current.append((start, end, tokens))
+        self.total += length
+        self.tokens += tokens
+
+    def finish(self, out: list) -> None:
+        if self.current:
+            out.append((self.current[0][0], self.current[-1][1]))
+            self.current.clear()
+        self.total = 0
+        self.tokens = 0
+
+
+class FastTextSplitter:
+    """
+    Rekursiver Splitter auf Offsets (gleiche Chunks wie
+    RecursiveCharacterTextSplitter, ohne Teilstring-Kopien)
+
+    Args:
+        chunk_size: Maximale Chunk-Länge in Zeichen
+        chunk_overlap: Überlappung in Zeichen
+        separators: Separator-Hierarchie (default: Absatz, Zeile, Wort, Zeichen)
+        max_tokens: Optional, maximale Tokens pro Chunk
+        token_counter: Zählt Tokens eines Textes (default: estimate_tokens)
+    """
+
+    def __init__(
+        self,
+        chunk_size: int,
+        chunk_overlap: int = 0,
+        separators: Optional[List[str]] = None,
+        max_tokens: Optional[int] = None,
+        token_counter: Optional[Callable[[str], int]] = None,
+    ):
+        if chunk_size <= 0:
+            raise ValueError(f"chunk_size muss > 0 sein ({chunk_size})")
+        if chunk_overlap < 0 or chunk_overlap > chunk_size:
+            raise ValueError(f"chunk_overlap ({chunk_overlap}) muss zwischen 0 und chunk_size ({chunk_size}) liegen")
+        if max_tokens is not None and max_tokens <= 0:
+            max_tokens = None
+        if max_tokens is not None and token_counter is None:
+            from .chat_memory import estimate_tokens
+            token_counter = estimate_tokens
+
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = list(separators or DEFAULT_SEPARATORS)
+        self.max_tokens = max_tokens
+        self.token_counter = token_counter
+        self._patterns = {sep: re.compile(re.escape(sep)) for sep in self.separators if sep}
+
+    # ---- Split ----
+
+    def _window_spans(self, start: int, end: int, out: list) -> None:
+        """Zeichen-Ebene ohne Token-Grenze: feste Fenster mit Überlappung"""
+        # Beim Mergen einzelner Zeichen bleiben höchstens chunk_size - 1 überlappend
+        step = self.chunk_size - min(self.chunk_overlap, self.chunk_size - 1)
+        while True:
+            window_end = start + self.chunk_size
+            if window_end >= end:
+                out.append((start, end))
+                return
+            out.append((start, window_end))
+            start += step
+
+    def _split(self, text: str, start: int, end: int, level: int, out: list) -> None:
+        """Entspricht RecursiveCharacterTextSplitter._split_text für text[start:end]"""
+        separators = self.separators
+        separator = separators[-1]
+        next_level = len(separators)
+        for i in range(level, len(separators)):
+            candidate = separators[i]
+            if not candidate:
+                separator = candidate
+                break
+            if self._patterns[candidate].search(text, start, end):
+                separator = candidate
+                next_level = i + 1
+                break
+
+        has_next = next_level < len(separators)
+        if len(separator) == 1 and self.max_tokens is None:
+            self._merge_by_search(text, start, end, separator, has_next, next_level, out)
+            return
+        if separator:
+            bounds = self._bounds(text, start, end, separator)
+        elif self.max_tokens is None and self.chunk_size > 1:
+            self._window_spans(start, end, out)
+            return
+        else:
+            bounds = list(range(start, end + 1))
+
+        if self.max_tokens is None:
+            self._merge_runs(text, bounds, has_next, next_level, out)
+        else:
+            self._merge_with_tokens(text, bounds, has_next, next_level, out)
+
+    def _bounds(self, text: str, start: int, end: int, separator: str) -> List[int]:
+        """
+        Grenzen der Abschnitte (Abschnitt k = bounds[k]:bounds[k+1]); der
+        Separator steht jeweils am Anfang (wie keep_separator=True)
+        """
+        bounds = [start]
+        bounds.extend(match.start() for match in self._patterns[separator].finditer(text, start, end))
+        if len(bounds) > 1 and bounds[1] == start:
+            del bounds[1]
+        bounds.append(end)
+        return bounds
+
+    def _too_long(self, text: str, start: int, end: int, has_next: bool, next_level: int, out: list) -> None:
+        """Abschnitt über der Grenze: eine Ebene tiefer splitten oder ungeteilt übernehmen"""
+        if has_next:
+            self._split(text, start, end, next_level, out)
+        else:
+            # Letzte Ebene: bleibt ungeteilt (und ungestrippt)
+            out.append((start, end, False))
+
+    def _merge_runs(self, text: str, bounds: List[int], has_next: bool, next_level: int, out: list) -> None:
+        """Nur Zeichen-Grenze: Läufe kleiner Abschnitte per Binärsuche mergen"""
+        chunk_size = self.chunk_size
+        run_start = 0
+        pieces = len(bounds) - 1
+        for k in [k for k in range(pieces) if bounds[k + 1] - bounds[k] >= chunk_size]:
+            if k > run_start:
+                self._merge_run(bounds, run_start, k, out)
+            self._too_long(text, bounds[k], bounds[k + 1], has_next, next_level, out)
+            run_start = k + 1
+        if pieces > run_start:
+            self._merge_run(bounds, run_start, pieces, out)
+
+    def _merge_run(self, bounds: List[int], lo: int, hi: int, out: list) -> None:
+        """
+        Merged die Abschnitte lo..hi-1 (alle kürzer als chunk_size) wie
+        TextSplitter._merge_splits. Da die Abschnitte lückenlos sind, ist die
+        Länge des aktuellen Chunks bounds[j] - bounds[i]; Chunk-Ende und
+        Überlappungs-Start lassen sich daher direkt per bisect finden.
+        """
+        chunk_size, chunk_overlap = self.chunk_size, self.chunk_overlap
+        i = lo
+        while True:
+            # Erster Abschnitt k, der nicht mehr in den Chunk ab i passt
+            k = bisect_right(bounds, bounds[i] + chunk_size, i, hi + 1) - 1
+            if k >= hi:
+                out.append((bounds[i], bounds[hi]))
+                return
+            out.append((bounds[i], bounds[k]))
+            # Vorne entfernen, bis nur noch die Überlappung übrig ist und Abschnitt k passt
+            keep_from = max(bounds[k] - chunk_overlap, bounds[k + 1] - chunk_size)
+            i = bisect_left(bounds, keep_from, i, k)
+
+    def _merge_by_search(
+        self, text: str, start: int, end: int, separator: str, has_next: bool, next_level: int, out: list
+    ) -> None:
+        """
+        Wie _merge_runs für Ein-Zeichen-Separatoren (Zeile, Wort), aber ohne
+        alle Grenzen aufzuzählen: Chunk-Ende und Überlappungs-Start werden mit
+        str.find/rfind direkt gesucht - ein paar C-Aufrufe pro Chunk statt
+        einem Python-Schritt pro Wort.
+        """
+        chunk_size, chunk_overlap = self.chunk_size, self.chunk_overlap
+
+        def next_bound(pos: int) -> int:
+            found = text.find(separator, pos + 1, end)
+            return end if found < 0 else found
+
+        pos, current = start, None
+        while pos < end:
+            if current is None:
+                piece_end = next_bound(pos)
+                if piece_end - pos >= chunk_size:
+                    self._too_long(text, pos, piece_end, has_next, next_level, out)
+                    pos = piece_end
+                    continue
+                current = pos
+
+            limit = current + chunk_size
+            if limit >= end:
+                out.append((current, end))
+                return
+            # Abschnitt k: beginnt spätestens bei limit, endet dahinter
+            found = text.rfind(separator, start + 1, limit + 1)
+            piece_start = start if found < 0 else found
+            piece_end = next_bound(piece_start)
+            out.append((current, piece_start))
+            if piece_end - piece_start >= chunk_size:
+                # Zu langer Abschnitt: ohne Überlappung neu beginnen
+                pos, current = piece_start, None
+                continue
+            # Vorne entfernen, bis nur noch die Überlappung übrig ist und Abschnitt k passt
+            keep_from = max(piece_start - chunk_overlap, piece_end - chunk_size)
+            if keep_from > current:
+                current = text.find(separator, keep_from, piece_start + 1)
+
+    def _merge_with_tokens(self, text: str, bounds: List[int], has_next: bool, next_level: int, out: list) -> None:
+        """Zeichen- und Token-Grenze: Abschnitt für Abschnitt mergen"""
+        chunk_size, max_tokens, count = self.chunk_size, self.max_tokens, self.token_counter
+        merger = _SpanMerger(chunk_size, self.chunk_overlap, max_tokens)
+        for k in range(len(bounds) - 1):
+            piece_start, piece_end = bounds[k], bounds[k + 1]
+            if piece_end - piece_start < chunk_size:
+                tokens = count(text[piece_start:piece_end])
+                if tokens < max_tokens:
+                    merger.add(piece_start, piece_end, tokens, out)
+                    continue
+            merger.finish(out)
+            self._too_long(text, piece_start, piece_end, has_next, next_level, out)
+        merger.finish(out)
+
+    def _raw_spans(self, text: str) -> list:
+        """Ungestrippte Spans; (start, end, False) = unverändert übernehmen"""
+        raw: list = []
+        if text:
+            self._split(text, 0, len(text), 0, raw)
+        return raw
+
+    def split_spans(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Chunks als (start, end)-Offsets in text (text[start:end] ist der Chunk)
+        """
+        spans = []
+        for span in self._raw_spans(text):
+            start, end = span[0], span[1]
+            if len(span) == 2:
+                # Strip über Offsets statt über eine Kopie
+                while start < end and text[start].isspace():
+                    start += 1
+                while end > start and text[end - 1].isspace():
+                    end -= 1
+                if start == end:
+                    continue
+            spans.append((start, end))
+        return spans
+
+    def split_text(self, text: str) -> List[str]:
+        chunks = []
+        for span in self._raw_spans(text):
+            chunk = text[span[0]:span[1]]
+            if len(span) == 2:
+                # strip() gibt den Slice selbst zurück, wenn nichts zu entfernen ist
+                chunk = chunk.strip()
+                if not chunk:
+                    continue
+            chunks.append(chunk)
+        return chunks
+
+    def split_documents(self, documents: Iterable[Document]) -> List[Document]:
+        """Wie TextSplitter.split_documents (Metadaten werden pro Chunk kopiert)"""
+        chunks = []
+        for doc in documents:
+            for chunk in self.split_text(doc.page_content):
+                chunks.append(Document(page_content=chunk, metadata=dict(doc.metadata)))
+        return chunks
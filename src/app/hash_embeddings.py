@@ -0,0 +1,48 @@
+# app/hash_embeddings.py
+"""
+Deterministische, lokale Hash-Embeddings (Feature Hashing über Wörter und
+Wort-Bigramme). Kein Modell, kein Netzwerk - für Benchmarks, Tests und
+Stub-Server, wo Ollama nicht verfügbar ist oder nicht belastet werden soll.
+
+Texte mit ähnlichem Vokabular bekommen ähnliche Vektoren, die Ergebnisse
+sind also für Retrieval-Tests brauchbar, aber nicht semantisch.
+"""
+import hashlib
+import math
+import re
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+class HashEmbeddings(Embeddings):
+    """Embedding-Funktion ohne Modell, gleiche Eingabe → gleicher Vektor"""
+
+    def __init__(self, dim: int = 768):
+        self.dim = dim
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dim
+        tokens = _TOKEN.findall(text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+        for feature in features:
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            index = value % self.dim
+            sign = 1.0 if (value >> 63) & 1 else -1.0
+            vector[index] += sign
+
+        norm = math.sqrt(sum(v * v for v in vector))
+        if norm == 0:
+            vector[0] = 1.0
+            return vector
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
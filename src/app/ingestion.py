@@ -0,0 +1,303 @@
+# app/ingestion.py
+"""
+Gemeinsamer Speicher-Pfad für den Import: Chunks in Batches einbetten und
+in ChromaDB schreiben (mit Retry). Genutzt von scripts/load_documents.py,
+der Upload-Seite und den Benchmarks.
+"""
+import logging
+import time
+import uuid
+from itertools import islice
+from typing import Callable, Iterable, List, Optional
+
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+
+def _embed_batch(vectorstore, batch: List[Document]):
+    """Bettet einen Batch ein (None, wenn der Vectorstore das selbst beim Speichern macht)"""
+    embeddings = getattr(vectorstore, "embeddings", None)
+    if embeddings is None or not hasattr(vectorstore, "_collection"):
+        return None
+    return embeddings.embed_documents([doc.page_content for doc in batch])
+
+
+def _upsert_batch(vectorstore, batch: List[Document], vectors, ids: List[str]) -> List[str]:
+    """Schreibt einen Batch mit vorberechneten Vektoren direkt in die Collection"""
+    if vectors is None:
+        return vectorstore.add_documents(batch, ids=ids)
+    vectorstore._collection.upsert(
+        ids=ids,
+        embeddings=vectors,
+        documents=[doc.page_content for doc in batch],
+        # ChromaDB lehnt leere Metadaten-Dicts ab, None ist erlaubt
+        metadatas=[doc.metadata or None for doc in batch],
+    )
+    return ids
+
+
+def _mark_stale(name: str, error: Exception, stats: dict, inventory=None) -> None:
+    """Merkt einen Sidecar zum Neuaufbau vor (Chunks sind gespeichert, nur der Sidecar fehlt)"""
+    logger.error(f"  ❌ {name} nicht aktualisiert, wird neu aufgebaut: {error}")
+    if name not in stats["stale_sidecars"]:
+        stats["stale_sidecars"].append(name)
+    if name == "inventory":
+        try:
+            # Auch über den Prozess hinaus: ensure_built() baut beim nächsten Zugriff neu auf
+            inventory.mark_stale()
+        except Exception as e:
+            logger.error(f"  ❌ Inventar nicht als veraltet markiert: {e}")
+
+
+def _update_sidecars(batch, ids, vectors, stats, catalog_index=None, inventory=None, summary_index=None) -> None:
+    """Pflegt die Sidecars eines gespeicherten Batches, jeden für sich"""
+    updates = []
+    if catalog_index is not None:
+        updates.append(("catalog_index", lambda: catalog_index.add_documents(batch, ids)))
+    if inventory is not None:
+        updates.append(("inventory", lambda: inventory.add_documents(batch, ids)))
+    if summary_index is not None and vectors is not None:
+        updates.append(("summary_index", lambda: summary_index.add_chunks(batch, vectors)))
+    for name, update in updates:
+        try:
+            update()
+        except Exception as e:
+            _mark_stale(name, e, stats, inventory)
+
+
+def rebuild_stale_sidecars(vectorstore, stale: Iterable[str], catalog_index=None, inventory=None, summary_index=None) -> None:
+    """Baut die beim Import als veraltet markierten Sidecars aus der Collection neu auf"""
+    sidecars = {"catalog_index": catalog_index, "inventory": inventory, "summary_index": summary_index}
+    for name in stale:
+        sidecar = sidecars.get(name)
+        if sidecar is None:
+            continue
+        logger.info(f"🔧 {name} wird aus der Collection neu aufgebaut...")
+        try:
+            sidecar.rebuild(vectorstore._collection)
+        except Exception as e:
+            logger.error(f"❌ {name} konnte nicht neu aufgebaut werden: {e}")
+
+
+def remove_files(
+    vectorstore,
+    filenames: Iterable[str],
+    catalog_index=None,
+    inventory=None,
+    summary_index=None,
+    parent_store=None,
+) -> int:
+    """
+    Entfernt alle Chunks der Dateien aus ChromaDB und den Sidecars (z.B.
+    vor einem erneuten Import, damit keine alten Children oder Parents
+    übrig bleiben)
+
+    Returns:
+        Anzahl gelöschter Chunks
+    """
+    collection = vectorstore._collection
+    removed = 0
+    for filename in filenames:
+        if inventory is not None:
+            ids = inventory.file_ids(filename)
+        else:
+            ids = collection.get(where={"filename": filename}, include=[])["ids"]
+        if ids:
+            collection.delete(ids=ids)
+            if catalog_index is not None:
+                catalog_index.delete(ids)
+            if inventory is not None:
+                inventory.delete(ids)
+            removed += len(ids)
+        if summary_index is not None:
+            summary_index.delete_file(filename)
+        if parent_store is not None:
+            parent_store.delete_file(filename)
+    if removed:
+        logger.info(f"🗑️  {removed} alte Chunks entfernt")
+    return removed
+
+
+def store_chunks_in_batches(
+    vectorstore,
+    chunks: List[Document],
+    batch_size: int = 10,
+    max_retries: int = 3,
+    retry_wait: float = 5.0,
+    catalog_index=None,
+    inventory=None,
+    on_batch: Optional[Callable[[int, int], None]] = None,
+    summary_index=None,
+) -> dict:
+    """
+    Speichert Chunks batchweise im Vectorstore
+
+    Embedding und Upsert sind getrennte Schritte: schlägt nur der Upsert
+    fehl, wird beim nächsten Versuch nicht erneut eingebettet. IDs werden
+    vor dem ersten Versuch vergeben, ein wiederholter Upsert überschreibt
+    also statt zu duplizieren. Sidecars (Katalog-Index, Inventar,
+    Dokument-Index) gehören nicht zum Retry: schlägt ihr Update fehl, wird
+    der Sidecar in 'stale_sidecars' zum Neuaufbau vorgemerkt
+    (siehe rebuild_stale_sidecars).
+
+    Args:
+        vectorstore: Ziel-Vectorstore (bettet beim add_documents ein)
+        chunks: Zu speichernde Chunks
+        batch_size: Chunks pro Batch (= pro Embedding-Call)
+        max_retries: Versuche pro Batch
+        retry_wait: Basis-Wartezeit zwischen Versuchen (wächst linear)
+        catalog_index: Optionaler Katalog-Feldindex, der mitbefüllt wird
+        inventory: Optionales Collection-Inventar, das mitgepflegt wird
+        on_batch: Callback(batch_num, total_batches) vor jedem Batch
+        summary_index: Optionaler Dokument-Index (Zentroid pro Datei) für
+            zweistufiges Retrieval, wird am Ende geschrieben
+
+    Returns:
+        dict mit 'successful_batches', 'failed_batches', 'total_batches',
+        'retries', 'errors', 'batch_seconds' sowie 'embed_seconds' und
+        'upsert_seconds' (pro Batch, inkl. fehlgeschlagener Versuche) und
+        'stale_sidecars' (Namen der neu aufzubauenden Sidecars)
+    """
+    total_chunks = len(chunks)
+    total_batches = (total_chunks + batch_size - 1) // batch_size
+
+    stats = {
+        "successful_batches": 0,
+        "failed_batches": 0,
+        "total_batches": total_batches,
+        "retries": 0,
+        "errors": [],
+        "batch_seconds": [],
+        "embed_seconds": [],
+        "upsert_seconds": [],
+        "stale_sidecars": [],
+    }
+
+    for i in range(0, total_chunks, batch_size):
+        batch = chunks[i:i + batch_size]
+        batch_num = (i // batch_size) + 1
+
+        if on_batch is not None:
+            on_batch(batch_num, total_batches)
+        logger.info(f"  📦 Batch {batch_num}/{total_batches}: {len(batch)} Chunks...")
+
+        success = False
+        start = time.perf_counter()
+        vectors = None
+        embed_seconds = upsert_seconds = 0.0
+        ids = [doc.id or str(uuid.uuid4()) for doc in batch]
+
+        for attempt in range(max_retries):
+            try:
+                if vectors is None:
+                    step = time.perf_counter()
+                    try:
+                        vectors = _embed_batch(vectorstore, batch)
+                    finally:
+                        embed_seconds += time.perf_counter() - step
+                step = time.perf_counter()
+                try:
+                    _upsert_batch(vectorstore, batch, vectors, ids)
+                finally:
+                    upsert_seconds += time.perf_counter() - step
+                stats["successful_batches"] += 1
+                success = True
+                break  # Erfolg, gehe zum nächsten Batch
+            except Exception as e:
+                if attempt < max_retries - 1:
+                    wait_time = (attempt + 1) * retry_wait  # 5s, 10s, 15s
+                    stats["retries"] += 1
+                    logger.warning(f"  ⚠️  Versuch {attempt + 1} fehlgeschlagen: {e}")
+                    logger.info(f"  ⏳ Warte {wait_time}s vor erneutem Versuch...")
+                    time.sleep(wait_time)
+                else:
+                    logger.error(f"  ❌ Batch {batch_num} nach {max_retries} Versuchen fehlgeschlagen!")
+                    stats["failed_batches"] += 1
+                    stats["errors"].append({"batch": batch_num, "error": str(e)})
+
+        if success:
+            _update_sidecars(batch, ids, vectors, stats, catalog_index, inventory, summary_index)
+
+        stats["batch_seconds"].append(time.perf_counter() - start)
+        stats["embed_seconds"].append(embed_seconds)
+        stats["upsert_seconds"].append(upsert_seconds)
+
+        if not success:
+            logger.warning(f"  ⏭️  Überspringe Batch {batch_num} und fahre fort...")
+
+    if summary_index is not None:
+        try:
+            summary_index.flush()
+        except Exception as e:
+            # Chunks sind gespeichert, nur der Dokument-Index fehlt
+            _mark_stale("summary_index", e, stats)
+            stats["summary_index_error"] = str(e)
+
+    return stats
+
+
+def store_chunk_stream(
+    vectorstore,
+    chunks: Iterable[Document],
+    group_size: int = 500,
+    on_batch: Optional[Callable[[int, int], None]] = None,
+    prepare_group: Optional[Callable[[List[Document]], List[Document]]] = None,
+    **kwargs,
+) -> dict:
+    """
+    Speichert einen Chunk-Strom (z.B. DocumentProcessor.iter_text_chunks)
+    gruppenweise über store_chunks_in_batches - es liegen nie mehr als
+    group_size Chunks gleichzeitig im Speicher.
+
+    Args:
+        group_size: Chunks pro Gruppe
+        on_batch: Callback(batch_num, total_batches) mit fortlaufender
+            Batch-Nummer; total_batches ist die Zahl der bisher bekannten Batches
+        prepare_group: Callback(group) -> group vor dem Speichern, z.B. um
+            doppelte oder unveränderte Einträge zu entfernen
+        **kwargs: Weitere Argumente für store_chunks_in_batches
+
+    Returns:
+        Zusammengefasste Statistik wie store_chunks_in_batches, plus 'chunks'
+    """
+    totals = {
+        "successful_batches": 0,
+        "failed_batches": 0,
+        "total_batches": 0,
+        "retries": 0,
+        "errors": [],
+        "batch_seconds": [],
+        "embed_seconds": [],
+        "upsert_seconds": [],
+        "stale_sidecars": [],
+        "chunks": 0,
+    }
+    iterator = iter(chunks)
+    while True:
+        group = list(islice(iterator, group_size))
+        if not group:
+            break
+        if prepare_group is not None:
+            group = prepare_group(group)
+            if not group:
+                continue
+        offset = totals["total_batches"]
+
+        def report_batch(batch_num, total_batches, offset=offset):
+            if on_batch is not None:
+                on_batch(offset + batch_num, offset + total_batches)
+
+        stats = store_chunks_in_batches(vectorstore, group, on_batch=report_batch, **kwargs)
+        for key in ("successful_batches", "failed_batches", "total_batches", "retries"):
+            totals[key] += stats[key]
+        for key in ("batch_seconds", "embed_seconds", "upsert_seconds"):
+            totals[key].extend(stats[key])
+        totals["errors"].extend(
+            {"batch": offset + error["batch"], "error": error["error"]} for error in stats["errors"]
+        )
+        totals["stale_sidecars"].extend(n for n in stats["stale_sidecars"] if n not in totals["stale_sidecars"])
+        if "summary_index_error" in stats:
+            totals["summary_index_error"] = stats["summary_index_error"]
+        totals["chunks"] += len(group)
+    return totals
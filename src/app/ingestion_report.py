@@ -0,0 +1,204 @@
+# app/ingestion_report.py
+"""
+Strukturierter Bericht pro Import-Lauf (CLI und Upload-Seite): Lade- und
+Split-Zeit, Seiten und Chunks pro Datei, Embedding- und Upsert-Latenz pro
+Batch, Retries, Fehler und Speicher. Berichte liegen als JSON in
+Config.INGESTION_REPORT_DIR und werden auf der Dokumente-Seite angezeigt.
+
+Speicher: ru_maxrss ist der Höchststand über die ganze Prozesslaufzeit und
+sagt in der Streamlit-App nichts über einen einzelnen Upload. Der Bericht
+tastet deshalb während des Laufs den aktuellen RSS (VmRSS) ab und meldet
+Start, Höchststand und Zuwachs dieses Laufs; der Prozess-Peak steht
+getrennt als 'process_peak_rss_mb' daneben.
+"""
+import json
+import logging
+import resource
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Union
+
+from langchain_core.documents import Document
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+
+# Abtastintervall für den RSS während eines Laufs (Sekunden)
+RSS_SAMPLE_SECONDS = 0.2
+
+
+def peak_rss_mb() -> float:
+    """Maximaler Resident Set Size des Prozesses in MB (über die ganze Laufzeit)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB, macOS: Bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def current_rss_mb() -> float:
+    """Aktueller Resident Set Size in MB (VmRSS; ohne /proc: Prozess-Peak)"""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return peak_rss_mb()
+
+
+class RssSampler:
+    """Tastet den RSS im Hintergrund ab und merkt sich den Höchststand"""
+
+    def __init__(self, interval: float = RSS_SAMPLE_SECONDS):
+        self.interval = interval
+        self.start_mb = self.peak_mb = current_rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> float:
+        rss = current_rss_mb()
+        self.peak_mb = max(self.peak_mb, rss)
+        return rss
+
+    def stop(self) -> dict:
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+        return {
+            "start_mb": self.start_mb,
+            "peak_mb": self.peak_mb,
+            "delta_mb": self.peak_mb - self.start_mb,
+        }
+
+
+class IngestionReport:
+    """Sammelt die Messwerte eines Import-Laufs"""
+
+    def __init__(self, collection: str, source: str, settings: Optional[dict] = None):
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self._rss = RssSampler()
+        self.data = {
+            "collection": collection,
+            "source": source,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "settings": settings or {},
+            "files": [],
+            "batches": [],
+            "retries": 0,
+            "failures": [],
+        }
+
+    def add_file(
+        self, file_path: Path, chunks: Union[List[Document], int], timings: dict, name: Optional[str] = None
+    ) -> None:
+        """
+        Trägt eine verarbeitete Datei ein (timings aus DocumentProcessor.load_and_process_file)
+
+        chunks: Liste der Chunks oder - bei gestreamten Dateien - ihre Anzahl
+        """
+        name = name or file_path.name
+        chunk_count = chunks if isinstance(chunks, int) else len(chunks)
+        entry = {
+            "filename": name,
+            "type": file_path.suffix.lower(),
+            "size_bytes": file_path.stat().st_size if file_path.exists() else None,
+            "pages": timings.get("pages", 0),
+            "chunks": chunk_count,
+            "load_seconds": timings.get("load_seconds", 0.0),
+            "split_seconds": timings.get("split_seconds", 0.0),
+        }
+        self.data["files"].append(entry)
+        self._rss.sample()
+        if timings.get("error"):
+            self.data["failures"].append({"stage": "load", "filename": name, "error": timings["error"]})
+        elif not chunk_count:
+            self.data["failures"].append({"stage": "load", "filename": name, "error": "keine Chunks"})
+
+    def add_storage(self, stats: dict) -> None:
+        """Übernimmt die Batch-Statistik aus store_chunks_in_batches"""
+        failed = {error["batch"]: error["error"] for error in stats["errors"]}
+        offset = len(self.data["batches"])
+        for i, seconds in enumerate(stats["batch_seconds"], 1):
+            self.data["batches"].append({
+                "batch": offset + i,
+                "seconds": seconds,
+                "embed_seconds": stats["embed_seconds"][i - 1],
+                "upsert_seconds": stats["upsert_seconds"][i - 1],
+                "ok": i not in failed,
+            })
+        self.data["retries"] += stats["retries"]
+        self._rss.sample()
+        for batch, error in failed.items():
+            self.data["failures"].append({"stage": "store", "batch": offset + batch, "error": error})
+
+    def finish(self, collection_count: Optional[int] = None) -> dict:
+        """Schließt den Bericht ab und berechnet die Zusammenfassung"""
+        files, batches = self.data["files"], self.data["batches"]
+        total = time.perf_counter() - self._start
+        rss = self._rss.stop()
+        self.data.update({
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "total_seconds": total,
+            "rss_start_mb": rss["start_mb"],
+            "run_peak_rss_mb": rss["peak_mb"],
+            "run_rss_delta_mb": rss["delta_mb"],
+            "process_peak_rss_mb": peak_rss_mb(),
+            "summary": {
+                "files": len(files),
+                "pages": sum(f["pages"] for f in files),
+                "chunks": sum(f["chunks"] for f in files),
+                "collection_count": collection_count,
+                "load_seconds": sum(f["load_seconds"] for f in files),
+                "split_seconds": sum(f["split_seconds"] for f in files),
+                "embed_seconds": sum(b["embed_seconds"] for b in batches),
+                "upsert_seconds": sum(b["upsert_seconds"] for b in batches),
+                "batches": len(batches),
+                "failed_batches": sum(1 for b in batches if not b["ok"]),
+                "retries": self.data["retries"],
+                "failures": len(self.data["failures"]),
+            },
+        })
+        return self.data
+
+    def save(self, directory: Optional[Path] = None) -> Path:
+        """Schreibt den Bericht als JSON (Dateiname: Startzeit + Collection)"""
+        directory = Path(directory or Config.INGESTION_REPORT_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        stamp = self.started_at.strftime("%Y%m%d-%H%M%S-%f")
+        path = directory / f"ingest-{stamp}-{self.data['collection']}.json"
+        path.write_text(json.dumps(self.data, indent=2, ensure_ascii=False), encoding="utf-8")
+        logger.info(f"📝 Import-Bericht gespeichert: {path}")
+        return path
+
+
+def list_reports(collection: Optional[str] = None, limit: int = 20, directory: Optional[Path] = None) -> List[dict]:
+    """Neueste Berichte zuerst, optional nur für eine Collection"""
+    directory = Path(directory or Config.INGESTION_REPORT_DIR)
+    if not directory.exists():
+        return []
+
+    reports = []
+    for path in sorted(directory.glob("ingest-*.json"), reverse=True):
+        try:
+            report = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"⚠️  Bericht nicht lesbar: {path.name}: {e}")
+            continue
+        if collection and report.get("collection") != collection:
+            continue
+        report["path"] = str(path)
+        reports.append(report)
+        if len(reports) >= limit:
+            break
+    return reports
@@ -0,0 +1,110 @@
+# app/metrics.py
+"""
+Prozessweite Laufzeit-Metriken (Zähler und Histogramme) für RAG-Pipeline
+und Ollama-Aufrufe, exportierbar im Prometheus-Textformat
+"""
+import threading
+from bisect import bisect_left
+from typing import Dict, Optional, Sequence
+
+# Bucket-Grenzen (obere Schranken, inklusive) für Latenzen in Sekunden
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKENS_PER_SECOND_BUCKETS = (1, 2, 5, 10, 20, 30, 50, 75, 100, 200)
+PROMPT_TOKEN_BUCKETS = (250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+
+
+class Histogram:
+    """Kumulatives Histogramm mit festen Buckets (wie Prometheus)"""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # letzter Bucket = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        cumulative, running = [], 0
+        for count in self.counts:
+            running += count
+            cumulative.append(running)
+        return {
+            "buckets": list(zip(list(self.buckets) + [float("inf")], cumulative)),
+            "sum": self.sum,
+            "count": self.count,
+        }
+
+
+class Metrics:
+    """Thread-sichere Sammlung von Zählern und Histogrammen"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._histograms: Dict[str, Histogram] = {}
+
+    def inc(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def get(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def observe(self, name: str, value: float, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        """Trägt einen Messwert ins Histogramm ein (Buckets gelten ab der ersten Messung)"""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(buckets)
+            histogram.observe(value)
+
+    def histogram(self, name: str) -> Optional[dict]:
+        with self._lock:
+            histogram = self._histograms.get(name)
+            return histogram.snapshot() if histogram else None
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._counters)
+
+    def render_prometheus(self, prefix: str = "sadpac_") -> str:
+        """Alle Metriken im Prometheus-Textformat (Version 0.0.4)"""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {name: h.snapshot() for name, h in self._histograms.items()}
+
+        lines = []
+        for name in sorted(counters):
+            lines.append(f"# TYPE {prefix}{name} counter")
+            lines.append(f"{prefix}{name} {_format_value(counters[name])}")
+        for name in sorted(histograms):
+            snapshot = histograms[name]
+            lines.append(f"# TYPE {prefix}{name} histogram")
+            for bound, count in snapshot["buckets"]:
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                lines.append(f'{prefix}{name}_bucket{{le="{le}"}} {count}')
+            lines.append(f"{prefix}{name}_sum {_format_value(snapshot['sum'])}")
+            lines.append(f"{prefix}{name}_count {snapshot['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+_metrics: Optional[Metrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    """Gibt die prozessweite Metrik-Sammlung zurück"""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics()
+        return _metrics
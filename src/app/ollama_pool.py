@@ -0,0 +1,372 @@
+# app/ollama_pool.py
+"""
+Pool aus mehreren Ollama-Servern mit Rollen (Chat, Embeddings).
+
+Config.OLLAMA_CHAT_URLS und Config.OLLAMA_EMBEDDING_URLS legen fest, welche
+Server welche Rolle übernehmen; eine URL in beiden Listen ist ein Server mit
+beiden Rollen. Ohne Angabe gilt für beide Rollen Config.OLLAMA_BASE_URL.
+
+Pro Aufruf wird der Server mit dem kleinsten Wert
+    geglättete Latenz (pro Rolle) x (laufende Aufrufe + 1)
+gewählt; Server ohne Messwert kommen zuerst dran. Schlägt ein Aufruf fehl,
+geht er an den nächstbesten Server (Failover, auch mitten im Import: jeder
+Embedding-Batch wird einzeln verteilt). Chat-Streams wechseln nur vor dem
+ersten Token den Server.
+
+Circuit Breaker: nach Config.OLLAMA_CIRCUIT_FAILURES Fehlern in Folge wird
+ein Server für Config.OLLAMA_CIRCUIT_OPEN_SECONDS übersprungen, danach darf
+ein Probe-Aufruf durch (half-open). Ein Health-Check im Hintergrund
+(GET /api/version) öffnet den Circuit nicht erreichbarer Server sofort und
+gibt wiedererreichbare vorzeitig frei.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, TypeVar
+
+from langchain_core.embeddings import Embeddings
+
+from .chroma_client import OLLAMA_VERSION_PATH, _probe
+from .config import Config
+from .metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+CHAT = "chat"
+EMBEDDINGS = "embeddings"
+ROLES = (CHAT, EMBEDDINGS)
+
+# Glättungsfaktor für die Latenz (Anteil der neuen Messung)
+LATENCY_ALPHA = 0.3
+
+T = TypeVar("T")
+
+
+class NoEndpointAvailable(RuntimeError):
+    """Kein Server für die Rolle erreichbar (alle Circuits offen)"""
+
+
+class Endpoint:
+    """Ein Ollama-Server mit Zustand für Routing und Circuit Breaker"""
+
+    def __init__(self, url: str, roles: Sequence[str]):
+        self.url = url.rstrip("/")
+        self.roles = set(roles)
+        self.in_flight = 0
+        self.latency: Dict[str, float] = {}
+        self.failures = 0
+        self.open_until = 0.0
+        self.last_error: Optional[str] = None
+        self.requests = 0
+        self.errors = 0
+
+    @property
+    def state(self) -> str:
+        if self.open_until == 0.0:
+            return "closed"
+        return "open" if time.monotonic() < self.open_until else "half_open"
+
+    def score(self, role: str) -> float:
+        return self.latency.get(role, 0.0) * (self.in_flight + 1)
+
+    def status(self) -> dict:
+        return {
+            "url": self.url,
+            "roles": sorted(self.roles),
+            "state": self.state,
+            "in_flight": self.in_flight,
+            "latency_ms": {role: round(value * 1000, 1) for role, value in self.latency.items()},
+            "requests": self.requests,
+            "errors": self.errors,
+            "last_error": self.last_error,
+        }
+
+
+class OllamaPool:
+    """
+    Verteilt Ollama-Aufrufe auf mehrere Server
+
+    Args:
+        endpoints: Liste von Endpoint
+        failure_threshold: Fehler in Folge, ab denen der Circuit öffnet
+        open_seconds: Wie lange ein offener Server übersprungen wird
+        probe_interval: Sekunden zwischen Health-Checks (0 = aus)
+        probe_timeout: Timeout pro Health-Check
+    """
+
+    def __init__(
+        self,
+        endpoints: List[Endpoint],
+        failure_threshold: int = 3,
+        open_seconds: float = 30.0,
+        probe_interval: float = 0.0,
+        probe_timeout: float = 2.0,
+    ):
+        if not endpoints:
+            raise ValueError("Mindestens ein Ollama-Endpunkt nötig")
+        self.endpoints = endpoints
+        self.failure_threshold = max(1, failure_threshold)
+        self.open_seconds = open_seconds
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._prober: Optional[threading.Thread] = None
+
+    # ---- Routing ----
+
+    def _acquire(self, role: str, tried: set) -> Endpoint:
+        with self._lock:
+            eligible = [
+                endpoint for endpoint in self.endpoints
+                if role in endpoint.roles and endpoint.state != "open" and endpoint.url not in tried
+            ]
+            if not eligible:
+                raise NoEndpointAvailable(f"Kein Ollama-Server für {role} erreichbar")
+            endpoint = min(eligible, key=lambda e: e.score(role))
+            endpoint.in_flight += 1
+            endpoint.requests += 1
+            if endpoint.state == "half_open":
+                # Nur ein Probe-Aufruf, bis das Ergebnis feststeht
+                endpoint.open_until = time.monotonic() + self.open_seconds
+            return endpoint
+
+    def _success(self, endpoint: Endpoint, role: str, seconds: float) -> None:
+        with self._lock:
+            endpoint.in_flight -= 1
+            previous = endpoint.latency.get(role)
+            endpoint.latency[role] = seconds if previous is None else (
+                LATENCY_ALPHA * seconds + (1 - LATENCY_ALPHA) * previous
+            )
+            if endpoint.open_until:
+                logger.info(f"✅ Ollama {endpoint.url} wieder verfügbar")
+            endpoint.failures = 0
+            endpoint.open_until = 0.0
+
+    def _failure(self, endpoint: Endpoint, error: Exception) -> None:
+        with self._lock:
+            endpoint.in_flight -= 1
+            endpoint.errors += 1
+            endpoint.failures += 1
+            endpoint.last_error = str(error)
+            if endpoint.failures >= self.failure_threshold or endpoint.open_until:
+                self._open(endpoint)
+        get_metrics().inc("ollama_endpoint_errors")
+
+    def _open(self, endpoint: Endpoint) -> None:
+        """Öffnet den Circuit (Lock muss gehalten werden)"""
+        if endpoint.state != "open":
+            logger.warning(
+                f"⚡ Ollama {endpoint.url} für {self.open_seconds:.0f}s gesperrt: {endpoint.last_error}"
+            )
+            get_metrics().inc("ollama_circuit_opened")
+        endpoint.open_until = time.monotonic() + self.open_seconds
+
+    def call(self, role: str, fn: Callable[[Endpoint], T]) -> T:
+        """Führt fn(endpoint) auf dem besten Server aus, bei Fehlern auf dem nächsten"""
+        tried = set()
+        last_error: Optional[Exception] = None
+        while True:
+            try:
+                endpoint = self._acquire(role, tried)
+            except NoEndpointAvailable:
+                if last_error is not None:
+                    raise last_error
+                raise
+            tried.add(endpoint.url)
+            start = time.perf_counter()
+            try:
+                result = fn(endpoint)
+            except Exception as e:
+                self._failure(endpoint, e)
+                last_error = e
+                logger.warning(f"⚠️  Ollama {endpoint.url} ({role}) fehlgeschlagen: {e}")
+                get_metrics().inc("ollama_failovers")
+                continue
+            self._success(endpoint, role, time.perf_counter() - start)
+            return result
+
+    def stream(self, role: str, fn: Callable[[Endpoint], Iterator[T]]) -> Iterator[T]:
+        """
+        Wie call() für Streams: Failover nur bis zum ersten Element, danach
+        werden Fehler weitergereicht (eine halbe Antwort lässt sich nicht
+        auf einem anderen Server fortsetzen)
+        """
+        tried = set()
+        last_error: Optional[Exception] = None
+        while True:
+            try:
+                endpoint = self._acquire(role, tried)
+            except NoEndpointAvailable:
+                if last_error is not None:
+                    raise last_error
+                raise
+            tried.add(endpoint.url)
+            start = time.perf_counter()
+            try:
+                iterator = fn(endpoint)
+                first = next(iterator)
+            except StopIteration:
+                self._success(endpoint, role, time.perf_counter() - start)
+                return
+            except Exception as e:
+                self._failure(endpoint, e)
+                last_error = e
+                logger.warning(f"⚠️  Ollama {endpoint.url} ({role}) fehlgeschlagen: {e}")
+                get_metrics().inc("ollama_failovers")
+                continue
+            break
+
+        # Latenz bis zum ersten Token, in_flight bis zum Ende des Streams
+        first_token_seconds = time.perf_counter() - start
+        try:
+            yield first
+            yield from iterator
+        except GeneratorExit:
+            self._success(endpoint, role, first_token_seconds)
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+            raise
+        except Exception as e:
+            self._failure(endpoint, e)
+            raise
+        self._success(endpoint, role, first_token_seconds)
+
+    # ---- Health-Checks ----
+
+    def probe(self) -> List[dict]:
+        """Prüft alle Server einmal per GET /api/version"""
+        results = []
+        for endpoint in self.endpoints:
+            result = _probe(endpoint.url + OLLAMA_VERSION_PATH, self.probe_timeout)
+            with self._lock:
+                if result["ok"]:
+                    if endpoint.state == "open":
+                        # Erreichbar: nächster Aufruf darf als Probe durch
+                        endpoint.open_until = time.monotonic()
+                else:
+                    endpoint.last_error = result.get("error")
+                    self._open(endpoint)
+            results.append({"url": endpoint.url, **result})
+        return results
+
+    def start_health_checks(self) -> None:
+        if self.probe_interval <= 0 or self._prober is not None:
+            return
+
+        def loop():
+            while not self._stop.wait(self.probe_interval):
+                try:
+                    self.probe()
+                except Exception as e:
+                    logger.warning(f"⚠️  Ollama-Health-Check fehlgeschlagen: {e}")
+
+        self._prober = threading.Thread(target=loop, name="ollama-health", daemon=True)
+        self._prober.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def status(self) -> List[dict]:
+        with self._lock:
+            return [endpoint.status() for endpoint in self.endpoints]
+
+
+class PooledEmbeddings(Embeddings):
+    """OllamaEmbeddings über den Pool (ein Client pro Server)"""
+
+    def __init__(self, pool: OllamaPool, model: str, client_factory: Optional[Callable[[str, str], Embeddings]] = None):
+        self.pool = pool
+        self.model = model
+        self._factory = client_factory or _ollama_embeddings
+        self._clients: Dict[str, Embeddings] = {}
+
+    def _client(self, endpoint: Endpoint) -> Embeddings:
+        client = self._clients.get(endpoint.url)
+        if client is None:
+            client = self._clients[endpoint.url] = self._factory(endpoint.url, self.model)
+        return client
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.pool.call(EMBEDDINGS, lambda endpoint: self._client(endpoint).embed_documents(texts))
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.pool.call(EMBEDDINGS, lambda endpoint: self._client(endpoint).embed_query(text))
+
+
+class PooledChatModel:
+    """
+    ChatOllama über den Pool - bietet invoke() und stream() wie das
+    Chat-Modell, der Server wird pro Aufruf gewählt
+    """
+
+    def __init__(self, pool: OllamaPool, client_factory: Optional[Callable[[str], object]] = None, **kwargs):
+        self.pool = pool
+        self.kwargs = kwargs
+        self._factory = client_factory or (lambda url: _chat_ollama(url, **self.kwargs))
+        self._clients: Dict[str, object] = {}
+
+    def _client(self, endpoint: Endpoint):
+        client = self._clients.get(endpoint.url)
+        if client is None:
+            client = self._clients[endpoint.url] = self._factory(endpoint.url)
+        return client
+
+    def invoke(self, messages, **kwargs):
+        return self.pool.call(CHAT, lambda endpoint: self._client(endpoint).invoke(messages, **kwargs))
+
+    def stream(self, messages, **kwargs):
+        return self.pool.stream(CHAT, lambda endpoint: iter(self._client(endpoint).stream(messages, **kwargs)))
+
+
+def _ollama_embeddings(url: str, model: str) -> Embeddings:
+    from langchain_ollama import OllamaEmbeddings
+
+    return OllamaEmbeddings(base_url=url, model=model)
+
+
+def _chat_ollama(url: str, **kwargs):
+    from langchain_ollama import ChatOllama
+
+    return ChatOllama(base_url=url, **kwargs)
+
+
+def endpoints_from_config() -> List[Endpoint]:
+    """Server aus OLLAMA_CHAT_URLS/OLLAMA_EMBEDDING_URLS (Rollen zusammengeführt)"""
+    chat = Config.OLLAMA_CHAT_URLS or [Config.OLLAMA_BASE_URL]
+    embeddings = Config.OLLAMA_EMBEDDING_URLS or [Config.OLLAMA_BASE_URL]
+    roles: Dict[str, List[str]] = {}
+    for role, urls in ((CHAT, chat), (EMBEDDINGS, embeddings)):
+        for url in urls:
+            roles.setdefault(url.rstrip("/"), []).append(role)
+    return [Endpoint(url, url_roles) for url, url_roles in roles.items()]
+
+
+def pool_enabled() -> bool:
+    """Pool nur, wenn eigene Server-Listen konfiguriert sind"""
+    return bool(Config.OLLAMA_CHAT_URLS or Config.OLLAMA_EMBEDDING_URLS)
+
+
+_pool: Optional[OllamaPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_ollama_pool() -> OllamaPool:
+    """Prozessweiter Pool (startet beim ersten Aufruf die Health-Checks)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = OllamaPool(
+                endpoints_from_config(),
+                failure_threshold=Config.OLLAMA_CIRCUIT_FAILURES,
+                open_seconds=Config.OLLAMA_CIRCUIT_OPEN_SECONDS,
+                probe_interval=Config.OLLAMA_HEALTH_INTERVAL,
+                probe_timeout=Config.STARTUP_CHECK_TIMEOUT,
+            )
+            _pool.start_health_checks()
+            logger.info(
+                "🔀 Ollama-Pool: "
+                + ", ".join(f"{e.url} ({'+'.join(sorted(e.roles))})" for e in _pool.endpoints)
+            )
+        return _pool
@@ -0,0 +1,300 @@
+# app/ollama_scheduler.py
+"""
+Prioritäts-Scheduler für den gemeinsam genutzten Ollama-Server.
+
+Alle Ollama-Aufrufe (Chat-Generierung, Query-Embeddings, Bulk-Embeddings beim
+Import) holen sich vorher einen Slot. Pro Request-Klasse gibt es ein eigenes
+Concurrency-Limit, zusätzlich ein globales Limit. Sind alle Slots belegt,
+werden wartende Anfragen nach Priorität (und innerhalb einer Priorität nach
+Ankunft) bedient - interaktive Anfragen also vor Bulk-Embeddings.
+
+Prozessübergreifend (Streamlit, API, CLI-Import auf demselben Host bzw. mit
+gemeinsam gemountetem data/index) stimmen sich die Prozesse über flock-Dateien
+in Config.OLLAMA_SLOT_DIR ab: Bulk-Embeddings belegen einen von
+OLLAMA_BULK_EMBEDDING_CONCURRENCY Slots für alle Prozesse zusammen und warten
+vor jedem Batch, solange irgendwo Chat oder Query-Embeddings laufen (höchstens
+OLLAMA_BULK_MAX_YIELD_SECONDS, damit Importe unter Dauerlast nicht verhungern).
+
+Die Concurrency-Limits gelten pro Ollama-Server: mit mehreren Servern im Pool
+(OLLAMA_CHAT_URLS / OLLAMA_EMBEDDING_URLS) werden sie mit der Zahl der Server
+der jeweiligen Rolle multipliziert.
+"""
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: nur prozessinterne Abstimmung
+    fcntl = None
+
+from langchain_core.embeddings import Embeddings
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+# Request-Klassen
+QUERY_EMBEDDING = "query_embedding"
+CHAT = "chat"
+BULK_EMBEDDING = "bulk_embedding"
+
+# Kleinere Zahl = höhere Priorität
+PRIORITIES: Dict[str, int] = {
+    QUERY_EMBEDDING: 0,
+    CHAT: 1,
+    BULK_EMBEDDING: 2,
+}
+
+
+class Ticket:
+    """Platz in der Warteschlange für einen Ollama-Aufruf"""
+
+    def __init__(self, scheduler: "OllamaScheduler", request_class: str, seq: int):
+        self.scheduler = scheduler
+        self.request_class = request_class
+        self.priority = PRIORITIES[request_class]
+        self.seq = seq
+        self.enqueued_at = time.perf_counter()
+        self.granted = False
+        self.released = False
+        # Prozessübergreifender Slot (offene Sperrdatei)
+        self.shared_handle = None
+
+    @property
+    def position(self) -> int:
+        """Anzahl der Anfragen, die vor diesem Ticket bedient werden (0 = als Nächstes)"""
+        return self.scheduler.position(self)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wartet auf den Slot. Gibt True zurück, sobald er vergeben wurde."""
+        return self.scheduler._wait(self, timeout)
+
+    def release(self) -> None:
+        """Gibt den Slot frei bzw. verlässt die Warteschlange"""
+        self.scheduler._release(self)
+
+
+class SharedSlots:
+    """
+    Prozessübergreifende Slots über flock-Dateien in einem gemeinsamen Ordner
+
+    Interaktive Aufrufe halten eine geteilte Sperre auf "interactive.lock".
+    Ein Bulk-Aufruf prüft vorher per exklusivem Test-Lock, ob irgendein
+    Prozess gerade interaktiv arbeitet, und belegt dann eine von bulk_slots
+    Dateien "bulk-<n>.lock". Stirbt ein Prozess, gibt der Kernel seine
+    Sperren frei.
+    """
+
+    def __init__(self, directory: Path, bulk_slots: int, max_yield_seconds: float = 30.0, poll_seconds: float = 0.1):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.bulk_slots = max(1, bulk_slots)
+        self.max_yield_seconds = max_yield_seconds
+        self.poll_seconds = poll_seconds
+
+    def _open(self, name: str):
+        return open(self.directory / name, "a")
+
+    def acquire(self, request_class: str, timeout: Optional[float] = None):
+        """Offene Sperrdatei als Slot oder None, falls timeout abgelaufen ist"""
+        if request_class != BULK_EMBEDDING:
+            handle = self._open("interactive.lock")
+            fcntl.flock(handle, fcntl.LOCK_SH)
+            return handle
+
+        start = time.perf_counter()
+        deadline = None if timeout is None else start + timeout
+        while True:
+            waited = time.perf_counter() - start
+            if waited >= self.max_yield_seconds or not self.interactive_active():
+                for n in range(self.bulk_slots):
+                    handle = self._open(f"bulk-{n}.lock")
+                    try:
+                        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        handle.close()
+                        continue
+                    if waited > 1.0:
+                        logger.info(f"⏳ {request_class}: prozessübergreifender Slot nach {waited:.1f}s")
+                    return handle
+            if deadline is not None and time.perf_counter() >= deadline:
+                return None
+            time.sleep(self.poll_seconds)
+
+    def interactive_active(self) -> bool:
+        """True, solange irgendein Prozess Chat oder Query-Embeddings ausführt"""
+        with self._open("interactive.lock") as handle:
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return True
+            fcntl.flock(handle, fcntl.LOCK_UN)
+            return False
+
+    @staticmethod
+    def release(handle) -> None:
+        # Schließen gibt die flock-Sperre frei
+        handle.close()
+
+
+class OllamaScheduler:
+    """Verteilt Slots für Ollama-Aufrufe nach Priorität und Concurrency-Limits"""
+
+    def __init__(self, class_limits: Dict[str, int], max_concurrency: int, shared: Optional[SharedSlots] = None):
+        self.class_limits = dict(class_limits)
+        self.max_concurrency = max(1, max_concurrency)
+        self.shared = shared
+
+        self._cond = threading.Condition()
+        self._waiting: List[Ticket] = []
+        self._running: Dict[str, int] = {cls: 0 for cls in PRIORITIES}
+        self._seq = itertools.count()
+
+    def submit(self, request_class: str) -> Ticket:
+        """Reiht eine Anfrage ein und vergibt den Slot sofort, falls frei"""
+        if request_class not in PRIORITIES:
+            raise ValueError(f"Unbekannte Request-Klasse: {request_class}")
+
+        with self._cond:
+            ticket = Ticket(self, request_class, next(self._seq))
+            self._waiting.append(ticket)
+            self._waiting.sort(key=lambda t: (t.priority, t.seq))
+            self._dispatch()
+        return ticket
+
+    @contextmanager
+    def slot(self, request_class: str) -> Iterator[Ticket]:
+        """Blockiert bis ein Slot frei ist und gibt ihn danach wieder frei"""
+        ticket = self.submit(request_class)
+        try:
+            ticket.wait()
+            yield ticket
+        finally:
+            ticket.release()
+
+    def position(self, ticket: Ticket) -> int:
+        with self._cond:
+            if ticket.granted or ticket.released:
+                return 0
+            return self._waiting.index(ticket)
+
+    def stats(self) -> dict:
+        """Aktuelle Auslastung pro Request-Klasse"""
+        with self._cond:
+            return {
+                "running": dict(self._running),
+                "waiting": {
+                    cls: sum(1 for t in self._waiting if t.request_class == cls)
+                    for cls in PRIORITIES
+                },
+            }
+
+    def _dispatch(self) -> None:
+        """Vergibt freie Slots an die Wartenden (Lock muss gehalten werden)"""
+        granted_any = False
+        for ticket in list(self._waiting):
+            if sum(self._running.values()) >= self.max_concurrency:
+                break
+            if self._running[ticket.request_class] >= self.class_limits.get(ticket.request_class, 1):
+                continue
+            self._waiting.remove(ticket)
+            self._running[ticket.request_class] += 1
+            ticket.granted = True
+            granted_any = True
+
+            waited = time.perf_counter() - ticket.enqueued_at
+            if waited > 1.0:
+                logger.info(f"⏳ {ticket.request_class}: Slot nach {waited:.1f}s Wartezeit erhalten")
+        if granted_any:
+            self._cond.notify_all()
+
+    def _wait(self, ticket: Ticket, timeout: Optional[float]) -> bool:
+        start = time.perf_counter()
+        with self._cond:
+            if not self._cond.wait_for(lambda: ticket.granted, timeout=timeout):
+                return False
+        if self.shared is None or ticket.shared_handle is not None:
+            return True
+        # Prozessintern vergeben, jetzt den Slot über alle Prozesse holen
+        remaining = None if timeout is None else max(0.0, timeout - (time.perf_counter() - start))
+        ticket.shared_handle = self.shared.acquire(ticket.request_class, remaining)
+        return ticket.shared_handle is not None
+
+    def _release(self, ticket: Ticket) -> None:
+        with self._cond:
+            if ticket.released:
+                return
+            ticket.released = True
+            if ticket.shared_handle is not None:
+                self.shared.release(ticket.shared_handle)
+                ticket.shared_handle = None
+            if ticket.granted:
+                self._running[ticket.request_class] -= 1
+            else:
+                self._waiting.remove(ticket)
+            self._dispatch()
+
+
+class ScheduledEmbeddings(Embeddings):
+    """
+    Embedding-Wrapper, der jeden Aufruf über den Scheduler leitet.
+
+    `embed_documents` läuft als Bulk-Embedding, `embed_query` und
+    `embed_query_batch` (für gebündelte Queries) als interaktive Anfrage.
+    """
+
+    def __init__(self, embeddings: Embeddings, scheduler: "OllamaScheduler" = None):
+        self.embeddings = embeddings
+        self.scheduler = scheduler or get_scheduler()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with self.scheduler.slot(BULK_EMBEDDING):
+            return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        with self.scheduler.slot(QUERY_EMBEDDING):
+            return self.embeddings.embed_query(text)
+
+    def embed_query_batch(self, texts: List[str]) -> List[List[float]]:
+        with self.scheduler.slot(QUERY_EMBEDDING):
+            return self.embeddings.embed_documents(texts)
+
+
+_scheduler: Optional[OllamaScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def scaled_limits() -> dict:
+    """Concurrency-Limits pro Server, hochgerechnet auf die Server pro Rolle im Pool"""
+    chat_urls = set(Config.OLLAMA_CHAT_URLS or [Config.OLLAMA_BASE_URL])
+    embedding_urls = set(Config.OLLAMA_EMBEDDING_URLS or [Config.OLLAMA_BASE_URL])
+    return {
+        "class_limits": {
+            QUERY_EMBEDDING: Config.OLLAMA_QUERY_EMBEDDING_CONCURRENCY * len(embedding_urls),
+            CHAT: Config.OLLAMA_CHAT_CONCURRENCY * len(chat_urls),
+            BULK_EMBEDDING: Config.OLLAMA_BULK_EMBEDDING_CONCURRENCY * len(embedding_urls),
+        },
+        "max_concurrency": Config.OLLAMA_MAX_CONCURRENCY * len(chat_urls | embedding_urls),
+    }
+
+
+def get_scheduler() -> OllamaScheduler:
+    """Gibt den prozessweiten Scheduler zurück (wird beim ersten Aufruf erstellt)"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            limits = scaled_limits()
+            shared = None
+            if Config.OLLAMA_SLOT_DIR and fcntl is not None:
+                shared = SharedSlots(
+                    Config.OLLAMA_SLOT_DIR,
+                    bulk_slots=limits["class_limits"][BULK_EMBEDDING],
+                    max_yield_seconds=Config.OLLAMA_BULK_MAX_YIELD_SECONDS,
+                )
+            _scheduler = OllamaScheduler(shared=shared, **limits)
+        return _scheduler
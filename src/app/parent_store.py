@@ -0,0 +1,153 @@
+# app/parent_store.py
+"""
+Lokaler Key-Value-Speicher für Parent-Chunks (Small-to-Big-Retrieval).
+
+Eingebettet werden nur kleine Child-Chunks; die größeren Parent-Fenster, aus
+denen sie stammen, liegen hier in einer SQLite-Datei (ID -> Text und
+Metadaten). RAGPipeline sucht mit den Children und ersetzt die Treffer durch
+ihre Parents - präzise Vektorsuche, trotzdem zusammenhängender Kontext für
+das LLM.
+
+Parent-IDs sind deterministisch (voller Quellpfad, Inhalts-Hash,
+Parent-Größe/-Überlappung, Position): gleichnamige Dateien aus verschiedenen
+Ordnern kollidieren nicht, und ein Neuaufbau (andere Parent-Größe oder
+geänderter Inhalt) überschreibt keine Parents der aktiven Version. Beim
+erneuten Import einer Datei entfernt ingestion.remove_files() vorher ihre
+alten Parents und Children.
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+# SQLite erlaubt nur begrenzt viele Parameter pro Statement
+_ID_CHUNK = 500
+
+# Feste Namespace-UUID: gleicher Parent -> gleiche ID in allen Prozessen
+_ID_NAMESPACE = uuid.UUID("0b6f6c1e-8a43-4f0e-b7f5-5d2a9c3e41a7")
+
+
+def parent_id(source: str, text: str, chunk_id: int, chunk_size: int, chunk_overlap: int) -> str:
+    """ID aus vollem Quellpfad, Inhalts-Hash, Parent-Einstellungen und Position"""
+    digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+    return str(uuid.uuid5(_ID_NAMESPACE, f"{source}:{digest}:{chunk_size}:{chunk_overlap}:{chunk_id}"))
+
+
+class ParentStore:
+    """SQLite-Speicher für Parent-Chunks einer Collection"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS parents (
+                    id TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    metadata TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_parents_filename ON parents(filename);
+            """)
+
+    def add_documents(self, documents: Iterable[Document]) -> int:
+        """Speichert Parents (ID in metadata['parent_id'])"""
+        rows = [
+            (
+                doc.metadata["parent_id"],
+                doc.metadata.get("filename") or "Unbekannt",
+                doc.page_content,
+                json.dumps(doc.metadata, ensure_ascii=False),
+            )
+            for doc in documents
+        ]
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO parents VALUES (?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def get_many(self, ids: List[str]) -> Dict[str, Document]:
+        """Parents zu den IDs (fehlende IDs fehlen im Ergebnis)"""
+        found: Dict[str, Document] = {}
+        with self._lock:
+            for i in range(0, len(ids), _ID_CHUNK):
+                part = ids[i:i + _ID_CHUNK]
+                placeholders = ",".join("?" * len(part))
+                for row_id, text, metadata in self._conn.execute(
+                    f"SELECT id, text, metadata FROM parents WHERE id IN ({placeholders})", part
+                ):
+                    found[row_id] = Document(id=row_id, page_content=text, metadata=json.loads(metadata))
+        return found
+
+    def delete_file(self, filename: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM parents WHERE filename = ?", (filename,))
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM parents")
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM parents").fetchone()[0]
+
+
+def expand_to_parents(docs_with_scores: List[tuple], store: ParentStore, k: int) -> List[tuple]:
+    """
+    Ersetzt Child-Treffer durch ihre Parents (in Trefferreihenfolge, jeder
+    Parent nur einmal, mit dem Score seines besten Childs). Treffer ohne
+    Parent bleiben unverändert.
+
+    Returns:
+        Höchstens k (Document, Score)
+    """
+    ids = list(dict.fromkeys(
+        doc.metadata["parent_id"] for doc, _ in docs_with_scores if doc.metadata.get("parent_id")
+    ))
+    parents = store.get_many(ids) if ids else {}
+
+    results, positions = [], {}
+    for doc, score in docs_with_scores:
+        pid = doc.metadata.get("parent_id")
+        parent = parents.get(pid) if pid else None
+        if parent is None:
+            if len(results) < k:
+                results.append((doc, score))
+            continue
+        if pid in positions:
+            # Weiterer Treffer im selben Parent: nur mitzählen
+            results[positions[pid]][0].metadata["child_hits"] += 1
+            continue
+        if len(results) < k:
+            parent.metadata["child_hits"] = 1
+            positions[pid] = len(results)
+            results.append((parent, score))
+    return results
+
+
+_stores: Dict[str, ParentStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_parent_store(collection_name: str) -> ParentStore:
+    """Gibt den (gecachten) Parent-Speicher einer Collection zurück"""
+    from .config import Config
+
+    with _stores_lock:
+        if collection_name not in _stores:
+            path = Path(Config.PARENT_STORE_DIR) / f"{collection_name}.parents.sqlite3"
+            _stores[collection_name] = ParentStore(path)
+        return _stores[collection_name]
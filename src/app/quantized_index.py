@@ -0,0 +1,409 @@
+# app/quantized_index.py
+"""
+Quantisierter First-Pass-Index für große, häufig abgefragte Collections
+(z.B. den Katalog in metadata-collection).
+
+Alle Vektoren liegen als int8- oder Binär-Codes im Speicher und werden per
+vektorisiertem Skalarprodukt bzw. Hamming-Distanz komplett durchsucht. Nur
+die besten Kandidaten werden anschließend mit den Original-Vektoren aus
+ChromaDB exakt nachbewertet.
+
+    float32: 4 Byte pro Dimension
+    int8:    1 Byte pro Dimension   (4x kleiner)
+    binary:  1 Bit pro Dimension    (32x kleiner)
+"""
+import logging
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+MODES = ("int8", "binary")
+
+# Zeilen pro Block beim Scan (Block bleibt im CPU-Cache, begrenzt temporären Speicher)
+SCAN_BLOCK_ROWS = 4096
+
+# Abstand, in dem die Vektoranzahl des Index mit der Collection verglichen wird (Sekunden)
+COUNT_CHECK_SECONDS = 30.0
+
+
+class QuantizedIndex:
+    """In-Memory-Index aus quantisierten Vektor-Codes"""
+
+    def __init__(
+        self,
+        mode: str,
+        ids: Sequence[str],
+        codes: np.ndarray,
+        scale: Optional[np.ndarray] = None,
+        offset: Optional[np.ndarray] = None,
+        norms: Optional[np.ndarray] = None,
+        dim: int = 0,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"Unbekannter Modus: {mode} (erlaubt: {', '.join(MODES)})")
+        self.mode = mode
+        self.ids = np.asarray(ids, dtype=object)
+        self.codes = codes
+        self.scale = scale
+        self.offset = offset
+        self.norms = norms
+        self.dim = dim or (codes.shape[1] * 8 if mode == "binary" else codes.shape[1])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # ---- Aufbau ----
+
+    @classmethod
+    def build(cls, mode: str, ids: Sequence[str], vectors: np.ndarray) -> "QuantizedIndex":
+        """Quantisiert eine Matrix aus float-Vektoren (eine Zeile pro Vektor)"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("vectors muss eine (n, dim)-Matrix passend zu ids sein")
+
+        if mode == "binary":
+            # Vorzeichen-Bits relativ zum Mittelwert, 8 Dimensionen pro Byte
+            offset = vectors.mean(axis=0)
+            codes = np.packbits(vectors > offset, axis=1)
+            return cls(mode, ids, codes, offset=offset, dim=vectors.shape[1])
+
+        if mode == "int8":
+            # Pro Dimension symmetrisch um den Mittelwert auf [-127, 127] skalieren
+            offset = vectors.mean(axis=0)
+            centered = vectors - offset
+            scale = np.abs(centered).max(axis=0) / 127.0
+            scale[scale == 0] = 1.0
+            codes = np.clip(np.rint(centered / scale), -127, 127).astype(np.int8)
+            norms = np.einsum("ij,ij->i", vectors, vectors).astype(np.float32)
+            return cls(mode, ids, codes, scale=scale.astype(np.float32),
+                       offset=offset.astype(np.float32), norms=norms, dim=vectors.shape[1])
+
+        raise ValueError(f"Unbekannter Modus: {mode} (erlaubt: {', '.join(MODES)})")
+
+    # ---- Suche ----
+
+    def scan(self, query: Sequence[float], n_candidates: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Durchsucht alle Codes und liefert die besten Kandidaten
+
+        Returns:
+            (Zeilen-Indizes, approximative Distanzen), aufsteigend sortiert
+        """
+        query = np.asarray(query, dtype=np.float32)
+        n = len(self)
+        n_candidates = min(max(1, n_candidates), n)
+        if n == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        if self.mode == "binary":
+            q_code = np.packbits(query > self.offset)
+            distances = np.empty(n, dtype=np.float32)
+            for start in range(0, n, SCAN_BLOCK_ROWS):
+                block = self.codes[start:start + SCAN_BLOCK_ROWS]
+                distances[start:start + len(block)] = np.bitwise_count(
+                    np.bitwise_xor(block, q_code)
+                ).sum(axis=1, dtype=np.int32)
+        else:
+            # ||x - q||² = ||x||² - 2·x·q + ||q||², mit x ≈ codes·scale + offset
+            q_scaled = query * self.scale
+            q_offset = float(np.dot(self.offset, query))
+            dots = np.empty(n, dtype=np.float32)
+            buffer = np.empty((min(SCAN_BLOCK_ROWS, n), self.codes.shape[1]), dtype=np.float32)
+            for start in range(0, n, SCAN_BLOCK_ROWS):
+                block = self.codes[start:start + SCAN_BLOCK_ROWS]
+                converted = buffer[:len(block)]
+                np.copyto(converted, block)
+                np.matmul(converted, q_scaled, out=dots[start:start + len(block)])
+            distances = self.norms - 2 * (dots + q_offset) + float(np.dot(query, query))
+
+        if n_candidates < n:
+            top = np.argpartition(distances, n_candidates - 1)[:n_candidates]
+        else:
+            top = np.arange(n)
+        order = np.argsort(distances[top], kind="stable")
+        return top[order], distances[top[order]]
+
+    @property
+    def nbytes(self) -> int:
+        """Speicherbedarf der Codes inkl. Hilfsdaten und IDs (Zeiger-Array plus String-Objekte)"""
+        total = self.codes.nbytes + self.ids.nbytes + sum(sys.getsizeof(i) for i in self.ids)
+        for arr in (self.scale, self.offset, self.norms):
+            if arr is not None:
+                total += arr.nbytes
+        return total
+
+    # ---- Persistenz ----
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {
+            "mode": np.array(self.mode),
+            "dim": np.array(self.dim),
+            "ids": np.array(self.ids.tolist(), dtype=str),
+            "codes": self.codes,
+        }
+        for name in ("scale", "offset", "norms"):
+            value = getattr(self, name)
+            if value is not None:
+                arrays[name] = value
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+        logger.info(f"💾 Quantisierter Index gespeichert: {path} ({len(self)} Vektoren)")
+
+    @classmethod
+    def load(cls, path: Path) -> "QuantizedIndex":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                mode=str(data["mode"]),
+                ids=data["ids"].tolist(),
+                codes=data["codes"],
+                scale=data["scale"] if "scale" in data else None,
+                offset=data["offset"] if "offset" in data else None,
+                norms=data["norms"] if "norms" in data else None,
+                dim=int(data["dim"]),
+            )
+
+
+def exact_search(vectors: np.ndarray, query: Sequence[float], k: int) -> np.ndarray:
+    """Exakte L2-Suche (Referenz für den Recall-Report)"""
+    query = np.asarray(query, dtype=np.float32)
+    distances = np.einsum("ij,ij->i", vectors, vectors) - 2 * (vectors @ query)
+    k = min(k, len(vectors))
+    top = np.argpartition(distances, k - 1)[:k]
+    return top[np.argsort(distances[top])]
+
+
+def recall_report(
+    index: QuantizedIndex,
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int = 10,
+    rescore_factor: int = 10,
+) -> dict:
+    """
+    Misst Recall@k des quantisierten Index gegen exakte Suche
+
+    Ausgewertet wird sowohl der reine Scan als auch Scan + exaktes Rescoring
+    der Top-(k * rescore_factor) Kandidaten.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scan_hits = 0
+    rescored_hits = 0
+    scan_times = []
+
+    for query in queries:
+        expected = set(exact_search(vectors, query, k).tolist())
+
+        start = time.perf_counter()
+        candidates, _ = index.scan(query, k * rescore_factor)
+        scan_times.append(time.perf_counter() - start)
+
+        scan_hits += len(expected & set(candidates[:k].tolist()))
+
+        cand_vectors = vectors[candidates]
+        exact = np.einsum("ij,ij->i", cand_vectors, cand_vectors) - 2 * (cand_vectors @ query)
+        rescored = candidates[np.argsort(exact)[:k]]
+        rescored_hits += len(expected & set(rescored.tolist()))
+
+    total = max(1, len(queries) * min(k, len(vectors)))
+    scan_ms = np.array(scan_times) * 1000
+    return {
+        "mode": index.mode,
+        "vectors": len(index),
+        "dim": index.dim,
+        "k": k,
+        "rescore_factor": rescore_factor,
+        "queries": len(queries),
+        "recall_scan": scan_hits / total,
+        "recall_rescored": rescored_hits / total,
+        "scan_ms_p50": float(np.percentile(scan_ms, 50)) if len(scan_ms) else 0.0,
+        "scan_ms_p95": float(np.percentile(scan_ms, 95)) if len(scan_ms) else 0.0,
+        "index_bytes": index.nbytes,
+        "float32_bytes": len(index) * index.dim * 4,
+        "compression": (len(index) * index.dim * 4) / max(1, index.nbytes),
+    }
+
+
+def load_collection_vectors(collection, page_size: int = 5000) -> Tuple[List[str], np.ndarray]:
+    """Lädt alle IDs und Embeddings einer Chroma-Collection seitenweise"""
+    ids: List[str] = []
+    blocks: List[np.ndarray] = []
+    offset = 0
+    while True:
+        page = collection.get(include=["embeddings"], limit=page_size, offset=offset)
+        if not page["ids"]:
+            break
+        ids.extend(page["ids"])
+        blocks.append(np.asarray(page["embeddings"], dtype=np.float32))
+        offset += len(page["ids"])
+        logger.info(f"  📥 {offset} Vektoren geladen...")
+    if not blocks:
+        return [], np.empty((0, 0), dtype=np.float32)
+    return ids, np.vstack(blocks)
+
+
+def index_path(collection_name: str, index_dir: Path = None) -> Path:
+    """Index-Datei der aktiven Version einer Collection (siehe collection_aliases)"""
+    from .collection_aliases import resolve_collection
+    from .config import Config
+
+    return Path(index_dir or Config.QUANTIZED_INDEX_DIR) / f"{resolve_collection(collection_name)}.npz"
+
+
+class QuantizedVectorStore:
+    """
+    Vectorstore-Wrapper: Scan über den quantisierten Index, danach exaktes
+    Rescoring der Kandidaten mit den Original-Vektoren aus ChromaDB.
+
+    Der Index wird pro Anfrage über die aktive Version der Collection
+    bestimmt (index_path); nach einem Versionswechsel wird also nie mit den
+    Codes der alten Version gesucht. Gibt es für die aktive Version keinen
+    Index, passt seine Dimension nicht zum Query-Vektor oder seine
+    Vektoranzahl nicht zur Collection, wird exakt in ChromaDB gesucht.
+
+    Liefert dieselben (Document, L2-Distanz)-Tupel wie Chroma. Alle anderen
+    Attribute werden an den darunterliegenden Vectorstore weitergereicht.
+    """
+
+    def __init__(self, vectorstore, collection_name: str, rescore_factor: int = 10):
+        self.vectorstore = vectorstore
+        self.collection_name = collection_name
+        self.rescore_factor = max(1, rescore_factor)
+
+    def __getattr__(self, name):
+        return getattr(self.vectorstore, name)
+
+    @property
+    def index(self) -> Optional[QuantizedIndex]:
+        """Index der aktiven Version (None, wenn keiner gebaut ist)"""
+        return load_quantized_index(self.collection_name, self.vectorstore)
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs) -> List[Tuple[Document, float]]:
+        if kwargs.get("filter"):
+            # Filter kennt nur ChromaDB - dort exakt suchen
+            return self.vectorstore.similarity_search_with_score(query, k=k, **kwargs)
+
+        return self.similarity_search_by_vector_with_relevance_scores(
+            self.vectorstore.embeddings.embed_query(query), k=k
+        )
+
+    def similarity_search_by_vector_with_relevance_scores(
+        self, embedding: List[float], k: int = 4, **kwargs
+    ) -> List[Tuple[Document, float]]:
+        index = None if kwargs.get("filter") else self.index
+        if index is None or index.dim != len(embedding):
+            # Kein Index für die aktive Version bzw. anderes Embedding-Modell
+            return self.vectorstore.similarity_search_by_vector_with_relevance_scores(embedding, k=k, **kwargs)
+
+        query_vector = np.asarray(embedding, dtype=np.float32)
+        candidates, _ = index.scan(query_vector, k * self.rescore_factor)
+        candidate_ids = [str(i) for i in index.ids[candidates]]
+        if not candidate_ids:
+            return []
+
+        results = self.vectorstore._collection.get(
+            ids=candidate_ids, include=["embeddings", "documents", "metadatas"]
+        )
+        if not results["ids"]:
+            # Index passt nicht (mehr) zur Collection
+            return self.vectorstore.similarity_search_by_vector_with_relevance_scores(embedding, k=k)
+
+        vectors = np.asarray(results["embeddings"], dtype=np.float32)
+        diff = vectors - query_vector
+        distances = np.einsum("ij,ij->i", diff, diff)
+        order = np.argsort(distances)[:k]
+
+        return [
+            (
+                Document(
+                    page_content=results["documents"][i] or "",
+                    metadata=results["metadatas"][i] or {},
+                    id=results["ids"][i],
+                ),
+                float(distances[i]),
+            )
+            for i in order
+        ]
+
+
+# Pfad -> {"mtime": ..., "index": ..., "checked_at": ..., "current": ...}
+_loaded_indexes: Dict[str, dict] = {}
+_missing_indexes: set = set()
+_loaded_lock = threading.Lock()
+
+
+def load_quantized_index(collection_name: str, vectorstore=None) -> Optional[QuantizedIndex]:
+    """
+    Lädt den Index der aktiven Version einer Collection
+
+    Gecacht pro (Datei, Änderungszeit): ein neu gebauter Index wird beim
+    nächsten Zugriff automatisch nachgeladen. Mit vectorstore wird
+    höchstens alle COUNT_CHECK_SECONDS geprüft, ob die Vektoranzahl noch
+    zur Collection passt.
+
+    Returns:
+        Den Index oder None, wenn für die aktive Version keiner gebaut ist
+        oder er nicht (mehr) zur Collection passt
+    """
+    path = index_path(collection_name)
+    key = str(path)
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        if key not in _missing_indexes:
+            _missing_indexes.add(key)
+            logger.warning(f"⚠️  Kein quantisierter Index für {collection_name} ({path}), suche exakt")
+        return None
+
+    entry = _loaded_indexes.get(key)
+    if entry is None or entry["mtime"] != mtime:
+        with _loaded_lock:
+            entry = _loaded_indexes.get(key)
+            if entry is None or entry["mtime"] != mtime:
+                index = QuantizedIndex.load(path)
+                entry = {"mtime": mtime, "index": index, "checked_at": 0.0, "current": True}
+                _loaded_indexes[key] = entry
+                _missing_indexes.discard(key)
+                logger.info(
+                    f"✅ Quantisierter Index geladen: {path.stem} "
+                    f"({len(index)} Vektoren, {index.mode}, {index.nbytes / 1e6:.1f} MB)"
+                )
+
+    index = entry["index"]
+    if vectorstore is not None and time.monotonic() - entry["checked_at"] >= COUNT_CHECK_SECONDS:
+        entry["checked_at"] = time.monotonic()
+        try:
+            count = vectorstore._collection.count()
+        except Exception:
+            count = None
+        current = count is None or count == len(index)
+        if not current and entry["current"]:
+            logger.warning(
+                f"⚠️  Index veraltet: {len(index)} Vektoren im Index, "
+                f"{count} in der Collection - suche exakt, bitte neu bauen"
+            )
+        entry["current"] = current
+    return index if entry["current"] else None
+
+
+def wrap_with_quantized_index(vectorstore, collection_name: str):
+    """
+    Nutzt den quantisierten Index, falls er für die Collection aktiviert ist.
+    Welche Index-Datei gilt, wird pro Anfrage anhand der aktiven Version
+    entschieden; ohne passenden Index wird exakt gesucht.
+    """
+    from .config import Config
+
+    if collection_name not in Config.QUANTIZED_INDEX_COLLECTIONS:
+        return vectorstore
+
+    load_quantized_index(collection_name, vectorstore)
+    return QuantizedVectorStore(vectorstore, collection_name, rescore_factor=Config.QUANTIZED_RESCORE_FACTOR)
@@ -3,17 +3,28 @@
 RAG Pipeline: Verbindet Retrieval (ChromaDB) mit Generation (Ollama LLM)
 """
 import logging
-from typing import List, Iterator
+import threading
+import time
+from typing import List, Iterator, Optional
 from langchain_core.documents import Document
-from langchain_ollama import ChatOllama
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnablePassthrough
 from .config import Config
+from .ollama_scheduler import CHAT, get_scheduler
+from .metrics import PROMPT_TOKEN_BUCKETS, TOKENS_PER_SECOND_BUCKETS, get_metrics
+from .chat_memory import ChatMemory, estimate_tokens, format_messages
+from .quantized_index import wrap_with_quantized_index
+from .catalog_index import extract_catalog_fields, get_catalog_index, parse_fielded_query
+from .summary_index import get_summary_index
+from .parent_store import expand_to_parents, get_parent_store
 
 logger = logging.getLogger(__name__)
 
 
+def _text_of(message) -> str:
+    """Text einer LLM-Antwort (wie StrOutputParser, ohne dessen Import)"""
+    from langchain_core.output_parsers import StrOutputParser
+    return StrOutputParser().invoke(message)
+
+
 class RAGPipeline:
     """RAG Pipeline für Question-Answering über Dokumente"""
     
@@ -72,17 +83,69 @@ Kontext aus den Volltexten:
 {context}"""
     }
     
+    # Prompt für die laufende Zusammenfassung älterer Turns
+    SUMMARY_PROMPT = """Fasse das bisherige Gespräch zwischen Nutzer und Assistent knapp zusammen.
+Behalte genannte Bücher, Autoren, Themen und offene Fragen. Antworte nur mit der Zusammenfassung.
+
+Bisherige Zusammenfassung:
+{summary}
+
+Neue Nachrichten:
+{messages}"""
+    
+    # Prompt zum Umformulieren von Folgefragen in eigenständige Suchanfragen
+    CONDENSE_PROMPT = """Formuliere die letzte Frage des Nutzers so um, dass sie ohne den Gesprächsverlauf verständlich ist.
+Antworte nur mit der umformulierten Frage, in der Sprache der Frage.
+
+Zusammenfassung des Gesprächs:
+{summary}
+
+Letzte Nachrichten:
+{messages}
+
+Frage: {question}"""
+    
     def __init__(self, vectorstore, collection_name: str = "documents-collection"):
-        self.vectorstore = vectorstore
+        # Optional: quantisierter First-Pass-Index (z.B. für den Katalog)
+        self.vectorstore = wrap_with_quantized_index(vectorstore, collection_name)
         self.collection_name = collection_name
+        self.scheduler = get_scheduler()
+        # Zweistufig: erst Top-Dokumente aus dem Dokument-Index, dann Chunks darin
+        self.two_stage = collection_name in Config.TWO_STAGE_COLLECTIONS
+        # Small-to-Big: Suche über kleine Child-Chunks, Kontext aus den Parents
+        self.parent_store = (
+            get_parent_store(collection_name)
+            if collection_name in Config.PARENT_CHILD_COLLECTIONS else None
+        )
+        
+        # Erst hier importieren: langchain_ollama und die Prompt-Klassen
+        # (ziehen langsmith nach) kosten zusammen ~1 s Importzeit
+        from langchain_ollama import ChatOllama
+        from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+        
+        from .ollama_pool import PooledChatModel, get_ollama_pool, pool_enabled
+        
+        if pool_enabled():
+            # Mehrere Server: pro Anfrage der schnellste erreichbare Chat-Server
+            def chat_model(**kwargs):
+                return PooledChatModel(get_ollama_pool(), **kwargs)
+        else:
+            def chat_model(**kwargs):
+                return ChatOllama(base_url=Config.OLLAMA_BASE_URL, **kwargs)
         
         # Ollama LLM initialisieren
-        self.llm = ChatOllama(
-            base_url=Config.OLLAMA_BASE_URL,
+        self.llm = chat_model(
             model=Config.OLLAMA_MODEL,
             temperature=0.7,
         )
         
+        # Deterministisches LLM für Zusammenfassung und Umformulierung
+        self.aux_llm = chat_model(
+            model=Config.OLLAMA_MODEL,
+            temperature=0,
+            num_predict=Config.CHAT_SUMMARY_MAX_TOKENS,
+        )
+        
         # Wähle den passenden System-Prompt basierend auf Collection
         system_prompt = self.SYSTEM_PROMPTS.get(
             collection_name,
@@ -92,11 +155,23 @@ Kontext aus den Volltexten:
         # RAG Prompt Template
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", system_prompt),
+            MessagesPlaceholder("history", optional=True),
             ("human", "{question}")
         ])
         
         logger.info(f"✅ RAG Pipeline initialisiert (LLM: {Config.OLLAMA_MODEL}, Collection: {collection_name})")
     
+    def _format_sources(self, docs_with_scores: List[tuple]) -> List[dict]:
+        """Bereitet Treffer als Quellen für UI/API auf"""
+        return [
+            {
+                "content": doc.page_content,
+                "metadata": doc.metadata,
+                "score": score
+            }
+            for doc, score in docs_with_scores
+        ]
+    
     def format_docs(self, docs: List[Document]) -> str:
         """Formatiert Dokumente für den Kontext"""
         formatted = []
@@ -105,76 +180,406 @@ Kontext aus den Volltexten:
             formatted.append(f"[Quelle {i}: {source}]\n{doc.page_content}\n")
         return "\n---\n".join(formatted)
     
-    def query(self, question: str, k: int = 3) -> dict:
+    def _run_aux(self, prompt: str) -> str:
+        """Führt einen kurzen Hilfs-Aufruf (Zusammenfassung/Umformulierung) aus"""
+        with self.scheduler.slot(CHAT):
+            return _text_of(self.aux_llm.invoke(prompt)).strip()
+    
+    def prepare_conversation(
+        self,
+        question: str,
+        history: Optional[List[dict]] = None,
+        memory: Optional[ChatMemory] = None,
+        condense: bool = True
+    ) -> tuple:
+        """
+        Bereitet den Gesprächsverlauf für eine Frage vor
+        
+        Args:
+            question: Aktuelle Frage
+            history: Bisherige Nachrichten ({'role', 'content'}) ohne die aktuelle Frage
+            memory: Zusammenfassungs-Zustand des Gesprächs (wird aktualisiert)
+            condense: Folgefrage für das Retrieval umformulieren
+            
+        Returns:
+            (eigenständige Suchanfrage, Nachrichten für den Prompt)
+        """
+        if not history:
+            return question, []
+        
+        memory = memory or ChatMemory()
+        
+        def summarize(previous: str, messages: List[dict]) -> str:
+            try:
+                summary = self._run_aux(self.SUMMARY_PROMPT.format(
+                    summary=previous or "(keine)",
+                    messages=format_messages(messages)
+                ))
+                return memory.truncate_summary(summary)
+            except Exception as e:
+                # Ohne Zusammenfassung weiter - die Nachrichten fallen dann weg
+                logger.warning(f"⚠️  Zusammenfassung fehlgeschlagen: {e}")
+                return previous
+        
+        summary, recent = memory.update(history, summarize)
+        
+        prompt_history = []
+        if summary:
+            prompt_history.append(("system", f"Zusammenfassung des bisherigen Gesprächs:\n{summary}"))
+        for message in recent:
+            role = "human" if message["role"] == "user" else "ai"
+            prompt_history.append((role, message["content"]))
+        
+        retrieval_query = question
+        if condense and Config.CHAT_CONDENSE_QUESTION:
+            try:
+                condensed = self._run_aux(self.CONDENSE_PROMPT.format(
+                    summary=summary or "(keine)",
+                    messages=format_messages(recent),
+                    question=question
+                ))
+                if condensed:
+                    retrieval_query = condensed
+                    logger.info(f"🔎 Suchanfrage: {retrieval_query}")
+            except Exception as e:
+                logger.warning(f"⚠️  Umformulierung fehlgeschlagen: {e}")
+        
+        return retrieval_query, prompt_history
+    
+    def catalog_lookup(self, question: str, k: int = 3) -> Optional[List[tuple]]:
+        """
+        Schneller Pfad für Katalog-Nachschlagefragen (Titel/Autor/Jahr/ISBN)
+        
+        Returns:
+            Liste von (Document, Score) bei Treffern, sonst None
+        """
+        if self.collection_name not in Config.CATALOG_INDEX_COLLECTIONS:
+            return None
+        
+        fields = parse_fielded_query(question)
+        if not fields:
+            return None
+        
+        try:
+            hits = get_catalog_index(self.collection_name).lookup(fields, limit=k)
+        except Exception as e:
+            logger.warning(f"⚠️  Katalog-Index nicht verfügbar: {e}")
+            return None
+        
+        if not hits:
+            return None
+        
+        logger.info(f"📇 Katalog-Treffer für {fields}: {len(hits)} ({hits[0]['match']})")
+        return [
+            (Document(page_content=hit["content"], metadata=hit["metadata"], id=hit["id"]), hit["score"])
+            for hit in hits
+        ]
+    
+    def retrieve(self, question: str, k: int = 3) -> List[tuple]:
+        """
+        Nur Retrieval (ohne Verlauf und Generierung), z.B. für Evaluation
+        
+        Returns:
+            Liste von (Document, Score) - Katalog-Treffer oder Vektorsuche
+        """
+        catalog_hits = self.catalog_lookup(question, k=k)
+        if catalog_hits:
+            return catalog_hits
+        return self._vector_search(question, k, {})
+    
+    def _vector_search(
+        self, query: str, k: int, timings: dict, query_vector: Optional[List[float]] = None
+    ) -> List[tuple]:
+        """
+        Vektorsuche; bei Small-to-Big werden mehr Children gesucht und die
+        Treffer durch ihre (deduplizierten) Parents ersetzt
+        """
+        if self.parent_store is None:
+            return self._search_chunks(query, k, timings, query_vector)
+        
+        children = self._search_chunks(query, k * Config.SMALL_TO_BIG_CHILD_FACTOR, timings, query_vector)
+        start = time.perf_counter()
+        try:
+            return expand_to_parents(children, self.parent_store, k)
+        except Exception as e:
+            logger.warning(f"⚠️  Parent-Speicher nicht verfügbar, nutze Children: {e}")
+            return children[:k]
+        finally:
+            timings["parent_lookup_seconds"] = time.perf_counter() - start
+    
+    def _search_chunks(
+        self, query: str, k: int, timings: dict, query_vector: Optional[List[float]] = None
+    ) -> List[tuple]:
+        """
+        Vektorsuche mit getrennter Messung von Query-Embedding und
+        ChromaDB-Suche (trägt beide Zeiten in timings ein). Ein bereits
+        berechneter query_vector (z.B. aus einem Batch) spart das Embedding.
+        """
+        embeddings = getattr(self.vectorstore, "embeddings", None)
+        search_by_vector = getattr(self.vectorstore, "similarity_search_by_vector_with_relevance_scores", None)
+        
+        if embeddings is None or search_by_vector is None:
+            # Vectorstore ohne getrennte Schritte: alles zählt als Suche
+            start = time.perf_counter()
+            results = self.vectorstore.similarity_search_with_score(query, k=k)
+            timings["vector_search_seconds"] = time.perf_counter() - start
+            return results
+        
+        if query_vector is None:
+            start = time.perf_counter()
+            query_vector = embeddings.embed_query(query)
+            timings["query_embedding_seconds"] = time.perf_counter() - start
+        
+        search_kwargs = {}
+        if self.two_stage:
+            filenames = self._select_documents(query_vector, timings)
+            if filenames:
+                search_kwargs["filter"] = {"filename": {"$in": filenames}}
+        
+        start = time.perf_counter()
+        results = search_by_vector(query_vector, k=k, **search_kwargs)
+        timings["vector_search_seconds"] = time.perf_counter() - start
+        return results
+    
+    def _select_documents(self, query_vector: List[float], timings: dict) -> Optional[List[str]]:
+        """
+        Erste Stufe: die Top-Dokumente aus dem Dokument-Index
+        
+        Returns:
+            Dateinamen oder None (kein Index - dann flache Suche über alle Chunks)
+        """
+        start = time.perf_counter()
+        try:
+            summary_index = get_summary_index(self.vectorstore)
+            hits = summary_index.search(query_vector, n=Config.TWO_STAGE_TOP_DOCUMENTS) if summary_index else []
+        except Exception as e:
+            logger.warning(f"⚠️  Dokument-Index nicht verfügbar: {e}")
+            hits = []
+        finally:
+            timings["document_search_seconds"] = time.perf_counter() - start
+        
+        if not hits:
+            return None
+        logger.info(f"📑 Top-Dokumente: {', '.join(filename for filename, _ in hits)}")
+        return [filename for filename, _ in hits]
+    
+    def _build_messages(self, docs: List[Document], prompt_history: list, question: str, timings: dict) -> list:
+        """Baut den Prompt (System + Kontext, Verlauf, Frage) und misst Dauer und Größe"""
+        start = time.perf_counter()
+        messages = self.prompt.format_messages(
+            context=self.format_docs(docs),
+            history=prompt_history,
+            question=question
+        )
+        timings["prompt_assembly_seconds"] = time.perf_counter() - start
+        
+        timings["prompt_chars"] = sum(len(m.content) for m in messages)
+        timings["prompt_tokens"] = sum(estimate_tokens(m.content) for m in messages)
+        return messages
+    
+    def _record_timings(self, timings: dict) -> dict:
+        """
+        Trägt die Stufen-Zeiten in die Histogramme ein und gibt sie (plus
+        abgeleitete Werte) für das 'metrics'-Event zurück
+        """
+        timings["retrieval_seconds"] = (
+            timings.get("catalog_lookup_seconds", 0.0)
+            + timings.get("query_embedding_seconds", 0.0)
+            + timings.get("document_search_seconds", 0.0)
+            + timings.get("vector_search_seconds", 0.0)
+            + timings.get("parent_lookup_seconds", 0.0)
+        )
+        metrics = get_metrics()
+        for name, value in timings.items():
+            if name.endswith("_seconds"):
+                metrics.observe(name, value)
+        if "tokens_per_second" in timings:
+            metrics.observe("tokens_per_second", timings["tokens_per_second"], TOKENS_PER_SECOND_BUCKETS)
+        if "prompt_tokens" in timings:
+            metrics.observe("prompt_tokens", timings["prompt_tokens"], PROMPT_TOKEN_BUCKETS)
+        return timings
+    
+    def format_catalog_answer(self, docs_with_scores: List[tuple]) -> str:
+        """Direkte Antwort aus Katalog-Treffern (ohne LLM)"""
+        lines = ["Das habe ich im Katalog gefunden:", ""]
+        for doc, score in docs_with_scores:
+            fields = extract_catalog_fields(doc.page_content, doc.metadata)
+            entry = f"**{fields.get('title', 'Ohne Titel')}**"
+            if fields.get("author"):
+                entry += f" von {fields['author']}"
+            if fields.get("year"):
+                entry += f" ({fields['year']})"
+            if fields.get("isbn"):
+                entry += f", ISBN {fields['isbn']}"
+            lines.append(f"- {entry}")
+        return "\n".join(lines)
+    
+    def _record_generation(self, token_count: int, cancelled: bool) -> None:
+        """
+        Zählt generierte Tokens. Bei Abbruch wird die Ersparnis anhand der
+        durchschnittlichen Länge vollständiger Antworten geschätzt.
+        """
+        metrics = get_metrics()
+        if not cancelled:
+            metrics.inc("generations_completed_total")
+            metrics.inc("generation_tokens_total", token_count)
+            return
+        
+        metrics.inc("generations_cancelled_total")
+        metrics.inc("cancelled_generation_tokens_total", token_count)
+        
+        completed = metrics.get("generations_completed_total")
+        if completed:
+            expected = metrics.get("generation_tokens_total") / completed
+        else:
+            expected = Config.CANCEL_EXPECTED_ANSWER_TOKENS
+        metrics.inc("cancellation_saved_tokens_total", max(0.0, expected - token_count))
+    
+    def query(
+        self,
+        question: str,
+        k: int = 3,
+        history: Optional[List[dict]] = None,
+        memory: Optional[ChatMemory] = None,
+        query_vector: Optional[List[float]] = None
+    ) -> dict:
         """
         Beantwortet eine Frage mit RAG (ohne Streaming)
         
         Args:
             question: Die Frage
             k: Anzahl relevanter Dokumente
+            history: Bisheriger Gesprächsverlauf (optional)
+            memory: Zusammenfassungs-Zustand des Gesprächs (optional)
+            query_vector: Vorab berechnetes Embedding der Frage (optional,
+                wird nur genutzt, wenn die Suchanfrage die Frage selbst ist)
             
         Returns:
-            dict mit 'answer', 'sources', 'source_documents'
+            dict mit 'answer', 'sources', 'source_documents' und 'metrics'
+            (Stufen-Zeiten in Sekunden, Prompt-Größe, Tokens/s)
         """
         try:
+            # 0. Katalog-Nachschlagefrage? Dann ohne Embedding-Round-Trip
+            timings = {}
+            start = time.perf_counter()
+            catalog_hits = self.catalog_lookup(question, k=k)
+            timings["catalog_lookup_seconds"] = time.perf_counter() - start
+            
+            if catalog_hits and Config.CATALOG_LOOKUP_MODE == "answer":
+                return {
+                    "answer": self.format_catalog_answer(catalog_hits),
+                    "sources": self._format_sources(catalog_hits),
+                    "source_documents": [doc for doc, score in catalog_hits],
+                    "metrics": self._record_timings(timings)
+                }
+            
+            retrieval_query, prompt_history = self.prepare_conversation(
+                question, history, memory, condense=not catalog_hits
+            )
+            
             # 1. Retrieval: Hole relevante Dokumente
-            docs_with_scores = self.vectorstore.similarity_search_with_score(question, k=k)
+            if catalog_hits:
+                docs_with_scores = catalog_hits
+            else:
+                if retrieval_query != question:
+                    query_vector = None
+                docs_with_scores = self._vector_search(retrieval_query, k, timings, query_vector)
             
             if not docs_with_scores:
                 return {
                     "answer": "Ich konnte keine relevanten Informationen in den Dokumenten finden.",
                     "sources": [],
-                    "source_documents": []
+                    "source_documents": [],
+                    "metrics": self._record_timings(timings)
                 }
             
             docs = [doc for doc, score in docs_with_scores]
             
             # 2. Generation: Erstelle Antwort mit LLM
-            context = self.format_docs(docs)
+            messages = self._build_messages(docs, prompt_history, question, timings)
             
-            chain = (
-                {"context": lambda x: context, "question": RunnablePassthrough()}
-                | self.prompt
-                | self.llm
-                | StrOutputParser()
-            )
+            start = time.perf_counter()
+            with self.scheduler.slot(CHAT):
+                timings["queue_wait_seconds"] = time.perf_counter() - start
+                start = time.perf_counter()
+                response = self.llm.invoke(messages)
+                timings["generation_seconds"] = time.perf_counter() - start
+            answer = _text_of(response)
             
-            answer = chain.invoke(question)
+            usage = getattr(response, "usage_metadata", None) or {}
+            if usage.get("output_tokens") and timings["generation_seconds"] > 0:
+                timings["completion_tokens"] = usage["output_tokens"]
+                timings["tokens_per_second"] = usage["output_tokens"] / timings["generation_seconds"]
             
             # 3. Bereite Quellen auf
-            sources = [
-                {
-                    "content": doc.page_content,
-                    "metadata": doc.metadata,
-                    "score": score
-                }
-                for doc, score in docs_with_scores
-            ]
+            sources = self._format_sources(docs_with_scores)
             
             return {
                 "answer": answer,
                 "sources": sources,
-                "source_documents": docs
+                "source_documents": docs,
+                "metrics": self._record_timings(timings)
             }
             
         except Exception as e:
             logger.error(f"Fehler in RAG Pipeline: {e}", exc_info=True)
             raise
     
-    def query_stream(self, question: str, k: int = 3) -> Iterator[dict]:
+    def query_stream(
+        self,
+        question: str,
+        k: int = 3,
+        cancel_event: Optional[threading.Event] = None,
+        history: Optional[List[dict]] = None,
+        memory: Optional[ChatMemory] = None
+    ) -> Iterator[dict]:
         """
         Beantwortet eine Frage mit RAG und streamt die Antwort
         
         Args:
             question: Die Frage
             k: Anzahl relevanter Dokumente
+            cancel_event: Wird es gesetzt, bricht die Generierung beim nächsten
+                Token ab und der HTTP-Stream zu Ollama wird geschlossen
+            history: Bisheriger Gesprächsverlauf (optional)
+            memory: Zusammenfassungs-Zustand des Gesprächs (optional)
             
         Yields:
-            dict mit 'type' ('sources', 'token', 'done') und entsprechenden Daten
+            dict mit 'type' ('sources', 'queue', 'token', 'metrics', 'done',
+            'cancelled') und entsprechenden Daten. 'queue' kommt nur, solange
+            der Ollama-Server ausgelastet ist, und enthält die aktuelle
+            Warteschlangen-'position'. 'metrics' kommt direkt vor 'done' mit
+            Retrieval-Zeit, Time-to-First-Token, Tokens/s und Prompt-Größe.
         """
         try:
+            # 0. Katalog-Nachschlagefrage? Dann ohne Embedding-Round-Trip
+            timings = {}
+            start = time.perf_counter()
+            catalog_hits = self.catalog_lookup(question, k=k)
+            timings["catalog_lookup_seconds"] = time.perf_counter() - start
+            
+            if catalog_hits and Config.CATALOG_LOOKUP_MODE == "answer":
+                yield {
+                    "type": "sources",
+                    "sources": self._format_sources(catalog_hits)
+                }
+                yield {
+                    "type": "token",
+                    "token": self.format_catalog_answer(catalog_hits)
+                }
+                yield {"type": "metrics", "metrics": self._record_timings(timings)}
+                yield {"type": "done"}
+                return
+            
+            retrieval_query, prompt_history = self.prepare_conversation(
+                question, history, memory, condense=not catalog_hits
+            )
+            
             # 1. Retrieval: Hole relevante Dokumente
-            docs_with_scores = self.vectorstore.similarity_search_with_score(question, k=k)
+            if catalog_hits:
+                docs_with_scores = catalog_hits
+            else:
+                docs_with_scores = self._vector_search(retrieval_query, k, timings)
             
             if not docs_with_scores:
                 yield {
@@ -185,18 +590,12 @@ Kontext aus den Volltexten:
                     "type": "token",
                     "token": "Ich konnte keine relevanten Informationen in den Dokumenten finden."
                 }
+                yield {"type": "metrics", "metrics": self._record_timings(timings)}
                 yield {"type": "done"}
                 return
             
             # Sende zuerst die Quellen
-            sources = [
-                {
-                    "content": doc.page_content,
-                    "metadata": doc.metadata,
-                    "score": score
-                }
-                for doc, score in docs_with_scores
-            ]
+            sources = self._format_sources(docs_with_scores)
             
             yield {
                 "type": "sources",
@@ -205,22 +604,65 @@ Kontext aus den Volltexten:
             
             # 2. Generation: Streame Antwort vom LLM
             docs = [doc for doc, score in docs_with_scores]
-            context = self.format_docs(docs)
-            
-            chain = (
-                {"context": lambda x: context, "question": RunnablePassthrough()}
-                | self.prompt
-                | self.llm
-            )
+            messages = self._build_messages(docs, prompt_history, question, timings)
             
-            # Streame die Tokens
-            for chunk in chain.stream(question):
-                if hasattr(chunk, 'content'):
+            # Warte auf einen Chat-Slot und melde die Position in der Warteschlange
+            queue_start = time.perf_counter()
+            ticket = self.scheduler.submit(CHAT)
+            token_count = 0
+            cancelled = False
+            try:
+                while not ticket.wait(timeout=Config.SCHEDULER_QUEUE_POLL_SECONDS):
+                    if cancel_event is not None and cancel_event.is_set():
+                        cancelled = True
+                        break
                     yield {
-                        "type": "token",
-                        "token": chunk.content
+                        "type": "queue",
+                        "position": ticket.position
                     }
+                
+                # Streame die Tokens
+                if not cancelled:
+                    generation_start = time.perf_counter()
+                    timings["queue_wait_seconds"] = generation_start - queue_start
+                    first_token_at = None
+                    stream = self.llm.stream(messages)
+                    try:
+                        for chunk in stream:
+                            if cancel_event is not None and cancel_event.is_set():
+                                cancelled = True
+                                break
+                            if hasattr(chunk, 'content'):
+                                if first_token_at is None:
+                                    first_token_at = time.perf_counter()
+                                    timings["time_to_first_token_seconds"] = first_token_at - generation_start
+                                token_count += 1
+                                yield {
+                                    "type": "token",
+                                    "token": chunk.content
+                                }
+                    finally:
+                        # Schließt den HTTP-Stream zu Ollama (auch bei Abbruch)
+                        stream.close()
+                        generation_end = time.perf_counter()
+                        timings["generation_seconds"] = generation_end - generation_start
+                        timings["completion_tokens"] = token_count
+                        if token_count > 1 and generation_end > first_token_at:
+                            timings["tokens_per_second"] = (token_count - 1) / (generation_end - first_token_at)
+            except GeneratorExit:
+                # Konsument hat den Stream geschlossen (Rerun, Tab geschlossen)
+                cancelled = True
+                raise
+            finally:
+                ticket.release()
+                self._record_generation(token_count, cancelled)
+            
+            if cancelled:
+                logger.info(f"🛑 Generierung nach {token_count} Tokens abgebrochen")
+                yield {"type": "cancelled", "tokens": token_count}
+                return
             
+            yield {"type": "metrics", "metrics": self._record_timings(timings)}
             yield {"type": "done"}
             
         except Exception as e:
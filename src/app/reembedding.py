@@ -0,0 +1,356 @@
+# app/reembedding.py
+"""
+Neuaufbau einer Collection im Hintergrund (anderes Embedding-Modell oder
+andere Chunk-Einstellungen), ohne die laufende App zu unterbrechen.
+
+Ablauf:
+    1. Shadow-Collection "<name>__v<N>" anlegen und befüllen - entweder aus
+       den Texten der aktiven Version (gleiche IDs, nur neu eingebettet)
+       oder neu aus einem Dokumenten-Ordner (neues Chunking).
+       Embeddings laufen als Bulk-Anfragen über den Ollama-Scheduler
+       (Chat hat Vorrang), zusätzlich wird zwischen Batches pausiert.
+    2. Beim Neu-Einbetten aus der Collection: Nachzügler abgleichen, die
+       während des Aufbaus in der aktiven Version dazugekommen, geändert
+       (gleiche ID, anderer Inhalt) oder gelöscht worden sind. Der Abgleich
+       läuft über einen Hash aus Text und Metadaten und wird wiederholt,
+       bis beide Seiten übereinstimmen (höchstens CATCHUP_ROUNDS Runden).
+    3. Prüfen (keine fehlgeschlagenen Batches, Anzahl stimmt), Inventar und
+       Katalog-Index der neuen Version aufbauen und erst dann im
+       Alias-Register atomar umschalten. Eine unvollständige Version wird
+       nie aktiv.
+
+rollback() schaltet auf die vorherige Version zurück. Die Sidecars liegen
+pro physischer Version; sind sie für die Zielversion schon aufgebaut, wird
+beim Zurückschalten nichts neu gescannt.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from langchain_core.documents import Document
+
+from .collection_aliases import AliasRegistry, get_alias_registry, version_name
+from .config import Config
+from .ingestion import rebuild_stale_sidecars, store_chunks_in_batches
+
+logger = logging.getLogger(__name__)
+
+# Abgleichrunden nach dem Aufbau, solange die aktive Version sich noch ändert
+CATCHUP_ROUNDS = 3
+
+
+def iter_collection_documents(collection, page_size: int = 500, ids: Optional[List[str]] = None):
+    """Liest Texte und Metadaten einer Collection seitenweise als Documents (mit ID)"""
+    if ids is not None:
+        for i in range(0, len(ids), page_size):
+            page = collection.get(ids=ids[i:i + page_size], include=["documents", "metadatas"])
+            yield _page_documents(page)
+        return
+
+    offset = 0
+    while True:
+        page = collection.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+        if not page["ids"]:
+            break
+        yield _page_documents(page)
+        offset += len(page["ids"])
+
+
+def _page_documents(page: dict) -> List[Document]:
+    return [
+        Document(id=doc_id, page_content=text or "", metadata=metadata or {})
+        for doc_id, text, metadata in zip(page["ids"], page["documents"], page["metadatas"])
+    ]
+
+
+def content_hash(text: Optional[str], metadata: Optional[dict]) -> str:
+    """Hash aus Text und Metadaten eines Eintrags (unabhängig vom Embedding)"""
+    payload = json.dumps([text or "", metadata or {}], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def collection_fingerprints(collection, page_size: int = 1000) -> Dict[str, str]:
+    """Alle IDs einer Collection mit Inhalts-Hash (seitenweise, ohne Vektoren)"""
+    fingerprints, offset = {}, 0
+    while True:
+        page = collection.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+        if not page["ids"]:
+            return fingerprints
+        for doc_id, text, metadata in zip(page["ids"], page["documents"], page["metadatas"]):
+            fingerprints[doc_id] = content_hash(text, metadata)
+        offset += len(page["ids"])
+
+
+def sidecars_built(physical_name: str) -> bool:
+    """
+    True, wenn die Sidecars einer physischen Version vollständig vorliegen
+
+    rebuild_sidecars() baut das Inventar zuletzt auf, und das Inventar setzt
+    seine 'built'-Markierung erst nach dem letzten Eintrag - ein
+    abgebrochener Neuaufbau zählt also nicht.
+    """
+    from .collection_inventory import get_inventory
+
+    return get_inventory(physical_name).is_built()
+
+
+def rebuild_sidecars(collection_name: str, physical_name: str, collection) -> None:
+    """
+    Baut Katalog-Index und Inventar einer physischen Version aus ihrer
+    Collection neu. Die Dateien gehören nur zu dieser Version; solange sie
+    nicht aktiv ist, liest niemand den Zwischenstand.
+    """
+    from .catalog_index import get_catalog_index
+    from .collection_inventory import get_inventory
+
+    if collection_name in Config.CATALOG_INDEX_COLLECTIONS:
+        get_catalog_index(physical_name).rebuild(collection)
+    # Inventar zuletzt: seine Markierung steht für den ganzen Satz
+    get_inventory(physical_name).rebuild(collection)
+
+
+class ReembeddingJob:
+    """
+    Baut eine neue Version einer Collection auf und schaltet danach um
+
+    Args:
+        collection_name: Logischer Name (z.B. "documents-collection")
+        connect: Callback(physical_name, embedding_model) -> Vectorstore
+            (default: get_chroma_vectorstore ohne Alias-Auflösung)
+        embedding_model: Neues Embedding-Modell (default: Config)
+        folder: Dokumenten-Ordner für neues Chunking; None = Texte der
+            aktiven Version neu einbetten
+        batch_pause: Pause zwischen Batches in Sekunden (Drosselung)
+        switch: Nach erfolgreichem Aufbau automatisch umschalten
+    """
+
+    def __init__(
+        self,
+        collection_name: str,
+        connect: Optional[Callable[[str, str], object]] = None,
+        embedding_model: Optional[str] = None,
+        folder: Optional[Path] = None,
+        file_types: Optional[List[str]] = None,
+        chunk_size: Optional[int] = None,
+        chunk_overlap: Optional[int] = None,
+        batch_size: int = 10,
+        batch_pause: Optional[float] = None,
+        switch: bool = True,
+        registry: Optional[AliasRegistry] = None,
+    ):
+        self.collection_name = collection_name
+        self.connect = connect or _connect_physical
+        self.embedding_model = embedding_model or Config.OLLAMA_EMBEDDING_MODEL
+        self.folder = Path(folder) if folder else None
+        self.file_types = file_types or [".pdf", ".txt", ".docx"]
+        # Bei Small-to-Big beschreiben chunk_size/chunk_overlap die Parents
+        small_to_big = collection_name in Config.PARENT_CHILD_COLLECTIONS
+        self.chunk_size = chunk_size or (Config.PARENT_CHUNK_SIZE if small_to_big else Config.CHUNK_SIZE)
+        self.chunk_overlap = chunk_overlap or (Config.PARENT_CHUNK_OVERLAP if small_to_big else Config.CHUNK_OVERLAP)
+        self.batch_size = batch_size
+        self.batch_pause = Config.REEMBED_BATCH_PAUSE if batch_pause is None else batch_pause
+        self.auto_switch = switch
+        self.registry = registry or get_alias_registry()
+        self.cancel_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.result: Optional[dict] = None
+
+    # ---- Fortschritt ----
+
+    def _progress(self, **fields) -> None:
+        self.build.update(fields, updated_at=datetime.now().isoformat(timespec="seconds"))
+        self.registry.set_build(self.collection_name, dict(self.build))
+
+    def _throttle(self, batch_num: int, total_batches: int) -> None:
+        if self.cancel_event.is_set():
+            raise InterruptedError("Neuaufbau abgebrochen")
+        if self.batch_pause:
+            time.sleep(self.batch_pause)
+
+    def _store(self, shadow, docs: List[Document]) -> None:
+        summary_index = None
+        if self.collection_name in Config.SUMMARY_INDEX_COLLECTIONS:
+            from .summary_index import get_summary_index
+            summary_index = get_summary_index(shadow)
+        stats = store_chunks_in_batches(
+            shadow, docs, batch_size=self.batch_size, on_batch=self._throttle,
+            summary_index=summary_index,
+        )
+        rebuild_stale_sidecars(shadow, stats["stale_sidecars"], summary_index=summary_index)
+        self.build["failed_batches"] += stats["failed_batches"]
+        self._progress(done=self.build["done"] + len(docs))
+
+    # ---- Ablauf ----
+
+    def run(self) -> dict:
+        """Baut die Shadow-Collection synchron auf; liefert den Build-Status"""
+        version = self.registry.next_version(self.collection_name)
+        shadow_name = version_name(self.collection_name, version)
+        active_name = self.registry.resolve(self.collection_name)
+        self.build = {
+            "version": version,
+            "collection": shadow_name,
+            "source": str(self.folder) if self.folder else active_name,
+            "embedding_model": self.embedding_model,
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "state": "building",
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "done": 0,
+            "failed_batches": 0,
+        }
+        self._progress()
+        logger.info(f"🏗️  Neuaufbau {self.collection_name}: {active_name} → {shadow_name} ({self.embedding_model})")
+
+        shadow = None
+        try:
+            shadow = self.connect(shadow_name, self.embedding_model)
+            if self.folder:
+                expected = self._build_from_folder(shadow)
+            else:
+                active = self.connect(active_name, None)
+                expected = self._build_from_collection(shadow, active._collection)
+
+            count = shadow._collection.count()
+            if self.build["failed_batches"] or count != expected:
+                raise RuntimeError(
+                    f"Version unvollständig: {count}/{expected} Einträge, "
+                    f"{self.build['failed_batches']} fehlgeschlagene Batches"
+                )
+
+            self.registry.add_version(self.collection_name, shadow_name, {
+                "embedding_model": self.embedding_model,
+                "chunk_size": self.chunk_size,
+                "chunk_overlap": self.chunk_overlap,
+                "count": count,
+                "built_at": datetime.now().isoformat(timespec="seconds"),
+            })
+            self._progress(state="ready", count=count)
+            logger.info(f"✅ {shadow_name} fertig ({count} Einträge)")
+
+            if self.auto_switch:
+                switch_version(self.collection_name, shadow_name, shadow._collection, self.registry)
+                self._progress(state="active")
+        except Exception as e:
+            state = "cancelled" if isinstance(e, InterruptedError) else "failed"
+            self._progress(state=state, error=str(e))
+            logger.error(f"❌ Neuaufbau {shadow_name} {state}: {e}")
+        self.result = dict(self.build)
+        return self.result
+
+    def _build_from_collection(self, shadow, source) -> int:
+        """Neu einbetten mit gleichen IDs, danach Nachzügler abgleichen"""
+        self._progress(total=source.count())
+        for docs in iter_collection_documents(source):
+            self._store(shadow, docs)
+
+        # Während des Aufbaus neue, geänderte und gelöschte Einträge nachziehen
+        for _ in range(CATCHUP_ROUNDS):
+            source_hashes = collection_fingerprints(source)
+            shadow_hashes = collection_fingerprints(shadow._collection)
+            stale = sorted(i for i, h in source_hashes.items() if shadow_hashes.get(i) != h)
+            removed = sorted(set(shadow_hashes) - set(source_hashes))
+            if not stale and not removed:
+                break
+            if stale:
+                logger.info(f"  🔁 {len(stale)} neue/geänderte Einträge nachziehen...")
+                for docs in iter_collection_documents(source, ids=stale):
+                    self._store(shadow, docs)
+            if removed:
+                logger.info(f"  🗑️  {len(removed)} gelöschte Einträge entfernen...")
+                for i in range(0, len(removed), 500):
+                    shadow._collection.delete(ids=removed[i:i + 500])
+        else:
+            logger.warning(f"  ⚠️  Aktive Version ändert sich weiter, Abgleich nach {CATCHUP_ROUNDS} Runden beendet")
+        return len(source_hashes)
+
+    def _build_from_folder(self, shadow) -> int:
+        """Neues Chunking aus den Originaldateien (Datei für Datei)"""
+        from .document_processor import DocumentProcessor
+
+        processor = DocumentProcessor.for_collection(
+            self.collection_name, chunk_size=self.chunk_size, chunk_overlap=self.chunk_overlap
+        )
+        parent_store = None
+        if processor.small_to_big:
+            # Parent-IDs enthalten die Parent-Größe: keine Kollision mit der aktiven Version
+            from .parent_store import get_parent_store
+            parent_store = get_parent_store(self.collection_name)
+        files = [f for file_type in self.file_types for f in sorted(self.folder.glob(f"*{file_type}"))]
+        self._progress(files=len(files))
+        expected = 0
+        for file_path in files:
+            chunks = processor.load_and_process_file(file_path)
+            if chunks and parent_store is not None:
+                chunks = list(processor.iter_children(chunks, parent_store))
+            if chunks:
+                self._store(shadow, chunks)
+                expected += len(chunks)
+        return expected
+
+    def start(self) -> threading.Thread:
+        """Startet den Neuaufbau in einem Hintergrund-Thread"""
+        self.thread = threading.Thread(target=self.run, name=f"reembed-{self.collection_name}", daemon=True)
+        self.thread.start()
+        return self.thread
+
+    def cancel(self) -> None:
+        self.cancel_event.set()
+
+
+def _connect_physical(physical_name: str, embedding_model: Optional[str]):
+    from .chroma_client import create_embedding_model, get_chroma_vectorstore
+
+    return get_chroma_vectorstore(
+        create_embedding_model(batch_queries=False, model=embedding_model),
+        collection_name=physical_name,
+        resolve_alias=False,
+    )
+
+
+def switch_version(
+    collection_name: str,
+    physical_name: str,
+    collection=None,
+    registry: Optional[AliasRegistry] = None,
+    connect: Optional[Callable[[str, str], object]] = None,
+) -> dict:
+    """
+    Schaltet auf eine fertige Version um
+
+    Inventar und Katalog-Index der Zielversion werden vorher vollständig
+    aufgebaut, sofern sie nicht schon vorliegen (z.B. beim Zurückschalten);
+    der Alias-Wechsel ist der letzte Schritt. Leser sehen also nie einen
+    halb gefüllten Index. Nur registrierte (vollständig gebaute) Versionen
+    oder der ursprüngliche Name sind erlaubt.
+    """
+    registry = registry or get_alias_registry()
+    entry = registry.get(collection_name)
+    if physical_name != collection_name and physical_name not in entry.get("versions", {}):
+        raise ValueError(f"{physical_name} ist keine fertige Version von {collection_name}")
+
+    if registry.resolve(collection_name) != physical_name and not sidecars_built(physical_name):
+        if collection is None:
+            connect = connect or _connect_physical
+            model = registry.version_info(physical_name).get("embedding_model")
+            collection = connect(physical_name, model)._collection
+        rebuild_sidecars(collection_name, physical_name, collection)
+    return registry.switch(collection_name, physical_name)
+
+
+def rollback(
+    collection_name: str,
+    registry: Optional[AliasRegistry] = None,
+    connect: Optional[Callable[[str, str], object]] = None,
+) -> dict:
+    """Schaltet auf die vorherige Version zurück"""
+    registry = registry or get_alias_registry()
+    previous = registry.get(collection_name).get("previous")
+    if not previous:
+        raise ValueError(f"Keine vorherige Version für {collection_name}")
+    return switch_version(collection_name, previous, registry=registry, connect=connect)
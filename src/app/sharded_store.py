@@ -0,0 +1,278 @@
+# app/sharded_store.py
+"""
+Sharding einer Collection über mehrere ChromaDB-Server.
+
+Beim Import wird jeder Chunk anhand eines stabilen Hashes seiner ID genau
+einem Shard zugeordnet. Suchen gehen parallel an alle Shards (Scatter),
+die Top-k-Listen werden nach Distanz zusammengeführt (Gather). Fällt ein
+Shard aus oder antwortet nicht rechtzeitig, wird er für eine Weile
+übersprungen und die Antwort aus den übrigen Shards gebaut.
+
+Die Shards sind normale langchain_chroma-Vectorstores - lokal lassen sich
+also auch mehrere In-Process-Collections als Shards verwenden.
+"""
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.documents import Document
+
+from .metrics import get_metrics
+
+logger = logging.getLogger(__name__)
+
+# Felder, die Collection.get/upsert parallel zu den IDs führen
+_ROW_FIELDS = ("embeddings", "documents", "metadatas", "uris", "data")
+
+
+def shard_for_id(doc_id: str, num_shards: int) -> int:
+    """Stabiler Shard-Index einer ID (gleich in allen Prozessen, anders als hash())"""
+    digest = hashlib.blake2b(str(doc_id).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % num_shards
+
+
+def _partition(ids: Sequence[str], num_shards: int) -> Dict[int, List[int]]:
+    """Positionen der IDs pro Shard"""
+    positions: Dict[int, List[int]] = {}
+    for position, doc_id in enumerate(ids):
+        positions.setdefault(shard_for_id(doc_id, num_shards), []).append(position)
+    return positions
+
+
+def _merge_results(pages: List[dict]) -> dict:
+    """Fügt get()-Ergebnisse mehrerer Shards zusammen"""
+    merged = {"ids": []}
+    for page in pages:
+        merged["ids"].extend(page["ids"])
+        for field in _ROW_FIELDS:
+            values = page.get(field)
+            if values is not None:
+                merged.setdefault(field, []).extend(list(values))
+    return merged
+
+
+class ShardedCollection:
+    """
+    Collection-Fassade über die Chroma-Collections aller Shards.
+
+    Bietet die Teilmenge der chromadb-Collection-API, die die App nutzt
+    (count, get, upsert, delete). upsert/delete/get mit IDs gehen nur an den
+    zuständigen Shard, alles andere an alle Shards.
+    """
+
+    def __init__(self, store: "ShardedVectorStore"):
+        self._store = store
+
+    @property
+    def name(self) -> str:
+        return self._store.collection_name
+
+    def _collections(self):
+        return [shard._collection for shard in self._store.shards]
+
+    def count(self) -> int:
+        return sum(collection.count() for collection in self._collections())
+
+    def upsert(self, ids: List[str], **fields) -> None:
+        collections = self._collections()
+        for shard, positions in _partition(ids, len(collections)).items():
+            part = {
+                field: [values[p] for p in positions]
+                for field, values in fields.items()
+                if field in _ROW_FIELDS and values is not None
+            }
+            collections[shard].upsert(ids=[ids[p] for p in positions], **part)
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        **kwargs,
+    ) -> dict:
+        collections = self._collections()
+        if ids is not None:
+            pages = [
+                collections[shard].get(ids=[ids[p] for p in positions], **kwargs)
+                for shard, positions in _partition(ids, len(collections)).items()
+            ]
+            return _merge_results(pages)
+
+        # Seitenweises Lesen: Shards nacheinander, Offset über die Shard-Größen verteilen
+        offset = offset or 0
+        remaining = limit
+        pages = []
+        for collection in collections:
+            if remaining is not None and remaining <= 0:
+                break
+            if offset:
+                size = collection.count()
+                if offset >= size:
+                    offset -= size
+                    continue
+            page = collection.get(limit=remaining, offset=offset or None, **kwargs)
+            offset = 0
+            pages.append(page)
+            if remaining is not None:
+                remaining -= len(page["ids"])
+        return _merge_results(pages) if pages else {"ids": []}
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs) -> None:
+        collections = self._collections()
+        if ids is not None:
+            for shard, positions in _partition(ids, len(collections)).items():
+                collections[shard].delete(ids=[ids[p] for p in positions], **kwargs)
+            return
+        for collection in collections:
+            collection.delete(**kwargs)
+
+
+class ShardedVectorStore:
+    """
+    Vectorstore über mehrere Chroma-Shards mit Scatter-Gather-Suche.
+
+    Liefert dieselben (Document, Distanz)-Tupel wie Chroma. Ein Shard, der
+    einen Fehler wirft oder das Timeout reißt, wird retry_after Sekunden lang
+    übersprungen; Suchen liefern dann Teilergebnisse. Erst wenn kein Shard
+    antwortet, wird ein Fehler geworfen.
+
+    Jeder Shard hat einen eigenen Thread-Pool (workers_per_shard Threads):
+    Der Chroma-HTTP-Client hat kein Timeout, ein hängender Request blockiert
+    seinen Thread also unbegrenzt - aber nur Threads seines eigenen Shards.
+    """
+
+    def __init__(
+        self,
+        shards: Sequence,
+        collection_name: str = "",
+        shard_names: Optional[Sequence[str]] = None,
+        timeout: float = 10.0,
+        retry_after: float = 30.0,
+        workers_per_shard: int = 4,
+    ):
+        if not shards:
+            raise ValueError("Mindestens ein Shard nötig")
+        self.shards = list(shards)
+        self.collection_name = collection_name
+        self.shard_names = list(shard_names or [f"shard-{i}" for i in range(len(self.shards))])
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._collection = ShardedCollection(self)
+        self._down_until = [0.0] * len(self.shards)
+        self._lock = threading.Lock()
+        self._executors = [
+            ThreadPoolExecutor(max_workers=max(1, workers_per_shard), thread_name_prefix=f"chroma-shard{i}")
+            for i in range(len(self.shards))
+        ]
+
+    @property
+    def embeddings(self):
+        return self.shards[0].embeddings
+
+    # ---- Shard-Zustand ----
+
+    def _available_shards(self) -> List[int]:
+        now = time.monotonic()
+        with self._lock:
+            available = [i for i, until in enumerate(self._down_until) if until <= now]
+        # Sind alle als gestört markiert, trotzdem alle versuchen
+        return available or list(range(len(self.shards)))
+
+    def _mark_down(self, shard: int, error) -> None:
+        with self._lock:
+            self._down_until[shard] = time.monotonic() + self.retry_after
+        get_metrics().inc("shard_errors")
+        logger.warning(
+            f"⚠️  Shard {self.shard_names[shard]} nicht verfügbar ({error}) - "
+            f"wird {self.retry_after:.0f}s übersprungen"
+        )
+
+    def _mark_up(self, shard: int) -> None:
+        with self._lock:
+            if self._down_until[shard]:
+                self._down_until[shard] = 0.0
+                logger.info(f"✅ Shard {self.shard_names[shard]} wieder erreichbar")
+
+    def shard_status(self) -> List[dict]:
+        """Zustand und Größe jedes Shards (für Übersicht/Health-Checks)"""
+        now = time.monotonic()
+        status = []
+        for i, shard in enumerate(self.shards):
+            entry = {"shard": self.shard_names[i], "available": self._down_until[i] <= now}
+            try:
+                entry["count"] = shard._collection.count()
+            except Exception as e:
+                entry.update(available=False, error=str(e))
+            status.append(entry)
+        return status
+
+    # ---- Suche ----
+
+    def similarity_search_by_vector_with_relevance_scores(
+        self, embedding: List[float], k: int = 4, **kwargs
+    ) -> List[Tuple[Document, float]]:
+        """Fragt alle verfügbaren Shards parallel ab und führt die Top-k zusammen"""
+        shards = self._available_shards()
+        futures = {
+            self._executors[i].submit(
+                self.shards[i].similarity_search_by_vector_with_relevance_scores, embedding, k=k, **kwargs
+            ): i
+            for i in shards
+        }
+        done, not_done = wait(futures, timeout=self.timeout)
+
+        results: List[Tuple[Document, float]] = []
+        errors = []
+        for future in not_done:
+            future.cancel()
+            errors.append(futures[future])
+            self._mark_down(futures[future], f"Timeout nach {self.timeout:.1f}s")
+        for future in done:
+            shard = futures[future]
+            try:
+                results.extend(future.result())
+                self._mark_up(shard)
+            except Exception as e:
+                errors.append(shard)
+                self._mark_down(shard, e)
+
+        if errors:
+            if len(errors) == len(shards):
+                raise RuntimeError(f"Kein Shard erreichbar ({len(shards)} abgefragt)")
+            get_metrics().inc("shard_partial_results")
+
+        results.sort(key=lambda item: item[1])
+        return results[:k]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs) -> List[Tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_relevance_scores(
+            self.embeddings.embed_query(query), k=k, **kwargs
+        )
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k=k, **kwargs)]
+
+    # ---- Schreiben ----
+
+    def add_documents(self, documents: List[Document], ids: Optional[List[str]] = None, **kwargs) -> List[str]:
+        """Embedded die Dokumente einmal und verteilt sie per ID-Hash auf die Shards"""
+        ids = list(ids or [doc.id or str(uuid.uuid4()) for doc in documents])
+        embeddings = self.embeddings.embed_documents([doc.page_content for doc in documents])
+        self._collection.upsert(
+            ids=ids,
+            embeddings=embeddings,
+            documents=[doc.page_content for doc in documents],
+            metadatas=[doc.metadata or None for doc in documents],
+        )
+        return ids
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs) -> None:
+        self._collection.delete(ids=ids, **kwargs)
+
+    def delete_collection(self) -> None:
+        for shard in self.shards:
+            shard.delete_collection()
@@ -0,0 +1,247 @@
+# app/snapshot.py
+"""
+Snapshots einer Collection: IDs, Vektoren, Texte und Metadaten in einem
+kompakten, spaltenorientierten Format auf der Platte. Damit lässt sich eine
+neue Umgebung ohne erneutes Embedding über Ollama aufsetzen.
+
+Aufbau eines Snapshot-Verzeichnisses:
+
+    manifest.json                 Collection, Dimension, Blöcke, Prüfsummen
+    vectors.f32                   alle Vektoren als rohe float32-Zeilen
+    block-00000.ids.json.gz       Spalten pro Block, gzip-komprimiert
+    block-00000.documents.json.gz
+    block-00000.metadatas.json.gz
+
+Export und Import laufen blockweise: im Speicher liegt immer nur eine
+begrenzte Zahl von Blöcken. Beim Import überlappen Lesen/Dekomprimieren und
+die Upserts nach ChromaDB (mehrere Upserts parallel).
+"""
+import gzip
+import json
+import logging
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+FORMAT = "sadpac-snapshot"
+VERSION = 1
+MANIFEST = "manifest.json"
+VECTORS = "vectors.f32"
+COLUMNS = ("ids", "documents", "metadatas")
+
+
+def _column_file(block: int, column: str) -> str:
+    return f"block-{block:05d}.{column}.json.gz"
+
+
+def _write_column(path: Path, values: list, compresslevel: int) -> None:
+    with gzip.open(path, "wt", encoding="utf-8", compresslevel=compresslevel) as f:
+        json.dump(values, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def _read_column(path: Path) -> list:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_manifest(path: Path) -> dict:
+    manifest = json.loads((Path(path) / MANIFEST).read_text(encoding="utf-8"))
+    if manifest.get("format") != FORMAT:
+        raise ValueError(f"Kein Snapshot: {path}")
+    if manifest.get("version", 0) > VERSION:
+        raise ValueError(f"Snapshot-Version {manifest['version']} wird nicht unterstützt")
+    return manifest
+
+
+def export_snapshot(
+    collection,
+    path: Path,
+    block_size: int = 5000,
+    compresslevel: int = 6,
+    info: Optional[dict] = None,
+) -> dict:
+    """
+    Exportiert eine Chroma-Collection seitenweise in ein Snapshot-Verzeichnis
+
+    Args:
+        collection: Chroma-Collection (vectorstore._collection)
+        path: Zielverzeichnis (wird angelegt, muss leer sein)
+        block_size: Einträge pro Block (= Speicherbedarf beim Export)
+        info: Zusätzliche Angaben fürs Manifest (z.B. Embedding-Modell)
+
+    Returns:
+        Das geschriebene Manifest
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    if any(path.iterdir()):
+        raise FileExistsError(f"Snapshot-Verzeichnis ist nicht leer: {path}")
+
+    start = time.perf_counter()
+    blocks = []
+    dim = None
+    offset = 0
+    with open(path / VECTORS, "wb") as vectors_file:
+        while True:
+            page = collection.get(
+                include=["embeddings", "documents", "metadatas"], limit=block_size, offset=offset
+            )
+            if not page["ids"]:
+                break
+
+            vectors = np.ascontiguousarray(page["embeddings"], dtype="<f4")
+            if dim is None:
+                dim = vectors.shape[1]
+            elif vectors.shape[1] != dim:
+                raise ValueError(f"Uneinheitliche Dimension: {vectors.shape[1]} statt {dim}")
+            data = vectors.tobytes()
+            vectors_file.write(data)
+
+            block = len(blocks)
+            columns = {
+                "ids": page["ids"],
+                "documents": page["documents"],
+                "metadatas": page["metadatas"],
+            }
+            for column, values in columns.items():
+                _write_column(path / _column_file(block, column), list(values), compresslevel)
+            blocks.append({"rows": len(page["ids"]), "crc32": zlib.crc32(data)})
+
+            offset += len(page["ids"])
+            logger.info(f"  📤 {offset} Einträge exportiert...")
+
+    manifest = {
+        "format": FORMAT,
+        "version": VERSION,
+        "collection": getattr(collection, "name", None),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "count": offset,
+        "dim": dim or 0,
+        "dtype": "float32",
+        "blocks": blocks,
+        "info": info or {},
+    }
+    (path / MANIFEST).write_text(json.dumps(manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    seconds = time.perf_counter() - start
+    size = sum(f.stat().st_size for f in path.iterdir())
+    logger.info(
+        f"✅ Snapshot exportiert: {offset} Einträge, {size / 1e6:.1f} MB in {seconds:.1f}s ({path})"
+    )
+    return manifest
+
+
+def iter_blocks(path: Path, manifest: Optional[dict] = None, verify: bool = True) -> Iterator[dict]:
+    """Liest einen Snapshot blockweise: {"ids", "embeddings", "documents", "metadatas"}"""
+    path = Path(path)
+    manifest = manifest or read_manifest(path)
+    dim = manifest["dim"]
+    with open(path / VECTORS, "rb") as vectors_file:
+        for block, entry in enumerate(manifest["blocks"]):
+            data = vectors_file.read(entry["rows"] * dim * 4)
+            if len(data) != entry["rows"] * dim * 4:
+                raise ValueError(f"{VECTORS} ist abgeschnitten (Block {block})")
+            if verify and zlib.crc32(data) != entry["crc32"]:
+                raise ValueError(f"Prüfsumme falsch in Block {block}")
+            rows = {column: _read_column(path / _column_file(block, column)) for column in COLUMNS}
+            rows["embeddings"] = np.frombuffer(data, dtype="<f4").reshape(entry["rows"], dim)
+            yield rows
+
+
+def import_snapshot(
+    collection,
+    path: Path,
+    batch_size: int = 1000,
+    workers: int = 4,
+    verify: bool = True,
+    on_batch: Optional[Callable[[List[Document], List[str]], None]] = None,
+) -> dict:
+    """
+    Lädt einen Snapshot per Bulk-Upsert in eine Chroma-Collection
+
+    Während die Upserts laufen, wird der nächste Block schon gelesen. Es sind
+    höchstens workers Batches gleichzeitig unterwegs (begrenzter Speicher).
+
+    Args:
+        collection: Ziel-Collection (vectorstore._collection)
+        batch_size: Einträge pro Upsert
+        workers: Parallele Upserts
+        on_batch: Callback(documents, ids) nach jedem gespeicherten Batch
+            (z.B. für Katalog-Index und Inventar)
+
+    Returns:
+        dict mit 'count', 'batches', 'seconds', 'rows_per_second', 'mb_per_second'
+    """
+    path = Path(path)
+    manifest = read_manifest(path)
+    max_batch = getattr(getattr(collection, "_client", None), "get_max_batch_size", None)
+    if callable(max_batch):
+        batch_size = min(batch_size, max_batch())
+
+    stats = {"count": 0, "batches": 0}
+    stats_lock = threading.Lock()
+    slots = threading.BoundedSemaphore(max(1, workers))
+
+    def upsert(ids, embeddings, documents, metadatas):
+        try:
+            collection.upsert(
+                ids=ids,
+                embeddings=embeddings,
+                documents=documents,
+                metadatas=[metadata or None for metadata in metadatas],
+            )
+            if on_batch is not None:
+                docs = [
+                    Document(page_content=text or "", metadata=metadata or {})
+                    for text, metadata in zip(documents, metadatas)
+                ]
+                on_batch(docs, ids)
+            with stats_lock:
+                stats["count"] += len(ids)
+                stats["batches"] += 1
+        finally:
+            slots.release()
+
+    start = time.perf_counter()
+    futures = []
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="snapshot") as executor:
+        for rows in iter_blocks(path, manifest, verify=verify):
+            for i in range(0, len(rows["ids"]), batch_size):
+                # Blockiert, solange workers Batches unterwegs sind
+                slots.acquire()
+                futures.append(executor.submit(
+                    upsert,
+                    rows["ids"][i:i + batch_size],
+                    rows["embeddings"][i:i + batch_size],
+                    rows["documents"][i:i + batch_size],
+                    rows["metadatas"][i:i + batch_size],
+                ))
+            # Fehler früh melden, erledigte Futures freigeben
+            for future in [f for f in futures if f.done()]:
+                future.result()
+                futures.remove(future)
+            logger.info(f"  📥 {stats['count']}/{manifest['count']} Einträge importiert...")
+        for future in futures:
+            future.result()
+
+    seconds = time.perf_counter() - start
+    vector_mb = manifest["count"] * manifest["dim"] * 4 / 1e6
+    stats.update({
+        "seconds": seconds,
+        "rows_per_second": stats["count"] / seconds if seconds else 0.0,
+        "mb_per_second": vector_mb / seconds if seconds else 0.0,
+    })
+    logger.info(
+        f"✅ Snapshot importiert: {stats['count']} Einträge in {seconds:.1f}s "
+        f"({stats['rows_per_second']:.0f}/s)"
+    )
+    return stats
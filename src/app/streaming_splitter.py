@@ -0,0 +1,296 @@
+# app/streaming_splitter.py
+"""
+Streaming-Splitter für sehr große TXT-Dateien (OCR-Dumps, Korpus-Exporte).
+
+TextLoader liest die ganze Datei in einen String, RecursiveCharacterTextSplitter
+hält beim Splitten mehrere Kopien davon. Hier wird die Datei per mmap
+eingeblendet und nur stückweise dekodiert:
+
+    - Encoding wird blockweise erkannt (BOM, sonst inkrementeller
+      UTF-8-Check, sonst Config.TXT_FALLBACK_ENCODING). UTF-16/32 wird
+      vorab blockweise in eine temporäre UTF-8-Datei umkodiert.
+    - Separatoren werden direkt in den Bytes gesucht (re über mmap, ohne
+      Kopie). Das ist für UTF-8 und Single-Byte-Encodings sicher, da
+      ASCII-Bytes dort nie Teil eines Mehrbyte-Zeichens sind.
+    - Zeilenenden werden wie beim Öffnen im Textmodus behandelt
+      (\\r\\n und \\r zählen als \\n).
+
+Separator-Hierarchie, Überlappung, Längenmessung (Zeichen) und Strip
+entsprechen RecursiveCharacterTextSplitter (keep_separator=True), die Chunks
+sind identisch. Im Speicher liegen nur der aktuelle Chunk und einzelne
+Abschnitte bis 4 x chunk_size Bytes. Eine optionale Token-Grenze (max_tokens)
+wirkt wie bei FastTextSplitter.
+"""
+import codecs
+import logging
+import mmap
+import os
+import re
+import tempfile
+from collections import deque
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+# Bytes pro Block bei Encoding-Erkennung, Umkodierung und Zeichen-Split
+BLOCK_BYTES = 1 << 20
+
+# Ein Zeilenende wie im Textmodus: \r\n, einzelnes \r oder \n
+_NEWLINE = rb"(?:\r\n|\r(?!\n)|\n)"
+
+_BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+
+def detect_encoding(data, fallback: str = "cp1252", block_size: int = BLOCK_BYTES) -> Tuple[str, int]:
+    """
+    Erkennt das Encoding blockweise (ohne die Datei komplett zu dekodieren)
+
+    Returns:
+        (encoding, offset) - offset überspringt ein UTF-8-BOM
+    """
+    head = bytes(data[:4])
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding, len(bom) if encoding == "utf-8" else 0
+
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    size = len(data)
+    try:
+        for start in range(0, size, block_size):
+            end = min(start + block_size, size)
+            decoder.decode(data[start:end], final=end == size)
+    except UnicodeDecodeError as e:
+        logger.info(f"🔤 Kein UTF-8 (Byte {start + e.start}), nutze {fallback}")
+        return fallback, 0
+    return "utf-8", 0
+
+
+def _translate_newlines(text: str) -> str:
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+class _ChunkMerger:
+    """
+    Fasst kleine Abschnitte zu Chunks zusammen, Schritt für Schritt wie
+    TextSplitter._merge_splits (mit leerem Separator, da Separatoren an den
+    Abschnitten hängen)
+    """
+
+    def __init__(self, chunk_size: int, chunk_overlap: int, max_tokens: Optional[int] = None):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.max_tokens = max_tokens
+        self.current = deque()
+        self.total = 0
+        self.tokens = 0
+
+    def _join(self) -> Optional[str]:
+        return "".join(piece for piece, _ in self.current).strip() or None
+
+    def _too_big(self, length: int, tokens: int) -> bool:
+        if self.total + length > self.chunk_size:
+            return True
+        return self.max_tokens is not None and self.tokens + tokens > self.max_tokens
+
+    def add(self, piece: str, tokens: int = 0) -> Iterator[str]:
+        length = len(piece)
+        if self.current and self._too_big(length, tokens):
+            doc = self._join()
+            if doc is not None:
+                yield doc
+            # Vorne entfernen, bis nur noch die Überlappung übrig ist
+            while self.total > self.chunk_overlap or (self.total > 0 and self._too_big(length, tokens)):
+                first, first_tokens = self.current.popleft()
+                self.total -= len(first)
+                self.tokens -= first_tokens
+        self.current.append((piece, tokens))
+        self.total += length
+        self.tokens += tokens
+
+    def finish(self) -> Iterator[str]:
+        doc = self._join()
+        self.current.clear()
+        self.total = 0
+        self.tokens = 0
+        if doc is not None:
+            yield doc
+
+
+class StreamingTextSplitter:
+    """
+    Splittet eine TXT-Datei per mmap in Chunks (gleiche Ergebnisse wie
+    TextLoader + RecursiveCharacterTextSplitter)
+
+    Args:
+        chunk_size: Maximale Chunk-Länge in Zeichen
+        chunk_overlap: Überlappung in Zeichen
+        separators: Separator-Hierarchie (default: Absatz, Zeile, Wort, Zeichen)
+        fallback_encoding: Encoding, wenn die Datei kein gültiges UTF-8 ist
+        max_tokens: Optional, maximale Tokens pro Chunk
+        token_counter: Zählt Tokens eines Textes (default: estimate_tokens)
+    """
+
+    def __init__(
+        self,
+        chunk_size: int,
+        chunk_overlap: int,
+        separators: Optional[List[str]] = None,
+        fallback_encoding: str = "cp1252",
+        max_tokens: Optional[int] = None,
+        token_counter: Optional[Callable[[str], int]] = None,
+    ):
+        if chunk_overlap > chunk_size:
+            raise ValueError(f"chunk_overlap ({chunk_overlap}) größer als chunk_size ({chunk_size})")
+        if max_tokens is not None and max_tokens <= 0:
+            max_tokens = None
+        if max_tokens is not None and token_counter is None:
+            from .chat_memory import estimate_tokens
+            token_counter = estimate_tokens
+        self.max_tokens = max_tokens
+        self.token_counter = token_counter
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = separators or ["\n\n", "\n", " ", ""]
+        self.fallback_encoding = fallback_encoding
+        self.encoding = "utf-8"
+        self._patterns = {}
+
+    # ---- Hilfen ----
+
+    def _pattern(self, separator: str):
+        pattern = self._patterns.get(separator)
+        if pattern is None:
+            parts = [
+                _NEWLINE if char == "\n" else re.escape(char.encode(self.encoding))
+                for char in separator
+            ]
+            pattern = self._patterns[separator] = re.compile(b"".join(parts))
+        return pattern
+
+    def _decode(self, data, start: int, end: int) -> str:
+        return _translate_newlines(data[start:end].decode(self.encoding, errors="replace"))
+
+    def _chars(self, data, start: int, end: int) -> Iterator[str]:
+        """Dekodiert einen Bereich blockweise (für den Zeichen-Split)"""
+        decoder = codecs.getincrementaldecoder(self.encoding)(errors="replace")
+        carry = ""
+        for block_start in range(start, end, BLOCK_BYTES):
+            block_end = min(block_start + BLOCK_BYTES, end)
+            final = block_end == end
+            text = carry + decoder.decode(data[block_start:block_end], final=final)
+            carry = ""
+            # \r am Blockende könnte zu einem \r\n gehören
+            if not final and text.endswith("\r"):
+                text, carry = text[:-1], "\r"
+            yield from _translate_newlines(text)
+
+    def _pieces(self, data, start: int, end: int, separator: str) -> Iterator[Tuple[int, int]]:
+        """Byte-Bereiche der Abschnitte, Separator jeweils am Anfang (wie keep_separator=True)"""
+        previous = start
+        for match in self._pattern(separator).finditer(data, start, end):
+            if match.start() > previous:
+                yield previous, match.start()
+            previous = match.start()
+        if end > previous:
+            yield previous, end
+
+    def _fits(self, text: str) -> Tuple[bool, int]:
+        """(Abschnitt klein genug zum Mergen, Tokens)"""
+        if len(text) >= self.chunk_size:
+            return False, 0
+        if self.max_tokens is None:
+            return True, 0
+        tokens = self.token_counter(text)
+        return tokens < self.max_tokens, tokens
+
+    # ---- Split ----
+
+    def _split_range(self, data, start: int, end: int, separators: List[str]) -> Iterator[str]:
+        """Entspricht RecursiveCharacterTextSplitter._split_text für data[start:end]"""
+        separator = separators[-1]
+        new_separators: List[str] = []
+        for i, candidate in enumerate(separators):
+            if not candidate:
+                separator = candidate
+                break
+            if self._pattern(candidate).search(data, start, end):
+                separator = candidate
+                new_separators = separators[i + 1:]
+                break
+
+        merger = _ChunkMerger(self.chunk_size, self.chunk_overlap, self.max_tokens)
+
+        if not separator:
+            for char in self._chars(data, start, end):
+                fits, tokens = self._fits(char)
+                if fits:
+                    yield from merger.add(char, tokens)
+                else:
+                    yield from merger.finish()
+                    yield char
+            yield from merger.finish()
+            return
+
+        for piece_start, piece_end in self._pieces(data, start, end, separator):
+            size = piece_end - piece_start
+            text = None
+            # Zeichenzahl <= Bytezahl; ab 4 Bytes pro Zeichen ist der Abschnitt sicher zu lang
+            if size < 4 * self.chunk_size:
+                text = self._decode(data, piece_start, piece_end)
+                fits, tokens = self._fits(text)
+                if fits:
+                    yield from merger.add(text, tokens)
+                    continue
+
+            yield from merger.finish()
+            if new_separators:
+                yield from self._split_range(data, piece_start, piece_end, new_separators)
+            else:
+                yield text if text is not None else self._decode(data, piece_start, piece_end)
+        yield from merger.finish()
+
+    def iter_chunks(self, file_path: Path) -> Iterator[str]:
+        """Liefert die Chunk-Texte einer Datei nacheinander"""
+        file_path = Path(file_path)
+        if file_path.stat().st_size == 0:
+            return
+
+        with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            encoding, offset = detect_encoding(data, self.fallback_encoding)
+            if encoding in ("utf-16", "utf-32"):
+                yield from self._iter_transcoded(data, encoding)
+                return
+            self.encoding = encoding
+            self._patterns.clear()
+            logger.info(f"🔤 {file_path.name}: {encoding}")
+            yield from self._split_range(data, offset, len(data), self.separators)
+
+    def _iter_transcoded(self, data, encoding: str) -> Iterator[str]:
+        """UTF-16/32 blockweise in eine temporäre UTF-8-Datei umkodieren und diese splitten"""
+        logger.info(f"🔤 {encoding} → UTF-8 (temporäre Datei)")
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        fd, tmp = tempfile.mkstemp(suffix=".txt")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                size = len(data)
+                for start in range(0, size, BLOCK_BYTES):
+                    end = min(start + BLOCK_BYTES, size)
+                    out.write(decoder.decode(data[start:end], final=end == size).encode("utf-8"))
+            yield from self.iter_chunks(Path(tmp))
+        finally:
+            os.unlink(tmp)
+
+    def iter_documents(self, file_path: Path, metadata: Optional[dict] = None) -> Iterator[Document]:
+        """Chunks als Documents (Metadaten wie bei TextLoader: 'source')"""
+        metadata = metadata if metadata is not None else {"source": str(file_path)}
+        for text in self.iter_chunks(file_path):
+            yield Document(page_content=text, metadata=dict(metadata))
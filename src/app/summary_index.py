@@ -0,0 +1,191 @@
+# app/summary_index.py
+"""
+Dokument-Index für zweistufiges Retrieval: ein Eintrag pro Datei in einer
+kleinen Chroma-Collection "<collection>-summaries".
+
+Als Dokument-Vektor dient der Mittelwert (Zentroid) aller Chunk-Vektoren
+einer Datei. Er entsteht beim Import ohne zusätzliche Ollama-Aufrufe aus den
+ohnehin berechneten Chunk-Embeddings und wird bei weiteren Chunks derselben
+Datei fortgeschrieben. Die Suche läuft mit Kosinus-Distanz, die Länge des
+Zentroids spielt also keine Rolle. Als Text wird der Anfang der Datei
+gespeichert (Vorschau).
+
+RAGPipeline wählt im zweistufigen Modus zuerst die besten Dateien aus diesem
+Index und sucht Chunks dann nur innerhalb dieser Dateien (where-Filter).
+"""
+import logging
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_SUFFIX = "-summaries"
+PREVIEW_CHARS = 500
+
+# Feste Namespace-UUID: gleiche Datei -> gleiche ID in allen Prozessen
+_ID_NAMESPACE = uuid.UUID("6f1c2a52-3d0e-4d55-9a57-0c1f3b7e9d21")
+
+
+def summary_id(filename: str) -> str:
+    return str(uuid.uuid5(_ID_NAMESPACE, filename))
+
+
+def _filename_of(metadata: dict) -> str:
+    filename = metadata.get("filename")
+    if not filename and metadata.get("source"):
+        filename = Path(str(metadata["source"])).name
+    return filename or "Unbekannt"
+
+
+class DocumentSummaryIndex:
+    """Zentroid-Vektor pro Datei in einer eigenen Chroma-Collection"""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self._lock = threading.Lock()
+        self._pending: Dict[str, dict] = {}
+
+    # ---- Aufbau ----
+
+    def add_chunks(self, documents: Sequence[Document], vectors: Sequence[Sequence[float]]) -> None:
+        """Merkt sich die Chunk-Vektoren pro Datei (geschrieben wird in flush())"""
+        with self._lock:
+            for doc, vector in zip(documents, vectors):
+                filename = _filename_of(doc.metadata)
+                entry = self._pending.get(filename)
+                if entry is None:
+                    entry = self._pending[filename] = {
+                        "sum": np.zeros(len(vector), dtype=np.float64),
+                        "chunks": 0,
+                        "chars": 0,
+                        "preview": "",
+                        "first_chunk": None,
+                        "source": doc.metadata.get("source"),
+                    }
+                entry["sum"] += np.asarray(vector, dtype=np.float64)
+                entry["chunks"] += 1
+                entry["chars"] += len(doc.page_content)
+                # Vorschau aus dem ersten Chunk der Datei
+                chunk_id = doc.metadata.get("chunk_id", 0)
+                if entry["first_chunk"] is None or chunk_id < entry["first_chunk"]:
+                    entry["first_chunk"] = chunk_id
+                    entry["preview"] = doc.page_content[:PREVIEW_CHARS]
+
+    def flush(self) -> int:
+        """Schreibt die gesammelten Dateien (mit bestehenden Einträgen verrechnet)"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        ids = [summary_id(filename) for filename in pending]
+        existing = self.collection.get(ids=ids, include=["embeddings", "metadatas", "documents"])
+        previous = {}
+        if existing["ids"]:
+            previous = {
+                doc_id: (np.asarray(vector, dtype=np.float64), metadata or {}, text)
+                for doc_id, vector, metadata, text in zip(
+                    existing["ids"], existing["embeddings"], existing["metadatas"], existing["documents"]
+                )
+            }
+
+        embeddings, metadatas, documents = [], [], []
+        for doc_id, (filename, entry) in zip(ids, pending.items()):
+            total, chunks, chars, preview = entry["sum"], entry["chunks"], entry["chars"], entry["preview"]
+            if doc_id in previous:
+                mean, metadata, text = previous[doc_id]
+                old_chunks = int(metadata.get("chunks", 0))
+                total = total + mean * old_chunks
+                chunks += old_chunks
+                chars += int(metadata.get("chars", 0))
+                preview = text or preview
+            embeddings.append((total / chunks).astype(np.float32).tolist())
+            metadata = {"filename": filename, "chunks": chunks, "chars": chars}
+            if entry["source"]:
+                metadata["source"] = entry["source"]
+            metadatas.append(metadata)
+            documents.append(preview)
+
+        self.collection.upsert(ids=ids, embeddings=embeddings, metadatas=metadatas, documents=documents)
+        logger.info(f"📑 Dokument-Index: {len(ids)} Dateien aktualisiert ({self.collection.name})")
+        return len(ids)
+
+    def rebuild(self, source, page_size: int = 500) -> int:
+        """Baut den Index aus den gespeicherten Chunk-Vektoren einer Collection neu auf"""
+        self.clear()
+        offset = 0
+        while True:
+            page = source.get(
+                include=["documents", "metadatas", "embeddings"], limit=page_size, offset=offset
+            )
+            if not page["ids"]:
+                break
+            docs = [
+                Document(page_content=text or "", metadata=metadata or {})
+                for text, metadata in zip(page["documents"], page["metadatas"])
+            ]
+            self.add_chunks(docs, page["embeddings"])
+            offset += len(page["ids"])
+        return self.flush()
+
+    def delete_file(self, filename: str) -> None:
+        self.collection.delete(ids=[summary_id(filename)])
+
+    def clear(self) -> None:
+        ids = self.collection.get(include=[])["ids"]
+        if ids:
+            self.collection.delete(ids=ids)
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    # ---- Suche ----
+
+    def search(self, query_vector: Sequence[float], n: int = 5) -> List[Tuple[str, float]]:
+        """Die n ähnlichsten Dateien als (Dateiname, Kosinus-Distanz)"""
+        if self.collection.count() == 0:
+            return []
+        results = self.collection.query(
+            query_embeddings=[list(query_vector)], n_results=n, include=["metadatas", "distances"]
+        )
+        return [
+            (metadata["filename"], float(distance))
+            for metadata, distance in zip(results["metadatas"][0], results["distances"][0])
+        ]
+
+
+def _client_of(vectorstore):
+    """Chroma-Client eines Vectorstores (bei Sharding: der des ersten Shards)"""
+    client = getattr(vectorstore, "_client", None)
+    if client is None:
+        shards = getattr(vectorstore, "shards", None)
+        if shards:
+            client = shards[0]._client
+    return client
+
+
+_indexes: Dict[str, DocumentSummaryIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_summary_index(vectorstore) -> Optional[DocumentSummaryIndex]:
+    """
+    Dokument-Index zur (aktiven) physischen Collection eines Vectorstores.
+    Eigene Version pro physischer Collection, da die Zentroide vom
+    Embedding-Modell abhängen.
+    """
+    client = _client_of(vectorstore)
+    if client is None:
+        return None
+    name = vectorstore._collection.name + SUMMARY_SUFFIX
+    key = f"{id(client)}:{name}"
+    with _indexes_lock:
+        if key not in _indexes:
+            collection = client.get_or_create_collection(name, metadata={"hnsw:space": "cosine"})
+            _indexes[key] = DocumentSummaryIndex(collection)
+        return _indexes[key]
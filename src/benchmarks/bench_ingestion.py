@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# benchmarks/bench_ingestion.py
+"""
+Offline-Benchmark für den Import: DocumentProcessor + Batch-Speicherpfad
+(app/ingestion.py wie in load_documents.py) gegen deterministische
+Hash-Embeddings und einen In-Process-ChromaDB-Client. Kein Ollama, kein
+ChromaDB-Server nötig.
+
+Beispiel:
+    python src/benchmarks/bench_ingestion.py --files-per-type 20 --output bench.json
+
+Mit --baseline wird gegen ein früheres Ergebnis verglichen; fällt der
+Durchsatz um mehr als --max-regression, endet das Skript mit Exit-Code 1 (CI).
+"""
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Füge Parent-Directory zum Path hinzu
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import chromadb
+from langchain_chroma import Chroma
+
+from app.document_processor import DocumentProcessor
+from app.hash_embeddings import HashEmbeddings
+from app.ingestion import store_chunks_in_batches
+from app.ingestion_report import peak_rss_mb
+from benchmarks.corpus import generate_corpus
+
+logger = logging.getLogger(__name__)
+
+
+def run_benchmark(
+    folder: Path,
+    file_types: list,
+    chunk_size: int = 1000,
+    chunk_overlap: int = 200,
+    batch_size: int = 10,
+    embedding_dim: int = 768,
+) -> dict:
+    """Lädt, splittet und speichert alle Dateien eines Ordners und misst jede Stufe"""
+    processor = DocumentProcessor(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    embeddings = HashEmbeddings(dim=embedding_dim)
+    vectorstore = Chroma(
+        collection_name=f"bench-{int(time.time() * 1000)}",
+        embedding_function=embeddings,
+        client=chromadb.EphemeralClient(),
+    )
+
+    stages = {"load": 0.0, "split": 0.0, "embed": 0.0, "upsert": 0.0}
+    per_type = {}
+    chunks = []
+    files = 0
+    failed_files = []
+
+    total_start = time.perf_counter()
+
+    # 1. Laden + Splitten (Zeiten pro Datei aus load_and_process_file)
+    for file_type in file_types:
+        type_stats = {"files": 0, "chunks": 0, "load_seconds": 0.0, "split_seconds": 0.0}
+        for file_path in sorted(folder.glob(f"*{file_type}")):
+            files += 1
+            timings = {}
+            file_chunks = processor.load_and_process_file(file_path, timings)
+            load_time = timings["load_seconds"]
+            split_time = timings.get("split_seconds", 0.0)
+
+            if not file_chunks:
+                failed_files.append(file_path.name)
+
+            chunks.extend(file_chunks)
+            stages["load"] += load_time
+            stages["split"] += split_time
+            type_stats["files"] += 1
+            type_stats["chunks"] += len(file_chunks)
+            type_stats["load_seconds"] += load_time
+            type_stats["split_seconds"] += split_time
+        per_type[file_type] = type_stats
+
+    # 2. Einbetten + Speichern (gleicher Pfad wie load_documents.py)
+    batch_stats = store_chunks_in_batches(vectorstore, chunks, batch_size=batch_size, retry_wait=0)
+    stages["embed"] = sum(batch_stats["embed_seconds"])
+    stages["upsert"] = sum(batch_stats["upsert_seconds"])
+
+    total = time.perf_counter() - total_start
+    stored = vectorstore._collection.count()
+
+    return {
+        "files": files,
+        "failed_files": failed_files,
+        "chunks": len(chunks),
+        "stored_chunks": stored,
+        "batch_size": batch_size,
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "total_seconds": total,
+        "files_per_second": files / total if total else 0.0,
+        "chunks_per_second": len(chunks) / total if total else 0.0,
+        "stage_seconds": stages,
+        "per_type": per_type,
+        "failed_batches": batch_stats["failed_batches"],
+        # Frischer Prozess pro Benchmark: der Prozess-Peak entspricht dem Lauf
+        "process_peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def compare_with_baseline(result: dict, baseline: dict, max_regression: float) -> list:
+    """Liefert eine Liste von Regressionen gegenüber einem Baseline-Ergebnis"""
+    regressions = []
+    for key in ("files_per_second", "chunks_per_second"):
+        old, new = baseline.get(key), result.get(key)
+        if old and new is not None and new < old * (1 - max_regression):
+            regressions.append(f"{key}: {new:.1f} < {old:.1f} (-{(1 - new / old) * 100:.0f}%)")
+    # Ältere Baselines speichern den Wert noch als 'peak_rss_mb'
+    old_rss = baseline.get("process_peak_rss_mb", baseline.get("peak_rss_mb"))
+    new_rss = result.get("process_peak_rss_mb")
+    if old_rss and new_rss and new_rss > old_rss * (1 + max_regression):
+        regressions.append(f"process_peak_rss_mb: {new_rss:.0f} > {old_rss:.0f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline-Benchmark für den Dokumenten-Import")
+    parser.add_argument("--files-per-type", type=int, default=10, help="Dateien pro Typ (default: 10)")
+    parser.add_argument("--paragraphs", type=int, default=20, help="Absätze pro Datei (default: 20)")
+    parser.add_argument(
+        "--file-types", nargs="+", default=[".pdf", ".txt", ".docx"],
+        help="Dateitypen (default: .pdf .txt .docx)"
+    )
+    parser.add_argument("--batch-size", type=int, default=10, help="Chunks pro Batch (default: 10)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Chunk-Größe (default: 1000)")
+    parser.add_argument("--chunk-overlap", type=int, default=200, help="Chunk-Overlap (default: 200)")
+    parser.add_argument("--folder", type=str, default=None, help="Vorhandenen Ordner statt synthetischem Korpus nutzen")
+    parser.add_argument("--output", type=str, default=None, help="Ergebnis als JSON speichern")
+    parser.add_argument("--baseline", type=str, default=None, help="Baseline-JSON zum Vergleich")
+    parser.add_argument(
+        "--max-regression", type=float, default=0.2,
+        help="Erlaubter Rückgang gegenüber der Baseline (default: 0.2 = 20%%)"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.WARNING,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.folder:
+            folder = Path(args.folder)
+        else:
+            folder = Path(tmp)
+            generate_corpus(folder, args.files_per_type, args.paragraphs, tuple(args.file_types))
+
+        result = run_benchmark(
+            folder,
+            args.file_types,
+            chunk_size=args.chunk_size,
+            chunk_overlap=args.chunk_overlap,
+            batch_size=args.batch_size,
+        )
+
+    print(json.dumps(result, indent=2))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare_with_baseline(result, baseline, args.max_regression)
+        if regressions:
+            print("❌ Regression gegenüber Baseline:", file=sys.stderr)
+            for line in regressions:
+                print(f"   {line}", file=sys.stderr)
+            sys.exit(1)
+        print("✅ Keine Regression gegenüber Baseline", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
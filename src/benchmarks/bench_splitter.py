@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# benchmarks/bench_splitter.py
+"""
+Splitter-Benchmark: FastTextSplitter gegen RecursiveCharacterTextSplitter
+auf synthetischen Texten verschiedener Form (Absätze wie TXT, kurze Zeilen
+wie PDF-Seiten, Fließtext ohne Absätze). Pro Form werden Median-Zeit über
+--runs, Zeichen/s, Speedup und ob beide Splitter identische Chunks liefern
+berichtet.
+
+Beispiel:
+    python src/benchmarks/bench_splitter.py --paragraphs 5000 --runs 5 --output splitter.json
+
+Mit --min-speedup endet das Skript mit Exit-Code 1, wenn der schnelle
+Splitter bei einer Form langsamer ist als gefordert oder andere Chunks
+liefert (CI).
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Füge Parent-Directory zum Path hinzu
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from app.document_processor import SEPARATORS
+from app.fast_splitter import FastTextSplitter
+from benchmarks.corpus import make_paragraphs
+
+
+def make_texts(paragraphs: int, seed: int = 42) -> Dict[str, str]:
+    """Texte verschiedener Form mit gleichem Vokabular"""
+    rng = random.Random(seed)
+    parts = make_paragraphs(rng, paragraphs)
+
+    # PDF-Seiten: Zeilenumbruch nach ~80 Zeichen, kaum Absätze
+    lines, line = [], ""
+    for word in " ".join(parts).split(" "):
+        if len(line) + len(word) > 80:
+            lines.append(line)
+            line = ""
+        line = f"{line} {word}" if line else word
+    lines.append(line)
+
+    return {
+        "absaetze": "\n\n".join(parts),
+        "zeilen": "\n".join(lines),
+        "fliesstext": " ".join(parts),
+    }
+
+
+def _median_seconds(fn: Callable[[], List[str]], runs: int) -> tuple:
+    times, result = [], None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def run_benchmark(texts: Dict[str, str], chunk_size: int, chunk_overlap: int, runs: int = 3) -> dict:
+    reference = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap, length_function=len, separators=SEPARATORS
+    )
+    fast = FastTextSplitter(chunk_size, chunk_overlap, SEPARATORS)
+
+    shapes = {}
+    for name, text in texts.items():
+        reference_seconds, expected = _median_seconds(lambda: reference.split_text(text), runs)
+        fast_seconds, chunks = _median_seconds(lambda: fast.split_text(text), runs)
+        shapes[name] = {
+            "chars": len(text),
+            "chunks": len(chunks),
+            "identical": chunks == expected,
+            "reference_seconds": reference_seconds,
+            "fast_seconds": fast_seconds,
+            "reference_mb_per_second": len(text) / reference_seconds / 1e6 if reference_seconds else 0.0,
+            "fast_mb_per_second": len(text) / fast_seconds / 1e6 if fast_seconds else 0.0,
+            "speedup": reference_seconds / fast_seconds if fast_seconds else 0.0,
+        }
+
+    return {
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "runs": runs,
+        "shapes": shapes,
+    }
+
+
+def check_result(result: dict, min_speedup: float) -> list:
+    """Liefert eine Liste von Problemen (abweichende Chunks, zu geringer Speedup)"""
+    problems = []
+    for name, shape in result["shapes"].items():
+        if not shape["identical"]:
+            problems.append(f"{name}: Chunks weichen vom RecursiveCharacterTextSplitter ab")
+        if shape["speedup"] < min_speedup:
+            problems.append(f"{name}: Speedup {shape['speedup']:.2f} < {min_speedup:.2f}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark: FastTextSplitter vs. RecursiveCharacterTextSplitter")
+    parser.add_argument("--paragraphs", type=int, default=2000, help="Absätze pro Text (default: 2000)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Chunk-Größe (default: 1000)")
+    parser.add_argument("--chunk-overlap", type=int, default=200, help="Chunk-Overlap (default: 200)")
+    parser.add_argument("--runs", type=int, default=3, help="Wiederholungen pro Messung (default: 3)")
+    parser.add_argument("--output", type=str, default=None, help="Ergebnis als JSON speichern")
+    parser.add_argument(
+        "--min-speedup", type=float, default=None,
+        help="Mindest-Speedup pro Textform, sonst Exit-Code 1 (CI)"
+    )
+    args = parser.parse_args()
+
+    texts = make_texts(args.paragraphs)
+    result = run_benchmark(texts, args.chunk_size, args.chunk_overlap, args.runs)
+    print(json.dumps(result, indent=2))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+    problems = check_result(result, args.min_speedup if args.min_speedup is not None else 0.0)
+    if problems:
+        print("❌ Splitter-Benchmark fehlgeschlagen:", file=sys.stderr)
+        for line in problems:
+            print(f"   {line}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# benchmarks/bench_startup.py
+"""
+Startup-Benchmark: Kaltstart und Importkosten pro Streamlit-Seite.
+
+Für jede Seite (Home.py, pages/*.py) werden deren Top-Level-Imports in einem
+frischen Python-Prozess ausgeführt (wie beim ersten Aufruf der Seite im
+Container) und mit -X importtime gemessen. Berichtet werden Wall-Zeit
+(Median über --runs), Importzeit, die teuersten Module und welche schweren
+Pakete (chromadb, langchain_ollama, Loader, ...) schon beim Seitenstart
+geladen werden. Zusätzlich wird der "First-Use"-Preis der schweren Pakete
+einzeln gemessen.
+
+Beispiel:
+    python src/benchmarks/bench_startup.py --runs 5 --output startup.json
+
+Mit --budget-ms endet das Skript mit Exit-Code 1, sobald eine Seite
+(Median-Wall-Zeit) das Kaltstart-Budget überschreitet (CI).
+"""
+import argparse
+import ast
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+SRC_DIR = Path(__file__).parent.parent
+
+# Pakete, die erst bei Bedarf geladen werden sollen
+HEAVY_MODULES = (
+    "chromadb",
+    "langchain_chroma",
+    "langchain_ollama",
+    "langchain_community.document_loaders",
+    "pypdf",
+    "unstructured",
+)
+
+
+def page_scripts(src_dir: Path = SRC_DIR) -> List[Path]:
+    """Home.py und alle Seiten unter pages/"""
+    return [src_dir / "Home.py"] + sorted((src_dir / "pages").glob("*.py"))
+
+
+def top_level_imports(script: Path) -> str:
+    """Quelltext aller Top-Level-Imports eines Skripts (ohne Streamlit-Aufrufe)"""
+    tree = ast.parse(script.read_text(encoding="utf-8"))
+    nodes = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return "\n".join(ast.unparse(node) for node in nodes)
+
+
+def parse_importtime(stderr: str) -> Dict[str, dict]:
+    """Wertet die Ausgabe von -X importtime aus: Modul -> self/cumulative in ms"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            modules[name.strip()] = {
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+                "top_level": not name.startswith("  "),
+            }
+        except ValueError:
+            continue
+    return modules
+
+
+def measure(code: str, cwd: Path = SRC_DIR) -> dict:
+    """Führt code in einem frischen Interpreter aus und misst Wall- und Importzeit"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=str(cwd),
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    modules = parse_importtime(result.stderr)
+    return {
+        "ok": result.returncode == 0,
+        "error": result.stderr.strip().splitlines()[-1] if result.returncode else None,
+        "wall_ms": wall_ms,
+        "import_ms": sum(m["cumulative_ms"] for m in modules.values() if m["top_level"]),
+        "modules": modules,
+    }
+
+
+def benchmark_code(code: str, runs: int, top: int = 10) -> dict:
+    """Misst code runs-mal (der erste Lauf wärmt nur den Dateisystem-Cache)"""
+    measure(code)
+    samples = [measure(code) for _ in range(runs)]
+    last = samples[-1]
+    modules = last["modules"]
+    slowest = sorted(modules.items(), key=lambda item: item[1]["self_ms"], reverse=True)[:top]
+    return {
+        "ok": all(s["ok"] for s in samples),
+        "error": last["error"],
+        "wall_ms": statistics.median(s["wall_ms"] for s in samples),
+        "import_ms": statistics.median(s["import_ms"] for s in samples),
+        "heavy_modules_loaded": [name for name in HEAVY_MODULES if name in modules],
+        "slowest_modules": [{"module": name, **stats} for name, stats in slowest],
+    }
+
+
+def run_benchmark(runs: int = 3, top: int = 10) -> dict:
+    """Interpreter-Baseline, Importkosten pro Seite und First-Use-Kosten"""
+    report = {"python": sys.version.split()[0], "runs": runs}
+    report["baseline"] = benchmark_code("pass", runs, top=0)
+
+    pages = {}
+    for script in page_scripts():
+        pages[script.name] = benchmark_code(top_level_imports(script), runs, top)
+    report["pages"] = pages
+
+    report["first_use"] = {
+        name: benchmark_code(f"import {name}", runs, top=0)["import_ms"]
+        for name in HEAVY_MODULES
+    }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kaltstart- und Import-Benchmark pro Seite")
+    parser.add_argument("--runs", type=int, default=3, help="Messläufe pro Seite (default: 3)")
+    parser.add_argument("--top", type=int, default=10, help="Teuerste Module pro Seite (default: 10)")
+    parser.add_argument(
+        "--budget-ms", type=float, default=None,
+        help="Kaltstart-Budget pro Seite in ms (Exit-Code 1 bei Überschreitung)"
+    )
+    parser.add_argument("--output", type=str, default=None, help="Ergebnis als JSON speichern")
+    args = parser.parse_args()
+
+    report = run_benchmark(runs=args.runs, top=args.top)
+
+    print(f"Interpreter: {report['baseline']['wall_ms']:.0f} ms")
+    for name, page in report["pages"].items():
+        heavy = ", ".join(page["heavy_modules_loaded"]) or "-"
+        status = "" if page["ok"] else f"  ❌ {page['error']}"
+        print(f"{name}: {page['wall_ms']:.0f} ms (Imports {page['import_ms']:.0f} ms, schwer: {heavy}){status}")
+    for name, import_ms in report["first_use"].items():
+        print(f"  first use {name}: {import_ms:.0f} ms")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    if args.budget_ms is not None:
+        over = {
+            name: page["wall_ms"] for name, page in report["pages"].items()
+            if page["wall_ms"] > args.budget_ms or not page["ok"]
+        }
+        if over:
+            for name, wall_ms in over.items():
+                print(f"❌ {name}: {wall_ms:.0f} ms > Budget {args.budget_ms:.0f} ms")
+            sys.exit(1)
+        print(f"✅ Alle Seiten innerhalb des Budgets ({args.budget_ms:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# benchmarks/corpus.py
+"""
+Synthetische Test-Korpora (PDF, TXT, DOCX) für Offline-Benchmarks.
+
+Die Texte sind deterministisch (fester Seed) und bestehen aus zufälligen
+Wörtern eines kleinen Vokabulars mit Absätzen, so dass der Splitter
+realistische Trennstellen findet. PDF und DOCX werden ohne Zusatzpakete
+direkt als Datei-Format geschrieben.
+"""
+import random
+import zipfile
+from pathlib import Path
+from typing import Dict, List
+from xml.sax.saxutils import escape
+
+VOCABULARY = (
+    "bibliothek katalog buch autor verlag ausgabe kapitel seite thema wissen "
+    "forschung studie methode ergebnis analyse daten modell system prozess "
+    "entwicklung geschichte gesellschaft sprache literatur wissenschaft technik "
+    "hochschule lehre projekt quelle zitat begriff theorie praxis beispiel"
+).split()
+
+
+def make_paragraphs(rng: random.Random, n_paragraphs: int, words_per_paragraph: int = 120) -> List[str]:
+    paragraphs = []
+    for _ in range(n_paragraphs):
+        words = [rng.choice(VOCABULARY) for _ in range(words_per_paragraph)]
+        sentences = []
+        for i in range(0, len(words), 12):
+            sentence = " ".join(words[i:i + 12])
+            sentences.append(sentence[:1].upper() + sentence[1:] + ".")
+        paragraphs.append(" ".join(sentences))
+    return paragraphs
+
+
+def write_txt(path: Path, paragraphs: List[str]) -> None:
+    path.write_text("\n\n".join(paragraphs), encoding="utf-8")
+
+
+def write_pdf(path: Path, pages: List[List[str]]) -> None:
+    """Schreibt ein minimales PDF (Helvetica, eine Textzeile pro Eintrag)"""
+    objects: List[bytes] = []
+
+    def add(obj: bytes) -> int:
+        objects.append(obj)
+        return len(objects)
+
+    catalog_id = add(b"")  # Platzhalter, wird unten gesetzt
+    pages_id = add(b"")
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    page_ids = []
+    for lines in pages:
+        content = ["BT /F1 9 Tf 40 800 Td 11 TL"]
+        for line in lines:
+            safe = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            content.append(f"({safe}) Tj T*")
+        content.append("ET")
+        stream = "\n".join(content).encode("latin-1", "replace")
+        content_id = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+            % (pages_id, font_id, content_id)
+        ))
+
+    objects[catalog_id - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id
+    kids = b" ".join(b"%d 0 R" % pid for pid in page_ids)
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, catalog_id, xref
+    )
+    path.write_bytes(bytes(out))
+
+
+def write_docx(path: Path, paragraphs: List[str]) -> None:
+    """Schreibt ein minimales DOCX (nur Absätze)"""
+    body = "".join(
+        f"<w:p><w:r><w:t xml:space=\"preserve\">{escape(p)}</w:t></w:r></w:p>" for p in paragraphs
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("[Content_Types].xml", (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            '</Types>'
+        ))
+        z.writestr("_rels/.rels", (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="word/document.xml"/></Relationships>'
+        ))
+        z.writestr("word/document.xml", (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f'<w:body>{body}</w:body></w:document>'
+        ))
+
+
+def generate_corpus(
+    folder: Path,
+    files_per_type: int = 5,
+    paragraphs_per_file: int = 20,
+    types: tuple = (".pdf", ".txt", ".docx"),
+    seed: int = 42,
+) -> Dict[str, List[Path]]:
+    """Erzeugt einen synthetischen Korpus und gibt die Dateien pro Typ zurück"""
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    files: Dict[str, List[Path]] = {t: [] for t in types}
+
+    for file_type in types:
+        for n in range(files_per_type):
+            paragraphs = make_paragraphs(rng, paragraphs_per_file)
+            path = folder / f"synthetisch_{n:04d}{file_type}"
+            if file_type == ".txt":
+                write_txt(path, paragraphs)
+            elif file_type == ".pdf":
+                # ~4 Absätze pro Seite, Zeilen à ~100 Zeichen
+                pages = []
+                for i in range(0, len(paragraphs), 4):
+                    text = " ".join(paragraphs[i:i + 4])
+                    pages.append([text[j:j + 100] for j in range(0, len(text), 100)])
+                write_pdf(path, pages)
+            elif file_type == ".docx":
+                write_docx(path, paragraphs)
+            else:
+                raise ValueError(f"Unbekannter Dateityp: {file_type}")
+            files[file_type].append(path)
+
+    return files
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# benchmarks/eval_retrieval.py
+"""
+Retrieval-Evaluation: Golden Set (Frage → erwartete Quelldateien) über ein
+Raster aus Chunking-Parametern (CHUNK_SIZE, CHUNK_OVERLAP) und k.
+
+Pro Chunking-Variante wird der Korpus in eine eigene Collection importiert
+(gleicher Pfad wie load_documents.py), dann läuft jede Frage durch
+RAGPipeline.retrieve. Ausgegeben werden recall@k, MRR, Kontextgröße und
+p50/p95/p99 der Retrieval-Latenz als JSON.
+
+Golden Set (JSONL, eine Zeile pro Frage):
+    {"question": "Wer hat ...?", "expected_sources": ["buch.pdf"]}
+
+Beispiele:
+    # Echte Dokumente, Ollama-Embeddings, ChromaDB-Server
+    python src/benchmarks/eval_retrieval.py --folder data/documents \\
+        --golden golden.jsonl --chunk-sizes 500 1000 --chunk-overlaps 100 200 --k 3 5
+
+    # Komplett offline (synthetischer Korpus, Hash-Embeddings, In-Process-ChromaDB)
+    python src/benchmarks/eval_retrieval.py --synthetic --embeddings hash --chroma memory
+"""
+import argparse
+import json
+import logging
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Füge Parent-Directory zum Path hinzu
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import chromadb
+from langchain_chroma import Chroma
+
+from app.config import Config
+from app.document_processor import DocumentProcessor
+from app.hash_embeddings import HashEmbeddings
+from app.ingestion import store_chunks_in_batches
+from app.rag_pipeline import RAGPipeline
+from benchmarks.corpus import generate_corpus
+from benchmarks.stats import latency_summary
+
+logger = logging.getLogger(__name__)
+
+
+def load_golden_set(path: Path) -> List[dict]:
+    """Liest das Golden Set (JSONL) und prüft die Pflichtfelder"""
+    golden = []
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if not entry.get("question") or not entry.get("expected_sources"):
+                raise ValueError(f"Zeile {line_no}: 'question' und 'expected_sources' erforderlich")
+            golden.append(entry)
+    return golden
+
+
+def make_synthetic_golden_set(folder: Path, questions_per_file: int = 2, seed: int = 42) -> List[dict]:
+    """Fragen aus zufälligen Textausschnitten der TXT-Dateien (Quelle ist bekannt)"""
+    rng = random.Random(seed)
+    golden = []
+    for path in sorted(folder.glob("*.txt")):
+        words = path.read_text(encoding="utf-8").split()
+        for _ in range(questions_per_file):
+            start = rng.randrange(max(1, len(words) - 12))
+            golden.append({
+                "question": " ".join(words[start:start + 12]),
+                "expected_sources": [path.name],
+            })
+    return golden
+
+
+def score_ranking(retrieved: List[str], expected: List[str], k: int) -> Dict[str, float]:
+    """
+    recall@k: Anteil der erwarteten Dateien unter den Top-k
+    reciprocal_rank: 1 / Rang des ersten relevanten Chunks (0 wenn keiner)
+    """
+    top_k = retrieved[:k]
+    expected_set = set(expected)
+    recall = len(expected_set & set(top_k)) / len(expected_set)
+    reciprocal_rank = 0.0
+    for rank, source in enumerate(top_k, 1):
+        if source in expected_set:
+            reciprocal_rank = 1.0 / rank
+            break
+    return {"recall": recall, "reciprocal_rank": reciprocal_rank}
+
+
+def create_vectorstore(collection_name: str, embeddings, chroma: str):
+    if chroma == "memory":
+        return Chroma(
+            collection_name=collection_name,
+            embedding_function=embeddings,
+            client=chromadb.EphemeralClient(),
+        )
+    from app.chroma_client import get_chroma_vectorstore
+    return get_chroma_vectorstore(embedding_model=embeddings, collection_name=collection_name)
+
+
+def evaluate_chunking(
+    folder: Path,
+    golden: List[dict],
+    chunk_size: int,
+    chunk_overlap: int,
+    k_values: List[int],
+    embeddings,
+    chroma: str = "memory",
+    file_types: List[str] = None,
+    keep_collection: bool = False,
+) -> List[dict]:
+    """Importiert den Korpus mit einer Chunking-Variante und wertet alle k aus"""
+    collection_name = f"eval-{chunk_size}-{chunk_overlap}"
+    vectorstore = create_vectorstore(collection_name, embeddings, chroma)
+
+    try:
+        start = time.perf_counter()
+        if vectorstore._collection.count() == 0:
+            processor = DocumentProcessor(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+            chunks = processor.load_and_process_folder(folder, file_types)
+            store_chunks_in_batches(vectorstore, chunks, batch_size=10, retry_wait=1.0)
+        ingest_seconds = time.perf_counter() - start
+        chunk_count = vectorstore._collection.count()
+
+        pipeline = RAGPipeline(vectorstore, collection_name=collection_name)
+        max_k = max(k_values)
+
+        # Einmal mit max_k abfragen; kleinere k sind Präfixe desselben Rankings.
+        # Die Latenz wird trotzdem pro k gemessen, weil sie mit k wächst.
+        rankings = []
+        for entry in golden:
+            docs_with_scores = pipeline.retrieve(entry["question"], k=max_k)
+            rankings.append(docs_with_scores)
+
+        results = []
+        for k in k_values:
+            latencies = []
+            for entry in golden:
+                start = time.perf_counter()
+                pipeline.retrieve(entry["question"], k=k)
+                latencies.append(time.perf_counter() - start)
+
+            recalls, reciprocal_ranks, context_chars = [], [], []
+            for entry, docs_with_scores in zip(golden, rankings):
+                top = docs_with_scores[:k]
+                retrieved = [doc.metadata.get("filename", "") for doc, _ in top]
+                scores = score_ranking(retrieved, entry["expected_sources"], k)
+                recalls.append(scores["recall"])
+                reciprocal_ranks.append(scores["reciprocal_rank"])
+                context_chars.append(sum(len(doc.page_content) for doc, _ in top))
+
+            n = len(golden) or 1
+            results.append({
+                "chunk_size": chunk_size,
+                "chunk_overlap": chunk_overlap,
+                "k": k,
+                "questions": len(golden),
+                "chunks": chunk_count,
+                "ingest_seconds": ingest_seconds,
+                "recall@k": sum(recalls) / n,
+                "mrr": sum(reciprocal_ranks) / n,
+                "mean_context_chars": sum(context_chars) / n,
+                "retrieval_latency": latency_summary(latencies),
+            })
+        return results
+    finally:
+        if not keep_collection:
+            try:
+                vectorstore.delete_collection()
+            except Exception as e:
+                logger.warning(f"⚠️  Collection {collection_name} nicht gelöscht: {e}")
+
+
+def run_grid(
+    folder: Path,
+    golden: List[dict],
+    chunk_sizes: List[int],
+    chunk_overlaps: List[int],
+    k_values: List[int],
+    embeddings,
+    chroma: str = "memory",
+    file_types: List[str] = None,
+    keep_collections: bool = False,
+) -> List[dict]:
+    """Wertet alle gültigen (chunk_size, chunk_overlap)-Kombinationen aus"""
+    results = []
+    for chunk_size in chunk_sizes:
+        for chunk_overlap in chunk_overlaps:
+            if chunk_overlap >= chunk_size:
+                logger.warning(f"⏭️  Überspringe chunk_size={chunk_size}, chunk_overlap={chunk_overlap}")
+                continue
+            logger.info(f"📐 chunk_size={chunk_size}, chunk_overlap={chunk_overlap}")
+            results.extend(evaluate_chunking(
+                folder, golden, chunk_size, chunk_overlap, k_values, embeddings,
+                chroma=chroma, file_types=file_types, keep_collection=keep_collections,
+            ))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrieval-Evaluation (recall@k, MRR, Latenz)")
+    parser.add_argument("--folder", type=str, default=None, help="Dokumenten-Ordner")
+    parser.add_argument("--golden", type=str, default=None, help="Golden Set (JSONL)")
+    parser.add_argument(
+        "--synthetic", action="store_true",
+        help="Synthetischen TXT-Korpus und Golden Set erzeugen"
+    )
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[Config.CHUNK_SIZE])
+    parser.add_argument("--chunk-overlaps", type=int, nargs="+", default=[Config.CHUNK_OVERLAP])
+    parser.add_argument("--k", type=int, nargs="+", default=[3, 5, 10], help="k-Werte (default: 3 5 10)")
+    parser.add_argument(
+        "--embeddings", choices=["ollama", "hash"], default="ollama",
+        help="Ollama (default) oder deterministische Hash-Embeddings"
+    )
+    parser.add_argument(
+        "--chroma", choices=["server", "memory"], default="server",
+        help="ChromaDB-Server (default) oder In-Process-Client"
+    )
+    parser.add_argument("--keep-collections", action="store_true", help="Eval-Collections nicht löschen")
+    parser.add_argument("--output", type=str, default=None, help="Ergebnis als JSON speichern")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    # Batch-Logs des Imports unterdrücken
+    logging.getLogger("app.ingestion").setLevel(logging.WARNING)
+
+    if not args.synthetic and not (args.folder and args.golden):
+        parser.error("--folder und --golden angeben oder --synthetic nutzen")
+
+    if args.embeddings == "hash":
+        embeddings = HashEmbeddings()
+    else:
+        from app.chroma_client import create_embedding_model
+        embeddings = create_embedding_model(batch_queries=False)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.synthetic:
+            folder = Path(tmp)
+            generate_corpus(folder, files_per_type=10, paragraphs_per_file=20, types=(".txt",))
+            golden = make_synthetic_golden_set(folder)
+        else:
+            folder = Path(args.folder)
+            golden = load_golden_set(Path(args.golden))
+
+        results = run_grid(
+            folder, golden, args.chunk_sizes, args.chunk_overlaps, sorted(args.k), embeddings,
+            chroma=args.chroma, keep_collections=args.keep_collections,
+        )
+
+    report = {"embeddings": args.embeddings, "chroma": args.chroma, "results": results}
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# benchmarks/load_test.py
+"""
+Lastgenerator: viele gleichzeitige Chat-Sessions (mehrere Turns mit Verlauf)
+gegen die RAG Pipeline, wahlweise gegen den lokalen Ollama-Stub
+(benchmarks/ollama_stub.py, Standard) oder einen echten Ollama-Server.
+
+Gemessen werden Durchsatz (Fragen/s, Tokens/s), Tail-Latenzen (Antwortzeit,
+Time-to-First-Token, Retrieval) und Fehler. Scheduler, Query-Batching und
+Abbruch laufen genau wie in der App, der Korpus liegt in einem
+In-Process-ChromaDB-Client.
+
+Beispiele:
+    # 16 Sessions à 3 Turns gegen den Stub (startet automatisch)
+    python src/benchmarks/load_test.py --sessions 16 --turns 3 --output load.json
+
+    # Langsamer, fehleranfälliger Server
+    python src/benchmarks/load_test.py --tokens-per-second 10 --error-rate 0.05 --abort-rate 0.05
+
+    # Gegen einen extern gestarteten Stub oder echten Ollama-Server
+    python src/benchmarks/load_test.py --ollama-url http://localhost:11500
+"""
+import argparse
+import json
+import logging
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+
+# Füge Parent-Directory zum Path hinzu
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import chromadb
+from langchain_chroma import Chroma
+
+from app.chat_memory import ChatMemory
+from app.config import Config
+from app.document_processor import DocumentProcessor
+from app.ingestion import store_chunks_in_batches
+from app.metrics import get_metrics
+from benchmarks.corpus import VOCABULARY, generate_corpus
+from benchmarks.ollama_stub import add_stub_arguments, start_stub_server, stub_config_from_args
+from benchmarks.stats import latency_summary
+
+logger = logging.getLogger(__name__)
+
+
+def make_question(rng: random.Random) -> str:
+    words = [rng.choice(VOCABULARY) for _ in range(rng.randint(4, 10))]
+    return "Was steht über " + " ".join(words) + "?"
+
+
+def build_pipeline(folder: Path, chunk_size: int = 1000, chunk_overlap: int = 200):
+    """Importiert den Korpus über Ollama-Embeddings (Config.OLLAMA_BASE_URL) und baut die Pipeline"""
+    # Erst hier importieren: Config.OLLAMA_BASE_URL ist dann schon gesetzt
+    from app.chroma_client import create_embedding_model
+    from app.rag_pipeline import RAGPipeline
+
+    vectorstore = Chroma(
+        collection_name=f"loadtest-{int(time.time() * 1000)}",
+        embedding_function=create_embedding_model(),
+        client=chromadb.EphemeralClient(),
+    )
+    processor = DocumentProcessor(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    chunks = processor.load_and_process_folder(folder, [".txt"])
+
+    start = time.perf_counter()
+    stats = store_chunks_in_batches(vectorstore, chunks, batch_size=10, retry_wait=0.5)
+    ingest_seconds = time.perf_counter() - start
+
+    ingest = {
+        "chunks": len(chunks),
+        "seconds": ingest_seconds,
+        "failed_batches": stats["failed_batches"],
+        "retries": stats["retries"],
+    }
+    return RAGPipeline(vectorstore, collection_name="loadtest-collection"), ingest
+
+
+def run_session(rag, session_id: int, turns: int, k: int, think_time: float, seed: int) -> List[dict]:
+    """Eine Chat-Session: mehrere Fragen mit Verlauf und Zusammenfassung"""
+    rng = random.Random(seed + session_id)
+    history, memory = [], ChatMemory()
+    results = []
+
+    for turn in range(turns):
+        question = make_question(rng)
+        result = {"session": session_id, "turn": turn, "outcome": "done", "tokens": 0}
+        answer = ""
+        start = time.perf_counter()
+
+        for event in rag.query_stream(question, k=k, history=history, memory=memory):
+            if event["type"] == "token":
+                if result["tokens"] == 0:
+                    result["ttft_seconds"] = time.perf_counter() - start
+                result["tokens"] += 1
+                answer += event["token"]
+            elif event["type"] == "queue":
+                result["queued"] = True
+            elif event["type"] == "metrics":
+                result["metrics"] = event["metrics"]
+            elif event["type"] in ("error", "cancelled"):
+                result["outcome"] = event["type"]
+                result["error"] = event.get("error")
+
+        result["latency_seconds"] = time.perf_counter() - start
+        results.append(result)
+
+        if result["outcome"] == "done":
+            history += [
+                {"role": "user", "content": question},
+                {"role": "assistant", "content": answer},
+            ]
+        if think_time:
+            time.sleep(rng.uniform(0, think_time))
+
+    return results
+
+
+def summarize(results: List[dict], wall_seconds: float) -> dict:
+    """Fasst die Ergebnisse aller Turns zu Durchsatz und Tail-Latenzen zusammen"""
+    done = [r for r in results if r["outcome"] == "done"]
+    tokens = sum(r["tokens"] for r in results)
+    retrieval = [r["metrics"]["retrieval_seconds"] for r in done if "metrics" in r]
+    tokens_per_second = [r["metrics"]["tokens_per_second"] for r in done if "tokens_per_second" in r.get("metrics", {})]
+
+    errors = {}
+    for r in results:
+        if r["outcome"] == "error":
+            errors[r["error"]] = errors.get(r["error"], 0) + 1
+
+    return {
+        "queries": len(results),
+        "completed": len(done),
+        "errors": sum(errors.values()),
+        "error_messages": errors,
+        "queued": sum(1 for r in results if r.get("queued")),
+        "wall_seconds": wall_seconds,
+        "queries_per_second": len(done) / wall_seconds if wall_seconds else 0.0,
+        "tokens_per_second": tokens / wall_seconds if wall_seconds else 0.0,
+        "latency": latency_summary([r["latency_seconds"] for r in done]),
+        "ttft": latency_summary([r["ttft_seconds"] for r in done if "ttft_seconds" in r]),
+        "retrieval": latency_summary(retrieval),
+        "per_stream_tokens_per_second_mean": (
+            sum(tokens_per_second) / len(tokens_per_second) if tokens_per_second else 0.0
+        ),
+    }
+
+
+def run_load_test(
+    sessions: int = 8,
+    turns: int = 3,
+    k: int = 3,
+    think_time: float = 0.0,
+    files: int = 10,
+    seed: int = 42,
+) -> dict:
+    """
+    Führt den Lasttest gegen Config.OLLAMA_BASE_URL aus
+
+    Returns:
+        dict mit 'ingest', 'summary' und 'results' (ein Eintrag pro Turn)
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        generate_corpus(Path(tmp), files_per_type=files, paragraphs_per_file=10, types=(".txt",), seed=seed)
+        rag, ingest = build_pipeline(Path(tmp))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions, thread_name_prefix="session") as executor:
+        futures = [
+            executor.submit(run_session, rag, i, turns, k, think_time, seed)
+            for i in range(sessions)
+        ]
+        results = [r for future in futures for r in future.result()]
+    wall_seconds = time.perf_counter() - start
+
+    return {
+        "ingest": ingest,
+        "summary": summarize(results, wall_seconds),
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lastgenerator für parallele RAG-Chat-Sessions")
+    parser.add_argument("--sessions", type=int, default=8, help="Gleichzeitige Sessions (default: 8)")
+    parser.add_argument("--turns", type=int, default=3, help="Fragen pro Session (default: 3)")
+    parser.add_argument("--k", type=int, default=3, help="Anzahl Chunks pro Frage (default: 3)")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Max. Pause zwischen Turns in Sekunden")
+    parser.add_argument("--files", type=int, default=10, help="Dateien im synthetischen Korpus (default: 10)")
+    parser.add_argument(
+        "--ollama-url", type=str, default=None,
+        help="Vorhandenen Ollama/Stub nutzen statt einen Stub zu starten"
+    )
+    parser.add_argument("--chat-concurrency", type=int, default=None, help="Überschreibt OLLAMA_CHAT_CONCURRENCY")
+    parser.add_argument("--output", type=str, default=None, help="Ergebnis als JSON speichern")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.WARNING,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    # Fehler werden im Report gezählt, keine Tracebacks pro Request
+    logging.getLogger("app.rag_pipeline").setLevel(logging.CRITICAL)
+
+    stub = None
+    if args.ollama_url:
+        Config.OLLAMA_BASE_URL = args.ollama_url
+    else:
+        stub = start_stub_server(config=stub_config_from_args(args))
+        Config.OLLAMA_BASE_URL = stub.url
+    if args.chat_concurrency:
+        Config.OLLAMA_CHAT_CONCURRENCY = args.chat_concurrency
+
+    try:
+        report = run_load_test(
+            sessions=args.sessions,
+            turns=args.turns,
+            k=args.k,
+            think_time=args.think_time,
+            files=args.files,
+        )
+    finally:
+        if stub is not None:
+            stub.shutdown()
+
+    report["config"] = {
+        "ollama_url": Config.OLLAMA_BASE_URL,
+        "sessions": args.sessions,
+        "turns": args.turns,
+        "chat_concurrency": Config.OLLAMA_CHAT_CONCURRENCY,
+    }
+    if stub is not None:
+        report["stub"] = stub.stats.snapshot()
+    report["counters"] = get_metrics().snapshot()
+
+    print(json.dumps({key: value for key, value in report.items() if key != "results"}, indent=2))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
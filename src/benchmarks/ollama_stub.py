@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+# benchmarks/ollama_stub.py
+"""
+Lokaler Stub-Server, der die Ollama-API für Embeddings und (Streaming-)Chat
+spricht - für Last- und Ausfalltests ohne GPU-Server.
+
+Endpunkte (Ausschnitt der Ollama-API):
+    GET  /                  "Ollama is running"
+    GET  /api/tags          Modell-Liste (Embedding- und Chat-Modell aus der Config)
+    POST /api/embed         {"model", "input": str | [str]} → {"embeddings": [...]}
+    POST /api/embeddings    {"model", "prompt"} → {"embedding": [...]} (alte API)
+    POST /api/chat          {"model", "messages", "stream"} → NDJSON-Stream oder JSON
+
+Embeddings sind deterministische Hash-Embeddings (app/hash_embeddings.py),
+Antworten zufällige Wörter aus dem Benchmark-Vokabular. Latenz, Token-Rate,
+Parallelität und Fehler sind konfigurierbar (StubConfig bzw. CLI-Optionen).
+
+Start:
+    python src/benchmarks/ollama_stub.py --port 11500 --tokens-per-second 30 --error-rate 0.05
+    OLLAMA_BASE_URL=http://localhost:11500 streamlit run src/Home.py
+
+Mehrere Instanzen für den Ollama-Pool (Ports 11500-11502, die erste fällt
+nach 200 Requests aus und antwortet nur noch mit HTTP 503):
+    python src/benchmarks/ollama_stub.py --instances 3 --fail-after 200
+    OLLAMA_CHAT_URLS=http://127.0.0.1:11500,http://127.0.0.1:11501 \
+    OLLAMA_EMBEDDING_URLS=http://127.0.0.1:11501,http://127.0.0.1:11502 \
+        python src/scripts/load_documents.py --folder data/documents
+"""
+import argparse
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, replace
+from datetime import datetime, timezone
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Füge Parent-Directory zum Path hinzu
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import Config
+from app.hash_embeddings import HashEmbeddings
+from benchmarks.corpus import VOCABULARY
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StubConfig:
+    """Verhalten des Stub-Servers"""
+
+    embedding_dim: int = 768
+    embed_latency_ms: float = 20.0           # fester Anteil pro Embedding-Request
+    embed_latency_per_text_ms: float = 2.0   # zusätzlich pro Text im Batch
+    ttft_ms: float = 300.0                   # Zeit bis zum ersten Token
+    tokens_per_second: float = 30.0          # Generierungs-Geschwindigkeit
+    answer_tokens: int = 120                 # Tokens pro Antwort
+    parallel: int = 4                        # gleichzeitige Generierungen (wie OLLAMA_NUM_PARALLEL)
+    error_rate: float = 0.0                  # Anteil Requests mit HTTP 500
+    abort_rate: float = 0.0                  # Anteil Chat-Streams, die mittendrin abbrechen
+    fail_after: int = 0                      # nach so vielen Requests nur noch HTTP 503 (0 = nie)
+    seed: int = 42
+
+
+class StubStats:
+    """Zähler des Stub-Servers (thread-sicher)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {
+            "embed_requests": 0,
+            "embedded_texts": 0,
+            "chat_requests": 0,
+            "streamed_tokens": 0,
+            "injected_errors": 0,
+            "injected_aborts": 0,
+            "client_disconnects": 0,
+            "requests": 0,
+            "unavailable": 0,
+        }
+
+    def inc(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.counters)
+
+
+class OllamaStubHandler(BaseHTTPRequestHandler):
+    """HTTP-Handler mit Ollama-kompatiblen Antworten"""
+
+    server_version = "OllamaStub/1.0"
+    protocol_version = "HTTP/1.1"
+
+    # ---- Routing ----
+
+    def _unavailable(self) -> bool:
+        """Simulierter Ausfall: nach fail_after Requests nur noch 503"""
+        self.server.stats.inc("requests")
+        fail_after = self.server.config.fail_after
+        if fail_after and self.server.stats.snapshot()["requests"] > fail_after:
+            self.server.stats.inc("unavailable")
+            self._send_error(HTTPStatus.SERVICE_UNAVAILABLE, "stub unavailable")
+            return True
+        return False
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0].rstrip("/")
+        if self._unavailable():
+            return
+        if path == "":
+            self._send_text("Ollama is running")
+        elif path == "/api/tags":
+            self._send_json({"models": [
+                {"name": Config.OLLAMA_EMBEDDING_MODEL, "model": Config.OLLAMA_EMBEDDING_MODEL},
+                {"name": Config.OLLAMA_MODEL, "model": Config.OLLAMA_MODEL},
+            ]})
+        elif path == "/api/version":
+            self._send_json({"version": "0.0.0-stub"})
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, f"unknown path: {path}")
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0].rstrip("/")
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError as e:
+            self._send_error(HTTPStatus.BAD_REQUEST, f"invalid JSON: {e}")
+            return
+        if self._unavailable():
+            return
+
+        if path not in ("/api/embed", "/api/embeddings", "/api/chat"):
+            self._send_error(HTTPStatus.NOT_FOUND, f"unknown path: {path}")
+            return
+
+        if self._roll(self.server.config.error_rate):
+            self.server.stats.inc("injected_errors")
+            self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, "injected error")
+            return
+
+        if path == "/api/chat":
+            self._handle_chat(body)
+        else:
+            self._handle_embed(body, legacy=(path == "/api/embeddings"))
+
+    # ---- Handler ----
+
+    def _handle_embed(self, body: dict, legacy: bool):
+        config = self.server.config
+        texts = [body.get("prompt", "")] if legacy else body.get("input", [])
+        if isinstance(texts, str):
+            texts = [texts]
+
+        start = time.perf_counter()
+        time.sleep((config.embed_latency_ms + config.embed_latency_per_text_ms * len(texts)) / 1000)
+        vectors = self.server.embeddings.embed_documents(texts)
+        self.server.stats.inc("embed_requests")
+        self.server.stats.inc("embedded_texts", len(texts))
+
+        if legacy:
+            self._send_json({"embedding": vectors[0] if vectors else []})
+            return
+        self._send_json({
+            "model": body.get("model", Config.OLLAMA_EMBEDDING_MODEL),
+            "embeddings": vectors,
+            "total_duration": int((time.perf_counter() - start) * 1e9),
+            "load_duration": 0,
+            "prompt_eval_count": sum(len(t.split()) for t in texts),
+        })
+
+    def _handle_chat(self, body: dict):
+        config = self.server.config
+        model = body.get("model", Config.OLLAMA_MODEL)
+        stream = body.get("stream", True)
+        self.server.stats.inc("chat_requests")
+
+        num_predict = (body.get("options") or {}).get("num_predict") or config.answer_tokens
+        n_tokens = max(1, min(config.answer_tokens, int(num_predict)))
+        abort_at = self._rng().randrange(n_tokens) if self._roll(config.abort_rate) else None
+        words = [self._rng().choice(VOCABULARY) for _ in range(n_tokens)]
+
+        # Begrenzte Parallelität wie bei Ollama: weitere Requests warten
+        with self.server.generation_slots:
+            start = time.perf_counter()
+            time.sleep(config.ttft_ms / 1000)
+
+            if not stream:
+                time.sleep(max(0, n_tokens - 1) / config.tokens_per_second)
+                self._send_json(self._chat_message(model, " ".join(words), start, n_tokens, done=True))
+                return
+
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            try:
+                for i, word in enumerate(words):
+                    if i == abort_at:
+                        # Verbindung hart schließen, ohne abschließenden Chunk
+                        self.server.stats.inc("injected_aborts")
+                        self.close_connection = True
+                        return
+                    if i > 0:
+                        time.sleep(1 / config.tokens_per_second)
+                    token = word if i == 0 else " " + word
+                    self._write_chunk(self._chat_message(model, token, start, i + 1, done=False))
+                    self.server.stats.inc("streamed_tokens")
+                self._write_chunk(self._chat_message(model, "", start, n_tokens, done=True))
+                self.wfile.write(b"0\r\n\r\n")
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                # Client hat den Stream geschlossen (z.B. Abbruch im Chat)
+                self.server.stats.inc("client_disconnects")
+                self.close_connection = True
+
+    # ---- Helfer ----
+
+    def _chat_message(self, model: str, content: str, start: float, eval_count: int, done: bool) -> dict:
+        message = {
+            "model": model,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "message": {"role": "assistant", "content": content},
+            "done": done,
+        }
+        if done:
+            duration = int((time.perf_counter() - start) * 1e9)
+            message.update({
+                "done_reason": "stop",
+                "total_duration": duration,
+                "load_duration": 0,
+                "prompt_eval_count": 0,
+                "eval_count": eval_count,
+                "eval_duration": duration,
+            })
+        return message
+
+    def _write_chunk(self, data: dict):
+        line = (json.dumps(data) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+        self.wfile.flush()
+
+    def _rng(self) -> random.Random:
+        return self.server.rng
+
+    def _roll(self, rate: float) -> bool:
+        return rate > 0 and self._rng().random() < rate
+
+    def _send_json(self, data: dict, status: HTTPStatus = HTTPStatus.OK):
+        self._send_text(json.dumps(data), status, "application/json; charset=utf-8")
+
+    def _send_text(self, text: str, status: HTTPStatus = HTTPStatus.OK, content_type: str = "text/plain; charset=utf-8"):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: HTTPStatus, message: str):
+        self._send_json({"error": message}, status=status)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class OllamaStubServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer mit Stub-Konfiguration, Zählern und Generierungs-Slots"""
+
+    daemon_threads = True
+
+    def __init__(self, address, config: StubConfig = None):
+        super().__init__(address, OllamaStubHandler)
+        self.config = config or StubConfig()
+        self.stats = StubStats()
+        self.embeddings = HashEmbeddings(dim=self.config.embedding_dim)
+        self.generation_slots = threading.BoundedSemaphore(max(1, self.config.parallel))
+        # random.Random ist für einzelne Aufrufe thread-sicher genug
+        self.rng = random.Random(self.config.seed)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0, config: StubConfig = None) -> OllamaStubServer:
+    """Startet den Stub in einem Hintergrund-Thread (port=0: freier Port)"""
+    server = OllamaStubServer((host, port), config)
+    thread = threading.Thread(target=server.serve_forever, name="ollama-stub", daemon=True)
+    thread.start()
+    logger.info(f"🧪 Ollama-Stub läuft auf {server.url}")
+    return server
+
+
+def start_stub_servers(count: int, host: str = "127.0.0.1", port: int = 0, configs=None) -> list:
+    """
+    Startet mehrere Stubs (z.B. für den Ollama-Pool). port=0: freie Ports,
+    sonst fortlaufend ab port. configs: eine StubConfig pro Instanz (optional)
+    """
+    configs = configs or [None] * count
+    return [
+        start_stub_server(host, port + i if port else 0, config)
+        for i, config in enumerate(configs[:count])
+    ]
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser) -> None:
+    """CLI-Optionen für StubConfig (auch vom Lastgenerator genutzt)"""
+    defaults = StubConfig()
+    parser.add_argument("--embed-latency-ms", type=float, default=defaults.embed_latency_ms)
+    parser.add_argument("--embed-latency-per-text-ms", type=float, default=defaults.embed_latency_per_text_ms)
+    parser.add_argument("--ttft-ms", type=float, default=defaults.ttft_ms, help="Zeit bis zum ersten Token")
+    parser.add_argument("--tokens-per-second", type=float, default=defaults.tokens_per_second)
+    parser.add_argument("--answer-tokens", type=int, default=defaults.answer_tokens)
+    parser.add_argument("--parallel", type=int, default=defaults.parallel, help="Gleichzeitige Generierungen")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="Anteil HTTP-500-Antworten")
+    parser.add_argument("--abort-rate", type=float, default=defaults.abort_rate, help="Anteil abgebrochener Streams")
+    parser.add_argument("--embedding-dim", type=int, default=defaults.embedding_dim)
+
+
+def stub_config_from_args(args: argparse.Namespace) -> StubConfig:
+    return StubConfig(
+        embedding_dim=args.embedding_dim,
+        embed_latency_ms=args.embed_latency_ms,
+        embed_latency_per_text_ms=args.embed_latency_per_text_ms,
+        ttft_ms=args.ttft_ms,
+        tokens_per_second=args.tokens_per_second,
+        answer_tokens=args.answer_tokens,
+        parallel=args.parallel,
+        error_rate=args.error_rate,
+        abort_rate=args.abort_rate,
+        fail_after=getattr(args, "fail_after", 0),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ollama-Stub-Server für Last- und Ausfalltests")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=11500, help="Port (default: 11500)")
+    parser.add_argument(
+        "--instances", type=int, default=1,
+        help="Anzahl Stubs auf fortlaufenden Ports (für den Ollama-Pool)"
+    )
+    parser.add_argument(
+        "--fail-after", type=int, default=0,
+        help="Erste Instanz antwortet nach so vielen Requests nur noch mit 503 (0 = nie)"
+    )
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    config = stub_config_from_args(args)
+    if args.instances > 1:
+        # Nur die erste Instanz fällt aus, die übrigen bleiben stabil
+        configs = [config] + [replace(config, fail_after=0) for _ in range(args.instances - 1)]
+        servers = start_stub_servers(args.instances, args.host, args.port, configs)
+        urls = ",".join(server.url for server in servers)
+        logger.info(f"🧪 {len(servers)} Ollama-Stubs: {urls} - {asdict(config)}")
+        logger.info(f"   OLLAMA_CHAT_URLS={urls} OLLAMA_EMBEDDING_URLS={urls}")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            for server in servers:
+                logger.info(f"👋 {server.url} beendet - {server.stats.snapshot()}")
+                server.shutdown()
+                server.server_close()
+        return
+
+    server = OllamaStubServer((args.host, args.port), config)
+    logger.info(f"🧪 Ollama-Stub auf {server.url} - {asdict(config)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info(f"👋 Stub beendet - {server.stats.snapshot()}")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
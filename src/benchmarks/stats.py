@@ -0,0 +1,31 @@
+# benchmarks/stats.py
+"""
+Kleine Statistik-Helfer für Benchmarks (Perzentile ohne numpy-Pflicht)
+"""
+import math
+from typing import Dict, Sequence
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Perzentil mit linearer Interpolation (wie numpy.percentile)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    if low == high:
+        return ordered[int(rank)]
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def latency_summary(seconds: Sequence[float]) -> Dict[str, float]:
+    """p50/p95/p99/Mittel/Max in Millisekunden"""
+    ms = [s * 1000 for s in seconds]
+    return {
+        "count": len(ms),
+        "mean_ms": sum(ms) / len(ms) if ms else 0.0,
+        "p50_ms": percentile(ms, 50),
+        "p95_ms": percentile(ms, 95),
+        "p99_ms": percentile(ms, 99),
+        "max_ms": max(ms) if ms else 0.0,
+    }
@@ -3,14 +3,20 @@ import streamlit as st
 import logging
 from pathlib import Path
 import tempfile
+import shutil
 import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.document_processor import DocumentProcessor
-from app.chroma_client import get_chroma_vectorstore
+from app.chroma_client import get_chroma_vectorstore, create_embedding_model
 from app.config import Config
-from langchain_ollama import OllamaEmbeddings
+from app.catalog_index import get_catalog_index
+from app.collection_inventory import get_inventory
+from app.ingestion import rebuild_stale_sidecars, remove_files, store_chunk_stream, store_chunks_in_batches
+from app.summary_index import get_summary_index
+from app.parent_store import get_parent_store
+from app.ingestion_report import IngestionReport, list_reports
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -28,10 +34,7 @@ if "selected_collection" not in st.session_state:
 @st.cache_resource
 def get_embedding_model():
     """Erstellt Ollama Embedding Model"""
-    return OllamaEmbeddings(
-        base_url=Config.OLLAMA_BASE_URL,
-        model=Config.OLLAMA_EMBEDDING_MODEL
-    )
+    return create_embedding_model()
 
 def get_vectorstore_for_collection(collection_name: str):
     """Erstellt Vectorstore für spezifische Collection"""
@@ -82,7 +85,7 @@ with st.sidebar:
             f"{count} Docs")
 
 # Tabs für verschiedene Aktionen
-tab1, tab2, tab3 = st.tabs(["📤 Upload", "📊 Übersicht", "🗑️ Verwaltung"])
+tab1, tab2, tab3, tab4 = st.tabs(["📤 Upload", "📊 Übersicht", "🗑️ Verwaltung", "📝 Import-Berichte"])
 
 # Tab 1: Upload
 with tab1:
@@ -125,46 +128,94 @@ with tab1:
                     delete=False, 
                     suffix=Path(uploaded_file.name).suffix
                 ) as tmp_file:
-                    tmp_file.write(uploaded_file.getvalue())
+                    # Ohne getvalue(): keine zusätzliche Kopie der ganzen Datei
+                    shutil.copyfileobj(uploaded_file, tmp_file)
                     tmp_path = Path(tmp_file.name)
                 
                 # Progress anzeigen
                 progress_bar = st.progress(0, "Lade Dokument...")
                 
                 # Dokument verarbeiten
-                processor = DocumentProcessor()
+                processor = DocumentProcessor.for_collection(selected_collection)
                 progress_bar.progress(30, "Verarbeite Text...")
                 
-                chunks = processor.load_and_process_file(tmp_path)
+                report = IngestionReport(selected_collection, source="upload", settings={
+                    "batch_size": batch_size,
+                    "chunk_size": processor.chunk_size,
+                    "chunk_overlap": processor.chunk_overlap,
+                    "small_to_big": processor.small_to_big,
+                    "embedding_model": Config.OLLAMA_EMBEDDING_MODEL,
+                })
+                timings = {}
+                # Große TXT-Dateien werden gestreamt (Chunks entstehen beim Speichern)
+                streaming = processor.is_large_text(tmp_path)
+                if streaming:
+                    chunks = processor.iter_text_chunks(tmp_path, timings)
+                else:
+                    chunks = processor.load_and_process_file(tmp_path, timings)
+                    report.add_file(tmp_path, chunks, timings, name=uploaded_file.name)
+                if processor.small_to_big:
+                    # Parents lokal ablegen, nur die Children einbetten
+                    chunks = processor.iter_children(chunks, get_parent_store(selected_collection))
+                    if not streaming:
+                        chunks = list(chunks)
                 progress_bar.progress(60, "Erstelle Embeddings...")
                 
                 # In ChromaDB speichern mit Batching (wichtig für große Dokumente!)
                 vectorstore = get_vectorstore_for_collection(selected_collection)
                 
-                total_chunks = len(chunks)
-                
-                logger.info(f"Speichere {total_chunks} Chunks in Batches von {batch_size}...")
+                if streaming:
+                    logger.info(f"Streame {uploaded_file.name} in Batches von {batch_size}...")
+                else:
+                    logger.info(f"Speichere {len(chunks)} Chunks in Batches von {batch_size}...")
                 
-                # Verarbeite in Batches
-                for i in range(0, total_chunks, batch_size):
-                    batch = chunks[i:i + batch_size]
-                    batch_num = (i // batch_size) + 1
-                    total_batches = (total_chunks + batch_size - 1) // batch_size
-                    
-                    # Progress aktualisieren
-                    progress_pct = 60 + int((i / total_chunks) * 40)
+                def show_batch_progress(batch_num, total_batches):
+                    progress_pct = 60 + int(((batch_num - 1) / total_batches) * 40)
                     progress_bar.progress(
                         progress_pct, 
                         f"Speichere Batch {batch_num}/{total_batches}..."
                     )
-                    
-                    try:
-                        vectorstore.add_documents(batch)
-                    except Exception as batch_error:
-                        st.warning(f"⚠️ Batch {batch_num} fehlgeschlagen: {batch_error}")
-                        logger.error(f"Batch {batch_num} error: {batch_error}")
-                        # Fahre mit nächstem Batch fort
-                        continue
+                
+                catalog_index = None
+                if selected_collection in Config.CATALOG_INDEX_COLLECTIONS:
+                    catalog_index = get_catalog_index(selected_collection)
+                
+                summary_index = None
+                if selected_collection in Config.SUMMARY_INDEX_COLLECTIONS:
+                    summary_index = get_summary_index(vectorstore)
+                
+                inventory = get_inventory(selected_collection)
+                inventory.ensure_built(vectorstore._collection)
+                
+                # Verarbeite in Batches (fehlgeschlagene Batches werden übersprungen)
+                store = store_chunk_stream if streaming else store_chunks_in_batches
+                stats = store(
+                    vectorstore,
+                    chunks,
+                    batch_size=batch_size,
+                    max_retries=1,
+                    catalog_index=catalog_index,
+                    inventory=inventory,
+                    summary_index=summary_index,
+                    on_batch=show_batch_progress
+                )
+                if streaming:
+                    report.add_file(tmp_path, stats["chunks"], timings, name=uploaded_file.name)
+                for failure in stats["errors"]:
+                    st.warning(f"⚠️ Batch {failure['batch']} fehlgeschlagen: {failure['error']}")
+                if stats["stale_sidecars"]:
+                    st.warning(f"⚠️ Neuaufbau nach Fehler: {', '.join(stats['stale_sidecars'])}")
+                    rebuild_stale_sidecars(
+                        vectorstore,
+                        stats["stale_sidecars"],
+                        catalog_index=catalog_index,
+                        inventory=inventory,
+                        summary_index=summary_index
+                    )
+                
+                report.add_storage(stats)
+                report.finish(collection_count=vectorstore._collection.count())
+                report.save()
                 
                 progress_bar.progress(100, "Fertig!")
                 
@@ -172,11 +223,12 @@ with tab1:
                 tmp_path.unlink()
                 
                 st.success(f"✅ **{uploaded_file.name}** erfolgreich in '{selected_collection}' hochgeladen!")
-                st.info(f"📊 {len(chunks)} Text-Chunks erstellt")
+                st.info(f"📊 {stats['chunks'] if streaming else len(chunks)} Text-Chunks erstellt")
                 
                 # Zeige Beispiel-Chunk
-                with st.expander("👀 Vorschau erstes Chunk"):
-                    st.text(chunks[0].page_content[:500] + "...")
+                if not streaming:
+                    with st.expander("👀 Vorschau erstes Chunk"):
+                        st.text(chunks[0].page_content[:500] + "...")
                 
                 st.balloons()
                 
@@ -206,35 +258,87 @@ with tab2:
         if doc_count > 0:
             st.divider()
             
-            # Hole Sample-Dokumente
-            results = collection.get(limit=50, include=['metadatas'])
+            # Inventar (SQLite) statt Scan über die Chunks in ChromaDB
+            inventory = get_inventory(selected_collection)
+            if not inventory.is_built():
+                with st.spinner("Baue Inventar auf (einmalig)..."):
+                    inventory.ensure_built(collection)
             
-            if results and results['metadatas']:
-                # Extrahiere eindeutige Dateinamen
-                filenames = {}
-                for metadata in results['metadatas']:
-                    if 'filename' in metadata:
-                        fname = metadata['filename']
-                        filenames[fname] = filenames.get(fname, 0) + 1
-                
-                st.subheader(f"📄 Hochgeladene Dokumente ({len(filenames)})")
-                
-                # Zeige als Tabelle
-                import pandas as pd
-                df = pd.DataFrame([
-                    {"Dateiname": fname, "Chunks": count}
-                    for fname, count in sorted(filenames.items())
-                ])
-                st.dataframe(df, use_container_width=True, hide_index=True)
-                
-                # Download-Option
-                csv = df.to_csv(index=False)
-                st.download_button(
-                    label="📥 Liste als CSV",
-                    data=csv,
-                    file_name=f"{selected_collection}_dokumente.csv",
-                    mime="text/csv"
+            totals = inventory.totals()
+            if totals["chunks"] != doc_count:
+                st.warning(
+                    f"⚠️ Inventar kennt {totals['chunks']} von {doc_count} Chunks "
+                    "(z.B. nach Import ohne Inventar)."
                 )
+                if st.button("🔄 Inventar neu aufbauen"):
+                    with st.spinner("Baue Inventar neu auf..."):
+                        inventory.rebuild(collection)
+                    st.rerun()
+            
+            st.subheader(f"📄 Hochgeladene Dokumente ({totals['files']})")
+            
+            col1, col2, col3 = st.columns([3, 1, 1])
+            with col1:
+                search = st.text_input("🔍 Dateiname enthält", key=f"inventory_search_{selected_collection}")
+            with col2:
+                sort_labels = {
+                    "filename": "Name",
+                    "chunks": "Chunks",
+                    "chars": "Größe",
+                    "last_ingested_at": "Zuletzt importiert",
+                }
+                order_by = st.selectbox("Sortierung", list(sort_labels), format_func=sort_labels.get)
+            with col3:
+                page_size = st.selectbox("Pro Seite", [25, 50, 100, 250], index=1)
+            
+            matching = inventory.count_files(search)
+            pages = max(1, (matching + page_size - 1) // page_size)
+            page = st.number_input(f"Seite (von {pages})", min_value=1, max_value=pages, value=1)
+            
+            files = inventory.list_files(search, offset=(page - 1) * page_size, limit=page_size, order_by=order_by)
+            
+            import pandas as pd
+            df = pd.DataFrame([
+                {
+                    "Dateiname": f["filename"],
+                    "Chunks": f["chunks"],
+                    "Textgröße (KB)": round(f["chars"] / 1024, 1),
+                    "Erster Import": f["first_ingested_at"],
+                    "Letzter Import": f["last_ingested_at"],
+                }
+                for f in files
+            ])
+            st.dataframe(df, use_container_width=True, hide_index=True)
+            st.caption(f"{matching} Dateien gefunden · {totals['chunks']} Chunks · {totals['chars'] / 1024 / 1024:.1f} MB Text")
+            
+            # Download-Option (komplette Liste aus dem Inventar)
+            all_files = pd.DataFrame(inventory.list_files(search, limit=None, order_by=order_by))
+            st.download_button(
+                label="📥 Liste als CSV",
+                data=all_files.to_csv(index=False),
+                file_name=f"{selected_collection}_dokumente.csv",
+                mime="text/csv"
+            )
+            
+            # Einzelne Datei löschen (ChromaDB, Katalog-Index und Inventar)
+            with st.expander("🗑️ Datei entfernen"):
+                if files:
+                    to_delete = st.selectbox("Datei", [f["filename"] for f in files])
+                    if st.button(f"🗑️ {to_delete} entfernen", type="secondary"):
+                        removed = remove_files(
+                            vectorstore,
+                            [to_delete],
+                            catalog_index=get_catalog_index(selected_collection)
+                            if selected_collection in Config.CATALOG_INDEX_COLLECTIONS else None,
+                            inventory=inventory,
+                            summary_index=get_summary_index(vectorstore)
+                            if selected_collection in Config.SUMMARY_INDEX_COLLECTIONS else None,
+                            parent_store=get_parent_store(selected_collection)
+                            if selected_collection in Config.PARENT_CHILD_COLLECTIONS else None,
+                        )
+                        st.success(f"✅ {to_delete} entfernt ({removed} Chunks)")
+                        st.cache_data.clear()
+                        st.rerun()
         else:
             st.info("Noch keine Dokumente vorhanden.")
             
@@ -284,6 +388,13 @@ with tab3:
                 if doc_count > 0:
                     with st.spinner("Lösche Dokumente..."):
                         vectorstore._collection.delete(where={})
+                        if selected_collection in Config.CATALOG_INDEX_COLLECTIONS:
+                            get_catalog_index(selected_collection).clear()
+                        if selected_collection in Config.SUMMARY_INDEX_COLLECTIONS:
+                            get_summary_index(vectorstore).clear()
+                        if selected_collection in Config.PARENT_CHILD_COLLECTIONS:
+                            get_parent_store(selected_collection).clear()
+                        get_inventory(selected_collection).clear()
                     st.success(f"✅ {selected_collection} geleert!")
                     st.cache_resource.clear()
                     st.rerun()
@@ -303,6 +414,13 @@ with tab3:
                 for coll in collections:
                     vs = get_vectorstore_for_collection(coll)
                     vs._collection.delete(where={})
+                    if coll in Config.CATALOG_INDEX_COLLECTIONS:
+                        get_catalog_index(coll).clear()
+                    if coll in Config.SUMMARY_INDEX_COLLECTIONS:
+                        get_summary_index(vs).clear()
+                    if coll in Config.PARENT_CHILD_COLLECTIONS:
+                        get_parent_store(coll).clear()
+                    get_inventory(coll).clear()
                 st.success("✅ Alle Collections geleert!")
                 st.cache_resource.clear()
                 st.rerun()
@@ -329,4 +447,58 @@ with tab3:
 - Chunk Size: {Config.CHUNK_SIZE}
 - Chunk Overlap: {Config.CHUNK_OVERLAP}
 - Embedding: {Config.OLLAMA_EMBEDDING_MODEL}
-        """, language="text")
\ No newline at end of file
+        """, language="text")
+
+# Tab 4: Import-Berichte
+with tab4:
+    st.header(f"Import-Berichte: {selected_collection}")
+    
+    reports = list_reports(selected_collection, limit=50)
+    
+    if not reports:
+        st.info("Noch keine Import-Berichte vorhanden.")
+    else:
+        import pandas as pd
+        df = pd.DataFrame([
+            {
+                "Start": r["started_at"],
+                "Quelle": r["source"],
+                "Dateien": r["summary"]["files"],
+                "Seiten": r["summary"]["pages"],
+                "Chunks": r["summary"]["chunks"],
+                "Dauer (s)": round(r["total_seconds"], 1),
+                "Embedding (s)": round(r["summary"]["embed_seconds"], 1),
+                "Upsert (s)": round(r["summary"]["upsert_seconds"], 1),
+                "Retries": r["summary"]["retries"],
+                "Fehler": r["summary"]["failures"],
+                # Ältere Berichte kennen nur den Prozess-Peak
+                "RAM-Zuwachs Lauf (MB)": round(r["run_rss_delta_mb"]) if "run_rss_delta_mb" in r else None,
+                "Prozess-Peak RAM (MB)": round(r.get("process_peak_rss_mb", r.get("peak_rss_mb", 0))),
+            }
+            for r in reports
+        ])
+        st.dataframe(df, use_container_width=True, hide_index=True)
+        
+        selected = st.selectbox(
+            "Bericht anzeigen",
+            range(len(reports)),
+            format_func=lambda i: f"{reports[i]['started_at']} ({reports[i]['source']})"
+        )
+        report = reports[selected]
+        
+        if report["failures"]:
+            st.subheader(f"⚠️ Fehler ({len(report['failures'])})")
+            st.dataframe(pd.DataFrame(report["failures"]), use_container_width=True, hide_index=True)
+        
+        with st.expander(f"📄 Dateien ({len(report['files'])})"):
+            st.dataframe(pd.DataFrame(report["files"]), use_container_width=True, hide_index=True)
+        
+        with st.expander(f"📦 Batches ({len(report['batches'])})"):
+            st.dataframe(pd.DataFrame(report["batches"]), use_container_width=True, hide_index=True)
+        
+        st.download_button(
+            label="📥 Bericht als JSON",
+            data=Path(report["path"]).read_bytes(),
+            file_name=Path(report["path"]).name,
+            mime="application/json"
+        )
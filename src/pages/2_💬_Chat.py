@@ -3,13 +3,15 @@ import streamlit as st
 import logging
 from pathlib import Path
 import sys
+import threading
+import time
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from app.chroma_client import get_chroma_vectorstore
+from app.chroma_client import get_chroma_vectorstore, create_embedding_model
 from app.rag_pipeline import RAGPipeline
+from app.chat_memory import ChatMemory
 from app.config import Config
-from langchain_ollama import OllamaEmbeddings
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -25,14 +27,27 @@ if "selected_collection" not in st.session_state:
     st.session_state.selected_collection = Config.DOCUMENTS_COLLECTION
 if "messages" not in st.session_state:
     st.session_state.messages = {}
+if "chat_memories" not in st.session_state:
+    st.session_state.chat_memories = {}
+if "active_generation" not in st.session_state:
+    st.session_state.active_generation = None
+if "pending_questions" not in st.session_state:
+    st.session_state.pending_questions = {}
+if "stop_requested" not in st.session_state:
+    st.session_state.stop_requested = False
+if "chat_visible" not in st.session_state:
+    st.session_state.chat_visible = {}
+
+# Noch laufende Generierung aus einem vorherigen Run abbrechen
+# (neue Frage, Collection-Wechsel oder Verbindungsabbruch)
+if st.session_state.active_generation is not None:
+    st.session_state.active_generation.set()
+    st.session_state.active_generation = None
 
 @st.cache_resource
 def get_embedding_model():
-    """Erstellt Ollama Embedding Model (gecached)"""
-    return OllamaEmbeddings(
-        base_url=Config.OLLAMA_BASE_URL,
-        model=Config.OLLAMA_EMBEDDING_MODEL
-    )
+    """Erstellt Ollama Embedding Model (gecached, bündelt parallele Queries)"""
+    return create_embedding_model()
 
 def get_vectorstore_for_collection(collection_name: str):
     """Erstellt Vectorstore für spezifische Collection"""
@@ -114,6 +129,8 @@ with st.sidebar:
     if st.button("🗑️ Chat löschen"):
         if selected_collection in st.session_state.messages:
             st.session_state.messages[selected_collection] = []
+        st.session_state.chat_memories.pop(selected_collection, None)
+        st.session_state.chat_visible.pop(selected_collection, None)
         st.rerun()
 
 # Warnung wenn keine Dokumente
@@ -138,123 +155,215 @@ make load-docs
 if selected_collection not in st.session_state.messages:
     st.session_state.messages[selected_collection] = []
 
-# Chat-Historie anzeigen
-for message in st.session_state.messages[selected_collection]:
+def render_sources(sources, key_prefix: str):
+    """Quellen einer Antwort (eingeklappt)"""
+    with st.expander(f"📚 Quellen ({len(sources)})"):
+        for i, source in enumerate(sources, 1):
+            st.markdown(f"**📄 Quelle {i}**")
+            
+            # Text in scrollbarem Container
+            st.text_area(
+                f"quelle_{i}",
+                source['content'][:500] + ("..." if len(source['content']) > 500 else ""),
+                height=100,
+                key=f"{key_prefix}_{i}",
+                label_visibility="collapsed"
+            )
+            
+            # Metadaten
+            col1, col2 = st.columns(2)
+            with col1:
+                if show_scores:
+                    st.caption(f"⭐ Relevanz: {source.get('score', 0):.3f}")
+            with col2:
+                st.caption(f"📄 {source['metadata'].get('filename', 'Unbekannt')}")
+            
+            if i < len(sources):
+                st.divider()
+
+def render_stage_metrics(stage_metrics: dict):
+    caption = f"⏱️ Retrieval {stage_metrics['retrieval_seconds'] * 1000:.0f} ms"
+    if "time_to_first_token_seconds" in stage_metrics:
+        caption += f" · erstes Token {stage_metrics['time_to_first_token_seconds']:.2f} s"
+    if "tokens_per_second" in stage_metrics:
+        caption += f" · {stage_metrics['tokens_per_second']:.1f} Tokens/s"
+    if "prompt_tokens" in stage_metrics:
+        caption += f" · Prompt ~{stage_metrics['prompt_tokens']} Tokens"
+    st.caption(caption)
+
+messages = st.session_state.messages[selected_collection]
+
+# Chat-Historie anzeigen: nur die letzten Nachrichten, ältere seitenweise nachladen
+visible = st.session_state.chat_visible.get(selected_collection, Config.CHAT_HISTORY_PAGE_SIZE)
+hidden = max(0, len(messages) - visible)
+if hidden:
+    if st.button(f"⬆️ Ältere Nachrichten anzeigen ({hidden})"):
+        st.session_state.chat_visible[selected_collection] = visible + Config.CHAT_HISTORY_PAGE_SIZE
+        st.rerun()
+
+for index in range(hidden, len(messages)):
+    message = messages[index]
     with st.chat_message(message["role"]):
         st.markdown(message["content"])
         
         # Zeige Quellen falls vorhanden
-        if message["role"] == "assistant" and "sources" in message and show_sources and message["sources"]:
-            with st.expander(f"📚 Quellen ({len(message['sources'])})"):
-                for i, source in enumerate(message["sources"], 1):
-                    st.markdown(f"**📄 Quelle {i}**")
-                    
-                    # Text in scrollbarem Container
-                    st.text_area(
-                        f"quelle_{i}",
-                        source['content'][:500] + ("..." if len(source['content']) > 500 else ""),
-                        height=100,
-                        key=f"history_{message.get('timestamp', i)}_{i}",
-                        label_visibility="collapsed"
-                    )
-                    
-                    # Metadaten
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        if show_scores:
-                            st.caption(f"⭐ Relevanz: {source.get('score', 0):.3f}")
-                    with col2:
-                        st.caption(f"📄 {source['metadata'].get('filename', 'Unbekannt')}")
-                    
-                    if i < len(message['sources']):
-                        st.divider()
+        if message["role"] == "assistant" and message.get("sources") and show_sources:
+            render_sources(message["sources"], f"history_{index}")
 
-# Chat-Input
-if prompt := st.chat_input(f"Stelle eine Frage zu '{selected_collection}'..."):
-    # User-Nachricht anzeigen und speichern
-    st.session_state.messages[selected_collection].append({
-        "role": "user", 
-        "content": prompt
-    })
+def request_stop():
+    """Stopp-Button: Generierung abbrechen, danach einmal die Seite neu zeichnen"""
+    if st.session_state.active_generation is not None:
+        st.session_state.active_generation.set()
+    st.session_state.stop_requested = True
+
+@st.fragment
+def answer_pending_question(collection_name: str):
+    """
+    Streamt die Antwort auf die offene Frage. Als Fragment läuft nur dieser
+    Teil neu (z.B. beim Stopp-Button), nicht der ganze Verlauf.
+    """
+    if st.session_state.stop_requested:
+        # Teilantwort steht im Verlauf - ganze Seite einmal neu zeichnen
+        st.session_state.stop_requested = False
+        st.rerun()
     
-    with st.chat_message("user"):
-        st.markdown(prompt)
+    prompt = st.session_state.pending_questions.pop(collection_name, None)
+    if prompt is None:
+        return
+    
+    messages = st.session_state.messages[collection_name]
     
     # Bot-Antwort generieren mit RAG + Streaming
     with st.chat_message("assistant"):
         try:
             # RAG Pipeline erstellen
-            rag = get_rag_pipeline(selected_collection)
+            rag = get_rag_pipeline(collection_name)
             
             # Container für gestreamte Antwort
             response_placeholder = st.empty()
-            sources_placeholder = st.empty()
+            stop_placeholder = st.empty()
+            stop_placeholder.button("⏹️ Stopp", on_click=request_stop, key=f"stop_{len(messages)}")
             
             full_response = ""
             sources = []
+            stage_metrics = None
+            completed = False
+            error = None
+            
+            # Streame die Antwort (abbrechbar, falls der Nutzer weitermacht)
+            cancel_event = threading.Event()
+            st.session_state.active_generation = cancel_event
+            # Verlauf ohne aktuelle Frage und ohne Fehlermeldungen
+            history = [
+                m for m in messages[:-1]
+                if not m["content"].startswith("❌")
+            ]
+            memory = st.session_state.chat_memories.setdefault(collection_name, ChatMemory())
+            
+            stream = rag.query_stream(
+                prompt,
+                k=k_results,
+                cancel_event=cancel_event,
+                history=history,
+                memory=memory
+            )
             
-            # Streame die Antwort
-            with st.spinner("🤔 Denke nach..."):
-                for chunk in rag.query_stream(prompt, k=k_results):
-                    if chunk["type"] == "sources":
-                        # Speichere Quellen
-                        sources = chunk["sources"]
-                        
-                    elif chunk["type"] == "token":
-                        # Füge Token zur Antwort hinzu
-                        full_response += chunk["token"]
-                        response_placeholder.markdown(full_response + "▌")
-                        
-                    elif chunk["type"] == "error":
-                        st.error(f"❌ Fehler: {chunk['error']}")
-                        break
+            # Markdown höchstens einmal pro Frame-Budget neu rendern, nicht pro Token
+            render_interval = Config.CHAT_RENDER_INTERVAL_MS / 1000
+            last_render = 0.0
+            
+            try:
+                with st.spinner("🤔 Denke nach..."):
+                    for chunk in stream:
+                        if chunk["type"] == "sources":
+                            # Speichere Quellen
+                            sources = chunk["sources"]
+                            
+                        elif chunk["type"] == "queue":
+                            # Ollama-Server ausgelastet: zeige Warteschlangen-Position
+                            response_placeholder.info(
+                                f"⏳ Server ausgelastet - Position {chunk['position'] + 1} in der Warteschlange"
+                            )
+                            
+                        elif chunk["type"] == "token":
+                            # Füge Token zur Antwort hinzu
+                            full_response += chunk["token"]
+                            now = time.monotonic()
+                            if now - last_render >= render_interval:
+                                response_placeholder.markdown(full_response + "▌")
+                                last_render = now
+                            
+                        elif chunk["type"] == "metrics":
+                            stage_metrics = chunk["metrics"]
+                            
+                        elif chunk["type"] == "done":
+                            completed = True
+                            
+                        elif chunk["type"] == "cancelled":
+                            break
+                            
+                        elif chunk["type"] == "error":
+                            error = chunk["error"]
+                            st.error(f"❌ Fehler: {error}")
+                            break
+            finally:
+                # Bei Rerun/Stopp/Disconnect bricht Streamlit den Lauf ab - Stream sofort schließen
+                cancel_event.set()
+                stream.close()
+                st.session_state.active_generation = None
+                
+                # Speichere Assistant-Antwort (auch Teilantworten nach Abbruch);
+                # Fehler bleiben im Verlauf sichtbar und gelten nicht als Stopp
+                content = full_response
+                if error is not None:
+                    content = f"{full_response}\n\n_❌ Fehler: {error}_" if full_response else f"❌ Fehler: {error}"
+                elif not completed and full_response:
+                    content = f"{full_response}\n\n_⏹️ abgebrochen_"
+                if content:
+                    messages.append({
+                        "role": "assistant",
+                        "content": content,
+                        "sources": sources,
+                        "timestamp": len(messages)
+                    })
             
             # Finale Antwort ohne Cursor
+            stop_placeholder.empty()
             response_placeholder.markdown(full_response)
             
+            if stage_metrics and show_scores:
+                render_stage_metrics(stage_metrics)
+            
             # Zeige Quellen
             if sources and show_sources:
-                with st.expander(f"📚 Verwendete Quellen ({len(sources)})", expanded=False):
-                    for i, source in enumerate(sources, 1):
-                        st.markdown(f"**📄 Quelle {i}**")
-                        
-                        st.text_area(
-                            f"source_{i}",
-                            source['content'][:500] + ("..." if len(source['content']) > 500 else ""),
-                            height=100,
-                            key=f"source_{i}_{len(st.session_state.messages[selected_collection])}",
-                            label_visibility="collapsed"
-                        )
-                        
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            if show_scores:
-                                st.caption(f"⭐ Relevanz: {source.get('score', 0):.3f}")
-                        with col2:
-                            st.caption(f"📄 {source['metadata'].get('filename', 'Unbekannt')}")
-                        
-                        if i < len(sources):
-                            st.divider()
-            
-            # Speichere Assistant-Antwort
-            st.session_state.messages[selected_collection].append({
-                "role": "assistant",
-                "content": full_response,
-                "sources": sources,
-                "timestamp": len(st.session_state.messages[selected_collection])
-            })
+                render_sources(sources, f"history_{len(messages) - 1}")
             
         except Exception as e:
             error_msg = f"❌ Fehler bei der Anfrage: {e}"
             st.error(error_msg)
             logger.error(f"RAG error: {e}", exc_info=True)
             
-            st.session_state.messages[selected_collection].append({
+            messages.append({
                 "role": "assistant",
                 "content": error_msg,
                 "sources": []
             })
 
+# Chat-Input
+if prompt := st.chat_input(f"Stelle eine Frage zu '{selected_collection}'..."):
+    # User-Nachricht anzeigen und speichern
+    messages.append({
+        "role": "user", 
+        "content": prompt
+    })
+    
+    with st.chat_message("user"):
+        st.markdown(prompt)
+    
+    st.session_state.pending_questions[selected_collection] = prompt
+
+answer_pending_question(selected_collection)
+
 # Footer
 st.divider()
 col1, col2, col3 = st.columns(3)
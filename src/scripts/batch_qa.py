@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# scripts/batch_qa.py
+"""
+Beantwortet viele Fragen aus einer JSONL-Datei über RAGPipeline.query
+(Evaluation, FAQ-Vorgenerierung) und schreibt die Antworten als JSONL.
+
+Eingabe (eine Zeile pro Frage, weitere Felder werden durchgereicht):
+    {"id": "faq-1", "question": "Wie lange kann ich Bücher ausleihen?"}
+
+Ausgabe (eine Zeile pro Frage):
+    {"id", "question", ..., "answer", "sources", "scores", "metrics",
+     "embedding_batch_size", "embedding_batch_seconds", "elapsed_seconds"}
+
+Ein Abbruch ist unkritisch: beim erneuten Start mit derselben Ausgabedatei
+werden beantwortete Fragen übersprungen.
+
+Beispiel:
+    python src/scripts/batch_qa.py --input fragen.jsonl --output antworten.jsonl --workers 4
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Füge Parent-Directory zum Path hinzu
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.batch_qa import BatchQARunner, read_questions
+from app.chroma_client import get_chroma_vectorstore, create_embedding_model
+from app.config import Config
+from app.rag_pipeline import RAGPipeline
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Beantwortet Fragen aus JSONL mit der RAG Pipeline (Batch)"
+    )
+    parser.add_argument("--input", type=str, required=True, help="Fragen als JSONL")
+    parser.add_argument("--output", type=str, required=True, help="Antworten als JSONL (zugleich Checkpoint)")
+    parser.add_argument(
+        "--collection",
+        type=str,
+        default=None,
+        help=f"Collection-Name (default: {Config.CHROMA_COLLECTION_NAME})"
+    )
+    parser.add_argument("--k", type=int, default=3, help="Anzahl Quellen pro Frage (default: 3)")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=Config.OLLAMA_CHAT_CONCURRENCY * 2,
+        help=f"Gleichzeitig bearbeitete Fragen (default: {Config.OLLAMA_CHAT_CONCURRENCY * 2})"
+    )
+    parser.add_argument(
+        "--embed-batch-size",
+        type=int,
+        default=Config.EMBEDDING_BATCH_MAX_SIZE,
+        help=f"Fragen pro Embedding-Call (default: {Config.EMBEDDING_BATCH_MAX_SIZE})"
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Vorhandene Ausgabe verwerfen statt fortzusetzen"
+    )
+    parser.add_argument(
+        "--log-every",
+        type=int,
+        default=50,
+        help="Fortschritt alle N Fragen loggen (default: 50)"
+    )
+
+    args = parser.parse_args()
+
+    input_path = Path(args.input)
+    if not input_path.exists():
+        logger.error(f"❌ Eingabedatei nicht gefunden: {input_path}")
+        sys.exit(1)
+
+    output_path = Path(args.output)
+    if args.restart and output_path.exists():
+        logger.warning(f"⚠️  Verwerfe vorhandene Ausgabe {output_path}")
+        output_path.unlink()
+
+    collection_name = args.collection or Config.CHROMA_COLLECTION_NAME
+    logger.info(f"🚀 Batch-QA: {input_path} → {output_path}")
+    logger.info(f"   📦 Collection: {collection_name}")
+    logger.info(f"   ⚙️  Workers: {args.workers}, Embedding-Batch: {args.embed_batch_size}, k={args.k}")
+
+    # Query-Embeddings bündelt der Runner selbst (ein Call pro Fenster)
+    embedding_model = create_embedding_model(batch_queries=False)
+    vectorstore = get_chroma_vectorstore(embedding_model, collection_name=collection_name)
+    rag = RAGPipeline(vectorstore, collection_name=collection_name)
+
+    processed = 0
+
+    def log_progress(record: dict) -> None:
+        nonlocal processed
+        processed += 1
+        if processed % args.log_every == 0:
+            logger.info(f"   📈 {processed} Fragen bearbeitet")
+
+    runner = BatchQARunner(
+        rag,
+        output_path,
+        workers=args.workers,
+        embed_batch_size=args.embed_batch_size,
+        k=args.k,
+        on_result=log_progress,
+    )
+    stats = runner.run(read_questions(input_path))
+
+    seconds = stats["seconds"]
+    rate = (stats["answered"] + stats["failed"]) / seconds if seconds > 0 else 0.0
+    logger.info("=" * 60)
+    logger.info("✅ Batch-QA abgeschlossen!")
+    logger.info(f"   ✅ Beantwortet: {stats['answered']}")
+    logger.info(f"   ↩️  Übersprungen (Checkpoint): {stats['skipped']}")
+    logger.info(f"   🧮 Embedding-Calls: {stats['embedding_batches']}")
+    logger.info(f"   ⏱️  {seconds:.1f}s ({rate:.2f} Fragen/s)")
+    if stats["failed"]:
+        logger.warning(f"   ⚠️  Fehlgeschlagen: {stats['failed']} (werden beim nächsten Start wiederholt)")
+    logger.info("=" * 60)
+    sys.exit(1 if stats["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
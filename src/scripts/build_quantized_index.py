@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# scripts/build_quantized_index.py
+"""
+Baut den quantisierten First-Pass-Index (int8/binary) für eine Collection
+und gibt einen Recall-Report gegen exakte Suche aus.
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Füge Parent-Directory zum Path hinzu
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.chroma_client import get_chroma_vectorstore, create_embedding_model
+from app.config import Config
+from app.quantized_index import (
+    MODES,
+    QuantizedIndex,
+    index_path,
+    load_collection_vectors,
+    recall_report,
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Baut einen quantisierten Vektor-Index für eine Collection"
+    )
+    parser.add_argument(
+        "--collection",
+        type=str,
+        default=Config.METADATA_COLLECTION,
+        help=f"Collection-Name (default: {Config.METADATA_COLLECTION})"
+    )
+    parser.add_argument(
+        "--mode",
+        choices=MODES,
+        default=Config.QUANTIZED_INDEX_MODE,
+        help=f"Quantisierung (default: {Config.QUANTIZED_INDEX_MODE})"
+    )
+    parser.add_argument(
+        "--k",
+        type=int,
+        default=10,
+        help="k für den Recall-Report (default: 10)"
+    )
+    parser.add_argument(
+        "--report-queries",
+        type=int,
+        default=100,
+        help="Anzahl Test-Queries für den Recall-Report, 0 = kein Report (default: 100)"
+    )
+    parser.add_argument(
+        "--questions",
+        type=str,
+        default=None,
+        help="Textdatei mit einer Frage pro Zeile als Test-Queries (statt gestörter Katalog-Vektoren)"
+    )
+    parser.add_argument(
+        "--report-file",
+        type=str,
+        default=None,
+        help="Schreibt den Recall-Report zusätzlich als JSON"
+    )
+
+    args = parser.parse_args()
+
+    embedding_model = create_embedding_model(batch_queries=False)
+    vectorstore = get_chroma_vectorstore(embedding_model, collection_name=args.collection)
+
+    # 1. Alle Vektoren laden
+    logger.info(f"📥 Lade Vektoren aus '{args.collection}'...")
+    start = time.perf_counter()
+    ids, vectors = load_collection_vectors(vectorstore._collection)
+    if not ids:
+        logger.warning("⚠️  Collection ist leer - kein Index gebaut")
+        sys.exit(0)
+    logger.info(f"   {len(ids)} Vektoren ({vectors.shape[1]} Dim.) in {time.perf_counter() - start:.1f}s")
+
+    # 2. Quantisieren und speichern
+    index = QuantizedIndex.build(args.mode, ids, vectors)
+    index.save(index_path(args.collection))
+
+    # 3. Recall-Report
+    if args.report_queries <= 0:
+        return
+
+    if args.questions:
+        questions = [
+            line.strip()
+            for line in Path(args.questions).read_text(encoding="utf-8").splitlines()
+            if line.strip()
+        ][:args.report_queries]
+        queries = np.asarray(embedding_model.embed_documents(questions), dtype=np.float32)
+    else:
+        # Gestörte Katalog-Vektoren als Stellvertreter für echte Fragen
+        rng = np.random.default_rng(42)
+        sample = rng.choice(len(vectors), size=min(args.report_queries, len(vectors)), replace=False)
+        noise = rng.normal(0, vectors.std() * 0.5, size=(len(sample), vectors.shape[1]))
+        queries = (vectors[sample] + noise).astype(np.float32)
+
+    report = recall_report(
+        index, vectors, queries, k=args.k, rescore_factor=Config.QUANTIZED_RESCORE_FACTOR
+    )
+
+    logger.info("=" * 60)
+    logger.info(f"📊 Recall-Report ({report['mode']}, k={report['k']}, {report['queries']} Queries)")
+    logger.info(f"   Recall Scan:        {report['recall_scan']:.3f}")
+    logger.info(f"   Recall + Rescoring: {report['recall_rescored']:.3f}")
+    logger.info(f"   Scan p50/p95:       {report['scan_ms_p50']:.2f} / {report['scan_ms_p95']:.2f} ms")
+    logger.info(f"   Speicher:           {report['index_bytes'] / 1e6:.1f} MB "
+                f"(float32: {report['float32_bytes'] / 1e6:.1f} MB, {report['compression']:.1f}x)")
+    logger.info("=" * 60)
+
+    if args.report_file:
+        Path(args.report_file).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# scripts/import_catalog.py
+"""
+Importiert Katalog-Exporte (JSONL, CSV/TSV, MARC) strukturiert in ChromaDB:
+ein Dokument pro Datensatz, alle Felder als Metadaten, deterministische IDs.
+
+Unterstützte Dateien:
+    .jsonl/.ndjson  ein JSON-Objekt pro Zeile
+    .csv/.tsv       Kopfzeile mit Feldnamen (Trennzeichen wird erkannt)
+    .mrc/.marc      binäres MARC 21 (ISO 2709)
+    .mrk            MARC im Textformat (MarcEdit)
+    .xml            MARCXML
+
+Ein erneuter Import derselben Datei ist unkritisch: bestehende Datensätze
+werden überschrieben, unveränderte gar nicht erst neu eingebettet.
+
+Beispiel:
+    python src/scripts/import_catalog.py --input data/metadata/katalog.jsonl
+    python src/scripts/import_catalog.py --input data/metadata --template "Titel: {title}\\nAutor: {author}"
+"""
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Füge Parent-Directory zum Path hinzu
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.catalog_import import FORMATS, detect_format, import_catalog_file
+from app.chroma_client import get_chroma_vectorstore, create_embedding_model
+from app.config import Config
+from app.catalog_index import get_catalog_index
+from app.collection_inventory import get_inventory
+from app.summary_index import get_summary_index
+from app.parent_store import get_parent_store
+from app.ingestion import rebuild_stale_sidecars
+from app.ingestion_report import IngestionReport
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def collect_files(input_path: Path, fmt: str = None) -> list:
+    """Einzelne Datei oder alle Katalogdateien eines Ordners"""
+    if input_path.is_file():
+        return [input_path]
+    return sorted(
+        p for p in input_path.rglob("*")
+        if p.is_file() and (fmt is not None or detect_format(p) is not None)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Importiert Katalog-Exporte (JSONL/CSV/MARC) in ChromaDB"
+    )
+    parser.add_argument(
+        "--input",
+        type=str,
+        default=str(Config.METADATA_DIR),
+        help=f"Datei oder Ordner mit Exporten (default: {Config.METADATA_DIR})"
+    )
+    parser.add_argument(
+        "--collection",
+        type=str,
+        default=Config.METADATA_COLLECTION,
+        help=f"Collection-Name (default: {Config.METADATA_COLLECTION})"
+    )
+    parser.add_argument(
+        "--format",
+        choices=sorted(set(FORMATS.values())),
+        default=None,
+        help="Format erzwingen (default: nach Dateiendung)"
+    )
+    parser.add_argument(
+        "--template",
+        type=str,
+        default=None,
+        help="Vorlage für den Embedding-Text, z.B. \"Titel: {title}\\nAutor: {author}\" "
+             "(default: CATALOG_TEXT_TEMPLATE)"
+    )
+    parser.add_argument(
+        "--id-fields",
+        nargs="+",
+        default=None,
+        help=f"Felder für die Datensatz-ID (default: {' '.join(Config.CATALOG_ID_FIELDS)})"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=64,
+        help="Datensätze pro Embedding-Batch (default: 64)"
+    )
+    parser.add_argument(
+        "--group-size",
+        type=int,
+        default=1000,
+        help="Datensätze gleichzeitig im Speicher (default: 1000)"
+    )
+    parser.add_argument(
+        "--no-skip-unchanged",
+        action="store_true",
+        help="Auch unveränderte Datensätze neu einbetten"
+    )
+    parser.add_argument(
+        "--clear",
+        action="store_true",
+        help="Löscht existierende Collection vor dem Import"
+    )
+    parser.add_argument(
+        "--log-every",
+        type=int,
+        default=100,
+        help="Fortschritt alle N Batches loggen (default: 100)"
+    )
+    parser.add_argument(
+        "--report-dir",
+        type=str,
+        default=str(Config.INGESTION_REPORT_DIR),
+        help=f"Ordner für den JSON-Import-Bericht (default: {Config.INGESTION_REPORT_DIR})"
+    )
+
+    args = parser.parse_args()
+
+    input_path = Path(args.input)
+    if not input_path.exists():
+        logger.error(f"❌ Datei/Ordner nicht gefunden: {input_path}")
+        sys.exit(1)
+
+    files = collect_files(input_path, args.format)
+    if not files:
+        logger.warning(f"⚠️  Keine Katalogdateien gefunden ({', '.join(sorted(FORMATS))})")
+        sys.exit(0)
+
+    collection_name = args.collection
+    template = args.template.replace("\\n", "\n") if args.template else None
+
+    logger.info("🚀 Starte Katalog-Import")
+    logger.info(f"   📁 Eingabe: {input_path} ({len(files)} Dateien)")
+    logger.info(f"   📦 Collection: {collection_name}")
+    logger.info(f"   ⚙️  Batch: {args.batch_size}, Gruppe: {args.group_size}")
+
+    embedding_model = create_embedding_model(batch_queries=False)
+    vectorstore = get_chroma_vectorstore(embedding_model, collection_name=collection_name)
+
+    if args.clear:
+        logger.warning(f"⚠️  Lösche existierende Dokumente aus Collection '{collection_name}'...")
+        vectorstore._collection.delete(where={})
+        if collection_name in Config.CATALOG_INDEX_COLLECTIONS:
+            get_catalog_index(collection_name).clear()
+        if collection_name in Config.SUMMARY_INDEX_COLLECTIONS:
+            get_summary_index(vectorstore).clear()
+        if collection_name in Config.PARENT_CHILD_COLLECTIONS:
+            get_parent_store(collection_name).clear()
+        get_inventory(collection_name).clear()
+        logger.info("🗑️  Collection geleert")
+
+    inventory = get_inventory(collection_name)
+    inventory.ensure_built(vectorstore._collection)
+    catalog_index = None
+    if collection_name in Config.CATALOG_INDEX_COLLECTIONS:
+        catalog_index = get_catalog_index(collection_name)
+    summary_index = None
+    if collection_name in Config.SUMMARY_INDEX_COLLECTIONS:
+        summary_index = get_summary_index(vectorstore)
+
+    report = IngestionReport(collection_name, source="catalog", settings={
+        "input": str(input_path),
+        "format": args.format,
+        "template": template or Config.CATALOG_TEXT_TEMPLATE,
+        "id_fields": args.id_fields or Config.CATALOG_ID_FIELDS,
+        "batch_size": args.batch_size,
+        "group_size": args.group_size,
+        "skip_unchanged": not args.no_skip_unchanged,
+        "embedding_model": Config.OLLAMA_EMBEDDING_MODEL,
+        "clear": args.clear,
+    })
+
+    def log_progress(batch_num: int, total_batches: int) -> None:
+        if batch_num % args.log_every == 0:
+            logger.info(f"   📈 {batch_num} Batches gespeichert")
+
+    totals = {"records": 0, "invalid": 0, "duplicates": 0, "unchanged": 0, "stored": 0, "failed_batches": 0}
+    stale_sidecars = []
+    for file_path in files:
+        logger.info(f"📚 {file_path.name}")
+        start = time.perf_counter()
+        try:
+            stats = import_catalog_file(
+                vectorstore,
+                file_path,
+                fmt=args.format,
+                template=template,
+                id_fields=args.id_fields,
+                batch_size=args.batch_size,
+                group_size=args.group_size,
+                skip_unchanged=not args.no_skip_unchanged,
+                catalog_index=catalog_index,
+                inventory=inventory,
+                summary_index=summary_index,
+                on_batch=log_progress,
+            )
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ {file_path.name}: {e}")
+            report.add_file(file_path, 0, {"error": str(e)})
+            continue
+
+        seconds = time.perf_counter() - start
+        # Datensätze zählen als "Seiten", gespeicherte Dokumente als Chunks;
+        # eine komplett unveränderte Datei ist kein Fehler
+        report.add_file(file_path, stats["records"] - stats["invalid"], {
+            "pages": stats["records"],
+            "load_seconds": seconds,
+        })
+        report.add_storage(stats)
+        for key in totals:
+            totals[key] += stats[key]
+        stale_sidecars += [n for n in stats["stale_sidecars"] if n not in stale_sidecars]
+
+        rate = stats["records"] / seconds if seconds > 0 else 0.0
+        logger.info(
+            f"   ✅ {stats['records']} Datensätze ({rate:.0f}/s): {stats['stored']} gespeichert, "
+            f"{stats['unchanged']} unverändert, {stats['invalid']} leer"
+        )
+
+    # Sidecars, deren Update fehlgeschlagen ist, einmal am Ende neu aufbauen
+    rebuild_stale_sidecars(
+        vectorstore, stale_sidecars,
+        catalog_index=catalog_index, inventory=inventory, summary_index=summary_index,
+    )
+
+    total_docs = vectorstore._collection.count()
+    report.finish(collection_count=total_docs)
+    report_path = report.save(args.report_dir)
+    logger.info("=" * 60)
+    logger.info("✅ Katalog-Import abgeschlossen!")
+    logger.info(f"   📊 Collection '{collection_name}' enthält jetzt {total_docs} Dokumente")
+    logger.info(f"   📚 Datensätze: {totals['records']}, gespeichert: {totals['stored']}, "
+                f"unverändert: {totals['unchanged']}")
+    if totals["duplicates"]:
+        logger.info(f"   🔁 Doppelte IDs zusammengefasst: {totals['duplicates']}")
+    if totals["failed_batches"]:
+        logger.warning(f"   ⚠️  Fehlgeschlagene Batches: {totals['failed_batches']}")
+    logger.info(f"   📝 Bericht: {report_path}")
+    logger.info("=" * 60)
+    sys.exit(1 if totals["failed_batches"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,16 +7,20 @@ Nutzt die gemeinsame Verarbeitungslogik aus app/document_processor.py
 import argparse
 import logging
 import sys
-import time
 from pathlib import Path
 
 # Füge Parent-Directory zum Path hinzu
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.document_processor import DocumentProcessor
-from app.chroma_client import get_chroma_vectorstore
+from app.chroma_client import get_chroma_vectorstore, create_embedding_model
 from app.config import Config
-from langchain_ollama import OllamaEmbeddings
+from app.catalog_index import get_catalog_index
+from app.collection_inventory import get_inventory
+from app.ingestion import rebuild_stale_sidecars, remove_files, store_chunk_stream, store_chunks_in_batches
+from app.summary_index import get_summary_index
+from app.parent_store import get_parent_store
+from app.ingestion_report import IngestionReport
 
 logging.basicConfig(
     level=logging.INFO,
@@ -58,6 +62,12 @@ def main():
         default=10,
         help="Anzahl Chunks pro Batch für Ollama (default: 10)"
     )
+    parser.add_argument(
+        "--report-dir",
+        type=str,
+        default=str(Config.INGESTION_REPORT_DIR),
+        help=f"Ordner für den JSON-Import-Bericht (default: {Config.INGESTION_REPORT_DIR})"
+    )
     
     args = parser.parse_args()
     
@@ -78,10 +88,7 @@ def main():
     logger.info(f"📊 Verbinde mit Ollama: {Config.OLLAMA_BASE_URL}")
     logger.info(f"🔧 Embedding-Model: {Config.OLLAMA_EMBEDDING_MODEL}")
     
-    embedding_model = OllamaEmbeddings(
-        base_url=Config.OLLAMA_BASE_URL,
-        model=Config.OLLAMA_EMBEDDING_MODEL
-    )
+    embedding_model = create_embedding_model(batch_queries=False)
     
     # 2. ChromaDB Verbindung mit gewählter Collection
     logger.info(f"🔌 Verbinde mit ChromaDB Collection: {collection_name}...")
@@ -92,68 +99,135 @@ def main():
         logger.warning(f"⚠️  Lösche existierende Dokumente aus Collection '{collection_name}'...")
         collection = vectorstore._collection
         collection.delete(where={})
+        if collection_name in Config.CATALOG_INDEX_COLLECTIONS:
+            get_catalog_index(collection_name).clear()
+        if collection_name in Config.SUMMARY_INDEX_COLLECTIONS:
+            get_summary_index(vectorstore).clear()
+        if collection_name in Config.PARENT_CHILD_COLLECTIONS:
+            get_parent_store(collection_name).clear()
+        get_inventory(collection_name).clear()
         logger.info("🗑️  Collection geleert")
     
     # 4. Dokumente laden und verarbeiten
-    processor = DocumentProcessor(
-        chunk_size=Config.CHUNK_SIZE,
-        chunk_overlap=Config.CHUNK_OVERLAP
-    )
+    # Small-to-Big-Collections: Parent-Fenster splitten, nur Children einbetten
+    processor = DocumentProcessor.for_collection(collection_name)
+    parent_store = get_parent_store(collection_name) if processor.small_to_big else None
+    
+    report = IngestionReport(collection_name, source="cli", settings={
+        "folder": str(folder_path),
+        "file_types": args.file_types,
+        "batch_size": args.batch_size,
+        "chunk_size": processor.chunk_size,
+        "chunk_overlap": processor.chunk_overlap,
+        "small_to_big": processor.small_to_big,
+        "embedding_model": Config.OLLAMA_EMBEDDING_MODEL,
+        "clear": args.clear,
+    })
     
     logger.info("📚 Lade und verarbeite Dokumente...")
-    chunks = processor.load_and_process_folder(folder_path, args.file_types)
+    # Große TXT-Dateien werden nicht komplett geladen, sondern nach den übrigen gestreamt
+    large_text_files = []
+    chunks = processor.load_and_process_folder(
+        folder_path, args.file_types, on_file=report.add_file, on_large_text=large_text_files.append
+    )
     
-    if not chunks:
+    if not chunks and not large_text_files:
         logger.warning("⚠️  Keine Dokumente gefunden!")
+        report.finish(collection_count=0)
+        report.save(args.report_dir)
         sys.exit(0)
     
+    # Inventar (Dateien/Chunks für die Übersicht) mitpflegen
+    inventory = get_inventory(collection_name)
+    inventory.ensure_built(vectorstore._collection)
+    
+    # Katalog-Feldindex (Titel/Autor/Jahr/ISBN) parallel befüllen
+    catalog_index = None
+    if collection_name in Config.CATALOG_INDEX_COLLECTIONS:
+        catalog_index = get_catalog_index(collection_name)
+    
+    # Dokument-Index (ein Zentroid pro Datei) für zweistufiges Retrieval
+    summary_index = None
+    if collection_name in Config.SUMMARY_INDEX_COLLECTIONS:
+        summary_index = get_summary_index(vectorstore)
+    
     # 5. In ChromaDB speichern (mit Batching für große Dokumente)
     batch_size = args.batch_size
+    if parent_store is not None:
+        # Erneuter Import: alte Children und Parents der Dateien vorher entfernen
+        filenames = {chunk.metadata["filename"] for chunk in chunks}
+        filenames.update(file_path.name for file_path in large_text_files)
+        remove_files(
+            vectorstore,
+            sorted(filenames),
+            catalog_index=catalog_index,
+            inventory=inventory,
+            summary_index=summary_index,
+            parent_store=parent_store
+        )
+        logger.info(f"🧩 Small-to-Big: {len(chunks)} Parents → Children")
+        chunks = list(processor.iter_children(chunks, parent_store))
     total_chunks = len(chunks)
+    if large_text_files:
+        logger.info(f"🌊 {len(large_text_files)} große TXT-Dateien werden gestreamt")
     logger.info(f"💾 Speichere {total_chunks} Chunks in ChromaDB (Batch-Größe: {batch_size})...")
     
-    successful_batches = 0
-    failed_batches = 0
-    
-    # Verarbeite in Batches
-    for i in range(0, total_chunks, batch_size):
-        batch = chunks[i:i + batch_size]
-        batch_num = (i // batch_size) + 1
-        total_batches = (total_chunks + batch_size - 1) // batch_size
-        
-        logger.info(f"  📦 Batch {batch_num}/{total_batches}: {len(batch)} Chunks...")
-        
-        # Retry-Logik
-        max_retries = 3
-        success = False
-        
-        for attempt in range(max_retries):
-            try:
-                vectorstore.add_documents(batch)
-                successful_batches += 1
-                success = True
-                break  # Erfolg, gehe zum nächsten Batch
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    wait_time = (attempt + 1) * 5  # 5s, 10s, 15s
-                    logger.warning(f"  ⚠️  Versuch {attempt + 1} fehlgeschlagen: {e}")
-                    logger.info(f"  ⏳ Warte {wait_time}s vor erneutem Versuch...")
-                    time.sleep(wait_time)
-                else:
-                    logger.error(f"  ❌ Batch {batch_num} nach {max_retries} Versuchen fehlgeschlagen!")
-                    failed_batches += 1
-        
-        if not success:
-            logger.warning(f"  ⏭️  Überspringe Batch {batch_num} und fahre fort...")
+    # Verarbeite in Batches (mit Retry-Logik)
+    stats = store_chunks_in_batches(
+        vectorstore,
+        chunks,
+        batch_size=batch_size,
+        catalog_index=catalog_index,
+        inventory=inventory,
+        summary_index=summary_index
+    )
+    report.add_storage(stats)
+    successful_batches = stats["successful_batches"]
+    failed_batches = stats["failed_batches"]
+    total_batches = stats["total_batches"]
+    stale_sidecars = list(stats["stale_sidecars"])
+    
+    # Große TXT-Dateien: Chunks gruppenweise erzeugen und speichern
+    for file_path in large_text_files:
+        timings = {}
+        file_chunks = processor.iter_text_chunks(file_path, timings)
+        if parent_store is not None:
+            file_chunks = processor.iter_children(file_chunks, parent_store)
+        stream_stats = store_chunk_stream(
+            vectorstore,
+            file_chunks,
+            batch_size=batch_size,
+            catalog_index=catalog_index,
+            inventory=inventory,
+            summary_index=summary_index
+        )
+        report.add_file(file_path, stream_stats["chunks"], timings)
+        report.add_storage(stream_stats)
+        successful_batches += stream_stats["successful_batches"]
+        failed_batches += stream_stats["failed_batches"]
+        total_batches += stream_stats["total_batches"]
+        stale_sidecars += [n for n in stream_stats["stale_sidecars"] if n not in stale_sidecars]
+    
+    # Sidecars, deren Update fehlgeschlagen ist, einmal am Ende neu aufbauen
+    rebuild_stale_sidecars(
+        vectorstore,
+        stale_sidecars,
+        catalog_index=catalog_index,
+        inventory=inventory,
+        summary_index=summary_index
+    )
     
     # 6. Statistiken
     total_docs = vectorstore._collection.count()
+    report.finish(collection_count=total_docs)
+    report_path = report.save(args.report_dir)
     logger.info("=" * 60)
     logger.info(f"✅ Import abgeschlossen!")
     logger.info(f"   📊 Collection '{collection_name}' enthält jetzt {total_docs} Dokumente")
     logger.info(f"   ✅ Erfolgreiche Batches: {successful_batches}/{total_batches}")
     if failed_batches > 0:
         logger.warning(f"   ⚠️  Fehlgeschlagene Batches: {failed_batches}/{total_batches}")
+    logger.info(f"   📝 Bericht: {report_path}")
     logger.info("=" * 60)
     
     # Zeige Beispiel-Metadaten
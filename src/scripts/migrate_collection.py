@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# scripts/migrate_collection.py
+"""
+Baut eine Collection als neue Version im Hintergrund auf (z.B. nach einem
+Wechsel von OLLAMA_EMBEDDING_MODEL oder CHUNK_SIZE) und schaltet die App
+danach atomar um. Die bisherige Version bleibt für ein Rollback erhalten.
+
+Beispiele:
+    # Texte der aktiven Version mit neuem Modell einbetten und umschalten
+    python src/scripts/migrate_collection.py build --collection documents-collection \\
+        --embedding-model nomic-embed-text
+
+    # Neues Chunking aus den Originaldateien, erst später umschalten
+    python src/scripts/migrate_collection.py build --folder data/documents --chunk-size 800 --no-switch
+    python src/scripts/migrate_collection.py switch --version 2
+
+    python src/scripts/migrate_collection.py rollback
+    python src/scripts/migrate_collection.py status
+"""
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+# Füge Parent-Directory zum Path hinzu
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.collection_aliases import get_alias_registry, version_name
+from app.config import Config
+from app.reembedding import ReembeddingJob, rollback, switch_version
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Neuaufbau einer Collection als Shadow-Version mit atomarem Umschalten"
+    )
+    parser.add_argument(
+        "--collection",
+        type=str,
+        default=Config.CHROMA_COLLECTION_NAME,
+        help=f"Logischer Collection-Name (default: {Config.CHROMA_COLLECTION_NAME})"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("build", help="Neue Version aufbauen")
+    build.add_argument("--embedding-model", type=str, default=None, help="Neues Embedding-Modell (default: Config)")
+    build.add_argument(
+        "--folder", type=str, default=None,
+        help="Neu aus Originaldateien chunken (default: Texte der aktiven Version neu einbetten)"
+    )
+    build.add_argument("--file-types", nargs="+", default=[".pdf", ".txt", ".docx"])
+    build.add_argument("--chunk-size", type=int, default=None, help=f"default: {Config.CHUNK_SIZE}")
+    build.add_argument("--chunk-overlap", type=int, default=None, help=f"default: {Config.CHUNK_OVERLAP}")
+    build.add_argument("--batch-size", type=int, default=10, help="Chunks pro Embedding-Call (default: 10)")
+    build.add_argument(
+        "--pause", type=float, default=Config.REEMBED_BATCH_PAUSE,
+        help=f"Pause zwischen Batches in Sekunden (default: {Config.REEMBED_BATCH_PAUSE})"
+    )
+    build.add_argument("--no-switch", action="store_true", help="Nach dem Aufbau nicht umschalten")
+
+    switch = subparsers.add_parser("switch", help="Auf eine fertige Version umschalten")
+    switch.add_argument("--version", type=int, required=True, help="Versionsnummer (z.B. 2)")
+
+    subparsers.add_parser("rollback", help="Auf die vorherige Version zurückschalten")
+    subparsers.add_parser("status", help="Aktive Version, Versionen und laufenden Aufbau anzeigen")
+
+    args = parser.parse_args()
+    registry = get_alias_registry()
+
+    if args.command == "build":
+        if args.folder and not Path(args.folder).exists():
+            logger.error(f"❌ Ordner nicht gefunden: {args.folder}")
+            sys.exit(1)
+        job = ReembeddingJob(
+            args.collection,
+            embedding_model=args.embedding_model,
+            folder=args.folder,
+            file_types=args.file_types,
+            chunk_size=args.chunk_size,
+            chunk_overlap=args.chunk_overlap,
+            batch_size=args.batch_size,
+            batch_pause=args.pause,
+            switch=not args.no_switch,
+        )
+        result = job.run()
+        if result["state"] not in ("ready", "active"):
+            sys.exit(1)
+    elif args.command == "switch":
+        switch_version(args.collection, version_name(args.collection, args.version))
+    elif args.command == "rollback":
+        rollback(args.collection)
+
+    print(json.dumps(registry.get(args.collection), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
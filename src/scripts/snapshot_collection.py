@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# scripts/snapshot_collection.py
+"""
+Exportiert eine Collection als Snapshot (IDs, Vektoren, Texte, Metadaten)
+bzw. importiert einen Snapshot in eine andere ChromaDB-Instanz - ohne die
+Chunks erneut über Ollama zu embedden.
+
+Beispiele:
+    python src/scripts/snapshot_collection.py export --collection documents-collection --output data/snapshots/documents
+    CHROMA_HTTP_URL=http://neuer-server:8000 \\
+        python src/scripts/snapshot_collection.py import --input data/snapshots/documents
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Füge Parent-Directory zum Path hinzu
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.chroma_client import get_chroma_vectorstore, create_embedding_model
+from app.config import Config
+from app.catalog_index import get_catalog_index
+from app.collection_inventory import get_inventory
+from app.summary_index import get_summary_index
+from app.snapshot import export_snapshot, import_snapshot, read_manifest
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def run_export(args):
+    collection_name = args.collection or Config.CHROMA_COLLECTION_NAME
+    vectorstore = get_chroma_vectorstore(
+        create_embedding_model(batch_queries=False), collection_name=collection_name
+    )
+    logger.info(f"📤 Exportiere '{collection_name}' nach {args.output}...")
+    export_snapshot(
+        vectorstore._collection,
+        Path(args.output),
+        block_size=args.block_size,
+        info={
+            "collection": collection_name,
+            "embedding_model": Config.OLLAMA_EMBEDDING_MODEL,
+            "chunk_size": Config.CHUNK_SIZE,
+            "chunk_overlap": Config.CHUNK_OVERLAP,
+        },
+    )
+
+
+def run_import(args):
+    manifest = read_manifest(Path(args.input))
+    collection_name = args.collection or manifest["info"].get("collection") or manifest["collection"]
+
+    model = manifest["info"].get("embedding_model")
+    if model and model != Config.OLLAMA_EMBEDDING_MODEL:
+        logger.warning(
+            f"⚠️  Snapshot wurde mit '{model}' erstellt, konfiguriert ist "
+            f"'{Config.OLLAMA_EMBEDDING_MODEL}' - Query-Embeddings passen nicht zusammen"
+        )
+
+    vectorstore = get_chroma_vectorstore(
+        create_embedding_model(batch_queries=False), collection_name=collection_name
+    )
+    collection = vectorstore._collection
+
+    inventory = get_inventory(collection_name)
+    catalog_index = None
+    if collection_name in Config.CATALOG_INDEX_COLLECTIONS:
+        catalog_index = get_catalog_index(collection_name)
+
+    if args.clear:
+        logger.warning(f"⚠️  Lösche existierende Dokumente aus Collection '{collection_name}'...")
+        collection.delete(where={})
+        if catalog_index is not None:
+            catalog_index.clear()
+        inventory.clear()
+    else:
+        inventory.ensure_built(collection)
+
+    def on_batch(docs, ids):
+        # Katalog-Feldindex und Inventar wie beim normalen Import mitpflegen
+        if catalog_index is not None:
+            catalog_index.add_documents(docs, ids)
+        inventory.add_documents(docs, ids)
+
+    logger.info(f"📥 Importiere {manifest['count']} Einträge nach '{collection_name}'...")
+    stats = import_snapshot(
+        collection,
+        Path(args.input),
+        batch_size=args.batch_size,
+        workers=args.workers,
+        verify=not args.no_verify,
+        on_batch=on_batch,
+    )
+    if collection_name in Config.SUMMARY_INDEX_COLLECTIONS:
+        # Zentroide aus den importierten Vektoren (ohne Re-Embedding)
+        files = get_summary_index(vectorstore).rebuild(collection)
+        logger.info(f"📑 Dokument-Index: {files} Dateien")
+    logger.info("=" * 60)
+    logger.info(f"✅ Import abgeschlossen: {stats['count']} Einträge in {stats['seconds']:.1f}s")
+    logger.info(f"   ⚡ {stats['rows_per_second']:.0f} Einträge/s, {stats['mb_per_second']:.1f} MB/s Vektoren")
+    logger.info(f"   📊 Collection '{collection_name}' enthält jetzt {collection.count()} Dokumente")
+    logger.info("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Snapshot-Export/-Import einer Collection (ohne Re-Embedding)"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Collection als Snapshot speichern")
+    export_parser.add_argument(
+        "--collection", type=str, default=None,
+        help=f"Collection-Name (default: {Config.CHROMA_COLLECTION_NAME})"
+    )
+    export_parser.add_argument("--output", type=str, required=True, help="Snapshot-Verzeichnis (muss leer sein)")
+    export_parser.add_argument(
+        "--block-size", type=int, default=5000,
+        help="Einträge pro Block (default: 5000)"
+    )
+
+    import_parser = subparsers.add_parser("import", help="Snapshot in eine Collection laden")
+    import_parser.add_argument("--input", type=str, required=True, help="Snapshot-Verzeichnis")
+    import_parser.add_argument(
+        "--collection", type=str, default=None,
+        help="Ziel-Collection (default: Name aus dem Snapshot)"
+    )
+    import_parser.add_argument(
+        "--batch-size", type=int, default=1000,
+        help="Einträge pro Upsert (default: 1000)"
+    )
+    import_parser.add_argument(
+        "--workers", type=int, default=4,
+        help="Parallele Upserts (default: 4)"
+    )
+    import_parser.add_argument(
+        "--clear", action="store_true",
+        help="Löscht existierende Dokumente der Ziel-Collection vor dem Import"
+    )
+    import_parser.add_argument(
+        "--no-verify", action="store_true",
+        help="Prüfsummen der Vektor-Blöcke nicht prüfen"
+    )
+
+    args = parser.parse_args()
+    if args.command == "export":
+        run_export(args)
+    else:
+        run_import(args)
+
+
+if __name__ == "__main__":
+    main()
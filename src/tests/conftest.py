@@ -0,0 +1,15 @@
+import pytest
+
+from app.config import Config
+
+
+@pytest.fixture(autouse=True, scope="session")
+def isolated_ollama_slots(tmp_path_factory):
+    """Prozessübergreifende Ollama-Slots der Tests nicht im data/-Ordner des Repos anlegen"""
+    slot_dir = str(tmp_path_factory.mktemp("ollama-slots"))
+    monkeypatch = pytest.MonkeyPatch()
+    monkeypatch.setattr(Config, "OLLAMA_SLOT_DIR", slot_dir)
+    # auch für Unterprozesse (Startzeit-Messung)
+    monkeypatch.setenv("OLLAMA_SLOT_DIR", slot_dir)
+    yield
+    monkeypatch.undo()
@@ -0,0 +1,150 @@
+import http.client
+import json
+import threading
+import uuid
+
+import chromadb
+import pytest
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+
+from app.api_server import MAX_BODY_BYTES, PipelineRegistry, create_server
+from app.config import Config
+from app.hash_embeddings import HashEmbeddings
+from benchmarks.ollama_stub import StubConfig, start_stub_server
+
+FAST = dict(embed_latency_ms=0, embed_latency_per_text_ms=0, ttft_ms=5, tokens_per_second=1000, answer_tokens=8)
+
+
+@pytest.fixture(scope="module")
+def api():
+    stub = start_stub_server(config=StubConfig(embedding_dim=32, **FAST))
+    monkeypatch = pytest.MonkeyPatch()
+    monkeypatch.setattr(Config, "OLLAMA_BASE_URL", stub.url)
+
+    embeddings = HashEmbeddings(dim=32)
+    vectorstore = Chroma(
+        collection_name=f"api-{uuid.uuid4().hex[:8]}",
+        embedding_function=embeddings,
+        client=chromadb.EphemeralClient(),
+    )
+    vectorstore.add_documents([
+        Document(page_content=f"Die Ausleihfrist beträgt {i} Wochen.", metadata={"filename": f"regel{i}.txt"})
+        for i in range(1, 6)
+    ])
+    registry = PipelineRegistry()
+    registry._embedding_model = embeddings
+    registry._vectorstores[Config.DOCUMENTS_COLLECTION] = vectorstore
+
+    server = create_server("127.0.0.1", 0, registry)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address[1]
+    server.shutdown()
+    server.server_close()
+    stub.shutdown()
+    stub.server_close()
+    monkeypatch.undo()
+
+
+def request(port, method, path, body=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        payload = body if isinstance(body, (bytes, type(None))) else json.dumps(body).encode("utf-8")
+        conn.request(method, path, body=payload, headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        return response.status, response.getheader("Content-Type"), response.read().decode("utf-8")
+    finally:
+        conn.close()
+
+
+def parse_sse(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        data = json.loads(lines["data"])
+        assert data["type"] == lines["event"]
+        events.append(data)
+    return events
+
+
+def test_health_and_stats(api):
+    status, _, body = request(api, "GET", "/health")
+    assert status == 200 and json.loads(body) == {"status": "ok"}
+
+    status, _, body = request(api, "GET", f"/collections/{Config.DOCUMENTS_COLLECTION}/stats")
+    assert status == 200 and json.loads(body)["count"] == 5
+
+    status, _, _ = request(api, "GET", "/collections/gibt-es-nicht/stats")
+    assert status == 404
+
+
+def test_query_returns_answer_and_sources(api):
+    status, _, body = request(api, "POST", "/query", {
+        "question": "Wie lange ist die Ausleihfrist?", "collection": Config.DOCUMENTS_COLLECTION, "k": 2,
+    })
+    assert status == 200
+    result = json.loads(body)
+    assert len(result["answer"].split()) == 8
+    assert len(result["sources"]) == 2
+    assert result["sources"][0]["metadata"]["filename"].startswith("regel")
+    assert "vector_search_seconds" in result["metrics"]
+
+
+def test_query_stream_sends_sse_events(api):
+    status, content_type, body = request(api, "POST", "/query/stream", {
+        "question": "Wie lange ist die Ausleihfrist?", "collection": Config.DOCUMENTS_COLLECTION, "k": 2,
+    })
+    assert status == 200 and content_type.startswith("text/event-stream")
+
+    events = parse_sse(body)
+    types = [event["type"] for event in events]
+    assert types[0] == "sources" and len(events[0]["sources"]) == 2
+    assert types[-2:] == ["metrics", "done"]
+    tokens = "".join(event["token"] for event in events if event["type"] == "token")
+    assert len(tokens.split()) == 8
+    assert events[-2]["metrics"]["completion_tokens"] > 0
+
+
+@pytest.mark.parametrize("body, message", [
+    (b"{kaputt", "Ungültiges JSON"),
+    ([], "JSON-Objekt"),
+    ("Frage", "JSON-Objekt"),
+    (1, "JSON-Objekt"),
+    ({"question": 42}, "String"),
+    ({"question": "  "}, "'question' fehlt"),
+    ({"question": "Frage?", "k": "viele"}, "Zahl"),
+    ({"question": "Frage?", "k": 0}, "zwischen 1 und 50"),
+    ({"question": "Frage?", "collection": "gibt-es-nicht"}, "Unbekannte Collection"),
+])
+def test_invalid_requests_get_400(api, body, message):
+    for path in ("/query", "/query/stream"):
+        status, _, text = request(api, "POST", path, body)
+        assert status == 400
+        assert message in json.loads(text)["error"]
+
+
+def raw_post(port, content_length, body=b""):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        conn.putrequest("POST", "/query")
+        conn.putheader("Content-Length", content_length)
+        conn.endheaders(body)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read().decode("utf-8"))
+    finally:
+        conn.close()
+
+
+def test_content_length_is_validated(api):
+    assert raw_post(api, "-1") == (400, {"error": "Ungültiger Content-Length-Header"})
+    assert raw_post(api, "viel")[0] == 400
+    status, body = raw_post(api, str(MAX_BODY_BYTES + 1), b"{}")
+    assert status == 413 and "zu groß" in body["error"]
+    # Server bleibt danach erreichbar
+    assert request(api, "GET", "/health")[0] == 200
+
+
+def test_unknown_path_gets_404(api):
+    assert request(api, "POST", "/antwort", {"question": "Frage?"})[0] == 404
+    assert request(api, "GET", "/gibt-es-nicht")[0] == 404
@@ -0,0 +1,118 @@
+import json
+import threading
+import uuid
+
+import chromadb
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage
+
+from app.batch_qa import BatchQARunner, load_checkpoint, read_questions
+from app.hash_embeddings import HashEmbeddings
+from app.rag_pipeline import RAGPipeline
+
+
+class CountingEmbeddings(HashEmbeddings):
+    def __init__(self):
+        super().__init__(dim=64)
+        self.query_calls = 0
+        self.batch_sizes = []
+
+    def embed_query(self, text):
+        self.query_calls += 1
+        return super().embed_query(text)
+
+    def embed_query_batch(self, texts):
+        self.batch_sizes.append(len(texts))
+        return self.embed_documents(texts)
+
+
+class EchoLLM:
+    """Thread-sicheres Fake-LLM; zählt gleichzeitige Aufrufe"""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.lock = threading.Lock()
+        self.active = self.max_active = 0
+
+    def invoke(self, messages):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            question = messages[-1].content
+            if self.fail_on and self.fail_on in question:
+                raise RuntimeError("Ollama weg")
+            return AIMessage(content=f"Antwort: {question}")
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def make_rag(fail_on=None):
+    embeddings = CountingEmbeddings()
+    vectorstore = Chroma(
+        collection_name=f"qa-{uuid.uuid4().hex[:8]}",
+        embedding_function=embeddings,
+        client=chromadb.EphemeralClient(),
+    )
+    vectorstore.add_documents([
+        Document(page_content=f"Ausleihe Regel {i}", metadata={"filename": f"regel{i}.txt"}) for i in range(5)
+    ])
+    rag = RAGPipeline(vectorstore, collection_name="qa")
+    rag.llm = EchoLLM(fail_on)
+    return rag, embeddings
+
+
+def write_questions(path, count):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            f.write(json.dumps({"question": f"Frage {i} zur Ausleihe?", "expected": i}) + "\n")
+        f.write("kein json\n")
+
+
+def test_batch_answers_with_batched_embeddings(tmp_path):
+    questions = tmp_path / "fragen.jsonl"
+    output = tmp_path / "antworten.jsonl"
+    write_questions(questions, 23)
+    rag, embeddings = make_rag()
+
+    stats = BatchQARunner(rag, output, workers=3, embed_batch_size=10, k=2).run(read_questions(questions))
+
+    assert stats["answered"] == 23 and stats["failed"] == 0
+    assert embeddings.batch_sizes == [10, 10, 3]
+    assert embeddings.query_calls == 0
+    assert rag.llm.max_active <= 3
+
+    records = [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+    assert sorted(int(r["id"]) for r in records) == list(range(1, 24))
+    record = records[0]
+    assert record["answer"].startswith("Antwort: Frage")
+    assert record["expected"] == int(record["id"]) - 1
+    assert len(record["sources"]) == len(record["scores"]) == 2
+    assert record["sources"][0]["metadata"]["filename"].startswith("regel")
+    assert "vector_search_seconds" in record["metrics"]
+    assert record["embedding_batch_size"] in (10, 3)
+
+
+def test_checkpoint_resumes_and_retries_failures(tmp_path):
+    questions = tmp_path / "fragen.jsonl"
+    output = tmp_path / "antworten.jsonl"
+    write_questions(questions, 6)
+
+    rag, _ = make_rag(fail_on="Frage 4")
+    stats = BatchQARunner(rag, output, workers=2, embed_batch_size=4).run(read_questions(questions))
+    assert stats["answered"] == 5 and stats["failed"] == 1
+
+    # Abbruch mitten im Schreiben simulieren
+    with open(output, "a", encoding="utf-8") as f:
+        f.write('{"id": "99", "answ')
+    assert load_checkpoint(output) == {"1", "2", "3", "4", "6"}
+
+    rag, embeddings = make_rag()
+    stats = BatchQARunner(rag, output, workers=2, embed_batch_size=4).run(read_questions(questions))
+    assert stats == {**stats, "answered": 1, "failed": 0, "skipped": 5}
+    assert embeddings.batch_sizes == [1]
+
+    ids = [json.loads(line)["id"] for line in output.read_text(encoding="utf-8").splitlines()]
+    assert sorted(ids) == ["1", "2", "3", "4", "5", "6"]
@@ -0,0 +1,27 @@
+from app.hash_embeddings import HashEmbeddings
+from benchmarks.bench_ingestion import compare_with_baseline, run_benchmark
+from benchmarks.corpus import generate_corpus
+
+
+def test_hash_embeddings_are_deterministic():
+    embeddings = HashEmbeddings(dim=64)
+    a = embeddings.embed_query("Bibliothek Katalog")
+    assert a == HashEmbeddings(dim=64).embed_query("Bibliothek Katalog")
+    assert a != embeddings.embed_query("Quantenphysik")
+    assert abs(sum(v * v for v in a) - 1.0) < 1e-9
+
+
+def test_ingestion_benchmark_runs_offline(tmp_path):
+    """Kompletter Import-Pfad ohne Ollama und ohne ChromaDB-Server"""
+    generate_corpus(tmp_path, files_per_type=2, paragraphs_per_file=5, types=(".txt", ".pdf"))
+    result = run_benchmark(tmp_path, [".txt", ".pdf"], batch_size=5, embedding_dim=32)
+
+    assert result["files"] == 4
+    assert result["failed_files"] == []
+    assert result["chunks"] > 0
+    assert result["stored_chunks"] == result["chunks"]
+    assert set(result["stage_seconds"]) == {"load", "split", "embed", "upsert"}
+
+    slower = dict(result, chunks_per_second=result["chunks_per_second"] * 0.5)
+    assert compare_with_baseline(slower, result, max_regression=0.2)
+    assert not compare_with_baseline(result, result, max_regression=0.2)
@@ -0,0 +1,166 @@
+import json
+import uuid
+
+import chromadb
+from langchain_chroma import Chroma
+
+from app.catalog_import import import_catalog_file, iter_records, render_text
+from app.catalog_index import CatalogIndex
+from app.collection_inventory import CollectionInventory
+from app.hash_embeddings import HashEmbeddings
+
+TEMPLATE = "Titel: {title}\nAutor: {author}\nJahr: {year}\nSchlagwörter: {subjects}"
+
+
+class CountingEmbeddings(HashEmbeddings):
+    def __init__(self):
+        super().__init__(dim=64)
+        self.embedded = 0
+
+    def embed_documents(self, texts):
+        self.embedded += len(texts)
+        return super().embed_documents(texts)
+
+
+def make_vectorstore():
+    embeddings = CountingEmbeddings()
+    vectorstore = Chroma(
+        collection_name=f"katalog-{uuid.uuid4().hex[:8]}",
+        embedding_function=embeddings,
+        client=chromadb.EphemeralClient(),
+    )
+    return vectorstore, embeddings
+
+
+def write_jsonl(path, records):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.write("kaputt\n")
+
+
+def iso2709(fields):
+    """Minimaler MARC-21-Writer (UTF-8) für Testdaten"""
+    directory, data = b"", b""
+    for tag, value in fields:
+        if tag < "010":
+            body = value.encode("utf-8") + b"\x1e"
+        else:
+            body = b"  " + b"".join(
+                b"\x1f" + code.encode() + text.encode("utf-8") for code, text in value
+            ) + b"\x1e"
+        directory += f"{tag}{len(body):04d}{len(data):05d}".encode()
+        data += body
+    base = 24 + len(directory) + 1
+    length = base + len(data) + 1
+    leader = f"{length:05d}nam a22{base:05d}   4500".encode()
+    return leader + directory + b"\x1e" + data + b"\x1d"
+
+
+def test_jsonl_import_is_idempotent(tmp_path):
+    path = tmp_path / "katalog.jsonl"
+    records = [
+        {"id": f"K{i}", "titel": f"Band {i}", "autor": "Thomas Mann", "jahr": 1900 + i,
+         "subjects": ["Roman", "Familie"], "exemplare": {"Wildau": 2}}
+        for i in range(25)
+    ]
+    # Korrektur desselben Datensatzes in derselben Gruppe: der letzte gewinnt
+    records.insert(6, {"id": "K3", "titel": "Band 3 (korrigiert)", "autor": "Thomas Mann"})
+    write_jsonl(path, records)
+
+    vectorstore, embeddings = make_vectorstore()
+    catalog_index = CatalogIndex(tmp_path / "catalog.sqlite3")
+    inventory = CollectionInventory(tmp_path / "inv.sqlite3")
+    stats = import_catalog_file(
+        vectorstore, path, template=TEMPLATE, batch_size=8, group_size=10,
+        catalog_index=catalog_index, inventory=inventory,
+    )
+
+    assert stats["records"] == 26 and stats["duplicates"] == 1 and stats["failed_batches"] == 0
+    assert vectorstore._collection.count() == 25
+    assert inventory.totals()["files"] == 1 and inventory.totals()["chunks"] == 25
+
+    stored = vectorstore._collection.get(where={"id": "K7"})
+    metadata = stored["metadatas"][0]
+    assert metadata["title"] == "Band 7" and metadata["titel"] == "Band 7"
+    assert metadata["subjects"] == "Roman; Familie"
+    assert json.loads(metadata["exemplare"]) == {"Wildau": 2}
+    assert vectorstore._collection.get(where={"id": "K3"})["metadatas"][0]["title"] == "Band 3 (korrigiert)"
+    assert metadata["filename"] == "katalog.jsonl" and metadata["source_format"] == "jsonl"
+    assert stored["documents"][0] == "Titel: Band 7\nAutor: Thomas Mann\nJahr: 1907\nSchlagwörter: Roman; Familie"
+
+    hits = catalog_index.lookup({"title": "Band 7", "author": "Thomas Mann"})
+    assert hits and hits[0]["id"] == stored["ids"][0]
+
+    # Zweiter Lauf: gleiche IDs, nichts neu eingebettet
+    embedded = embeddings.embedded
+    stats = import_catalog_file(vectorstore, path, template=TEMPLATE, batch_size=8, group_size=10)
+    assert stats["stored"] == 0 and stats["unchanged"] == 25
+    assert embeddings.embedded == embedded
+    assert vectorstore._collection.count() == 25
+
+
+def test_csv_and_marc_records(tmp_path):
+    csv_path = tmp_path / "export.csv"
+    csv_path.write_text(
+        "Titel;Verfasser;Erscheinungsjahr;ISBN\n"
+        "Die Blechtrommel;Günter Grass;1959;978-3-423-11821-4\n"
+        ";;;\n",
+        encoding="utf-8",
+    )
+    records = list(iter_records(csv_path))
+    assert records[0]["Verfasser"] == "Günter Grass"
+
+    marc_path = tmp_path / "export.mrc"
+    marc_path.write_bytes(iso2709([
+        ("001", "BV123"),
+        ("020", [("a", "9783596294339")]),
+        ("100", [("a", "Mann, Thomas")]),
+        ("245", [("a", "Der Zauberberg :"), ("b", "Roman /"), ("c", "Thomas Mann.")]),
+        ("264", [("a", "Frankfurt am Main :"), ("b", "S. Fischer,"), ("c", "c1924.")]),
+        ("650", [("a", "Sanatorium")]),
+        ("650", [("a", "Davos")]),
+        ("999", [("a", "Lokal"), ("b", "Signatur X")]),
+    ]) * 2)
+    mrk_path = tmp_path / "export.mrk"
+    mrk_path.write_text(
+        "=LDR  00000nam a2200000   4500\n=001  BV123\n=245  10$aDer Zauberberg :$bRoman /$cThomas Mann.\n"
+        "=100  1\\$aMann, Thomas\n=264  \\1$aFrankfurt am Main :$bS. Fischer,$cc1924.\n"
+        "=650  \\7$aSanatorium\n=650  \\7$aDavos\n=999  \\\\$aLokal$bSignatur X\n=020  \\\\$a9783596294339\n\n",
+        encoding="utf-8",
+    )
+    expected = {
+        "control_number": "BV123",
+        "isbn": "9783596294339",
+        "author": "Mann, Thomas",
+        "title": "Der Zauberberg : Roman",
+        "responsibility": "Thomas Mann",
+        "place": "Frankfurt am Main",
+        "publisher": "S. Fischer",
+        "year": "1924",
+        "subjects": ["Sanatorium", "Davos"],
+        "marc_999": "Lokal Signatur X",
+    }
+    assert list(iter_records(marc_path)) == [expected, expected]
+    assert list(iter_records(mrk_path)) == [expected]
+
+    vectorstore, _ = make_vectorstore()
+    csv_stats = import_catalog_file(vectorstore, csv_path, template=TEMPLATE)
+    marc_stats = import_catalog_file(vectorstore, marc_path, template=TEMPLATE)
+    assert csv_stats["invalid"] == 1 and csv_stats["stored"] == 1
+    # Doppelter Datensatz in derselben Datei: eine ID, ein Dokument
+    assert marc_stats["duplicates"] == 1 and marc_stats["stored"] == 1
+    assert vectorstore._collection.count() == 2
+
+    # Gleiche Kontrollnummer aus .mrk → gleiche ID, kein neues Dokument
+    import_catalog_file(vectorstore, mrk_path, template=TEMPLATE)
+    assert vectorstore._collection.count() == 2
+
+    blechtrommel = vectorstore._collection.get(where={"isbn": "978-3-423-11821-4"})
+    assert blechtrommel["metadatas"][0]["author"] == "Günter Grass"
+    assert blechtrommel["documents"][0] == "Titel: Die Blechtrommel\nAutor: Günter Grass\nJahr: 1959"
+
+
+def test_render_text_falls_back_to_all_fields():
+    assert render_text({"Signatur": "ABC 1"}, TEMPLATE) == "Signatur: ABC 1"
+    assert render_text({"TITLE": "X"}, "Titel: {title}\nHinweis: Bestand Wildau") == "Titel: X\nHinweis: Bestand Wildau"
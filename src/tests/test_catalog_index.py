@@ -0,0 +1,61 @@
+from langchain_core.documents import Document
+from app.catalog_index import CatalogIndex, extract_catalog_fields, parse_fielded_query
+
+
+RECORDS = [
+    "Titel: Der Zauberberg\nAutor: Thomas Mann\nJahr: 1924\nISBN: 978-3-596-29433-9",
+    "Titel: Buddenbrooks\nAutor: Thomas Mann\nJahr: 1901",
+    "Titel: Die Blechtrommel\nAutor: Günter Grass\nErscheinungsjahr: 1959",
+]
+
+
+def make_index(tmp_path):
+    index = CatalogIndex(tmp_path / "catalog.sqlite3")
+    docs = [Document(page_content=text, metadata={"filename": "katalog.txt"}) for text in RECORDS]
+    assert index.add_documents(docs, [f"id-{i}" for i in range(len(docs))]) == 3
+    return index
+
+
+def test_extract_fields_from_text_and_metadata():
+    fields = extract_catalog_fields(RECORDS[0])
+    assert fields == {
+        "title": "Der Zauberberg",
+        "author": "Thomas Mann",
+        "year": "1924",
+        "isbn": "9783596294339",
+    }
+    # Metadaten haben Vorrang vor dem Text
+    assert extract_catalog_fields(RECORDS[1], {"title": "Anders"})["title"] == "Anders"
+
+
+def test_parse_fielded_query():
+    assert parse_fielded_query("Habt ihr den Zauberberg von Thomas Mann?") == {
+        "title": "Zauberberg",
+        "author": "Thomas Mann",
+    }
+    assert parse_fielded_query("ISBN 978-3-596-29433-9") == {"isbn": "9783596294339"}
+    assert parse_fielded_query("Titel: Buddenbrooks, Jahr: 1901") == {"title": "Buddenbrooks", "year": "1901"}
+    # Themenfragen gehen weiter über die Vektorsuche
+    assert parse_fielded_query("Gibt es Bücher über Quantenphysik?") is None
+    assert parse_fielded_query("Was ist der Sinn des Lebens?") is None
+
+
+def test_lookup_exact_prefix_fuzzy(tmp_path):
+    index = make_index(tmp_path)
+
+    hits = index.lookup({"isbn": "9783596294339"})
+    assert [h["id"] for h in hits] == ["id-0"]
+
+    hits = index.lookup({"title": "der zauberberg", "author": "Mann"})
+    assert hits[0]["id"] == "id-0" and hits[0]["match"] == "exact"
+
+    hits = index.lookup(parse_fielded_query("Habt ihr den Zauberberg von Thomas Mann?"))
+    assert hits[0]["id"] == "id-0" and hits[0]["match"] == "exact"
+
+    hits = index.lookup({"title": "Die Blech"})
+    assert hits[0]["id"] == "id-2" and hits[0]["match"] == "prefix"
+
+    hits = index.lookup({"title": "Budenbroks"})
+    assert hits[0]["id"] == "id-1" and hits[0]["match"] == "fuzzy"
+
+    assert index.lookup({"title": "Völlig unbekannt"}) == []
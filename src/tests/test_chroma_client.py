@@ -1,33 +1,47 @@
 import logging
-from app.chroma_client import get_chroma_vectorstore
+
+import pytest
+
+from app.chroma_client import check_connectivity, get_chroma_vectorstore
 from langchain_ollama import OllamaEmbeddings  
 from app.config import Config  
 
 logging.basicConfig(level=logging.INFO)
 
+
+def require_services():
+    """Überspringt den Test, wenn ChromaDB oder Ollama nicht laufen (z.B. in CI)"""
+    status = check_connectivity(timeout=2)
+    down = [name for name in ("chroma", "ollama") if not status[name]["ok"]]
+    if down:
+        pytest.skip(f"Dienste nicht erreichbar: {', '.join(down)}")
+
+
 def test_connection():
-    """Testet die Verbindung zu ChromaDB"""
+    """Testet die Verbindung zu ChromaDB (nur mit laufenden Diensten)"""
+    require_services()
+
+    # Embedding-Modell erstellen
+    embedding_model = OllamaEmbeddings(
+        base_url=Config.OLLAMA_BASE_URL,
+        model=Config.OLLAMA_EMBEDDING_MODEL
+    )
+
+    # Vectorstore holen
+    vectorstore = get_chroma_vectorstore(embedding_model)
+
+    # Collection-Info abrufen
+    collection = vectorstore._collection
+    print(f"📦 Collection: {collection.name}")
+    print(f"📊 Anzahl Dokumente: {collection.count()}")
+    assert collection.count() >= 0
+
+
+if __name__ == "__main__":
     try:
-        # Embedding-Modell erstellen
-        embedding_model = OllamaEmbeddings(
-            base_url=Config.OLLAMA_BASE_URL,
-            model=Config.OLLAMA_EMBEDDING_MODEL
-        )
-       
-        # Vectorstore holen
-        vectorstore = get_chroma_vectorstore(embedding_model)
-       
+        test_connection()
         print("✅ Verbindung erfolgreich!")
-       
-        # Collection-Info abrufen
-        collection = vectorstore._collection
-        print(f"📦 Collection: {collection.name}")
-        print(f"📊 Anzahl Dokumente: {collection.count()}")
-       
-        return True
+    except pytest.skip.Exception as e:
+        print(f"⚠️  {e}")
     except Exception as e:
         print(f"❌ Fehler: {e}")
-        return False
-
-if __name__ == "__main__":
-    test_connection()
\ No newline at end of file
@@ -0,0 +1,59 @@
+import chromadb
+from langchain_core.documents import Document
+
+from app.collection_inventory import CollectionInventory
+
+
+def make_docs(filename, n, size=100):
+    return [Document(page_content="x" * size, metadata={"filename": filename}) for _ in range(n)]
+
+
+def test_incremental_add_and_delete(tmp_path):
+    inventory = CollectionInventory(tmp_path / "inv.sqlite3")
+    inventory.add_documents(make_docs("a.pdf", 3), ["a1", "a2", "a3"])
+    inventory.add_documents(make_docs("b.txt", 2, size=50), ["b1", "b2"])
+    # Erneuter Upsert derselben ID zählt nicht doppelt
+    inventory.add_documents(make_docs("a.pdf", 1), ["a1"])
+
+    assert inventory.totals() == {"files": 2, "chunks": 5, "chars": 400}
+    files = {f["filename"]: f for f in inventory.list_files()}
+    assert files["a.pdf"]["chunks"] == 3
+    assert files["b.txt"]["file_type"] == ".txt"
+
+    inventory.delete(inventory.file_ids("b.txt"))
+    assert [f["filename"] for f in inventory.list_files()] == ["a.pdf"]
+    inventory.delete(["a1"])
+    assert inventory.totals()["chunks"] == 2
+
+
+def test_search_and_pagination(tmp_path):
+    inventory = CollectionInventory(tmp_path / "inv.sqlite3")
+    for i in range(12):
+        inventory.add_documents(make_docs(f"buch_{i:02d}.pdf", i + 1), [f"{i}-{j}" for j in range(i + 1)])
+    inventory.add_documents(make_docs("100%_wahr.txt", 1), ["w"])
+
+    assert inventory.count_files("buch") == 12
+    page = inventory.list_files("buch", offset=10, limit=5)
+    assert [f["filename"] for f in page] == ["buch_10.pdf", "buch_11.pdf"]
+    assert inventory.list_files(order_by="chunks", limit=1)[0]["filename"] == "buch_11.pdf"
+    # % und _ sind in der Suche keine Platzhalter
+    assert [f["filename"] for f in inventory.list_files("0%_")] == ["100%_wahr.txt"]
+
+
+def test_rebuild_from_collection(tmp_path):
+    collection = chromadb.EphemeralClient().get_or_create_collection("inventory-test")
+    collection.upsert(
+        ids=[f"id{i}" for i in range(7)],
+        embeddings=[[float(i), 1.0] for i in range(7)],
+        documents=["text"] * 7,
+        metadatas=[{"filename": "a.pdf" if i < 4 else "b.pdf"} for i in range(7)],
+    )
+    inventory = CollectionInventory(tmp_path / "inv.sqlite3")
+    assert not inventory.is_built()
+
+    inventory.ensure_built(collection)
+    assert inventory.is_built()
+    assert inventory.totals() == {"files": 2, "chunks": 7, "chars": 28}
+
+    assert inventory.rebuild(collection, page_size=3) == 7
+    assert {f["filename"]: f["chunks"] for f in inventory.list_files()} == {"a.pdf": 4, "b.pdf": 3}
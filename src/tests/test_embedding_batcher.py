@@ -0,0 +1,70 @@
+import threading
+import time
+from app.embedding_batcher import BatchingEmbeddings
+
+
+class CountingEmbeddings:
+    """Fake-Embeddings, die jeden Call zählen und etwas Latenz simulieren"""
+
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        time.sleep(self.delay)
+        return [[float(len(t)), float(sum(map(ord, t)))] for t in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def test_single_query_passthrough():
+    """Einzelne Query wird ohne Wartezeit direkt eingebettet"""
+    base = CountingEmbeddings(delay=0)
+    batcher = BatchingEmbeddings(base, window_ms=50)
+
+    start = time.perf_counter()
+    vector = batcher.embed_query("hallo")
+    elapsed = time.perf_counter() - start
+
+    assert vector == base.embed_query("hallo")
+    assert elapsed < 0.04
+
+
+def test_concurrent_queries_are_batched():
+    """Parallele Queries landen in wenigen Calls und bekommen ihren eigenen Vektor"""
+    base = CountingEmbeddings()
+    batcher = BatchingEmbeddings(base, window_ms=5)
+    texts = [f"frage {i}" for i in range(20)]
+    results = {}
+
+    def worker(text):
+        results[text] = batcher.embed_query(text)
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in texts]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for text in texts:
+        assert results[text] == [float(len(text)), float(sum(map(ord, text)))]
+    assert len(base.calls) < len(texts)
+    assert batcher.queries_embedded == len(texts)
+
+
+def test_errors_reach_every_caller():
+    """Fehler im Batch-Call werden an alle Aufrufer weitergegeben"""
+
+    class FailingEmbeddings(CountingEmbeddings):
+        def embed_documents(self, texts):
+            raise ConnectionError("Ollama nicht erreichbar")
+
+    batcher = BatchingEmbeddings(FailingEmbeddings())
+    try:
+        batcher.embed_query("x")
+    except ConnectionError:
+        pass
+    else:
+        raise AssertionError("ConnectionError erwartet")
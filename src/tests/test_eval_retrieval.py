@@ -0,0 +1,37 @@
+from app.hash_embeddings import HashEmbeddings
+from benchmarks.corpus import generate_corpus
+from benchmarks.eval_retrieval import make_synthetic_golden_set, run_grid, score_ranking
+from benchmarks.stats import percentile
+
+
+def test_score_ranking():
+    assert score_ranking(["a.txt", "b.txt", "c.txt"], ["b.txt"], k=3) == {"recall": 1.0, "reciprocal_rank": 0.5}
+    assert score_ranking(["a.txt", "b.txt"], ["b.txt"], k=1) == {"recall": 0.0, "reciprocal_rank": 0.0}
+    assert score_ranking(["a.txt", "b.txt"], ["a.txt", "c.txt"], k=2)["recall"] == 0.5
+
+
+def test_percentile_interpolates():
+    assert percentile([1, 2, 3, 4], 50) == 2.5
+    assert percentile([5], 99) == 5
+    assert percentile([], 50) == 0.0
+
+
+def test_grid_evaluation_offline(tmp_path):
+    generate_corpus(tmp_path, files_per_type=3, paragraphs_per_file=4, types=(".txt",))
+    golden = make_synthetic_golden_set(tmp_path, questions_per_file=1)
+
+    results = run_grid(
+        tmp_path, golden, chunk_sizes=[300, 600], chunk_overlaps=[50, 400], k_values=[1, 3],
+        embeddings=HashEmbeddings(dim=64), chroma="memory",
+    )
+
+    # (300, 400) wird übersprungen: Overlap >= Chunk-Größe
+    assert [(r["chunk_size"], r["chunk_overlap"], r["k"]) for r in results] == [
+        (300, 50, 1), (300, 50, 3), (600, 50, 1), (600, 50, 3), (600, 400, 1), (600, 400, 3),
+    ]
+    for result in results:
+        assert 0.0 <= result["mrr"] <= result["recall@k"] <= 1.0
+        assert result["retrieval_latency"]["count"] == len(golden)
+        assert result["retrieval_latency"]["p50_ms"] <= result["retrieval_latency"]["p99_ms"]
+    # Mehr Treffer bei größerem k
+    assert results[1]["recall@k"] >= results[0]["recall@k"]
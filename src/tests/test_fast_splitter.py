@@ -0,0 +1,86 @@
+import random
+
+import pytest
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from app.chat_memory import estimate_tokens
+from app.document_processor import SEPARATORS
+from app.fast_splitter import FastTextSplitter
+from app.streaming_splitter import StreamingTextSplitter
+from benchmarks.bench_splitter import check_result, make_texts, run_benchmark
+
+WORDS = ["Bibliothek", "Straße", "a", "x" * 60, "y" * 1500, "\n", "\n\n", "\n\n\n", "  ", "\t", " \n "]
+
+
+def random_text(rng, words):
+    return "".join(rng.choice(WORDS) + (" " if rng.random() < 0.7 else "") for _ in range(words))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_same_chunks_as_recursive_splitter(seed):
+    rng = random.Random(seed)
+    for _ in range(200):
+        chunk_size = rng.choice([1, 5, 20, 100, 1000])
+        chunk_overlap = rng.choice([0, 1, chunk_size // 2, chunk_size])
+        separators = rng.choice([SEPARATORS, ["\n\n", "\n"], [" ", "a"], ["\n\n\n", " "]])
+        text = random_text(rng, rng.randint(0, 300))
+
+        reference = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size, chunk_overlap=chunk_overlap, separators=separators
+        )
+        fast = FastTextSplitter(chunk_size, chunk_overlap, separators)
+        assert fast.split_text(text) == reference.split_text(text)
+        assert [text[start:end] for start, end in fast.split_spans(text)] == reference.split_text(text)
+
+
+def test_split_documents_copies_metadata():
+    docs = [
+        Document(page_content="Erster Absatz.\n\nZweiter Absatz " * 20, metadata={"source": "a.txt", "page": 1}),
+        Document(page_content="   ", metadata={"source": "leer.txt"}),
+    ]
+    reference = RecursiveCharacterTextSplitter(chunk_size=100, chunk_overlap=20, separators=SEPARATORS)
+    chunks = FastTextSplitter(100, 20, SEPARATORS).split_documents(docs)
+
+    expected = reference.split_documents(docs)
+    assert [(c.page_content, c.metadata) for c in chunks] == [(c.page_content, c.metadata) for c in expected]
+    chunks[0].metadata["chunk_id"] = 0
+    assert "chunk_id" not in docs[0].metadata
+
+
+@pytest.mark.parametrize("max_tokens", [5, 20, 60])
+def test_token_bound(max_tokens):
+    rng = random.Random(max_tokens)
+    text = " ".join(rng.choice(["Wort", "a", "Bibliotheksausweis", "\n", "\n\n"]) for _ in range(3000))
+
+    def words(chunk):
+        return len(chunk.split())
+
+    for counter in (None, words):
+        splitter = FastTextSplitter(500, 100, SEPARATORS, max_tokens=max_tokens, token_counter=counter)
+        chunks = splitter.split_text(text)
+        count = counter or estimate_tokens
+        assert chunks
+        assert all(len(chunk) <= 500 and count(chunk) <= max_tokens for chunk in chunks)
+
+    # Ohne wirksame Token-Grenze: identisch zum reinen Zeichen-Split
+    assert FastTextSplitter(500, 100, max_tokens=10_000).split_text(text) == FastTextSplitter(500, 100).split_text(text)
+
+
+def test_streaming_splitter_honours_token_bound(tmp_path):
+    rng = random.Random(7)
+    text = random_text(rng, 2000)
+    path = tmp_path / "dump.txt"
+    path.write_text(text, encoding="utf-8")
+
+    fast = FastTextSplitter(200, 40, SEPARATORS, max_tokens=25)
+    streamed = StreamingTextSplitter(200, 40, SEPARATORS, max_tokens=25)
+    assert list(streamed.iter_chunks(path)) == fast.split_text(text)
+
+
+def test_benchmark_reports_identical_chunks():
+    result = run_benchmark(make_texts(30), chunk_size=300, chunk_overlap=50, runs=1)
+    assert set(result["shapes"]) == {"absaetze", "zeilen", "fliesstext"}
+    assert all(shape["identical"] and shape["chunks"] > 0 for shape in result["shapes"].values())
+    assert check_result(result, min_speedup=0.0) == []
+    assert check_result(result, min_speedup=1e9)
@@ -0,0 +1,145 @@
+import uuid
+
+import chromadb
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+
+from app.collection_inventory import CollectionInventory
+from app.document_processor import DocumentProcessor
+from app.hash_embeddings import HashEmbeddings
+from app.ingestion import rebuild_stale_sidecars, store_chunks_in_batches
+from app.ingestion_report import IngestionReport, list_reports
+from benchmarks.corpus import generate_corpus
+
+
+class FlakyCollection:
+    """Erster Upsert schlägt fehl, danach wird gespeichert"""
+
+    def __init__(self):
+        self.calls = 0
+        self.ids = []
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self.calls += 1
+        if self.calls == 1:
+            raise ConnectionError("ChromaDB nicht erreichbar")
+        self.ids.extend(ids)
+
+    def count(self):
+        return len(self.ids)
+
+
+class CountingEmbeddings(HashEmbeddings):
+    def __init__(self):
+        super().__init__(dim=16)
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return super().embed_documents(texts)
+
+
+class FakeVectorStore:
+    def __init__(self):
+        self.embeddings = CountingEmbeddings()
+        self._collection = FlakyCollection()
+
+
+def test_report_covers_files_batches_and_retries(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    generate_corpus(corpus, files_per_type=2, paragraphs_per_file=3, types=(".txt",))
+    (corpus / "kaputt.pdf").write_bytes(b"kein PDF")
+
+    report = IngestionReport("test-collection", source="cli", settings={"batch_size": 4})
+    chunks = DocumentProcessor(chunk_size=300, chunk_overlap=50).load_and_process_folder(
+        corpus, [".txt", ".pdf"], on_file=report.add_file
+    )
+
+    vectorstore = FakeVectorStore()
+    stats = store_chunks_in_batches(vectorstore, chunks, batch_size=4, retry_wait=0)
+    report.add_storage(stats)
+    data = report.finish(collection_count=vectorstore._collection.count())
+
+    summary = data["summary"]
+    assert summary["files"] == 3
+    assert summary["chunks"] == len(chunks) == summary["collection_count"]
+    assert summary["retries"] == 1
+    assert summary["failed_batches"] == 0
+    assert summary["batches"] == len(data["batches"]) == stats["total_batches"]
+    # Nur der Upsert wurde wiederholt, nicht das Embedding
+    assert vectorstore.embeddings.calls == stats["total_batches"]
+    assert [f["filename"] for f in data["failures"]] == ["kaputt.pdf"]
+    assert all(f["load_seconds"] >= 0 for f in data["files"])
+
+    assert data["run_peak_rss_mb"] >= data["rss_start_mb"] > 0
+    assert data["process_peak_rss_mb"] >= data["run_peak_rss_mb"] - 1
+
+    path = report.save(tmp_path / "reports")
+    IngestionReport("andere-collection", source="upload").save(tmp_path / "reports")
+    reports = list_reports("test-collection", directory=tmp_path / "reports")
+    assert [r["path"] for r in reports] == [str(path)]
+
+
+class FailingInventory(CollectionInventory):
+    """Erstes Update schlägt fehl"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.failures = 1
+
+    def add_documents(self, documents, ids):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("Datenträger voll")
+        return super().add_documents(documents, ids)
+
+
+def test_retry_keeps_ids_and_sidecar_errors_trigger_rebuild(tmp_path):
+    vectorstore = Chroma(
+        collection_name=f"retry-{uuid.uuid4().hex[:8]}",
+        embedding_function=HashEmbeddings(dim=16),
+        client=chromadb.EphemeralClient(),
+    )
+    # Upsert kommt an, die Antwort aber nicht (Timeout): der Retry darf nicht duplizieren
+    upsert = vectorstore._collection.upsert
+    calls = []
+
+    def timeout_after_write(**kwargs):
+        upsert(**kwargs)
+        calls.append(kwargs["ids"])
+        if len(calls) == 1:
+            raise TimeoutError("Antwort verloren")
+
+    vectorstore._collection.upsert = timeout_after_write
+    inventory = FailingInventory(tmp_path / "inv.sqlite3")
+    inventory.rebuild(vectorstore._collection)
+    chunks = [Document(page_content=f"Absatz {i}", metadata={"filename": f"d{i % 2}.txt"}) for i in range(8)]
+
+    stats = store_chunks_in_batches(vectorstore, chunks, batch_size=4, retry_wait=0, inventory=inventory)
+
+    assert calls[0] == calls[1] and len(calls) == 3
+    assert vectorstore._collection.count() == 8
+    assert stats["retries"] == 1 and stats["failed_batches"] == 0
+    # Sidecar-Fehler: kein Retry des Batches, Inventar zum Neuaufbau markiert
+    assert stats["stale_sidecars"] == ["inventory"]
+    assert not inventory.is_built() and inventory.totals()["chunks"] == 4
+
+    rebuild_stale_sidecars(vectorstore, stats["stale_sidecars"], inventory=inventory)
+    assert inventory.is_built() and inventory.totals()["chunks"] == 8
+
+
+def test_memory_is_measured_per_run():
+    """Der Zuwachs eines Laufs ist unabhängig vom bisherigen Prozess-Peak"""
+    report = IngestionReport("test-collection", source="upload")
+    buffer = bytearray(64 * 1024 * 1024)
+    buffer[::4096] = b"x" * len(buffer[::4096])
+    report.add_storage({"errors": [], "batch_seconds": [], "embed_seconds": [], "upsert_seconds": [], "retries": 0})
+    del buffer
+    data = report.finish()
+    assert data["run_rss_delta_mb"] >= 48
+
+    # Zweiter Lauf ohne große Allokation: kleiner Zuwachs, obwohl der Prozess-Peak hoch bleibt
+    data = IngestionReport("test-collection", source="upload").finish()
+    assert data["run_rss_delta_mb"] < 32
+    assert data["process_peak_rss_mb"] >= 64
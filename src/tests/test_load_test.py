@@ -0,0 +1,49 @@
+import pytest
+from langchain_ollama import ChatOllama, OllamaEmbeddings
+
+from app.config import Config
+from benchmarks.load_test import run_load_test
+from benchmarks.ollama_stub import StubConfig, start_stub_server
+
+FAST = dict(embed_latency_ms=0, embed_latency_per_text_ms=0, ttft_ms=5, tokens_per_second=1000, answer_tokens=8)
+
+
+@pytest.fixture
+def stub():
+    server = start_stub_server(config=StubConfig(embedding_dim=32, **FAST))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_stub_speaks_ollama_api(stub):
+    embeddings = OllamaEmbeddings(base_url=stub.url, model="stub")
+    assert len(embeddings.embed_documents(["a", "b"])) == 2
+    assert embeddings.embed_query("a") == embeddings.embed_query("a")
+
+    chunks = list(ChatOllama(base_url=stub.url, model="stub").stream("Hallo"))
+    assert len("".join(c.content for c in chunks).split()) == 8
+    assert stub.stats.snapshot()["streamed_tokens"] == 8
+
+
+def test_stub_injects_errors():
+    server = start_stub_server(config=StubConfig(error_rate=1.0, **FAST))
+    try:
+        with pytest.raises(Exception, match="injected error"):
+            ChatOllama(base_url=server.url, model="stub").invoke("Hallo")
+        assert server.stats.snapshot()["injected_errors"] == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_load_test_against_stub(stub, monkeypatch):
+    monkeypatch.setattr(Config, "OLLAMA_BASE_URL", stub.url)
+    report = run_load_test(sessions=3, turns=2, files=2)
+
+    summary = report["summary"]
+    assert summary["queries"] == 6
+    assert summary["completed"] == 6
+    assert summary["errors"] == 0
+    assert summary["latency"]["p99_ms"] >= summary["ttft"]["p50_ms"] > 0
+    assert report["ingest"]["failed_batches"] == 0
@@ -0,0 +1,127 @@
+import time
+import uuid
+
+import chromadb
+import pytest
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+
+from app.ingestion import store_chunks_in_batches
+from app.ollama_pool import (
+    CHAT,
+    EMBEDDINGS,
+    Endpoint,
+    NoEndpointAvailable,
+    OllamaPool,
+    PooledChatModel,
+    PooledEmbeddings,
+)
+from benchmarks.ollama_stub import StubConfig, start_stub_servers
+
+FAST = dict(embedding_dim=32, embed_latency_ms=0, embed_latency_per_text_ms=0, ttft_ms=5, tokens_per_second=1000, answer_tokens=8)
+
+
+def make_pool(*urls, roles=(CHAT, EMBEDDINGS), **kwargs):
+    return OllamaPool([Endpoint(url, roles) for url in urls], **kwargs)
+
+
+def test_routes_by_latency_and_in_flight():
+    pool = make_pool("http://a", "http://b")
+    a, b = pool.endpoints
+    a.latency[EMBEDDINGS], b.latency[EMBEDDINGS] = 0.1, 0.3
+
+    assert pool.call(EMBEDDINGS, lambda endpoint: endpoint.url) == "http://a"
+    # Viele laufende Aufrufe auf a: b ist jetzt günstiger
+    a.in_flight = 5
+    assert pool.call(EMBEDDINGS, lambda endpoint: endpoint.url) == "http://b"
+    assert b.in_flight == 0
+
+
+def test_failover_and_circuit_breaker():
+    pool = make_pool("http://a", "http://b", failure_threshold=2, open_seconds=0.2)
+    a, _ = pool.endpoints
+    a.latency[EMBEDDINGS] = 0.0
+
+    def flaky(endpoint):
+        if endpoint.url == "http://a":
+            raise ConnectionError("a ist weg")
+        return endpoint.url
+
+    assert pool.call(EMBEDDINGS, flaky) == "http://b"
+    assert pool.call(EMBEDDINGS, flaky) == "http://b"
+    assert a.state == "open" and a.errors == 2
+
+    # Gesperrt: a wird gar nicht mehr versucht
+    assert pool.call(EMBEDDINGS, flaky) == "http://b"
+    assert a.errors == 2
+
+    # Nach Ablauf darf ein Probe-Aufruf durch, Erfolg schließt den Circuit
+    time.sleep(0.25)
+    assert a.state == "half_open"
+    assert pool.call(EMBEDDINGS, lambda endpoint: endpoint.url) == "http://a"
+    assert a.state == "closed"
+
+
+def test_roles_and_no_endpoint():
+    pool = OllamaPool([Endpoint("http://chat", [CHAT]), Endpoint("http://embed", [EMBEDDINGS])])
+    assert pool.call(CHAT, lambda endpoint: endpoint.url) == "http://chat"
+    assert pool.call(EMBEDDINGS, lambda endpoint: endpoint.url) == "http://embed"
+
+    def broken(endpoint):
+        raise ConnectionError("kaputt")
+
+    with pytest.raises(ConnectionError):
+        pool.call(CHAT, broken)
+    pool.endpoints[0].open_until = time.monotonic() + 60
+    with pytest.raises(NoEndpointAvailable):
+        pool.call(CHAT, broken)
+
+
+@pytest.fixture
+def stubs():
+    servers = start_stub_servers(3, configs=[
+        StubConfig(fail_after=5, **FAST),   # fällt mitten im Import aus
+        StubConfig(**FAST),
+        StubConfig(error_rate=1.0, **FAST),  # liefert nur HTTP 500
+    ])
+    yield servers
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_ingestion_fails_over_between_stubs(stubs):
+    pool = make_pool(*(server.url for server in stubs), failure_threshold=1, open_seconds=60)
+    # Bisher gemessen: der zweite Stub ist langsam, wird also erst nach dem Ausfall genutzt
+    pool.endpoints[1].latency[EMBEDDINGS] = 5.0
+    vectorstore = Chroma(
+        collection_name=f"pool-{uuid.uuid4().hex[:8]}",
+        embedding_function=PooledEmbeddings(pool, "stub"),
+        client=chromadb.EphemeralClient(),
+    )
+    docs = [Document(page_content=f"Kapitel {i}", metadata={"filename": "a.txt"}) for i in range(60)]
+
+    stats = store_chunks_in_batches(vectorstore, docs, batch_size=5, max_retries=1)
+
+    assert stats["failed_batches"] == 0
+    assert vectorstore._collection.count() == 60
+    states = {status["url"]: status["state"] for status in pool.status()}
+    assert states[stubs[0].url] == "open"
+    assert states[stubs[2].url] == "open"
+    assert stubs[0].stats.snapshot()["embed_requests"] == 5
+    assert stubs[1].stats.snapshot()["embed_requests"] == 12 - 5
+
+    # Health-Check sperrt den ausgefallenen Server ebenfalls
+    results = {result["url"]: result["ok"] for result in pool.probe()}
+    assert results == {stubs[0].url: False, stubs[1].url: True, stubs[2].url: True}
+
+
+def test_chat_stream_fails_over_before_first_token(stubs):
+    pool = make_pool(stubs[2].url, stubs[1].url)
+    llm = PooledChatModel(pool, model="stub")
+
+    tokens = "".join(chunk.content for chunk in llm.stream("Hallo"))
+    assert len(tokens.split()) == 8
+    assert pool.endpoints[0].errors == 1
+    assert pool.endpoints[1].in_flight == 0
+    assert llm.invoke("Hallo").content
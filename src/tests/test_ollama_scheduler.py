@@ -0,0 +1,103 @@
+from app.config import Config
+from app.ollama_scheduler import (
+    OllamaScheduler,
+    SharedSlots,
+    BULK_EMBEDDING,
+    CHAT,
+    QUERY_EMBEDDING,
+    scaled_limits,
+)
+
+
+def make_scheduler(max_concurrency=1):
+    return OllamaScheduler(
+        class_limits={QUERY_EMBEDDING: 2, CHAT: 2, BULK_EMBEDDING: 1},
+        max_concurrency=max_concurrency,
+    )
+
+
+def test_interactive_requests_overtake_bulk():
+    """Wartende Chat-Anfragen werden vor Bulk-Embeddings bedient"""
+    scheduler = make_scheduler(max_concurrency=1)
+
+    running = scheduler.submit(BULK_EMBEDDING)
+    assert running.wait(timeout=0)
+
+    bulk = scheduler.submit(BULK_EMBEDDING)
+    chat = scheduler.submit(CHAT)
+    assert chat.position == 0
+    assert bulk.position == 1
+
+    running.release()
+    assert chat.wait(timeout=0)
+    assert not bulk.wait(timeout=0)
+
+    chat.release()
+    assert bulk.wait(timeout=0)
+    bulk.release()
+
+
+def test_class_limit_is_enforced():
+    """Bulk-Embeddings belegen nie mehr als ihr Klassen-Limit"""
+    scheduler = make_scheduler(max_concurrency=4)
+
+    first = scheduler.submit(BULK_EMBEDDING)
+    second = scheduler.submit(BULK_EMBEDDING)
+    chat = scheduler.submit(CHAT)
+
+    assert first.wait(timeout=0)
+    assert not second.wait(timeout=0)
+    assert chat.wait(timeout=0)
+
+    # Abbrechen eines wartenden Tickets räumt die Warteschlange auf
+    second.release()
+    assert scheduler.stats()["waiting"][BULK_EMBEDDING] == 0
+
+    first.release()
+    chat.release()
+    assert scheduler.stats()["running"] == {QUERY_EMBEDDING: 0, CHAT: 0, BULK_EMBEDDING: 0}
+
+
+def test_bulk_yields_to_chat_in_other_processes(tmp_path):
+    """Zwei Scheduler (= zwei Prozesse) teilen sich Bulk-Slots und Chat-Vorrang über flock"""
+    app = OllamaScheduler({CHAT: 2, BULK_EMBEDDING: 1}, 4, shared=SharedSlots(tmp_path, bulk_slots=1, poll_seconds=0.01))
+    cli = OllamaScheduler({CHAT: 2, BULK_EMBEDDING: 1}, 4, shared=SharedSlots(tmp_path, bulk_slots=1, poll_seconds=0.01))
+
+    chat = app.submit(CHAT)
+    assert chat.wait(timeout=0)
+    bulk = cli.submit(BULK_EMBEDDING)
+    assert not bulk.wait(timeout=0.05)
+
+    chat.release()
+    assert bulk.wait(timeout=1)
+
+    # Ein Bulk-Slot für alle Prozesse zusammen
+    other = app.submit(BULK_EMBEDDING)
+    assert not other.wait(timeout=0.05)
+    bulk.release()
+    assert other.wait(timeout=1)
+    other.release()
+
+
+def test_bulk_does_not_starve_under_constant_chat(tmp_path):
+    chat_process = OllamaScheduler({CHAT: 1}, 1, shared=SharedSlots(tmp_path, bulk_slots=1))
+    import_process = OllamaScheduler(
+        {BULK_EMBEDDING: 1}, 1, shared=SharedSlots(tmp_path, bulk_slots=1, max_yield_seconds=0.05, poll_seconds=0.01)
+    )
+    with chat_process.slot(CHAT):
+        bulk = import_process.submit(BULK_EMBEDDING)
+        assert bulk.wait(timeout=1)
+        bulk.release()
+
+
+def test_limits_scale_with_pool_endpoints(monkeypatch):
+    monkeypatch.setattr(Config, "OLLAMA_CHAT_URLS", ["http://a", "http://b"])
+    monkeypatch.setattr(Config, "OLLAMA_EMBEDDING_URLS", ["http://b", "http://c", "http://d"])
+    monkeypatch.setattr(Config, "OLLAMA_CHAT_CONCURRENCY", 2)
+    monkeypatch.setattr(Config, "OLLAMA_QUERY_EMBEDDING_CONCURRENCY", 2)
+    monkeypatch.setattr(Config, "OLLAMA_BULK_EMBEDDING_CONCURRENCY", 1)
+    monkeypatch.setattr(Config, "OLLAMA_MAX_CONCURRENCY", 4)
+
+    limits = scaled_limits()
+    assert limits["class_limits"] == {QUERY_EMBEDDING: 6, CHAT: 4, BULK_EMBEDDING: 3}
+    assert limits["max_concurrency"] == 16
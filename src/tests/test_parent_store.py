@@ -0,0 +1,136 @@
+import uuid
+
+import chromadb
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+
+from app.config import Config
+from app.document_processor import DocumentProcessor
+from app.hash_embeddings import HashEmbeddings
+from app.ingestion import remove_files, store_chunks_in_batches
+from app.parent_store import ParentStore, expand_to_parents
+from app.rag_pipeline import RAGPipeline
+
+TEXT = (
+    "Sterne Planeten Teleskop Galaxie Umlaufbahn. " * 12
+    + "\n\n"
+    + "Rezept Pfanne Zwiebeln Suppe Gewürze. " * 12
+    + "\n\n"
+    + "Zug Gleis Fahrplan Bahnhof Lokomotive. " * 12
+)
+
+
+def make_parents(processor, text=TEXT, source="/tmp/mix.txt"):
+    doc = Document(page_content=text, metadata={"source": source, "filename": "mix.txt"})
+    return processor.process_documents([doc])
+
+
+def test_children_reference_their_parent(tmp_path):
+    processor = DocumentProcessor(chunk_size=500, chunk_overlap=50, child_chunk_size=120, child_chunk_overlap=20)
+    store = ParentStore(tmp_path / "p.sqlite3")
+
+    parents = make_parents(processor)
+    children = list(processor.iter_children(parents, store, group_size=2))
+
+    assert processor.small_to_big
+    assert store.count() == len(parents)
+    assert len(children) > len(parents)
+    assert all(len(child.page_content) <= 120 for child in children)
+
+    by_id = store.get_many([parent.metadata["parent_id"] for parent in parents])
+    for child in children:
+        parent = by_id[child.metadata["parent_id"]]
+        assert child.page_content in parent.page_content
+        assert child.metadata["filename"] == parent.metadata["filename"] == "mix.txt"
+
+    # Gleiche Datei, gleiche Einstellungen: gleiche IDs (Import überschreibt)
+    again = make_parents(processor)
+    processor.split_children(again)
+    assert [p.metadata["parent_id"] for p in again] == [p.metadata["parent_id"] for p in parents]
+
+    # Gleichnamige Datei aus anderem Ordner: eigene Parents
+    other = make_parents(processor, source="/daten/archiv/mix.txt")
+    processor.split_children(other)
+    assert not {p.metadata["parent_id"] for p in other} & {p.metadata["parent_id"] for p in parents}
+
+    store.delete_file("mix.txt")
+    assert store.count() == 0
+
+
+def test_reimport_replaces_old_parents_and_children(tmp_path):
+    processor = DocumentProcessor(chunk_size=500, chunk_overlap=50, child_chunk_size=120, child_chunk_overlap=20)
+    store = ParentStore(tmp_path / "p.sqlite3")
+    vectorstore = Chroma(
+        collection_name=f"s2b-{uuid.uuid4().hex[:8]}",
+        embedding_function=HashEmbeddings(dim=64),
+        client=chromadb.EphemeralClient(),
+    )
+
+    def import_text(text):
+        remove_files(vectorstore, ["mix.txt"], parent_store=store)
+        parents = make_parents(processor, text=text)
+        children = list(processor.iter_children(parents, store))
+        store_chunks_in_batches(vectorstore, children, batch_size=10)
+        return parents, children
+
+    import_text(TEXT)
+    # Geänderte, kürzere Datei: nur noch die neuen Parents und Children
+    parents, children = import_text("Nur noch ein Absatz über Teleskope. " * 5)
+    assert store.count() == len(parents) == 1
+    assert vectorstore._collection.count() == len(children)
+    stored = vectorstore._collection.get(include=["metadatas"])["metadatas"]
+    assert {m["parent_id"] for m in stored} == {parents[0].metadata["parent_id"]}
+
+
+def test_expand_deduplicates_in_hit_order(tmp_path):
+    store = ParentStore(tmp_path / "p.sqlite3")
+    store.add_documents([
+        Document(page_content="Parent A", metadata={"parent_id": "a", "filename": "x.txt"}),
+        Document(page_content="Parent B", metadata={"parent_id": "b", "filename": "x.txt"}),
+    ])
+    hits = [
+        (Document(page_content="a1", metadata={"parent_id": "a"}), 0.9),
+        (Document(page_content="ohne Parent", metadata={}), 0.8),
+        (Document(page_content="a2", metadata={"parent_id": "a"}), 0.7),
+        (Document(page_content="b1", metadata={"parent_id": "b"}), 0.6),
+        (Document(page_content="fehlt", metadata={"parent_id": "c"}), 0.5),
+    ]
+
+    expanded = expand_to_parents(hits, store, k=3)
+    assert [(doc.page_content, score) for doc, score in expanded] == [
+        ("Parent A", 0.9), ("ohne Parent", 0.8), ("Parent B", 0.6)
+    ]
+    assert expanded[0][0].metadata["child_hits"] == 2
+
+
+def test_pipeline_returns_parents(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "PARENT_STORE_DIR", tmp_path)
+    monkeypatch.setattr(Config, "PARENT_CHILD_COLLECTIONS", ["small-to-big"])
+    monkeypatch.setattr(Config, "PARENT_CHUNK_SIZE", 500)
+    monkeypatch.setattr(Config, "PARENT_CHUNK_OVERLAP", 0)
+    monkeypatch.setattr(Config, "CHILD_CHUNK_SIZE", 100)
+    monkeypatch.setattr(Config, "CHILD_CHUNK_OVERLAP", 0)
+
+    vectorstore = Chroma(
+        collection_name=f"s2b-{uuid.uuid4().hex[:8]}",
+        embedding_function=HashEmbeddings(dim=64),
+        client=chromadb.EphemeralClient(),
+    )
+    rag = RAGPipeline(vectorstore, collection_name="small-to-big")
+    processor = DocumentProcessor.for_collection("small-to-big")
+    assert processor.small_to_big and processor.chunk_size == 500
+
+    parents = make_parents(processor)
+    children = list(processor.iter_children(parents, rag.parent_store))
+    store_chunks_in_batches(vectorstore, children, batch_size=10)
+    assert vectorstore._collection.count() == len(children)
+
+    timings = {}
+    hits = rag._vector_search("Welche Planeten sieht man im Teleskop?", 2, timings)
+    assert 1 <= len(hits) <= 2
+    texts = [doc.page_content for doc, _ in hits]
+    assert len(set(texts)) == len(texts)
+    assert all(doc.page_content in {p.page_content for p in parents} for doc, _ in hits)
+    assert "Teleskop" in texts[0]
+    assert "parent_lookup_seconds" in timings
+    assert rag._record_timings(timings)["retrieval_seconds"] >= timings["parent_lookup_seconds"]
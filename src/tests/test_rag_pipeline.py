@@ -0,0 +1,107 @@
+import threading
+from langchain_core.documents import Document
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from app.rag_pipeline import RAGPipeline
+from app.metrics import Metrics, get_metrics
+
+
+class FakeVectorStore:
+    """Liefert feste Treffer ohne Embedding-Server"""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    def similarity_search_with_score(self, query, k=3):
+        return [(doc, 0.1 * i) for i, doc in enumerate(self.docs[:k])]
+
+
+def make_pipeline(answer="eins zwei drei vier fünf sechs"):
+    docs = [Document(page_content="Inhalt", metadata={"filename": "a.txt"})]
+    rag = RAGPipeline(FakeVectorStore(docs))
+    rag.llm = GenericFakeChatModel(messages=iter([AIMessage(content=answer)]))
+    return rag
+
+
+def test_query_stream_events():
+    """Streaming liefert Quellen, Tokens und ein abschließendes 'done'"""
+    rag = make_pipeline()
+    events = list(rag.query_stream("Frage?"))
+
+    assert events[0]["type"] == "sources"
+    assert events[-1]["type"] == "done"
+    tokens = "".join(e["token"] for e in events if e["type"] == "token")
+    assert tokens == "eins zwei drei vier fünf sechs"
+
+
+def test_query_stream_cancellation():
+    """Gesetztes cancel_event beendet die Generierung vorzeitig"""
+    metrics = get_metrics()
+    cancelled_before = metrics.get("generations_cancelled_total")
+
+    rag = make_pipeline()
+    cancel_event = threading.Event()
+    events = []
+    for event in rag.query_stream("Frage?", cancel_event=cancel_event):
+        events.append(event)
+        if event["type"] == "token":
+            cancel_event.set()
+
+    assert events[-1]["type"] == "cancelled"
+    assert sum(1 for e in events if e["type"] == "token") == 1
+    assert metrics.get("generations_cancelled_total") == cancelled_before + 1
+    assert metrics.get("cancellation_saved_tokens_total") > 0
+
+
+def test_chat_memory_keeps_prompt_size_flat():
+    """Ältere Turns werden inkrementell zusammengefasst, das Fenster bleibt begrenzt"""
+    from app.chat_memory import ChatMemory, estimate_tokens
+
+    memory = ChatMemory(token_budget=50, summary_max_tokens=20)
+    summarized = []
+
+    def summarize(previous, messages):
+        summarized.append(len(messages))
+        return memory.truncate_summary(previous + " " + " ".join(m["content"][:5] for m in messages))
+
+    history = []
+    for turn in range(30):
+        history.append({"role": "user", "content": f"Frage {turn} " + "x" * 60})
+        history.append({"role": "assistant", "content": f"Antwort {turn} " + "y" * 60})
+        summary, recent = memory.update(history, summarize)
+
+        assert sum(estimate_tokens(m["content"]) for m in recent) <= 50
+        assert estimate_tokens(summary) <= 20
+        assert recent[-1] == history[-1]
+
+    # Jede Nachricht wurde genau einmal zusammengefasst
+    assert sum(summarized) == memory.summarized_upto
+
+
+def test_query_stream_reports_stage_metrics():
+    """Vor 'done' kommt ein 'metrics'-Event, die Histogramme werden befüllt"""
+    rag = make_pipeline()
+    events = list(rag.query_stream("Frage?"))
+
+    assert [e["type"] for e in events[-2:]] == ["metrics", "done"]
+    stage = events[-2]["metrics"]
+    for key in ("retrieval_seconds", "prompt_assembly_seconds", "time_to_first_token_seconds",
+                "generation_seconds", "tokens_per_second", "prompt_tokens"):
+        assert key in stage
+    assert stage["completion_tokens"] == 11  # 6 Wörter + 5 Leerzeichen
+
+    exposition = get_metrics().render_prometheus()
+    assert "# TYPE sadpac_time_to_first_token_seconds histogram" in exposition
+    assert 'sadpac_retrieval_seconds_bucket{le="+Inf"}' in exposition
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = Metrics()
+    for value in (0.003, 0.02, 0.02, 7.0, 100.0):
+        metrics.observe("latency_seconds", value)
+    snapshot = metrics.histogram("latency_seconds")
+    buckets = dict(snapshot["buckets"])
+    assert buckets[0.005] == 1
+    assert buckets[0.025] == 3
+    assert buckets[10.0] == 4
+    assert buckets[float("inf")] == snapshot["count"] == 5
@@ -0,0 +1,254 @@
+import multiprocessing
+import uuid
+
+import chromadb
+import pytest
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+
+from app.collection_aliases import AliasedVectorStore, AliasRegistry
+from app.config import Config
+from app.hash_embeddings import HashEmbeddings
+from app.ingestion import store_chunks_in_batches
+import app.reembedding as reembedding
+from app.reembedding import ReembeddingJob, rollback
+
+DIMS = {None: 32, "neues-modell": 48}
+
+
+@pytest.fixture
+def setup(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "INVENTORY_DIR", tmp_path / "index")
+    client = chromadb.EphemeralClient()
+    name = f"reembed-{uuid.uuid4().hex[:8]}"
+    registry = AliasRegistry(tmp_path / "aliases.json", refresh_seconds=0)
+
+    def connect(physical_name, model=None):
+        return Chroma(
+            collection_name=physical_name,
+            embedding_function=HashEmbeddings(dim=DIMS[model]),
+            client=client,
+        )
+
+    docs = [Document(page_content=f"Kapitel {i} über Bibliotheken", metadata={"filename": f"d{i % 3}.txt"}) for i in range(25)]
+    store_chunks_in_batches(connect(name), docs, batch_size=10)
+    return name, registry, connect
+
+
+def test_build_switch_and_rollback(setup):
+    name, registry, connect = setup
+    reader = AliasedVectorStore(name, factory=lambda physical: connect(physical), registry=registry)
+    assert reader._collection.name == name
+
+    job = ReembeddingJob(name, connect=connect, embedding_model="neues-modell", batch_pause=0, registry=registry)
+    result = job.run()
+
+    assert result["state"] == "active"
+    shadow = f"{name}__v1"
+    assert registry.resolve(name) == shadow
+    assert registry.get(name)["versions"][shadow]["count"] == 25
+    # Gleiche IDs, neue Dimension
+    assert sorted(connect(shadow)._collection.get()["ids"]) == sorted(connect(name)._collection.get()["ids"])
+    assert len(connect(shadow, "neues-modell")._collection.get(limit=1, include=["embeddings"])["embeddings"][0]) == 48
+
+    # Gecachte Leser wechseln ohne Neustart
+    assert reader._collection.name == shadow
+
+    rollback(name, registry=registry, connect=connect)
+    assert registry.resolve(name) == name
+    assert reader._collection.name == name
+
+
+def test_catchup_reconciles_changes_during_build(setup):
+    name, registry, connect = setup
+    source = connect(name)._collection
+    ids = source.get(limit=2)["ids"]
+
+    job = ReembeddingJob(name, connect=connect, embedding_model="neues-modell", batch_size=5, batch_pause=0, registry=registry)
+    throttle = job._throttle
+
+    def write_during_build(batch_num, total_batches):
+        if batch_num == 3:
+            # Schon kopierte Einträge: neu hochgeladen bzw. gelöscht; dazu ein neuer Eintrag
+            source.upsert(ids=[ids[0]], documents=["Neue Fassung"], metadatas=[{"filename": "neu.txt"}], embeddings=[[0.1] * 32])
+            source.delete(ids=[ids[1]])
+            source.add(ids=["nachzuegler"], documents=["Spät dazugekommen"], metadatas=[{"filename": "d0.txt"}], embeddings=[[0.2] * 32])
+        throttle(batch_num, total_batches)
+
+    job._throttle = write_during_build
+    assert job.run()["state"] == "active"
+
+    shadow = connect(f"{name}__v1", "neues-modell")._collection
+    assert reembedding.collection_fingerprints(shadow) == reembedding.collection_fingerprints(source)
+    assert shadow.get(ids=[ids[0]])["documents"] == ["Neue Fassung"]
+    assert shadow.count() == 25
+
+
+def test_switching_back_reuses_existing_sidecars(setup, monkeypatch):
+    name, registry, connect = setup
+    calls = []
+    rebuild = reembedding.rebuild_sidecars
+
+    def counting_rebuild(collection_name, physical_name, collection):
+        calls.append(physical_name)
+        rebuild(collection_name, physical_name, collection)
+
+    monkeypatch.setattr(reembedding, "rebuild_sidecars", counting_rebuild)
+    job = ReembeddingJob(name, connect=connect, embedding_model="neues-modell", batch_pause=0, registry=registry)
+    assert job.run()["state"] == "active"
+    rollback(name, registry=registry, connect=connect)
+    assert calls == [f"{name}__v1", name]
+
+    # Beide Versionen haben ihre Sidecars: Hin- und Zurückschalten ohne Scan
+    reembedding.switch_version(name, f"{name}__v1", registry=registry, connect=connect)
+    rollback(name, registry=registry, connect=connect)
+    assert calls == [f"{name}__v1", name]
+    assert registry.resolve(name) == name
+
+
+def test_incomplete_build_is_never_activated(setup, monkeypatch):
+    name, registry, connect = setup
+
+    def failing_connect(physical_name, model=None):
+        store = connect(physical_name, model)
+        if physical_name != name:
+            def fail(**kwargs):
+                raise ConnectionError("upsert kaputt")
+            store._collection.upsert = fail
+        return store
+
+    # Retries ohne Wartezeit
+    monkeypatch.setattr(
+        reembedding, "store_chunks_in_batches",
+        lambda *args, **kwargs: store_chunks_in_batches(*args, retry_wait=0, **kwargs),
+    )
+    job = ReembeddingJob(name, connect=failing_connect, batch_pause=0, registry=registry)
+    result = job.run()
+
+    assert result["state"] == "failed"
+    assert registry.resolve(name) == name
+    assert f"{name}__v1" not in registry.get(name).get("versions", {})
+
+
+def test_registry_switch_is_atomic_file_replace(tmp_path):
+    registry = AliasRegistry(tmp_path / "aliases.json", refresh_seconds=0)
+    registry.switch("katalog", "katalog__v1")
+    registry.switch("katalog", "katalog__v2")
+
+    other = AliasRegistry(tmp_path / "aliases.json", refresh_seconds=0)
+    assert other.resolve("katalog") == "katalog__v2"
+    assert other.get("katalog")["previous"] == "katalog__v1"
+    assert other.resolve("unbekannt") == "unbekannt"
+    # keine liegengebliebenen Temp-Dateien, nur Register und Sperrdatei
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["aliases.json", "aliases.json.lock"]
+
+
+def _switch_many(path, prefix):
+    registry = AliasRegistry(path, refresh_seconds=0)
+    for i in range(20):
+        registry.switch(f"{prefix}{i}", f"{prefix}{i}__v1")
+
+
+def test_registry_updates_from_parallel_processes_are_not_lost(tmp_path):
+    path = tmp_path / "aliases.json"
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=_switch_many, args=(path, prefix)) for prefix in ("app", "cli", "api")]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    registry = AliasRegistry(path, refresh_seconds=0)
+    assert len(registry.all()) == 60
+
+
+class ShuffledHashEmbeddings(HashEmbeddings):
+    """Anderes Modell mit gleicher Dimension"""
+
+    def _embed(self, text):
+        return super()._embed(text)[::-1]
+
+
+@pytest.mark.parametrize("model, dim", [("neues-modell", 48), ("gleiche-dimension", 32)])
+def test_live_pipeline_ignores_quantized_index_of_old_version(setup, tmp_path, monkeypatch, model, dim):
+    from app.collection_aliases import get_alias_registry
+    from app.quantized_index import QuantizedIndex, index_path, load_collection_vectors
+    from app.rag_pipeline import RAGPipeline
+
+    name, _, connect = setup
+    monkeypatch.setattr(Config, "COLLECTION_ALIAS_FILE", tmp_path / "live-aliases.json")
+    monkeypatch.setattr(Config, "QUANTIZED_INDEX_DIR", tmp_path / "index")
+    monkeypatch.setattr(Config, "QUANTIZED_INDEX_COLLECTIONS", [name])
+    registry = get_alias_registry()
+    registry.refresh_seconds = 0
+
+    def versioned_connect(physical_name, model_name=None):
+        if model_name == "gleiche-dimension":
+            return Chroma(collection_name=physical_name, embedding_function=ShuffledHashEmbeddings(dim=32), client=connect(name)._client)
+        return connect(physical_name, model_name)
+
+    def factory(physical_name):
+        return versioned_connect(physical_name, registry.version_info(physical_name).get("embedding_model"))
+
+    ids, vectors = load_collection_vectors(connect(name)._collection)
+    QuantizedIndex.build("int8", ids, vectors).save(index_path(name))
+
+    rag = RAGPipeline(AliasedVectorStore(name, factory=factory, registry=registry), collection_name=name)
+    assert rag.vectorstore.index is not None and rag.vectorstore.index.dim == 32
+    assert rag._vector_search("Kapitel 3 über Bibliotheken", 3, {})
+
+    job = ReembeddingJob(name, connect=versioned_connect, embedding_model=model, batch_pause=0, registry=registry)
+    assert job.run()["state"] == "active"
+
+    # Gecachte Pipeline: neue Version, neue Query-Embeddings, kein Index der alten Version
+    query = "Kapitel 3 über Bibliotheken"
+    shadow = versioned_connect(f"{name}__v1", model)
+    assert rag.vectorstore.index is None
+    hits = rag._vector_search(query, 3, {})
+    expected = shadow.similarity_search_with_score(query, k=3)
+    assert [(doc.id, round(score, 4)) for doc, score in hits] == [(doc.id, round(score, 4)) for doc, score in expected]
+    assert len(shadow._collection.get(limit=1, include=["embeddings"])["embeddings"][0]) == dim
+
+    # Rollback: der Index der ursprünglichen Version gilt wieder
+    rollback(name, registry=registry, connect=versioned_connect)
+    assert rag.vectorstore.index is not None and rag.vectorstore.index.dim == 32
+
+
+def test_sidecars_are_complete_before_switch(setup, tmp_path, monkeypatch):
+    from app.catalog_index import get_catalog_index
+    from app.collection_aliases import get_alias_registry
+    from app.collection_inventory import get_inventory
+
+    name, _, connect = setup
+    monkeypatch.setattr(Config, "COLLECTION_ALIAS_FILE", tmp_path / "live-aliases.json")
+    monkeypatch.setattr(Config, "CATALOG_INDEX_DIR", tmp_path / "index")
+    monkeypatch.setattr(Config, "CATALOG_INDEX_COLLECTIONS", [name])
+    registry = get_alias_registry()
+    registry.refresh_seconds = 0
+
+    active = connect(name)._collection
+    page = active.get(include=["metadatas"])
+    active.update(ids=page["ids"], metadatas=[{**m, "title": f"Band {i}"} for i, m in enumerate(page["metadatas"])])
+    get_inventory(name).rebuild(active)
+    for docs in reembedding.iter_collection_documents(active):
+        get_catalog_index(name).add_documents(docs, [doc.id for doc in docs])
+
+    # Im Moment des Umschaltens: neue Version vollständig, aktive unangetastet
+    seen = {}
+    switch = registry.switch
+
+    def checking_switch(collection_name, physical_name):
+        seen["active_catalog"] = get_catalog_index(collection_name).count()
+        seen["active_files"] = get_inventory(collection_name).totals()["files"]
+        seen["shadow_catalog"] = get_catalog_index(physical_name).count()
+        seen["shadow_chunks"] = get_inventory(physical_name).totals()["chunks"]
+        return switch(collection_name, physical_name)
+
+    monkeypatch.setattr(registry, "switch", checking_switch)
+    job = ReembeddingJob(name, connect=connect, embedding_model="neues-modell", batch_pause=0, registry=registry)
+    assert job.run()["state"] == "active"
+
+    assert seen == {"active_catalog": 25, "active_files": 3, "shadow_catalog": 25, "shadow_chunks": 25}
+    # Logische Namen zeigen jetzt auf die Sidecars der neuen Version
+    assert get_catalog_index(name) is get_catalog_index(f"{name}__v1")
+    assert get_inventory(name).totals() == get_inventory(f"{name}__v1").totals()
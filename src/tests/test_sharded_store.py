@@ -0,0 +1,134 @@
+import threading
+import uuid
+
+import chromadb
+import pytest
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+
+from app.hash_embeddings import HashEmbeddings
+from app.ingestion import store_chunks_in_batches
+from app.sharded_store import ShardedVectorStore, shard_for_id
+
+WORDS = "bibliothek katalog roman lyrik physik chemie geschichte informatik musik kunst".split()
+
+
+def make_chunks(n=60):
+    return [
+        Document(
+            page_content=f"{WORDS[i % len(WORDS)]} {WORDS[(i * 3) % len(WORDS)]} text {i}",
+            metadata={"filename": f"datei{i % 5}.txt"},
+        )
+        for i in range(n)
+    ]
+
+
+def make_store(embeddings, name, num_shards=3, **kwargs):
+    # In-Process-Collections als Shards (statt mehrerer Server)
+    client = chromadb.EphemeralClient()
+    shards = [
+        Chroma(collection_name=f"{name}-shard{i}", embedding_function=embeddings, client=client)
+        for i in range(num_shards)
+    ]
+    return ShardedVectorStore(shards, collection_name=name, **kwargs)
+
+
+@pytest.fixture
+def embeddings():
+    return HashEmbeddings(dim=64)
+
+
+@pytest.fixture
+def sharded(embeddings):
+    store = make_store(embeddings, f"sharded-{uuid.uuid4().hex[:8]}")
+    store_chunks_in_batches(store, make_chunks(), batch_size=16)
+    yield store
+    store.delete_collection()
+
+
+def test_shard_for_id_is_stable():
+    assert shard_for_id("abc", 4) == shard_for_id("abc", 4)
+    assert {shard_for_id(str(i), 4) for i in range(100)} == {0, 1, 2, 3}
+
+
+def test_ingest_partitions_across_shards(sharded):
+    counts = [shard._collection.count() for shard in sharded.shards]
+    assert sum(counts) == sharded._collection.count() == 60
+    assert all(count > 0 for count in counts)
+
+    for i, shard in enumerate(sharded.shards):
+        ids = shard._collection.get()["ids"]
+        assert all(shard_for_id(doc_id, 3) == i for doc_id in ids)
+
+
+def test_get_by_ids_and_pages(sharded):
+    all_ids = sharded._collection.get(limit=25)["ids"] + sharded._collection.get(limit=100, offset=25)["ids"]
+    assert sorted(all_ids) == sorted(sharded._collection.get()["ids"])
+    assert len(set(all_ids)) == 60
+
+    result = sharded._collection.get(ids=all_ids[:7], include=["documents"])
+    assert sorted(result["ids"]) == sorted(all_ids[:7])
+    assert len(result["documents"]) == 7
+
+    sharded._collection.delete(ids=all_ids[:10])
+    assert sharded._collection.count() == 50
+
+
+def test_search_matches_unsharded(sharded, embeddings):
+    single = Chroma(
+        collection_name=f"single-{uuid.uuid4().hex[:8]}",
+        embedding_function=embeddings,
+        client=chromadb.EphemeralClient(),
+    )
+    store_chunks_in_batches(single, make_chunks(), batch_size=16)
+    try:
+        query = "roman physik"
+        expected = single.similarity_search_with_score(query, k=5)
+        merged = sharded.similarity_search_with_score(query, k=5)
+        # Gleiche Distanzen (bei Gleichstand kann die Reihenfolge abweichen)
+        assert [score for _, score in merged] == pytest.approx([score for _, score in expected], abs=1e-5)
+    finally:
+        single.delete_collection()
+
+
+def test_failed_shard_degrades_gracefully(sharded):
+    broken = sharded.shards[1]
+
+    def fail(*args, **kwargs):
+        raise ConnectionError("shard down")
+
+    broken.similarity_search_by_vector_with_relevance_scores = fail
+    results = sharded.similarity_search_with_score("roman", k=5)
+    assert len(results) == 5
+    assert all(shard_for_id(doc.id, 3) != 1 for doc, _ in results)
+    assert sharded.shard_status()[1]["available"] is False
+
+
+def test_all_shards_failing_raises(sharded):
+    def fail(*args, **kwargs):
+        raise ConnectionError("shard down")
+
+    for shard in sharded.shards:
+        shard.similarity_search_by_vector_with_relevance_scores = fail
+    with pytest.raises(RuntimeError, match="Kein Shard"):
+        sharded.similarity_search_with_score("roman", k=3)
+
+
+def test_hung_shard_does_not_starve_other_shards(embeddings):
+    store = make_store(embeddings, f"sharded-{uuid.uuid4().hex[:8]}", timeout=0.2, retry_after=0, workers_per_shard=2)
+    store_chunks_in_batches(store, make_chunks(), batch_size=16)
+    release = threading.Event()
+
+    def hang(*args, **kwargs):
+        release.wait(30)
+        return []
+
+    store.shards[1].similarity_search_by_vector_with_relevance_scores = hang
+    try:
+        # Mehr hängende Requests als Threads insgesamt: die anderen Shards antworten weiter
+        for _ in range(8):
+            results = store.similarity_search_with_score("roman", k=5)
+            assert len(results) == 5
+    finally:
+        release.set()
+        store.delete_collection()
@@ -0,0 +1,77 @@
+import gzip
+import json
+import uuid
+
+import chromadb
+import numpy as np
+import pytest
+
+from app.snapshot import export_snapshot, import_snapshot, iter_blocks, read_manifest
+
+
+def make_collection(name, n=0, dim=16):
+    collection = chromadb.EphemeralClient().get_or_create_collection(f"{name}-{uuid.uuid4().hex[:8]}")
+    if n:
+        rng = np.random.default_rng(0)
+        collection.upsert(
+            ids=[f"id-{i}" for i in range(n)],
+            embeddings=rng.normal(size=(n, dim)).astype(np.float32),
+            documents=[f"Text Nummer {i} mit Umlauten äöü" for i in range(n)],
+            metadatas=[{"filename": f"datei{i % 3}.txt", "chunk_id": i} if i % 5 else None for i in range(n)],
+        )
+    return collection
+
+
+def test_export_import_roundtrip(tmp_path):
+    source = make_collection("source", n=55)
+    manifest = export_snapshot(source, tmp_path / "snap", block_size=20, info={"embedding_model": "test"})
+
+    assert manifest["count"] == 55
+    assert manifest["dim"] == 16
+    assert [block["rows"] for block in manifest["blocks"]] == [20, 20, 15]
+    assert (tmp_path / "snap" / "vectors.f32").stat().st_size == 55 * 16 * 4
+    assert read_manifest(tmp_path / "snap")["info"]["embedding_model"] == "test"
+
+    target = make_collection("target")
+    seen = []
+    stats = import_snapshot(
+        target, tmp_path / "snap", batch_size=8, workers=3,
+        on_batch=lambda docs, ids: seen.extend(ids),
+    )
+    assert stats["count"] == 55
+    assert sorted(seen) == sorted(f"id-{i}" for i in range(55))
+
+    ids = [f"id-{i}" for i in range(55)]
+    include = ["embeddings", "documents", "metadatas"]
+    original = source.get(ids=ids, include=include)
+    copied = target.get(ids=ids, include=include)
+    order = {doc_id: i for i, doc_id in enumerate(copied["ids"])}
+    for i, doc_id in enumerate(original["ids"]):
+        j = order[doc_id]
+        assert copied["documents"][j] == original["documents"][i]
+        assert copied["metadatas"][j] == original["metadatas"][i]
+        np.testing.assert_array_equal(copied["embeddings"][j], original["embeddings"][i])
+
+
+def test_export_refuses_non_empty_directory(tmp_path):
+    (tmp_path / "snap").mkdir()
+    (tmp_path / "snap" / "alt.txt").write_text("x")
+    with pytest.raises(FileExistsError):
+        export_snapshot(make_collection("source", n=3), tmp_path / "snap")
+
+
+def test_corrupted_vectors_are_detected(tmp_path):
+    export_snapshot(make_collection("source", n=10), tmp_path / "snap", block_size=4)
+    vectors = tmp_path / "snap" / "vectors.f32"
+    data = bytearray(vectors.read_bytes())
+    data[100] ^= 0xFF
+    vectors.write_bytes(bytes(data))
+
+    with pytest.raises(ValueError, match="Prüfsumme"):
+        list(iter_blocks(tmp_path / "snap"))
+
+
+def test_columns_are_compressed_json(tmp_path):
+    export_snapshot(make_collection("source", n=5), tmp_path / "snap")
+    with gzip.open(tmp_path / "snap" / "block-00000.ids.json.gz", "rt") as f:
+        assert sorted(json.load(f)) == sorted(f"id-{i}" for i in range(5))
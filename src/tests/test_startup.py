@@ -0,0 +1,29 @@
+from app.chroma_client import check_connectivity
+from app.config import Config
+from benchmarks.bench_startup import HEAVY_MODULES, measure, page_scripts, top_level_imports
+from benchmarks.ollama_stub import start_stub_server
+
+
+def test_pages_do_not_import_heavy_modules():
+    for script in page_scripts():
+        result = measure(top_level_imports(script))
+        assert result["ok"], result["error"]
+        loaded = [name for name in HEAVY_MODULES if name in result["modules"]]
+        assert loaded == [], f"{script.name} importiert {loaded} beim Seitenstart"
+
+
+def test_check_connectivity(monkeypatch):
+    stub = start_stub_server()
+    try:
+        monkeypatch.setattr(Config, "OLLAMA_BASE_URL", stub.url)
+        # Der Stub kennt keinen Chroma-Heartbeat
+        monkeypatch.setattr(Config, "CHROMA_HTTP_URL", stub.url)
+        status = check_connectivity(timeout=1)
+    finally:
+        stub.shutdown()
+        stub.server_close()
+
+    assert status["ollama"]["ok"]
+    assert status["ollama"]["response"]["version"]
+    assert not status["chroma"]["ok"]
+    assert status["chroma"]["error"]
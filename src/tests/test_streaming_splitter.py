@@ -0,0 +1,106 @@
+import random
+import tracemalloc
+import uuid
+
+import chromadb
+import pytest
+from langchain_chroma import Chroma
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from app.document_processor import SEPARATORS, DocumentProcessor
+from app.hash_embeddings import HashEmbeddings
+from app.ingestion import store_chunk_stream
+from app.streaming_splitter import StreamingTextSplitter, detect_encoding
+
+WORDS = ["Bibliothek", "Straße", "Fahrplan", "a", "x" * 60, "y" * 1500, "\n", "\r\n", "\n\n", "\r\n\r\n", "\r", "  "]
+
+
+def random_text(rng, words):
+    return "".join(rng.choice(WORDS) + (" " if rng.random() < 0.7 else "") for _ in range(words))
+
+
+def reference_chunks(path, chunk_size, chunk_overlap, encoding="utf-8"):
+    """Bisheriger Pfad: Datei im Textmodus lesen (wie TextLoader), dann rekursiv splitten"""
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size, chunk_overlap=chunk_overlap, separators=SEPARATORS
+    )
+    return splitter.split_text(path.read_text(encoding=encoding))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_same_chunks_as_recursive_splitter(tmp_path, seed):
+    rng = random.Random(seed)
+    path = tmp_path / "dump.txt"
+    for _ in range(20):
+        chunk_size = rng.choice([20, 100, 1000])
+        chunk_overlap = rng.choice([0, 10, chunk_size // 2])
+        path.write_bytes(random_text(rng, rng.randint(0, 300)).encode("utf-8"))
+
+        streamed = list(StreamingTextSplitter(chunk_size, chunk_overlap).iter_chunks(path))
+        assert streamed == reference_chunks(path, chunk_size, chunk_overlap)
+
+
+def test_encoding_detection(tmp_path):
+    text = "Größere Straße über Bücher.\r\n\r\nZweite Zeile " * 40
+    path = tmp_path / "ocr.txt"
+
+    path.write_bytes(text.encode("cp1252"))
+    with open(path, "rb") as f:
+        assert detect_encoding(f.read()) == ("cp1252", 0)
+    expected = reference_chunks(path, 100, 20, encoding="cp1252")
+    assert list(StreamingTextSplitter(100, 20).iter_chunks(path)) == expected
+
+    # UTF-16 wird über eine temporäre UTF-8-Datei verarbeitet
+    path.write_bytes(text.encode("utf-16"))
+    assert list(StreamingTextSplitter(100, 20).iter_chunks(path)) == expected
+
+
+def test_peak_memory_independent_of_file_size(tmp_path):
+    path = tmp_path / "gross.txt"
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(40000):
+            f.write(f"Absatz {i} über Bibliotheken und Fahrpläne. " * 3 + "\n\n")
+        f.write("z" * 200000)  # langes Wort ohne Separatoren
+    assert path.stat().st_size > 5_000_000
+
+    splitter = StreamingTextSplitter(1000, 200)
+    tracemalloc.start()
+    try:
+        count = sum(1 for _ in splitter.iter_chunks(path))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert count > 5000
+    # Begrenzt durch Blockgröße bei der Encoding-Erkennung, nicht durch die Datei
+    assert peak < 8 * 1024 * 1024
+
+
+def test_streamed_ingestion_matches_processor_output(tmp_path):
+    path = tmp_path / "korpus.txt"
+    path.write_text("Erster Absatz über Kataloge.\n\n" * 200 + "Zeile ohne Ende " * 300, encoding="utf-8")
+    processor = DocumentProcessor(chunk_size=200, chunk_overlap=40)
+
+    loaded = processor.load_and_process_file(path)
+    timings = {}
+    streamed = list(processor.iter_text_chunks(path, timings))
+    assert [(c.page_content, c.metadata) for c in streamed] == [(c.page_content, c.metadata) for c in loaded]
+    assert timings["chunks"] == len(loaded)
+
+    vectorstore = Chroma(
+        collection_name=f"stream-{uuid.uuid4().hex[:8]}",
+        embedding_function=HashEmbeddings(dim=32),
+        client=chromadb.EphemeralClient(),
+    )
+    batches = []
+    stats = store_chunk_stream(
+        vectorstore,
+        processor.iter_text_chunks(path),
+        group_size=25,
+        batch_size=10,
+        on_batch=lambda num, total: batches.append(num),
+    )
+    assert stats["chunks"] == len(loaded)
+    assert stats["successful_batches"] == stats["total_batches"] == len(batches)
+    assert batches == list(range(1, len(batches) + 1))
+    assert vectorstore._collection.count() == len(loaded)
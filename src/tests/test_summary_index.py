@@ -0,0 +1,85 @@
+import uuid
+
+import chromadb
+import numpy as np
+import pytest
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+
+from app.config import Config
+from app.hash_embeddings import HashEmbeddings
+from app.ingestion import store_chunks_in_batches
+from app.rag_pipeline import RAGPipeline
+from app.summary_index import get_summary_index, summary_id
+
+TOPICS = {
+    "astronomie.txt": "Sterne Planeten Teleskop Galaxie Umlaufbahn",
+    "kochen.txt": "Rezept Pfanne Zwiebeln Suppe Gewürze",
+    "bahn.txt": "Zug Gleis Fahrplan Bahnhof Lokomotive",
+}
+
+
+@pytest.fixture
+def vectorstore():
+    return Chroma(
+        collection_name=f"docs-{uuid.uuid4().hex[:8]}",
+        embedding_function=HashEmbeddings(dim=64),
+        client=chromadb.EphemeralClient(),
+    )
+
+
+def make_chunks(filename, count, start=0):
+    return [
+        Document(
+            page_content=f"{TOPICS[filename]} Abschnitt {i}",
+            metadata={"filename": filename, "chunk_id": i},
+        )
+        for i in range(start, start + count)
+    ]
+
+
+def test_centroid_is_merged_across_flushes(vectorstore):
+    index = get_summary_index(vectorstore)
+    chunks = make_chunks("kochen.txt", 6)
+    store_chunks_in_batches(vectorstore, chunks[:4], batch_size=2, summary_index=index)
+    store_chunks_in_batches(vectorstore, chunks[4:], batch_size=2, summary_index=index)
+
+    entry = index.collection.get(ids=[summary_id("kochen.txt")], include=["embeddings", "metadatas", "documents"])
+    assert entry["metadatas"][0]["chunks"] == 6
+    assert entry["documents"][0].startswith(TOPICS["kochen.txt"])
+
+    expected = np.mean(vectorstore.embeddings.embed_documents([c.page_content for c in chunks]), axis=0)
+    assert np.allclose(entry["embeddings"][0], expected, atol=1e-5)
+
+    # Neuaufbau aus den gespeicherten Chunk-Vektoren ergibt denselben Zentroid
+    assert index.rebuild(vectorstore._collection) == 1
+    rebuilt = index.collection.get(ids=[summary_id("kochen.txt")], include=["embeddings"])
+    assert np.allclose(rebuilt["embeddings"][0], expected, atol=1e-5)
+
+    index.delete_file("kochen.txt")
+    assert index.count() == 0
+
+
+def test_two_stage_retrieval_searches_only_top_documents(vectorstore, monkeypatch):
+    chunks = [chunk for filename in TOPICS for chunk in make_chunks(filename, 5)]
+    store_chunks_in_batches(vectorstore, chunks, batch_size=4, summary_index=get_summary_index(vectorstore))
+    assert get_summary_index(vectorstore).count() == 3
+
+    monkeypatch.setattr(Config, "TWO_STAGE_COLLECTIONS", ["docs"])
+    monkeypatch.setattr(Config, "TWO_STAGE_TOP_DOCUMENTS", 1)
+    rag = RAGPipeline(vectorstore, collection_name="docs")
+    assert rag.two_stage
+
+    timings = {}
+    hits = rag._vector_search("Welche Planeten sieht man im Teleskop?", 8, timings)
+    assert hits
+    assert {doc.metadata["filename"] for doc, _ in hits} == {"astronomie.txt"}
+    assert "document_search_seconds" in timings
+
+
+def test_two_stage_falls_back_to_flat_search_without_index(vectorstore, monkeypatch):
+    store_chunks_in_batches(vectorstore, make_chunks("bahn.txt", 3), batch_size=3)
+
+    monkeypatch.setattr(Config, "TWO_STAGE_COLLECTIONS", ["docs"])
+    rag = RAGPipeline(vectorstore, collection_name="docs")
+    assert len(rag._vector_search("Wann fährt der Zug?", 3, {})) == 3